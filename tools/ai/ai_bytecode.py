@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+FFMQ AI Bytecode - Decode, compile and check enemy AI scripts
+
+Each enemy has a 256-byte slot at 0x320000, in the layout the AI script
+editor reads (ffmq_ai_editor.extract_ai_script; declared here as
+record_tables.AI_SCRIPTS):
+
+	+0    7 rules of 32 bytes
+	      +0   flags: 0x00, 0xFF = no rule
+	      +1   4 conditions: type, param1, param2 (type 0xFF = none)
+	      +13  4 actions: type, skill ID (0xFF = none), target, priority
+	+224  0xFF (the editor's rule 7, left empty), initial state
+	+226  3 transitions: from << 4 | to, condition type, param1, param2
+	+240  counter-attack: type, skill ID, target
+	+248  counter-magic: type, skill ID, target
+
+Type bytes are indices into the editor's ConditionType, ActionType and
+TargetType; designer concepts the editor had no code for were appended
+to those enums. A rule's actions share its conditions, so consecutive
+EnemyAI actions with equal conditions share a rule. param1 is a percent
+for HP/MP/random thresholds and a count otherwise; param2 is 0. Every
+unused byte is 0xFF, and an all-0xFF slot has no script. Skill names
+are not stored.
+
+Decoding is strict: a slot decodes only when compiling the result gives
+back the same 256 bytes, so saving from the designer never rewrites
+bytes it did not understand. Editor codes with no EnemyAI equivalent
+(turn_mod, enemy_count, always, nothing, weakest, strongest) are
+reported per enemy like any other malformed slot.
+
+Features:
+- Batched decode: all slots are viewed as one structured array; empty
+  slots and the compile-back byte comparison are whole-table NumPy ops
+- Compile with capacity accounting (rules, conditions, actions and
+  transitions per slot)
+- Listings of a slot's entries with offsets and raw bytes
+- Static analysis: unreachable states, never-true conditions, dead
+  transitions and actions that can never be selected
+- JSON export/import in the designer's format
+
+Usage:
+	python ai_bytecode.py rom.sfc --list
+	python ai_bytecode.py rom.sfc --disassemble 12
+	python ai_bytecode.py rom.sfc --analyze
+	python ai_bytecode.py rom.sfc --export-json scripts.json
+	python ai_bytecode.py rom.sfc --import-json scripts.json --output patched.sfc
+	python ai_bytecode.py rom.sfc --assign 12 --pattern coward --output patched.sfc
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+
+import ffmq_ai_editor as editor
+from ffmq_ai_editor import FFMQAIDatabase
+from ffmq_enemy_ai import (
+	STATE_ACTIONS, AIAction, AIState, ActionType, Condition, ConditionType, EnemyAI, FFMQEnemyAIDesigner,
+	StateTransition, TargetType
+)
+from record_tables import AI_RULE, AI_SCRIPTS
+
+
+FILL = 0xFF					# Empty entries and unused bytes
+SCRIPT_SIZE = AI_SCRIPTS.stride
+RULES = FFMQAIDatabase.NUM_RULES
+RULE_SIZE = AI_RULE.itemsize
+CONDITIONS_PER_RULE = AI_RULE['conditions'].shape[0]
+ACTIONS_PER_RULE = AI_RULE['actions'].shape[0]
+TRANSITIONS = AI_SCRIPTS.dtype['transitions'].shape[0]
+STATE_OFFSET = FFMQAIDatabase.STATE_OFFSET
+COUNTERS = (('counter_attack', FFMQAIDatabase.COUNTER_OFFSET), ('counter_magic', FFMQAIDatabase.COUNTER_OFFSET + 8))
+
+STATES = list(AIState)
+CONDITIONS = list(ConditionType)
+
+
+def _codes(editor_enum, pairs: dict) -> Dict:
+	"""Designer member -> editor type byte"""
+	members = list(editor_enum)
+	return {ours: members.index(theirs) for ours, theirs in pairs.items()}
+
+
+CONDITION_CODES = _codes(editor.ConditionType, {
+	ConditionType.HP_BELOW: editor.ConditionType.HP_BELOW,
+	ConditionType.HP_ABOVE: editor.ConditionType.HP_ABOVE,
+	ConditionType.MP_BELOW: editor.ConditionType.MP_BELOW,
+	ConditionType.TURN_COUNT: editor.ConditionType.TURN_AT_LEAST,
+	ConditionType.STATUS_HAS: editor.ConditionType.HAS_STATUS,
+	ConditionType.ALLY_COUNT: editor.ConditionType.ALLY_COUNT,
+	ConditionType.RANDOM: editor.ConditionType.RANDOM,
+})
+ACTION_CODES = _codes(editor.ActionType, {member: editor.ActionType[member.name] for member in ActionType})
+TARGET_CODES = _codes(editor.TargetType, {
+	TargetType.ENEMY_RANDOM: editor.TargetType.RANDOM,
+	TargetType.ENEMY_LOWEST_HP: editor.TargetType.LOWEST_HP,
+	TargetType.ENEMY_HIGHEST_HP: editor.TargetType.HIGHEST_HP,
+	TargetType.ALLY_RANDOM: editor.TargetType.ALLY_RANDOM,
+	TargetType.ALLY_LOWEST_HP: editor.TargetType.ALLY_LOWEST_HP,
+	TargetType.SELF: editor.TargetType.SELF,
+	TargetType.ALL_ENEMIES: editor.TargetType.ALL,
+	TargetType.ALL_ALLIES: editor.TargetType.ALL_ALLIES,
+})
+
+# Conditions stored as a percentage; the rest are counts
+PERCENT_CONDITIONS = {ConditionType.HP_BELOW, ConditionType.HP_ABOVE, ConditionType.MP_BELOW, ConditionType.RANDOM}
+
+MAX_STATUSES = 6			# StatusEffect members in the battle editor
+MAX_ALLIES = 7				# Other enemies in an 8-slot formation
+
+
+class ScriptError(ValueError):
+	"""Malformed slot, or a model that cannot be encoded"""
+
+
+class Usage(NamedTuple):
+	"""Slot capacity taken by one script"""
+	rules: int
+	transitions: int
+
+
+def as_slots(data) -> np.ndarray:
+	"""(scripts, SCRIPT_SIZE) byte matrix over a ROM, or one slot padded with 0xFF"""
+	if len(data) >= AI_SCRIPTS.offset:
+		return AI_SCRIPTS.view(data).view(np.uint8).reshape(-1, SCRIPT_SIZE)
+	row = np.full((1, SCRIPT_SIZE), FILL, dtype=np.uint8)
+	row[0, :len(data)] = np.frombuffer(bytes(data[:SCRIPT_SIZE]), dtype=np.uint8)
+	return row
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+
+def _name(editor_enum, code: int) -> str:
+	members = list(editor_enum)
+	return members[code].value if code < len(members) else f"0x{code:02X}"
+
+
+def _lookup(codes: Dict, code: int, editor_enum, what: str, offset: int):
+	for member, value in codes.items():
+		if value == code:
+			return member
+	if code < len(editor_enum):
+		raise ScriptError(f"{what} '{_name(editor_enum, code)}' at 0x{offset:02X} has no EnemyAI equivalent")
+	raise ScriptError(f"bad {what} type 0x{code:02X} at 0x{offset:02X}")
+
+
+def _state(index: int, offset: int) -> AIState:
+	if index >= len(STATES):
+		raise ScriptError(f"state {index} out of range at 0x{offset:02X}")
+	return STATES[index]
+
+
+def _condition_at(entry: Sequence[int], offset: int) -> Condition:
+	condition_type = _lookup(CONDITION_CODES, entry[0], editor.ConditionType, "condition", offset)
+	value = entry[1] / 100 if condition_type in PERCENT_CONDITIONS else entry[1]
+	return Condition(condition_type, value)
+
+
+def _action_at(entry: Sequence[int], conditions: List[Condition], offset: int) -> AIAction:
+	action = AIAction(
+		action_type=_lookup(ACTION_CODES, entry[0], editor.ActionType, "action", offset),
+		target_type=_lookup(TARGET_CODES, entry[2], editor.TargetType, "target", offset + 2),
+		skill_id=None if entry[1] == FILL else entry[1],
+		conditions=conditions,
+	)
+	if len(entry) > 3:
+		action.priority = entry[3]
+	return action
+
+
+def build(enemy_id: int, enemy_name: str, record: np.void) -> EnemyAI:
+	"""EnemyAI from one AI_SCRIPTS record"""
+	ai = EnemyAI(enemy_id=enemy_id, enemy_name=enemy_name,
+				 current_state=_state(int(record['state']), STATE_OFFSET + 1))
+
+	for index, (flags, conditions, actions) in enumerate(record['rules'].tolist()):
+		if flags == FILL:
+			continue
+		base = index * RULE_SIZE
+		shared = [_condition_at(entry, base + 1 + i * 3) for i, entry in enumerate(conditions) if entry[0] != FILL]
+		for i, entry in enumerate(actions):
+			if entry[0] != FILL:
+				ai.actions.append(_action_at(entry, list(shared), base + 13 + i * 4))
+
+	for i, (states, *condition) in enumerate(record['transitions'].tolist()):
+		if states == FILL:
+			continue
+		offset = STATE_OFFSET + 2 + i * 4
+		ai.transitions.append(StateTransition(
+			from_state=_state(states >> 4, offset),
+			to_state=_state(states & 0x0F, offset),
+			condition=_condition_at(condition, offset + 1),
+		))
+
+	for field, offset in COUNTERS:
+		entry = record[field].tolist()
+		if entry[0] != FILL:
+			setattr(ai, field, _action_at(entry, [], offset))
+	return ai
+
+
+def decode_slots(slots: np.ndarray, first_id: int = 0) -> Tuple[Dict[int, EnemyAI], Dict[int, str]]:
+	"""
+	Decode a (scripts, SCRIPT_SIZE) byte matrix in one pass
+
+	Returns (enemy -> AI, enemy -> error). A script that does not
+	compile back to its exact bytes is an error, not a result.
+	"""
+	slots = np.ascontiguousarray(slots, dtype=np.uint8)
+	records = slots.reshape(-1).view(AI_SCRIPTS.dtype)
+	scripts: Dict[int, EnemyAI] = {}
+	errors: Dict[int, str] = {}
+	for row in np.flatnonzero((slots != FILL).any(axis=1)).tolist():
+		enemy_id = first_id + row
+		try:
+			scripts[enemy_id] = build(enemy_id, FFMQAIDatabase.get_enemy_name(enemy_id), records[row])
+		except ScriptError as e:
+			errors[enemy_id] = str(e)
+
+	if scripts:
+		ids = list(scripts)
+		rows = np.array(ids) - first_id
+		compiled = np.frombuffer(b''.join(compile_ai(scripts[i]) for i in ids), dtype=np.uint8)
+		differs = compiled.reshape(len(ids), SCRIPT_SIZE) != slots[rows]
+		for index in np.flatnonzero(differs.any(axis=1)).tolist():
+			offset = int(np.argmax(differs[index]))
+			enemy_id = ids[index]
+			errors[enemy_id] = (f"byte 0x{slots[rows[index], offset]:02X} at 0x{offset:02X} does not round-trip "
+								f"(compiles to 0x{compiled[index * SCRIPT_SIZE + offset]:02X})")
+			del scripts[enemy_id]
+	return scripts, dict(sorted(errors.items()))
+
+
+def decode(code: bytes, enemy_id: int = 0, enemy_name: Optional[str] = None) -> Optional[EnemyAI]:
+	"""One slot to EnemyAI; None for an empty slot"""
+	scripts, errors = decode_slots(as_slots(code), enemy_id)
+	if errors:
+		raise ScriptError(errors[enemy_id])
+	ai = scripts.get(enemy_id)
+	if ai is not None and enemy_name:
+		ai.enemy_name = enemy_name
+	return ai
+
+
+def decode_rom(rom: bytes) -> Tuple[Dict[int, EnemyAI], Dict[int, str]]:
+	"""Every enemy's script: (enemy -> AI, enemy -> error)"""
+	return decode_slots(as_slots(rom))
+
+
+# ----------------------------------------------------------------------
+# Compiling
+# ----------------------------------------------------------------------
+
+def _byte(value, what: str, top: int = 255) -> int:
+	if not 0 <= value <= top or value != int(value):
+		raise ScriptError(f"{what} {value!r} does not fit in a byte" + (" below 0xFF" if top < 255 else ""))
+	return int(value)
+
+
+def _condition(condition: Condition) -> List[int]:
+	value = condition.value * 100 if condition.condition_type in PERCENT_CONDITIONS else condition.value
+	if condition.condition_type in PERCENT_CONDITIONS and abs(value - round(value)) < 1e-9:
+		value = round(value)
+	return [CONDITION_CODES[condition.condition_type], _byte(value, f"{condition.condition_type.value} value"), 0]
+
+
+def _action(action: AIAction) -> List[int]:
+	skill = FILL if action.skill_id is None else _byte(action.skill_id, "skill ID", FILL - 1)
+	return [ACTION_CODES[action.action_type], skill, TARGET_CODES[action.target_type],
+			_byte(action.priority, "priority")]
+
+
+def rule_groups(ai: EnemyAI) -> List[Tuple[List[Condition], List[AIAction]]]:
+	"""Actions grouped into rules: consecutive actions with equal conditions, up to 4 per rule"""
+	groups = []
+	for action in ai.actions:
+		if groups and groups[-1][0] == action.conditions and len(groups[-1][1]) < ACTIONS_PER_RULE:
+			groups[-1][1].append(action)
+		else:
+			groups.append((action.conditions, [action]))
+	return groups
+
+
+def usage(ai: EnemyAI) -> Usage:
+	return Usage(len(rule_groups(ai)), len(ai.transitions))
+
+
+def compile_ai(ai: EnemyAI) -> bytes:
+	"""Full SCRIPT_SIZE slot"""
+	groups = rule_groups(ai)
+	if len(groups) > RULES:
+		raise ScriptError(f"{ai.enemy_name}: {len(groups)} rules, slot holds {RULES}")
+	if len(ai.transitions) > TRANSITIONS:
+		raise ScriptError(f"{ai.enemy_name}: {len(ai.transitions)} transitions, slot holds {TRANSITIONS}")
+
+	code = bytearray([FILL]) * SCRIPT_SIZE
+	record = np.frombuffer(code, dtype=AI_SCRIPTS.dtype)[0]
+	for index, (conditions, actions) in enumerate(groups):
+		if len(conditions) > CONDITIONS_PER_RULE:
+			raise ScriptError(f"{ai.enemy_name}: {len(conditions)} conditions on one action, "
+							  f"a rule holds {CONDITIONS_PER_RULE}")
+		rule = record['rules'][index]
+		rule['flags'] = 0
+		for i, condition in enumerate(conditions):
+			rule['conditions'][i] = _condition(condition)
+		for i, action in enumerate(actions):
+			rule['actions'][i] = _action(action)
+
+	record['state'] = STATES.index(ai.current_state)
+	for i, transition in enumerate(ai.transitions):
+		states = STATES.index(transition.from_state) << 4 | STATES.index(transition.to_state)
+		record['transitions'][i] = [states] + _condition(transition.condition)
+
+	for field, _ in COUNTERS:
+		counter = getattr(ai, field)
+		if counter is not None:
+			if counter.conditions:
+				raise ScriptError(f"{ai.enemy_name}: {field} cannot have conditions")
+			record[field] = _action(counter)[:3]
+	return bytes(code)
+
+
+def write_rom(rom: bytearray, scripts: Iterable[EnemyAI]) -> Dict[int, Usage]:
+	"""Compile scripts into their enemies' slots; returns enemy -> capacity used
+
+	Everything is compiled before anything is written, so a script that
+	does not fit leaves the ROM untouched.
+	"""
+	slots = as_slots(rom)
+	compiled = {}
+	for ai in scripts:
+		if not 0 <= ai.enemy_id < len(slots):
+			raise ScriptError(f"{ai.enemy_name}: no script slot for enemy {ai.enemy_id}")
+		compiled[ai.enemy_id] = (compile_ai(ai), usage(ai))
+	for enemy_id, (code, _) in compiled.items():
+		slots[enemy_id] = np.frombuffer(code, dtype=np.uint8)
+	return {enemy_id: used for enemy_id, (_, used) in compiled.items()}
+
+
+def slot_usage(rom: bytes) -> Tuple[np.ndarray, np.ndarray]:
+	"""Rules and transitions in use per slot, straight from the flag bytes"""
+	records = AI_SCRIPTS.view(rom)
+	return ((records['rules']['flags'] != FILL).sum(axis=1),
+			(records['transitions'][..., 0] != FILL).sum(axis=1))
+
+
+def disassemble(code: bytes) -> List[str]:
+	"""Listing lines: offset, raw bytes and meaning of every entry in use"""
+	slots = as_slots(code)
+	record = slots.reshape(-1).view(AI_SCRIPTS.dtype)[0]
+	lines = []
+
+	def line(offset: int, raw: Sequence[int], text: str) -> None:
+		hex_bytes = ' '.join(f"{b:02X}" for b in raw)
+		lines.append(f"{offset:04X}  {hex_bytes:<12} {text}".rstrip())
+
+	for index, (flags, conditions, actions) in enumerate(record['rules'].tolist()):
+		if flags == FILL:
+			continue
+		base = index * RULE_SIZE
+		line(base, [flags], f"RULE {index}")
+		for i, entry in enumerate(conditions):
+			if entry[0] != FILL:
+				line(base + 1 + i * 3, entry, f"  IF {_name(editor.ConditionType, entry[0])} {entry[1]}")
+		for i, entry in enumerate(actions):
+			if entry[0] != FILL:
+				line(base + 13 + i * 4, entry, f"  {_action_text(entry)} priority {entry[3]}")
+
+	if (slots[0, STATE_OFFSET:FFMQAIDatabase.COUNTER_OFFSET] != FILL).any():
+		state = int(record['state'])
+		line(STATE_OFFSET + 1, [state], f"STATE {STATES[state].value if state < len(STATES) else f'?{state}'}")
+	for i, entry in enumerate(record['transitions'].tolist()):
+		if entry[0] != FILL:
+			names = [STATES[s].value if s < len(STATES) else f"?{s}" for s in (entry[0] >> 4, entry[0] & 0x0F)]
+			line(STATE_OFFSET + 2 + i * 4, entry,
+				 f"GOTO {names[0]} -> {names[1]} IF {_name(editor.ConditionType, entry[1])} {entry[2]}")
+	for field, offset in COUNTERS:
+		entry = record[field].tolist()
+		if entry[0] != FILL:
+			line(offset, entry, f"{field.upper().replace('_', ' ')} {_action_text(entry)}")
+
+	try:
+		decode(code)
+	except ScriptError as e:
+		lines.append(f"; error: {e}")
+	return lines
+
+
+def _action_text(entry: Sequence[int]) -> str:
+	text = f"{_name(editor.ActionType, entry[0])} -> {_name(editor.TargetType, entry[2])}"
+	return text + (f" skill {entry[1]}" if entry[1] != FILL else "")
+
+
+# ----------------------------------------------------------------------
+# Static analysis
+# ----------------------------------------------------------------------
+
+class FindingKind(Enum):
+	"""Static analysis finding"""
+	UNREACHABLE_STATE = "unreachable_state"
+	NEVER_TRUE = "never_true"
+	DEAD_TRANSITION = "dead_transition"
+	ZERO_PROBABILITY = "zero_probability"
+
+
+@dataclass
+class Finding:
+	"""One analyzer result"""
+	kind: FindingKind
+	enemy_id: int
+	subject: str
+	message: str
+
+	def to_dict(self) -> dict:
+		return {'kind': self.kind.value, 'enemy_id': self.enemy_id, 'subject': self.subject,
+				'message': self.message}
+
+
+def never_true(condition: Condition) -> bool:
+	"""Condition that no battle state satisfies"""
+	kind, value = condition.condition_type, condition.value
+	return ((kind in (ConditionType.HP_BELOW, ConditionType.MP_BELOW, ConditionType.RANDOM) and value <= 0)
+			or (kind == ConditionType.HP_ABOVE and value >= 1)
+			or (kind == ConditionType.STATUS_HAS and value > MAX_STATUSES)
+			or (kind == ConditionType.ALLY_COUNT and value > MAX_ALLIES))
+
+
+def always_true(condition: Condition) -> bool:
+	"""Condition that every battle state satisfies"""
+	kind, value = condition.condition_type, condition.value
+	return ((kind in (ConditionType.HP_BELOW, ConditionType.MP_BELOW) and value > 1)
+			or (kind == ConditionType.HP_ABOVE and value < 0)
+			or (kind == ConditionType.RANDOM and value >= 1)
+			or (kind == ConditionType.TURN_COUNT and value <= 1)
+			or (kind == ConditionType.ALLY_COUNT and value <= 0))
+
+
+def _contradiction(conditions: Sequence[Condition]) -> Optional[str]:
+	"""Reason a set of conditions cannot hold together"""
+	below = [c.value for c in conditions if c.condition_type == ConditionType.HP_BELOW]
+	above = [c.value for c in conditions if c.condition_type == ConditionType.HP_ABOVE]
+	if below and above and max(above) >= min(below):
+		return f"HP below {min(below):g} and above {max(above):g}"
+	return None
+
+
+def _describe(condition: Condition) -> str:
+	return f"{condition.condition_type.value} {condition.value:g}"
+
+
+def shadowed(ai: EnemyAI, index: int) -> bool:
+	"""Transition that an earlier always-true one from the same state always beats"""
+	transition = ai.transitions[index]
+	return any(t.from_state == transition.from_state and always_true(t.condition) for t in ai.transitions[:index])
+
+
+def reachable_states(ai: EnemyAI) -> List[AIState]:
+	"""States reachable from the initial state through transitions that can fire"""
+	live = [t for i, t in enumerate(ai.transitions) if not never_true(t.condition) and not shadowed(ai, i)]
+	reached = [ai.current_state]
+	for state in reached:
+		for transition in live:
+			if transition.from_state == state and transition.to_state not in reached:
+				reached.append(transition.to_state)
+	return reached
+
+
+def analyze(ai: EnemyAI) -> List[Finding]:
+	"""Unreachable states, never-true conditions, dead transitions, unselectable actions"""
+	findings = []
+
+	def report(kind: FindingKind, subject: str, message: str) -> None:
+		findings.append(Finding(kind, ai.enemy_id, subject, message))
+
+	reachable = reachable_states(ai)
+	mentioned = []
+	for transition in ai.transitions:
+		for state in (transition.from_state, transition.to_state):
+			if state not in mentioned:
+				mentioned.append(state)
+	for state in mentioned:
+		if state not in reachable:
+			report(FindingKind.UNREACHABLE_STATE, state.value,
+				   f"State '{state.value}' cannot be reached from '{ai.current_state.value}'")
+
+	# Transitions: never true, from an unreachable state, or behind an always-true one
+	for index, transition in enumerate(ai.transitions):
+		subject = f"transition {index} ({transition.from_state.value} -> {transition.to_state.value})"
+		if never_true(transition.condition):
+			report(FindingKind.NEVER_TRUE, subject, f"Condition {_describe(transition.condition)} is never true")
+		elif shadowed(ai, index):
+			report(FindingKind.DEAD_TRANSITION, subject,
+				   f"An earlier transition from '{transition.from_state.value}' always fires first")
+		elif transition.from_state not in reachable:
+			report(FindingKind.DEAD_TRANSITION, subject, f"Leaves unreachable state '{transition.from_state.value}'")
+
+	# Actions: unsatisfiable, or outranked in every reachable state by one that is always valid
+	always = [all(always_true(c) for c in action.conditions) for action in ai.actions]
+	for index, action in enumerate(ai.actions):
+		subject = f"action {index} ({action.action_type.value})"
+		impossible = [c for c in action.conditions if never_true(c)]
+		for condition in impossible:
+			report(FindingKind.NEVER_TRUE, subject, f"Condition {_describe(condition)} is never true")
+		contradiction = _contradiction(action.conditions)
+		if contradiction:
+			report(FindingKind.NEVER_TRUE, subject, f"Conditions contradict: {contradiction}")
+		if impossible or contradiction:
+			continue
+
+		blockers = []
+		for state in reachable:
+			preferred = STATE_ACTIONS.get(state, ())
+			mine = action.action_type in preferred
+			blocker = next((
+				other for other, valid in zip(range(len(ai.actions)), always)
+				if valid and other != index and (
+					(ai.actions[other].action_type in preferred and not mine)
+					or ((ai.actions[other].action_type in preferred) == mine
+						and (ai.actions[other].priority, -other) > (action.priority, -index)))
+			), None)
+			if blocker is None:
+				break
+			blockers.append(blocker)
+		else:
+			others = ', '.join(str(b) for b in sorted(set(blockers)))
+			report(FindingKind.ZERO_PROBABILITY, subject,
+				   f"Never selected: outranked in every reachable state by action {others}")
+	return findings
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ AI Bytecode Tool')
+	parser.add_argument('rom', type=str, help='FFMQ ROM file')
+	parser.add_argument('--list', action='store_true', help='List scripts with slot usage')
+	parser.add_argument('--disassemble', type=int, help='List one enemy script slot')
+	parser.add_argument('--analyze', action='store_true', help='Static analysis of every script')
+	parser.add_argument('--export-json', type=str, help='Export decoded scripts to JSON')
+	parser.add_argument('--import-json', type=str, help='Compile scripts from JSON into the ROM')
+	parser.add_argument('--assign', type=int, help='Enemy ID to give a designer pattern')
+	parser.add_argument('--pattern', type=str, default='aggressive',
+						choices=list(FFMQEnemyAIDesigner.AI_PATTERNS), help='Pattern for --assign')
+	parser.add_argument('--output', type=str, help='Output ROM for --import-json/--assign')
+	args = parser.parse_args()
+
+	with open(args.rom, 'rb') as f:
+		rom = bytearray(f.read())
+
+	if args.list:
+		scripts, errors = decode_rom(rom)
+		rules, transitions = slot_usage(rom)
+		print(f"\nAI Scripts ({len(scripts)} decoded, {len(errors)} not decodable):\n")
+		print(f"{'ID':>4} {'Enemy':<20} {'State':<10} {'Actions':>7} {'Rules':>5} {'Trans':>5}")
+		print("=" * 56)
+		for enemy_id, ai in scripts.items():
+			print(f"{enemy_id:>4} {ai.enemy_name:<20} {ai.current_state.value:<10} {len(ai.actions):>7} "
+				  f"{rules[enemy_id]:>3}/{RULES} {transitions[enemy_id]:>3}/{TRANSITIONS}")
+		for enemy_id, error in errors.items():
+			print(f"{enemy_id:>4} {FFMQAIDatabase.get_enemy_name(enemy_id):<20} ❌ {error}")
+		print(f"\nRules used: {int(rules.sum()):,} of {len(rules) * RULES:,}")
+		return 0
+
+	if args.disassemble is not None:
+		code = as_slots(rom)[args.disassemble].tobytes()
+		print(f"\n=== {FFMQAIDatabase.get_enemy_name(args.disassemble)} AI Script ===\n")
+		print('\n'.join(disassemble(code)) or "(no script)")
+		return 0
+
+	if args.analyze:
+		scripts, errors = decode_rom(rom)
+		findings = [finding for ai in scripts.values() for finding in analyze(ai)]
+		print(f"\nAnalyzed {len(scripts)} scripts: {len(findings)} findings, {len(errors)} not decodable\n")
+		for finding in findings:
+			name = FFMQAIDatabase.get_enemy_name(finding.enemy_id)
+			print(f"  ⚠️  {name} {finding.subject}: {finding.message}")
+		for enemy_id, error in errors.items():
+			print(f"  ❌ {FFMQAIDatabase.get_enemy_name(enemy_id)}: {error}")
+		return 0
+
+	if args.export_json:
+		scripts, errors = decode_rom(rom)
+		with open(args.export_json, 'w', encoding='utf-8') as f:
+			json.dump([ai.to_dict() for ai in scripts.values()], f, indent='\t')
+		print(f"✓ Exported {len(scripts)} scripts to {args.export_json}"
+			  + (f" ({len(errors)} not decodable, skipped)" if errors else ""))
+		return 0
+
+	if args.import_json or args.assign is not None:
+		if args.import_json:
+			with open(args.import_json, encoding='utf-8') as f:
+				scripts = [EnemyAI.from_dict(data) for data in json.load(f)]
+		else:
+			designer = FFMQEnemyAIDesigner()
+			scripts = [designer.create_enemy_ai(args.assign, FFMQAIDatabase.get_enemy_name(args.assign),
+												args.pattern)]
+		try:
+			used = write_rom(rom, scripts)
+		except ScriptError as e:
+			print(f"❌ {e}")
+			return 1
+		for ai in scripts:
+			rules, transitions = used[ai.enemy_id]
+			print(f"  {ai.enemy_id:>4} {ai.enemy_name:<20} {rules}/{RULES} rules, "
+				  f"{transitions}/{TRANSITIONS} transitions")
+		output = Path(args.output or args.rom)
+		with open(output, 'wb') as f:
+			f.write(rom)
+		print(f"✓ Wrote {len(scripts)} scripts to {output}")
+		return 0
+
+	print("Use --list, --disassemble, --analyze, --export-json, --import-json or --assign")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
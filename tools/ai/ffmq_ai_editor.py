@@ -31,6 +31,13 @@ AI Script Structure:
 - Targets (random, weakest, strongest, self)
 - Counters (respond to damage/magic)
 
+Slot layout (256 bytes per enemy at 0x320000):
+- +0    7 rules of 32 bytes: flags (0xFF = no rule), 4 conditions of
+        (type, param1, param2), 4 actions of (type, ID, target, priority)
+- +224  State machine (ai_bytecode): 0xFF, initial state, 3 transitions
+- +240  Counter-attack (type, ID, target), counter-magic at +248
+Type bytes index the enums below; 0xFF marks an empty entry.
+
 Usage:
 	python ffmq_ai_editor.py rom.sfc --list-scripts
 	python ffmq_ai_editor.py rom.sfc --show-script 10
@@ -58,6 +65,9 @@ class ConditionType(Enum):
 	ENEMY_COUNT = "enemy_count"
 	ALLY_COUNT = "ally_count"
 	ALWAYS = "always"
+	MP_BELOW = "mp_below"
+	TURN_AT_LEAST = "turn_at_least"
+	RANDOM = "random"
 
 
 class ActionType(Enum):
@@ -69,6 +79,8 @@ class ActionType(Enum):
 	DEFEND = "defend"
 	FLEE = "flee"
 	NOTHING = "nothing"
+	BUFF = "buff"
+	HEAL = "heal"
 
 
 class TargetType(Enum):
@@ -80,6 +92,9 @@ class TargetType(Enum):
 	HIGHEST_HP = "highest_hp"
 	SELF = "self"
 	ALL = "all"
+	ALLY_RANDOM = "ally_random"
+	ALLY_LOWEST_HP = "ally_lowest_hp"
+	ALL_ALLIES = "all_allies"
 
 
 @dataclass
@@ -109,6 +124,12 @@ class AICondition:
 			return f"Enemies == {self.param1}"
 		elif self.condition_type == ConditionType.ALWAYS:
 			return "Always"
+		elif self.condition_type == ConditionType.MP_BELOW:
+			return f"MP < {self.param1}%"
+		elif self.condition_type == ConditionType.TURN_AT_LEAST:
+			return f"Turn >= {self.param1}"
+		elif self.condition_type == ConditionType.RANDOM:
+			return f"{self.param1}% chance"
 		return "Unknown"
 
 
@@ -179,6 +200,10 @@ class FFMQAIDatabase:
 	AI_SCRIPT_OFFSET = 0x320000
 	NUM_AI_SCRIPTS = 256
 	SCRIPT_SIZE = 256
+	NUM_RULES = 7			# A rule 7 would overlap the state machine and counters
+	RULE_SIZE = 32
+	STATE_OFFSET = 224
+	COUNTER_OFFSET = 240
 	
 	# Known enemy names (subset)
 	ENEMY_NAMES = {
@@ -249,12 +274,12 @@ class FFMQAIEditor:
 		if offset + FFMQAIDatabase.SCRIPT_SIZE > len(self.rom_data):
 			return None
 		
-		# Read AI rules (up to 8 rules)
+		# Read AI rules (up to 7 rules)
 		rules = []
-		for rule_id in range(8):
-			rule_offset = offset + (rule_id * 32)
+		for rule_id in range(FFMQAIDatabase.NUM_RULES):
+			rule_offset = offset + (rule_id * FFMQAIDatabase.RULE_SIZE)
 			
-			if rule_offset + 32 > len(self.rom_data):
+			if rule_offset + FFMQAIDatabase.RULE_SIZE > len(self.rom_data):
 				break
 			
 			# Check if rule exists
@@ -333,7 +358,7 @@ class FFMQAIEditor:
 				))
 		
 		# Read counter-attacks
-		counter_offset = offset + 240
+		counter_offset = offset + FFMQAIDatabase.COUNTER_OFFSET
 		counter_attack = None
 		counter_magic = None
 		
@@ -32,6 +32,8 @@ Features:
 - Export AI data
 - Import templates
 - Validate logic
+- Simulate fights with the battle simulator (state transitions,
+  party turn order, statuses)
 
 Usage:
 	python ffmq_enemy_ai.py rom.sfc --create goblin --pattern aggressive
@@ -39,11 +41,13 @@ Usage:
 	python ffmq_enemy_ai.py rom.sfc --test goblin --simulate 10
 	python ffmq_enemy_ai.py rom.sfc --export goblin_ai.json
 	python ffmq_enemy_ai.py rom.sfc --import boss_ai.json
+	python ffmq_enemy_ai.py rom.sfc --load-rom-scripts --info Goblin
 """
 
 import argparse
 import json
 import random
+import sys
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, asdict, field
@@ -121,7 +125,17 @@ class AIAction:
 		d = asdict(self)
 		d['action_type'] = self.action_type.value
 		d['target_type'] = self.target_type.value
+		d['conditions'] = [c.to_dict() for c in self.conditions]
 		return d
+	
+	@classmethod
+	def from_dict(cls, data: dict) -> 'AIAction':
+		"""Inverse of to_dict"""
+		data = dict(data)
+		data['action_type'] = ActionType(data['action_type'])
+		data['target_type'] = TargetType(data['target_type'])
+		data['conditions'] = [Condition(ConditionType(c['condition_type']), c['value']) for c in data['conditions']]
+		return cls(**data)
 
 
 @dataclass
@@ -135,6 +149,7 @@ class StateTransition:
 		d = asdict(self)
 		d['from_state'] = self.from_state.value
 		d['to_state'] = self.to_state.value
+		d['condition'] = self.condition.to_dict()
 		return d
 
 
@@ -146,11 +161,63 @@ class EnemyAI:
 	current_state: AIState
 	actions: List[AIAction] = field(default_factory=list)
 	transitions: List[StateTransition] = field(default_factory=list)
+	counter_attack: Optional[AIAction] = None	# Response to a physical hit
+	counter_magic: Optional[AIAction] = None	# Response to a spell
 	
 	def to_dict(self) -> dict:
 		d = asdict(self)
 		d['current_state'] = self.current_state.value
+		d['actions'] = [a.to_dict() for a in self.actions]
+		d['transitions'] = [t.to_dict() for t in self.transitions]
+		for counter in ('counter_attack', 'counter_magic'):
+			if getattr(self, counter) is not None:
+				d[counter] = getattr(self, counter).to_dict()
 		return d
+	
+	@classmethod
+	def from_dict(cls, data: dict) -> 'EnemyAI':
+		"""Inverse of to_dict"""
+		actions = [AIAction.from_dict(action_data) for action_data in data['actions']]
+		
+		transitions = []
+		for trans_data in data['transitions']:
+			condition = trans_data['condition']
+			transitions.append(StateTransition(
+				from_state=AIState(trans_data['from_state']),
+				to_state=AIState(trans_data['to_state']),
+				condition=Condition(ConditionType(condition['condition_type']), condition['value'])
+			))
+		
+		return cls(
+			enemy_id=data['enemy_id'],
+			enemy_name=data['enemy_name'],
+			current_state=AIState(data['current_state']),
+			actions=actions,
+			transitions=transitions,
+			counter_attack=AIAction.from_dict(data['counter_attack']) if data.get('counter_attack') else None,
+			counter_magic=AIAction.from_dict(data['counter_magic']) if data.get('counter_magic') else None
+		)
+
+
+@dataclass
+class AIContext:
+	"""Battle state visible to AI conditions"""
+	hp_percent: float = 1.0
+	turn: int = 1
+	mp_percent: float = 1.0
+	statuses: int = 0			# Active status effects on the enemy
+	allies: int = 0				# Other enemies still fighting
+	rng: Any = random			# random.Random (or the module) for RANDOM conditions
+
+
+# Action types an AI state prefers, when one of them is valid
+STATE_ACTIONS = {
+	AIState.ATTACKING: (ActionType.ATTACK, ActionType.MAGIC, ActionType.SKILL),
+	AIState.DEFENDING: (ActionType.DEFEND, ActionType.HEAL, ActionType.BUFF),
+	AIState.FLEEING: (ActionType.FLEE,),
+	AIState.BUFFING: (ActionType.BUFF,),
+	AIState.HEALING: (ActionType.HEAL, ActionType.ITEM),
+}
 
 
 class FFMQEnemyAIDesigner:
@@ -287,8 +354,12 @@ class FFMQEnemyAIDesigner:
 			print(f"✓ Added {action.action_type.value} action to {enemy_name}")
 	
 	def select_action(self, ai: EnemyAI, hp_percent: float = 1.0, 
-					  turn: int = 1) -> Optional[AIAction]:
+					  turn: int = 1, context: Optional[AIContext] = None,
+					  state: Optional[AIState] = None) -> Optional[AIAction]:
 		"""Select best action based on current state"""
+		context = context or AIContext(hp_percent=hp_percent, turn=turn)
+		state = state or ai.current_state
+		
 		# Filter actions by conditions
 		valid_actions = []
 		
@@ -296,7 +367,7 @@ class FFMQEnemyAIDesigner:
 			valid = True
 			
 			for condition in action.conditions:
-				if not self._check_condition(condition, hp_percent, turn):
+				if not self._check_condition(condition, context.hp_percent, context.turn, context):
 					valid = False
 					break
 			
@@ -306,13 +377,35 @@ class FFMQEnemyAIDesigner:
 		if not valid_actions:
 			return None
 		
+		# Actions that suit the current state go first
+		preferred = [a for a in valid_actions if a.action_type in STATE_ACTIONS.get(state, ())]
+		if preferred:
+			valid_actions = preferred
+		
 		# Sort by priority (higher first)
 		valid_actions.sort(key=lambda a: a.priority, reverse=True)
 		
 		return valid_actions[0]
 	
-	def _check_condition(self, condition: Condition, hp_percent: float, turn: int) -> bool:
+	def next_state(self, ai: EnemyAI, state: AIState, context: AIContext) -> AIState:
+		"""State after the first matching transition out of state"""
+		for transition in ai.transitions:
+			if (transition.from_state == state and
+				self._check_condition(transition.condition, context.hp_percent, context.turn, context)):
+				return transition.to_state
+		
+		return state
+	
+	def advance_state(self, ai: EnemyAI, context: AIContext) -> AIState:
+		"""Apply transitions to the AI's current state"""
+		ai.current_state = self.next_state(ai, ai.current_state, context)
+		return ai.current_state
+	
+	def _check_condition(self, condition: Condition, hp_percent: float, turn: int,
+						 context: Optional[AIContext] = None) -> bool:
 		"""Check if condition is met"""
+		rng = context.rng if context else random
+		
 		if condition.condition_type == ConditionType.HP_BELOW:
 			return hp_percent < condition.value
 		elif condition.condition_type == ConditionType.HP_ABOVE:
@@ -320,40 +413,35 @@ class FFMQEnemyAIDesigner:
 		elif condition.condition_type == ConditionType.TURN_COUNT:
 			return turn >= condition.value
 		elif condition.condition_type == ConditionType.RANDOM:
-			return random.random() < condition.value
+			return rng.random() < condition.value
+		elif context is not None:
+			if condition.condition_type == ConditionType.MP_BELOW:
+				return context.mp_percent < condition.value
+			elif condition.condition_type == ConditionType.STATUS_HAS:
+				return context.statuses >= max(1, condition.value)
+			elif condition.condition_type == ConditionType.ALLY_COUNT:
+				return context.allies >= condition.value
 		
 		return True
 	
-	def simulate_battle(self, enemy_name: str, turns: int = 10) -> None:
-		"""Simulate battle turns"""
+	def simulate_battle(self, enemy_name: str, turns: int = 10, seed: Optional[int] = None) -> None:
+		"""Simulate a fight against the default party and print each turn"""
 		if enemy_name not in self.enemies:
 			raise ValueError(f"Enemy not found: {enemy_name}")
 		
-		ai = self.enemies[enemy_name]
+		sys.path.insert(0, str(Path(__file__).parent.parent / 'battle'))
+		from battle_simulator import Battle, default_enemy, default_party
 		
-		print(f"\n=== Simulating {enemy_name} Battle ({turns} turns) ===\n")
+		ai = self.enemies[enemy_name]
+		enemy = default_enemy(enemy_name, ai)
 		
-		hp_percent = 1.0
+		print(f"\n=== Simulating {enemy_name} Battle (up to {turns} rounds) ===\n")
 		
-		for turn in range(1, turns + 1):
-			# Select action
-			action = self.select_action(ai, hp_percent, turn)
-			
-			if action:
-				print(f"Turn {turn} (HP: {hp_percent*100:.0f}%): "
-					  f"{action.action_type.value} → {action.target_type.value}")
-			else:
-				print(f"Turn {turn} (HP: {hp_percent*100:.0f}%): No valid action")
-			
-			# Simulate damage taken
-			hp_percent -= random.uniform(0.05, 0.15)
-			hp_percent = max(0.0, hp_percent)
-			
-			if hp_percent <= 0:
-				print("\nEnemy defeated!\n")
-				break
+		result = Battle(default_party(), [enemy], designer=self, max_rounds=turns).run(
+			random.Random(seed), log=print
+		)
 		
-		print()
+		print(f"\nResult: {result.outcome.value} after {result.rounds} rounds\n")
 	
 	def export_ai(self, enemy_name: str, output_path: Path) -> None:
 		"""Export enemy AI to JSON"""
@@ -374,42 +462,29 @@ class FFMQEnemyAIDesigner:
 		with open(input_path, 'r', encoding='utf-8') as f:
 			data = json.load(f)
 		
-		# Convert enums
-		data['current_state'] = AIState(data['current_state'])
-		
-		actions = []
-		for action_data in data['actions']:
-			action_data['action_type'] = ActionType(action_data['action_type'])
-			action_data['target_type'] = TargetType(action_data['target_type'])
-			
-			conditions = []
-			for cond_data in action_data['conditions']:
-				cond_data['condition_type'] = ConditionType(cond_data['condition_type'])
-				conditions.append(Condition(**cond_data))
-			
-			action_data['conditions'] = conditions
-			actions.append(AIAction(**action_data))
+		ai = EnemyAI.from_dict(data)
+		self.enemies[ai.enemy_name] = ai
 		
-		data['actions'] = actions
+		if self.verbose:
+			print(f"✓ Imported {ai.enemy_name} AI from {input_path}")
 		
-		transitions = []
-		for trans_data in data['transitions']:
-			trans_data['from_state'] = AIState(trans_data['from_state'])
-			trans_data['to_state'] = AIState(trans_data['to_state'])
-			trans_data['condition']['condition_type'] = ConditionType(
-				trans_data['condition']['condition_type'])
-			trans_data['condition'] = Condition(**trans_data['condition'])
-			transitions.append(StateTransition(**trans_data))
+		return ai
+	
+	def load_rom_scripts(self) -> Dict[int, str]:
+		"""Decode every AI script in the ROM into the designer; returns malformed scripts"""
+		from ai_bytecode import decode_rom
 		
-		data['transitions'] = transitions
+		with open(self.rom_path, 'rb') as f:
+			scripts, errors = decode_rom(f.read())
 		
-		ai = EnemyAI(**data)
-		self.enemies[ai.enemy_name] = ai
+		# Rebuilt through to_dict so the enums are this module's (it may be __main__)
+		for ai in scripts.values():
+			self.enemies[ai.enemy_name] = EnemyAI.from_dict(ai.to_dict())
 		
 		if self.verbose:
-			print(f"✓ Imported {ai.enemy_name} AI from {input_path}")
+			print(f"✓ Loaded {len(scripts)} AI scripts from {self.rom_path} ({len(errors)} malformed)")
 		
-		return ai
+		return errors
 	
 	def print_ai_info(self, enemy_name: str) -> None:
 		"""Print enemy AI configuration"""
@@ -431,6 +506,10 @@ class FFMQEnemyAIDesigner:
 				for cond in action.conditions:
 					print(f"   Condition: {cond.condition_type.value} {cond.value}")
 		
+		for label, counter in (('Counter-attack', ai.counter_attack), ('Counter-magic', ai.counter_magic)):
+			if counter is not None:
+				print(f"{label}: {counter.action_type.value} → {counter.target_type.value}")
+		
 		print()
 
 
@@ -443,11 +522,14 @@ def main():
 					   default='aggressive', help='AI pattern')
 	parser.add_argument('--enemy-id', type=int, default=1, help='Enemy ID')
 	parser.add_argument('--test', type=str, help='Test enemy AI')
-	parser.add_argument('--simulate', type=int, default=10, help='Simulation turns')
+	parser.add_argument('--simulate', type=int, default=10, help='Simulation rounds')
+	parser.add_argument('--seed', type=int, help='Random seed for the simulation')
 	parser.add_argument('--export', type=str, help='Export AI to JSON')
 	parser.add_argument('--import', type=str, dest='import_file', help='Import AI from JSON')
 	parser.add_argument('--info', type=str, help='Show AI info')
 	parser.add_argument('--list-patterns', action='store_true', help='List AI patterns')
+	parser.add_argument('--load-rom-scripts', action='store_true',
+					   help='Start enemies from the AI scripts in the ROM')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
 	
 	args = parser.parse_args()
@@ -455,6 +537,16 @@ def main():
 	rom_path = Path(args.rom) if args.rom else None
 	designer = FFMQEnemyAIDesigner(rom_path=rom_path, verbose=args.verbose)
 	
+	# Enemies with a script in the ROM start from it
+	if args.load_rom_scripts:
+		if not rom_path:
+			print("❌ --load-rom-scripts needs a ROM")
+			return 1
+		errors = designer.load_rom_scripts()
+		print(f"✓ Loaded {len(designer.enemies)} AI scripts from {rom_path}")
+		for enemy_id, error in errors.items():
+			print(f"  ❌ Enemy {enemy_id}: {error}")
+	
 	# List patterns
 	if args.list_patterns:
 		print("\n=== AI Patterns ===\n")
@@ -490,7 +582,7 @@ def main():
 		if args.test not in designer.enemies:
 			designer.create_enemy_ai(args.enemy_id, args.test, args.pattern)
 		
-		designer.simulate_battle(args.test, args.simulate)
+		designer.simulate_battle(args.test, args.simulate, args.seed)
 		return 0
 	
 	# Show info
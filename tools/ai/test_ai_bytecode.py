@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+AI Bytecode - Test Suite
+
+Checks compile/decode round trips for every designer pattern, agreement
+with the AI editor's reading of the same slots, byte-exact ROM round
+trips through the batched decoder, error reporting for bad slots, and
+the static analyzer.
+
+Usage:
+	python test_ai_bytecode.py
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import ffmq_ai_editor as editor
+from ai_bytecode import (
+	RULES, SCRIPT_SIZE, FindingKind, ScriptError, analyze, compile_ai, decode, decode_rom, disassemble,
+	slot_usage, write_rom
+)
+from ffmq_enemy_ai import (
+	AIAction, AIState, ActionType, Condition, ConditionType, EnemyAI, FFMQEnemyAIDesigner, StateTransition,
+	TargetType
+)
+from record_tables import AI_SCRIPTS
+
+
+def pattern_scripts() -> list:
+	designer = FFMQEnemyAIDesigner()
+	return [designer.create_enemy_ai(i * 7, f"Enemy {i * 7}", pattern)
+			for i, pattern in enumerate(designer.AI_PATTERNS)]
+
+
+def sample_rom() -> bytearray:
+	rom = bytearray(np.random.default_rng(0).integers(0, 256, 0x340000, dtype=np.uint8).tobytes())
+	AI_SCRIPTS.view(rom).view(np.uint8)[:] = 0xFF
+	return rom
+
+
+def editor_slot() -> bytes:
+	"""Slot written byte by byte at extract_ai_script's offsets"""
+	code = bytearray([0xFF]) * SCRIPT_SIZE
+	code[0] = 0x00									# Rule 0
+	code[1:4] = [0, 30, 0]							# hp_below 30%
+	code[13:17] = [8, 0xFF, 5, 7]					# heal -> self, priority 7
+	code[17:21] = [1, 12, 6, 3]						# magic 12 -> all, priority 3
+	code[32] = 0x00									# Rule 1, unconditional
+	code[45:49] = [0, 0xFF, 3, 1]					# attack -> lowest_hp
+	code[225] = 1									# Starts attacking
+	code[226:230] = [0x13, 0, 20, 0]				# attacking -> fleeing at hp_below 20%
+	code[240:243] = [0, 0xFF, 0]					# Counter-attack: attack -> random
+	return bytes(code)
+
+
+class TestRoundTrip(unittest.TestCase):
+	def test_patterns(self):
+		for ai in pattern_scripts():
+			code = compile_ai(ai)
+			self.assertEqual(len(code), SCRIPT_SIZE)
+			decoded = decode(code, ai.enemy_id, ai.enemy_name)
+			self.assertEqual(decoded, ai)
+			self.assertEqual(compile_ai(decoded), code)
+
+	def test_editor_layout(self):
+		code = editor_slot()
+		heal_conditions = [Condition(ConditionType.HP_BELOW, 0.3)]
+		expected = EnemyAI(3, "Mage", AIState.ATTACKING, [
+			AIAction(ActionType.HEAL, TargetType.SELF, priority=7, conditions=list(heal_conditions)),
+			AIAction(ActionType.MAGIC, TargetType.ALL_ENEMIES, skill_id=12, priority=3,
+					 conditions=list(heal_conditions)),
+			AIAction(ActionType.ATTACK, TargetType.ENEMY_LOWEST_HP, priority=1),
+		], [StateTransition(AIState.ATTACKING, AIState.FLEEING, Condition(ConditionType.HP_BELOW, 0.2))],
+			counter_attack=AIAction(ActionType.ATTACK, TargetType.ENEMY_RANDOM))
+		self.assertEqual(decode(code, 3, "Mage"), expected)
+		self.assertEqual(compile_ai(expected), code)
+		self.assertEqual(disassemble(code)[3], "0011  01 0C 06 03    magic -> all skill 12 priority 3")
+
+	def test_editor_reads_compiled_slots(self):
+		ai = FFMQEnemyAIDesigner().create_enemy_ai(0, "Goblin", 'support')
+		ai.counter_magic = AIAction(ActionType.MAGIC, TargetType.ENEMY_RANDOM, skill_id=4)
+		rom = sample_rom()
+		write_rom(rom, [ai])
+		with tempfile.TemporaryDirectory() as tmp:
+			path = Path(tmp) / "test.sfc"
+			path.write_bytes(rom)
+			script = editor.FFMQAIEditor(path).extract_ai_script(0)
+
+		rules = [[(c.condition_type.value, c.param1) for c in rule.conditions] for rule in script.rules]
+		actions = [(a.action_type.value, a.target_type.value, a.priority)
+				   for rule in script.rules for a in rule.actions]
+		self.assertEqual(rules, [[('ally_count', 1)], []])
+		self.assertEqual(actions, [('heal', 'ally_lowest_hp', 3), ('buff', 'all_allies', 2), ('magic', 'random', 1)])
+		self.assertEqual(script.counter_magic.action_type, editor.ActionType.MAGIC)
+		self.assertEqual(script.counter_magic.action_id, 4)
+		self.assertIsNone(script.counter_attack)
+
+	def test_rom_bytes_model_bytes(self):
+		rom = sample_rom()
+		scripts = pattern_scripts()
+		used = write_rom(rom, scripts)
+		rules, transitions = slot_usage(rom)
+		ids = [ai.enemy_id for ai in scripts]
+		self.assertEqual(list(zip(rules[ids].tolist(), transitions[ids].tolist())), list(used.values()))
+
+		# Damage one slot; the others still decode
+		slots = AI_SCRIPTS.view(rom).view(np.uint8).reshape(-1, SCRIPT_SIZE)
+		slots[200, :4] = [0x00, 0x0E, 0x00, 0x00]
+		decoded, errors = decode_rom(rom)
+		self.assertEqual(list(errors), [200])
+		self.assertEqual(sorted(decoded), ids)
+
+		# Batched decode agrees with one slot at a time
+		for enemy_id, ai in decoded.items():
+			self.assertEqual(decode(slots[enemy_id].tobytes(), enemy_id), ai)
+
+		rebuilt = sample_rom()
+		AI_SCRIPTS.view(rebuilt).view(np.uint8).reshape(-1, SCRIPT_SIZE)[200] = slots[200]
+		write_rom(rebuilt, decoded.values())
+		self.assertEqual(rebuilt, rom)
+
+	def test_mutations(self):
+		"""Test every mutated slot either fails to decode or round-trips exactly"""
+		rng = np.random.default_rng(3)
+		codes = [compile_ai(ai) for ai in pattern_scripts()] + [editor_slot()]
+		decoded = 0
+		for _ in range(2000):
+			code = bytearray(codes[rng.integers(len(codes))])
+			for offset in rng.integers(0, SCRIPT_SIZE, rng.integers(1, 3)):
+				code[offset] = rng.choice([0x00, 0x01, 0x05, 0x09, 0x0C, 0x13, 0x64, 0xFF])
+			try:
+				ai = decode(bytes(code))
+			except ScriptError:
+				continue
+			if ai is not None:
+				self.assertEqual(compile_ai(ai), code)
+				decoded += 1
+		self.assertGreater(decoded, 100)
+
+
+class TestErrors(unittest.TestCase):
+	def test_bad_slots(self):
+		base = editor_slot()
+		for edits, message in (({1: 2}, "condition 'turn_mod' at 0x01 has no EnemyAI equivalent"),
+							   ({13: 6}, "action 'nothing' at 0x0D has no EnemyAI equivalent"),
+							   ({15: 1}, "target 'weakest' at 0x0F has no EnemyAI equivalent"),
+							   ({13: 0x20}, "bad action type 0x20 at 0x0D"),
+							   ({225: 9}, "state 9 out of range"),
+							   ({0: 0x01}, "byte 0x01 at 0x00 does not round-trip"),
+							   ({3: 5}, "byte 0x05 at 0x03 does not round-trip"),
+							   ({250: 0}, "byte 0x00 at 0xFA does not round-trip")):
+			code = bytearray(base)
+			for offset, value in edits.items():
+				code[offset] = value
+			with self.assertRaisesRegex(ScriptError, message):
+				decode(bytes(code))
+		self.assertIsNone(decode(b'\xFF' * SCRIPT_SIZE))
+
+		ai = pattern_scripts()[0]
+		ai.actions[0].conditions.append(Condition(ConditionType.HP_BELOW, 0.333))
+		with self.assertRaisesRegex(ScriptError, "hp_below value"):
+			compile_ai(ai)
+		ai.actions = [AIAction(ActionType.ATTACK, TargetType.ENEMY_RANDOM,
+							   conditions=[Condition(ConditionType.TURN_COUNT, turn)]) for turn in range(RULES + 1)]
+		rom = sample_rom()
+		with self.assertRaisesRegex(ScriptError, f"slot holds {RULES}"):
+			write_rom(rom, [pattern_scripts()[1], ai])
+		self.assertEqual(slot_usage(rom)[0].max(), 0)			# Nothing written
+
+		ai.actions = ai.actions[:1]
+		ai.counter_attack = AIAction(ActionType.ATTACK, TargetType.SELF, conditions=ai.actions[0].conditions)
+		with self.assertRaisesRegex(ScriptError, "counter_attack cannot have conditions"):
+			compile_ai(ai)
+
+
+class TestAnalyzer(unittest.TestCase):
+	def test_findings(self):
+		ai = EnemyAI(5, "Test", AIState.IDLE, [
+			AIAction(ActionType.ATTACK, TargetType.ENEMY_RANDOM, priority=1),
+			AIAction(ActionType.SKILL, TargetType.ENEMY_RANDOM, priority=2),
+			AIAction(ActionType.HEAL, TargetType.SELF, priority=5,
+					 conditions=[Condition(ConditionType.HP_BELOW, 0.3), Condition(ConditionType.HP_ABOVE, 0.6)]),
+			AIAction(ActionType.FLEE, TargetType.SELF, priority=9, conditions=[Condition(ConditionType.RANDOM, 0)]),
+		], [
+			StateTransition(AIState.IDLE, AIState.ATTACKING, Condition(ConditionType.TURN_COUNT, 1)),
+			StateTransition(AIState.IDLE, AIState.DEFENDING, Condition(ConditionType.HP_BELOW, 0.5)),
+			StateTransition(AIState.ATTACKING, AIState.FLEEING, Condition(ConditionType.ALLY_COUNT, 9)),
+			StateTransition(AIState.FLEEING, AIState.IDLE, Condition(ConditionType.RANDOM, 0.5)),
+		])
+		findings = {(f.kind, f.subject) for f in analyze(ai)}
+		self.assertEqual(findings, {
+			(FindingKind.ZERO_PROBABILITY, "action 0 (attack)"),
+			(FindingKind.NEVER_TRUE, "action 2 (heal)"),
+			(FindingKind.NEVER_TRUE, "action 3 (flee)"),
+			(FindingKind.DEAD_TRANSITION, "transition 1 (idle -> defending)"),
+			(FindingKind.NEVER_TRUE, "transition 2 (attacking -> fleeing)"),
+			(FindingKind.DEAD_TRANSITION, "transition 3 (fleeing -> idle)"),
+			(FindingKind.UNREACHABLE_STATE, "defending"),
+			(FindingKind.UNREACHABLE_STATE, "fleeing"),
+		})
+
+		# Agrees with the designer's own selection
+		designer = FFMQEnemyAIDesigner()
+		for state in (AIState.IDLE, AIState.ATTACKING):
+			for hp in (0.1, 0.5, 1.0):
+				chosen = designer.select_action(ai, hp, state=state)
+				self.assertIs(chosen, ai.actions[1])
+
+		flagged = {pattern: [f.subject for f in analyze(ai)]
+				   for pattern, ai in zip(designer.AI_PATTERNS, pattern_scripts())}
+		self.assertEqual(flagged['aggressive'], ["action 0 (attack)"])
+		self.assertEqual(flagged['coward'], [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Script Analysis Suite - Run every script analyzer over one shared IR
+
+Parses the given script files once (in parallel, through the content-hash
+IR cache in script_ir.py) and hands the same parsed IR to each analyzer,
+instead of every tool re-reading and re-parsing the scripts itself.
+
+Analyzers:
+- lint: ScriptLinter style/best-practice report
+- optimize: ScriptOptimizer size optimization report
+- parameters: ParameterValueExtractor database (JSON) and reference
+- flow: EventFlowVisualizer control flow graphs (Mermaid)
+- deps: DependencyGraphGenerator graph (JSON)
+- profile: CommandUsageProfiler report and JSON
+- translation: TranslationMemoryBuilder (needs --tm-target)
+
+Usage:
+	python analyze_scripts.py --script dialogs.txt --all --output-dir reports/
+	python analyze_scripts.py --script *.txt --lint --profile
+	python analyze_scripts.py --script en.txt --translation --tm-target ja.txt
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from script_ir import DEFAULT_CACHE_DIR, ScriptFile, load_scripts
+from script_linter import ScriptLinter
+from script_optimizer import ScriptOptimizer
+from parameter_value_database import ParameterValueExtractor
+from event_flow_visualizer import EventFlowVisualizer
+from dependency_graph_generator import DependencyGraphGenerator
+from command_usage_profiler import CommandUsageProfiler
+from translation_memory import TranslationMemoryBuilder
+
+
+class ScriptAnalysisSuite:
+	"""Run analyzers against a shared parsed IR"""
+
+	def __init__(self, script_paths: List[Path], scripts: List[ScriptFile], output_dir: Path,
+	             verbose: bool = False):
+		self.script_paths = script_paths
+		self.scripts = scripts
+		self.output_dir = output_dir
+		self.verbose = verbose
+
+	def run_lint(self) -> str:
+		linter = ScriptLinter(verbose=self.verbose)
+		report = linter.lint(self.script_paths, self.scripts)
+		output = self.output_dir / 'lint_report.txt'
+		output.write_text(linter.generate_report(report), encoding='utf-8')
+		return f"{len(report.issues)} issues ({report.error_count} errors)"
+
+	def run_optimize(self) -> str:
+		optimizer = ScriptOptimizer(verbose=self.verbose)
+		report = optimizer.analyze(self.script_paths, self.scripts)
+		output = self.output_dir / 'optimization_report.md'
+		output.write_text(optimizer.generate_report(report), encoding='utf-8')
+		return f"{len(report.opportunities)} opportunities, {report.potential_savings:,} bytes"
+
+	def run_parameters(self) -> str:
+		extractor = ParameterValueExtractor(verbose=self.verbose)
+		db = extractor.build_database(self.script_paths, self.scripts)
+		extractor.export_json(db, self.output_dir / 'parameters.json')
+		(self.output_dir / 'parameters.md').write_text(extractor.generate_report(db), encoding='utf-8')
+		return f"{len(db.commands)} commands, {db.total_parameters:,} parameters"
+
+	def run_flow(self) -> str:
+		visualizer = EventFlowVisualizer(verbose=self.verbose)
+		for script in self.scripts:
+			visualizer.load_ir(script)
+
+		sections = []
+		for dialog_id in visualizer.dialogs:
+			graph = visualizer.build_control_flow_graph(dialog_id)
+			visualizer.graphs[dialog_id] = graph
+			sections.append(f"## {dialog_id}\n\n```mermaid\n{visualizer.generate_mermaid(graph)}\n```\n")
+
+		(self.output_dir / 'event_flow.md').write_text('\n'.join(sections), encoding='utf-8')
+		return f"{len(visualizer.graphs)} graphs"
+
+	def run_deps(self) -> str:
+		generator = DependencyGraphGenerator(verbose=self.verbose)
+		for script in self.scripts:
+			generator.load_ir(script)
+		(self.output_dir / 'dependencies.json').write_text(generator.generate_json(), encoding='utf-8')
+		return f"{len(generator.nodes)} nodes, {len(generator.dependencies)} dependencies"
+
+	def run_profile(self) -> str:
+		profiler = CommandUsageProfiler()
+		for script in self.scripts:
+			profiler.load_ir(script)
+		profiler.identify_subroutines()
+		profiler.generate_report(str(self.output_dir / 'usage_profile_report.md'))
+		profiler.export_json(str(self.output_dir / 'usage_profile.json'))
+		return f"{len(profiler.script_profiles)} scripts profiled"
+
+	def run_translation(self, target_path: Path) -> str:
+		target = load_scripts([target_path])[0]
+		builder = TranslationMemoryBuilder(verbose=self.verbose)
+		tm = builder.build_memory(self.script_paths[0], target_path, scripts=(self.scripts[0], target))
+		builder.export_json(tm, self.output_dir / 'translation_memory.json')
+		return f"{len(tm.units):,} units, {tm.metrics.coverage_percent:.1f}% coverage"
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Run script analyzers over one shared parsed IR')
+	parser.add_argument('--script', type=Path, nargs='+', required=True, help='Script file(s) to analyze')
+	parser.add_argument('--output-dir', type=Path, default=Path('script_analysis'), help='Report directory')
+	parser.add_argument('--all', action='store_true', help='Run every analyzer')
+	parser.add_argument('--lint', action='store_true', help='Run the script linter')
+	parser.add_argument('--optimize', action='store_true', help='Run the script optimizer')
+	parser.add_argument('--parameters', action='store_true', help='Build the parameter database')
+	parser.add_argument('--flow', action='store_true', help='Build event flow graphs')
+	parser.add_argument('--deps', action='store_true', help='Build the dependency graph')
+	parser.add_argument('--profile', action='store_true', help='Profile command usage')
+	parser.add_argument('--translation', action='store_true', help='Build translation memory')
+	parser.add_argument('--tm-target', type=Path, help='Target-language script for --translation')
+	parser.add_argument('--workers', type=int, help='Parser processes')
+	parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help='IR cache directory')
+	parser.add_argument('--no-cache', action='store_true', help='Parse without the IR cache')
+	parser.add_argument('--verbose', action='store_true', help='Verbose output')
+
+	args = parser.parse_args()
+
+	start = time.perf_counter()
+	scripts = load_scripts(args.script, cache_dir=None if args.no_cache else args.cache_dir,
+	                       workers=args.workers)
+	print(f"Parsed {len(scripts)} script(s), "
+	      f"{sum(len(s.dialogs) for s in scripts)} dialogs in {time.perf_counter() - start:.2f}s")
+
+	args.output_dir.mkdir(parents=True, exist_ok=True)
+	suite = ScriptAnalysisSuite(args.script, scripts, args.output_dir, verbose=args.verbose)
+
+	analyzers: Dict[str, Callable[[], str]] = {
+		'lint': suite.run_lint,
+		'optimize': suite.run_optimize,
+		'parameters': suite.run_parameters,
+		'flow': suite.run_flow,
+		'deps': suite.run_deps,
+		'profile': suite.run_profile,
+	}
+	if args.tm_target:
+		analyzers['translation'] = lambda: suite.run_translation(args.tm_target)
+	elif args.translation:
+		print("--translation needs --tm-target")
+		return 1
+
+	selected = [name for name in analyzers if args.all or getattr(args, name)]
+	if not selected:
+		print("No analyzers selected (use --all or pick individual analyzers)")
+		return 1
+
+	for name in selected:
+		start = time.perf_counter()
+		summary = analyzers[name]()
+		print(f"  {name:<12} {time.perf_counter() - start:6.2f}s  {summary}")
+
+	print(f"\n✓ Reports written to {args.output_dir}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
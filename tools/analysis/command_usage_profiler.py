@@ -29,7 +29,6 @@ Date: 2025-11-12
 License: MIT
 """
 
-import re
 import json
 from pathlib import Path
 from collections import Counter, defaultdict
@@ -37,6 +36,8 @@ from typing import Dict, List, Tuple, Optional, Set, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
+from script_ir import OpKind, ScriptFile, load_script, load_scripts
+
 
 @dataclass
 class CommandProfile:
@@ -114,47 +115,31 @@ class CommandUsageProfiler:
 		Args:
 			script_file: Path to script file
 		"""
-		print(f"\n📊 Profiling script: {script_file}")
-
-		current_dialog_id: Optional[int] = None
-		current_profile: Optional[ScriptProfile] = None
-		previous_command: Optional[str] = None
-
-		with open(script_file, 'r', encoding='utf-8') as f:
-			for line in f:
-				line = line.strip()
-
-				# Skip comments and empty lines
-				if line.startswith(';') or not line:
-					continue
-
-				# Dialog start
-				if line.startswith('[DIALOG'):
-					# Save previous dialog
-					if current_profile:
-						current_profile.unique_commands = len(set(current_profile.commands_used))
-						current_profile.complexity_score = self.calculate_complexity(current_profile)
-
-					# Parse dialog ID
-					match = re.match(r'\[DIALOG\s+(\d+)\]', line)
-					if match:
-						current_dialog_id = int(match.group(1))
-						current_profile = ScriptProfile(dialog_id=current_dialog_id)
-						self.script_profiles[current_dialog_id] = current_profile
-						previous_command = None
-					continue
-
-				if current_profile is None:
-					continue
+		self.load_ir(load_script(Path(script_file)))
 
-				# Command
-				if line.startswith('['):
-					match = re.match(r'\[([A-Z_0-9]+)(?::(.+))?\]', line)
-					if not match:
-						continue
+	def load_ir(self, script: ScriptFile) -> None:
+		"""
+		Build profiles from parsed script IR.
+
+		Args:
+			script: Parsed script file
+		"""
+		print(f"\n📊 Profiling script: {script.path}")
+
+		for dialog in script.dialogs.values():
+			if not dialog.dialog_id.isdigit():
+				continue
 
-					cmd_name = match.group(1)
-					params_str = match.group(2) if match.group(2) else ""
+			current_dialog_id = int(dialog.dialog_id)
+			current_profile = ScriptProfile(dialog_id=current_dialog_id)
+			self.script_profiles[current_dialog_id] = current_profile
+			previous_command: Optional[str] = None
+
+			for op in dialog.ops:
+				# Command
+				if op.kind == OpKind.COMMAND:
+					cmd_name = op.name
+					params = list(op.params)
 
 					if cmd_name not in self.COMMANDS:
 						continue
@@ -165,7 +150,6 @@ class CommandUsageProfiler:
 					cmd_profile.dialogs_used_in.add(current_dialog_id)
 
 					# Parse parameters
-					params = [p.strip() for p in params_str.split(':')] if params_str else []
 					cmd_profile.total_parameters += len(params)
 
 					# Track parameter distributions
@@ -225,12 +209,10 @@ class CommandUsageProfiler:
 						except ValueError:
 							pass
 
-				else:
+				elif op.kind == OpKind.TEXT and not op.stripped.startswith('['):
 					# Text line
-					current_profile.text_bytes += len(line)
+					current_profile.text_bytes += len(op.stripped)
 
-		# Save last dialog
-		if current_profile:
 			current_profile.unique_commands = len(set(current_profile.commands_used))
 			current_profile.complexity_score = self.calculate_complexity(current_profile)
 
@@ -501,8 +483,8 @@ Documentation:
 	profiler = CommandUsageProfiler()
 
 	# Profile each script
-	for script_path in args.script:
-		profiler.parse_script_file(script_path)
+	for script in load_scripts(args.script):
+		profiler.load_ir(script)
 
 	# Identify subroutines
 	profiler.identify_subroutines()
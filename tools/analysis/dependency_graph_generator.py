@@ -51,6 +51,8 @@ from collections import defaultdict, deque
 from enum import Enum
 import json
 
+from script_ir import ScriptFile, load_script, load_scripts
+
 
 class DependencyType(Enum):
 	"""Type of dependency relationship"""
@@ -107,34 +109,28 @@ class DependencyGraphGenerator:
 
 	def parse_script(self, path: Path, script_id: Optional[str] = None) -> None:
 		"""Parse script file and extract dependencies"""
-		if script_id is None:
-			script_id = path.stem
-
-		if script_id not in self.nodes:
-			self.nodes[script_id] = ScriptNode(script_id=script_id, file_path=str(path))
-
-		node = self.nodes[script_id]
-
 		try:
-			with open(path) as f:
-				lines = f.readlines()
-		except Exception as e:
+			script = load_script(path)
+		except OSError as e:
 			if self.verbose:
 				print(f"Error reading {path}: {e}")
 			return
 
-		for line_num, line in enumerate(lines, 1):
-			line = line.strip()
-			if not line or line.startswith(';'):
-				continue
+		self.load_ir(script, script_id)
 
-			# Parse command
-			match = re.match(r'^([A-Z_]+)(?:\s+(.+))?$', line)
-			if not match:
-				continue
+	def load_ir(self, script: ScriptFile, script_id: Optional[str] = None) -> None:
+		"""Extract dependencies from parsed script IR"""
+		if script_id is None:
+			script_id = Path(script.path).stem
 
-			command = match.group(1)
-			params_str = match.group(2) or ""
+		if script_id not in self.nodes:
+			self.nodes[script_id] = ScriptNode(script_id=script_id, file_path=script.path)
+
+		node = self.nodes[script_id]
+
+		for op in script.commands():
+			command = op.name
+			params_str = op.args
 
 			# Call dependencies
 			if command == 'CALL':
@@ -572,15 +568,17 @@ def main():
 
 	generator = DependencyGraphGenerator(verbose=args.verbose)
 
-	# Parse all scripts
+	# Collect and parse all scripts (in parallel, through the IR cache)
+	script_paths = []
 	for input_path in args.input_paths:
 		if input_path.is_file():
-			generator.parse_script(input_path)
+			script_paths.append(input_path)
 		elif input_path.is_dir():
-			for script_file in input_path.rglob('*.txt'):
-				generator.parse_script(script_file)
-			for script_file in input_path.rglob('*.asm'):
-				generator.parse_script(script_file)
+			script_paths.extend(input_path.rglob('*.txt'))
+			script_paths.extend(input_path.rglob('*.asm'))
+
+	for script in load_scripts(script_paths):
+		generator.load_ir(script)
 
 	if args.verbose:
 		print(f"Parsed {len(generator.nodes)} scripts")
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+FFMQ Difficulty Curve - Whole-game encounter table from the ROM
+
+The difficulty analyzer scored each area from eight guessed enemy IDs.
+This module joins the ROM tables instead: every active encounter zone,
+each formation it can roll (with its weight), each enemy in that
+formation and the party expected at the zone's progression point become
+one row of a columnar table (a dict of NumPy arrays). Damage, kill
+times, rewards and danger are computed over all rows at once with the
+damage calculator's formulas (stat_space), then reduced per encounter
+(zone x formation) and per area.
+
+Features:
+- One row per zone x formation x enemy, joined from record_tables views
+- Party curve per progression point: level, HP, attack, defense, speed,
+  and an equipped weapon/armor read from the same ROM's item table
+- Expected damage dealt and taken, turns to clear, EXP/GP per minute
+- Danger spikes: encounters expected to wipe the party, and areas much
+  more dangerous than the area before them
+- Per-area delta report between two ROMs (vanilla vs. a mod)
+- CSV/JSON export; pandas DataFrames on demand
+
+Model:
+- The party acts as one character with the curve's stats and kills
+  enemies one at a time, in slot order
+- Each living enemy attacks (enemy speed / party speed) times per party
+  turn; danger is an encounter's expected damage taken / party HP
+- An encounter costs its zone's steps of walking, a fixed transition and
+  its battle turns (SECONDS_PER_STEP, BATTLE_OVERHEAD, SECONDS_PER_TURN)
+
+Areas are map IDs; the analyzer's progression points are keyed the same
+way, and a map uses the last point at or below its ID.
+
+Usage:
+	python ffmq_difficulty_analyzer.py rom.sfc --analyze
+	python ffmq_difficulty_analyzer.py rom.sfc --table encounters.csv
+	python ffmq_difficulty_analyzer.py vanilla.sfc --compare hard.sfc --output delta.csv
+	python ffmq_difficulty_analyzer.py rom.sfc --analyze --curve party.json
+"""
+
+import csv
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'battlefield'))
+
+from record_tables import EDITOR_ENEMIES, EDITOR_ITEMS, ENCOUNTER_ZONES, FORMATIONS
+from stat_space import StatSpace
+
+
+EMPTY = 0xFF				# Unused zone / formation slot
+
+# Party constants not in the curve (the battle simulator's hero)
+PARTY_SPEED = 50
+PARTY_ACCURACY = 10
+PARTY_CRITICAL = 12
+
+# Time model (seconds)
+SECONDS_PER_STEP = 0.25
+SECONDS_PER_TURN = 3.0
+BATTLE_OVERHEAD = 6.0
+
+MAX_TURNS = 999.0			# Turns to kill an enemy the party cannot damage
+SPIKE_RATIO = 1.5			# Area danger over the previous area's that counts as a spike
+LETHAL_DANGER = 1.0			# Encounter danger at which the party is expected to wipe
+
+# Area columns compared between ROMs
+AREA_METRICS = (
+	'enemy_hp', 'dealt', 'taken', 'turns_to_kill', 'clear_turns', 'damage_taken',
+	'danger', 'max_danger', 'exp_per_minute', 'gold_per_minute',
+)
+
+
+@dataclass
+class ColumnTable:
+	"""Named, equal-length NumPy columns"""
+	columns: Dict[str, np.ndarray]
+
+	def __len__(self) -> int:
+		return len(next(iter(self.columns.values()))) if self.columns else 0
+
+	def __getitem__(self, name: str) -> np.ndarray:
+		return self.columns[name]
+
+	def take(self, index) -> 'ColumnTable':
+		return ColumnTable({name: values[index] for name, values in self.columns.items()})
+
+	def rows(self) -> List[Dict[str, Any]]:
+		names = list(self.columns)
+		return [dict(zip(names, values)) for values in zip(*(self.columns[n].tolist() for n in names))]
+
+	def to_csv(self, path: Path) -> int:
+		rows = self.rows()
+		with open(path, 'w', newline='') as f:
+			writer = csv.DictWriter(f, fieldnames=list(self.columns))
+			writer.writeheader()
+			writer.writerows(rows)
+		return len(rows)
+
+	def to_json(self, path: Path) -> int:
+		rows = self.rows()
+		with open(path, 'w') as f:
+			json.dump(rows, f, indent='\t')
+		return len(rows)
+
+	def to_dataframe(self):
+		import pandas as pd
+		return pd.DataFrame(self.columns)
+
+
+# ----------------------------------------------------------------------
+# Party curve
+# ----------------------------------------------------------------------
+
+@dataclass
+class PartyCurve:
+	"""Expected party per progression point; point i covers maps from area[i]"""
+	area: np.ndarray
+	level: np.ndarray
+	hp: np.ndarray
+	attack: np.ndarray
+	defense: np.ndarray
+	speed: np.ndarray
+	weapon: np.ndarray			# Editor item IDs, -1 = none
+	armor: np.ndarray
+
+	FIELDS = ('area', 'level', 'hp', 'attack', 'defense', 'speed', 'weapon', 'armor')
+
+	@classmethod
+	def from_points(cls, points: Sequence[Mapping[str, int]]) -> 'PartyCurve':
+		"""Points as dicts; speed, weapon and armor are optional"""
+		defaults = {'speed': PARTY_SPEED, 'weapon': -1, 'armor': -1}
+		points = sorted(points, key=lambda point: point['area'])
+		return cls(**{
+			name: np.array([point.get(name, defaults.get(name)) for point in points], dtype=np.int64)
+			for name in cls.FIELDS
+		})
+
+	@classmethod
+	def from_progression(cls, progression: Mapping[int, Tuple[int, int, int, int]]) -> 'PartyCurve':
+		"""From {area: (level, hp, attack, defense)}"""
+		return cls.from_points([
+			{'area': area, 'level': level, 'hp': hp, 'attack': attack, 'defense': defense}
+			for area, (level, hp, attack, defense) in progression.items()
+		])
+
+	@classmethod
+	def from_json(cls, path: Path) -> 'PartyCurve':
+		with open(path) as f:
+			return cls.from_points(json.load(f))
+
+	def point(self, areas: np.ndarray) -> np.ndarray:
+		"""Progression point index for each area (map) ID"""
+		return np.maximum(np.searchsorted(self.area, areas, side='right') - 1, 0)
+
+
+# ----------------------------------------------------------------------
+# Table building
+# ----------------------------------------------------------------------
+
+def _equipment(items: np.ndarray, ids: np.ndarray, name: str) -> np.ndarray:
+	"""Item stat per ID, 0 where the ID is -1 or past the table"""
+	valid = (ids >= 0) & (ids < len(items))
+	return np.where(valid, items[name][np.where(valid, ids, 0)] if len(items) else 0, 0).astype(np.int64)
+
+
+def _group_starts(groups: np.ndarray) -> np.ndarray:
+	"""Index of the first row of each row's group (groups sorted)"""
+	return np.searchsorted(groups, groups, side='left')
+
+
+def encounter_table(rom: bytes, curve: PartyCurve) -> ColumnTable:
+	"""One row per zone x formation x enemy, with per-enemy damage and kill times"""
+	zones = ENCOUNTER_ZONES.view(rom)
+	formations = FORMATIONS.view(rom)['slots']['enemy']
+	enemies = EDITOR_ENEMIES.view(rom)
+	items = EDITOR_ITEMS.view(rom)
+
+	zone_ids = np.flatnonzero(zones['map_id'] != EMPTY)
+	slots = zones['slots'][zone_ids]
+	formation = slots['formation'].astype(np.int64)
+	valid = (formation != EMPTY) & (formation < len(formations))
+	weight = np.where(valid, slots['weight'], 0).astype(np.float64)
+	total = weight.sum(axis=1, keepdims=True)
+	counts = np.maximum(valid.sum(axis=1, keepdims=True), 1)
+	probability = np.where(total > 0, weight / np.where(total > 0, total, 1), valid / counts)
+
+	zone, zone_slot = np.nonzero(valid)
+	members = formations[formation[zone, zone_slot]].astype(np.int64)
+	present = (members != EMPTY) & (members < len(enemies))
+	encounter, slot = np.nonzero(present)
+	enemy = members[encounter, slot]
+	zone, zone_slot = zone[encounter], zone_slot[encounter]
+	record = enemies[enemy]
+
+	area = zones['map_id'][zone_ids][zone].astype(np.int64)
+	point = curve.point(area)
+	weapon, armor = curve.weapon[point], curve.armor[point]
+	party_defense = curve.defense[point] + _equipment(items, armor, 'defense')
+	party_speed = np.maximum(curve.speed[point], 1)
+
+	rows = np.arange(len(enemy))
+	dealt = (StatSpace(power=0, accuracy=PARTY_ACCURACY, critical_rate=PARTY_CRITICAL)
+			 .axis('row', rows, attack=curve.attack[point], weapon_power=_equipment(items, weapon, 'attack'),
+				   accuracy_modifier=_equipment(items, weapon, 'accuracy'),
+				   defense=record['defense'], evasion=record['evade'])
+			 .evaluate('physical').values('expected_damage'))
+	hit = (StatSpace(power=0, accuracy=0, evasion=0)
+		   .axis('row', rows, attack=record['attack'], defense=party_defense,
+				 critical_rate=np.minimum(record['critical'], 100))
+		   .evaluate('physical').values('expected_damage'))
+	dealt, hit = np.maximum(dealt, 0.0), np.maximum(hit, 0.0)
+
+	hp = record['hp'].astype(np.float64)
+	turns = np.where(dealt > 0, np.minimum(hp / np.where(dealt > 0, dealt, 1), MAX_TURNS), MAX_TURNS)
+	taken = hit * record['speed'] / party_speed			# Per party turn while alive
+	elapsed = np.cumsum(turns)
+	starts = _group_starts(encounter)
+	kill_turn = elapsed - (elapsed[starts] - turns[starts])
+
+	return ColumnTable({
+		'encounter': encounter,
+		'zone': zone_ids[zone],
+		'area': area,
+		'point': point,
+		'formation': formation[zone, zone_slot],
+		'probability': probability[zone, zone_slot],
+		'encounter_rate': zones['encounter_rate'][zone_ids][zone].astype(np.int64),
+		'slot': slot,
+		'enemy': enemy,
+		'enemy_level': record['level'].astype(np.int64),
+		'enemy_hp': record['hp'].astype(np.int64),
+		'enemy_attack': record['attack'].astype(np.int64),
+		'enemy_defense': record['defense'].astype(np.int64),
+		'enemy_speed': record['speed'].astype(np.int64),
+		'exp': record['exp'].astype(np.int64),
+		'gold': record['gold'].astype(np.int64),
+		'party_level': curve.level[point],
+		'party_hp': curve.hp[point],
+		'party_defense': party_defense,
+		'dealt': dealt,
+		'taken': taken,
+		'turns_to_kill': turns,
+		'kill_turn': kill_turn,
+		'damage_taken': taken * kill_turn,
+	})
+
+
+def encounter_summary(enemies: ColumnTable) -> ColumnTable:
+	"""One row per zone x formation"""
+	group = enemies['encounter']
+	first = np.flatnonzero(np.r_[True, group[1:] != group[:-1]]) if len(group) else group
+	_, inverse = np.unique(group, return_inverse=True)
+
+	def total(name: str) -> np.ndarray:
+		return np.bincount(inverse, weights=enemies[name], minlength=len(first))
+
+	clear_turns = total('turns_to_kill')
+	damage_taken = total('damage_taken')
+	party_hp = enemies['party_hp'][first]
+	seconds = (enemies['encounter_rate'][first] * SECONDS_PER_STEP + BATTLE_OVERHEAD
+			   + clear_turns * SECONDS_PER_TURN)
+	return ColumnTable({
+		'zone': enemies['zone'][first],
+		'area': enemies['area'][first],
+		'point': enemies['point'][first],
+		'formation': enemies['formation'][first],
+		'probability': enemies['probability'][first],
+		'party_level': enemies['party_level'][first],
+		'party_hp': party_hp,
+		'enemies': np.bincount(inverse, minlength=len(first)),
+		'enemy_hp': total('enemy_hp'),
+		'taken': total('taken'),
+		'clear_turns': clear_turns,
+		'damage_taken': damage_taken,
+		'danger': damage_taken / np.maximum(party_hp, 1),
+		'exp': total('exp'),
+		'gold': total('gold'),
+		'seconds': seconds,
+	})
+
+
+def area_report(enemies: ColumnTable, encounters: ColumnTable,
+				names: Optional[Mapping[int, str]] = None) -> ColumnTable:
+	"""One row per area, weighting encounters by their zone probability"""
+	names = names or {}
+	areas, index, inverse = np.unique(encounters['area'], return_index=True, return_inverse=True)
+	weight = encounters['probability']
+	row_areas = np.searchsorted(areas, enemies['area'])
+	_, zone_index = np.unique(encounters['zone'], return_index=True)
+
+	def mean(values: np.ndarray, groups: np.ndarray = inverse, weights: np.ndarray = weight) -> np.ndarray:
+		return (np.bincount(groups, weights=weights * values, minlength=len(areas))
+				/ np.maximum(np.bincount(groups, weights=weights, minlength=len(areas)), 1e-12))
+
+	def enemy_mean(name: str) -> np.ndarray:
+		return mean(enemies[name], row_areas, enemies['probability'])
+
+	def per_minute(name: str) -> np.ndarray:
+		return mean(encounters[name]) / np.maximum(mean(encounters['seconds']), 1e-12) * 60.0
+
+	danger = mean(encounters['danger'])
+	rolled = weight > 0
+	max_danger = np.zeros(len(areas))
+	np.maximum.at(max_danger, inverse, np.where(rolled, encounters['danger'], 0.0))
+	previous = np.r_[np.nan, danger[:-1]]
+
+	return ColumnTable({
+		'area': areas,
+		'name': np.array([names.get(int(area), f"Area {area}") for area in areas], dtype=object),
+		'level': encounters['party_level'][index],
+		'party_hp': encounters['party_hp'][index],
+		'zones': np.bincount(inverse[zone_index], minlength=len(areas)),
+		'formations': np.bincount(inverse, minlength=len(areas)),
+		'enemy_level': enemy_mean('enemy_level'),
+		'enemy_hp': enemy_mean('enemy_hp'),
+		'enemy_attack': enemy_mean('enemy_attack'),
+		'dealt': enemy_mean('dealt'),
+		'taken': mean(encounters['taken']),
+		'turns_to_kill': enemy_mean('turns_to_kill'),
+		'clear_turns': mean(encounters['clear_turns']),
+		'damage_taken': mean(encounters['damage_taken']),
+		'danger': danger,
+		'max_danger': max_danger,
+		'lethal': np.bincount(inverse, weights=rolled & (encounters['danger'] >= LETHAL_DANGER),
+							  minlength=len(areas)).astype(np.int64),
+		'spike': (previous > 0) & (danger > SPIKE_RATIO * previous),
+		'exp_per_minute': per_minute('exp'),
+		'gold_per_minute': per_minute('gold'),
+	})
+
+
+# ----------------------------------------------------------------------
+# Whole-ROM analysis
+# ----------------------------------------------------------------------
+
+@dataclass
+class DifficultyCurve:
+	"""Enemy rows, encounters and areas for one ROM"""
+	enemies: ColumnTable
+	encounters: ColumnTable
+	areas: ColumnTable
+
+	@classmethod
+	def from_rom(cls, rom: bytes, curve: PartyCurve,
+				 names: Optional[Mapping[int, str]] = None) -> 'DifficultyCurve':
+		enemies = encounter_table(rom, curve)
+		encounters = encounter_summary(enemies)
+		return cls(enemies, encounters, area_report(enemies, encounters, names))
+
+	def spikes(self) -> List[str]:
+		"""Danger spikes and lethal encounters, one message each"""
+		messages = []
+		for row in self.areas.rows():
+			if row['spike']:
+				messages.append(f"{row['name']}: Danger spike ({row['danger']:.2f} of party HP per encounter)")
+			if row['lethal']:
+				messages.append(f"{row['name']}: {row['lethal']} encounter(s) expected to wipe the party")
+		return messages
+
+	def compare(self, other: 'DifficultyCurve') -> ColumnTable:
+		"""Per-area base/other/delta columns; NaN where only one ROM has the area"""
+		areas = np.union1d(self.areas['area'], other.areas['area'])
+		names = {}
+		columns = {'area': areas}
+		for label, table in (('base', self.areas), ('other', other.areas)):
+			position = np.searchsorted(table['area'], areas)
+			found = (position < len(table)) & (table['area'][np.minimum(position, len(table) - 1)] == areas) \
+				if len(table) else np.zeros(len(areas), dtype=bool)
+			position = np.where(found, position, 0)
+			for area, name in zip(table['area'].tolist(), table['name'].tolist()):
+				names.setdefault(area, name)
+			for metric in AREA_METRICS:
+				values = table[metric][position] if len(table) else np.zeros(len(areas))
+				columns[f'{metric}_{label}'] = np.where(found, values, np.nan)
+			columns[f'spike_{label}'] = found & (table['spike'][position] if len(table) else False)
+		for metric in AREA_METRICS:
+			columns[f'{metric}_delta'] = columns[f'{metric}_other'] - columns[f'{metric}_base']
+		columns = {'area': areas, 'name': np.array([names[a] for a in areas.tolist()], dtype=object),
+				   **{name: values for name, values in columns.items() if name != 'area'}}
+		return ColumnTable(columns)
@@ -36,6 +36,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
 
+from script_ir import ScriptFile, load_script
+
 
 class NodeType(Enum):
 	"""Types of nodes in control flow graph"""
@@ -140,21 +142,15 @@ class EventFlowVisualizer:
 
 	def parse_script_file(self, script_path: Path) -> None:
 		"""Parse script file into dialog dictionary"""
-		if self.verbose:
-			print(f"Parsing {script_path}...")
+		self.load_ir(load_script(script_path))
 
-		with open(script_path, 'r', encoding='utf-8') as f:
-			content = f.read()
-
-		# Split by dialog markers
-		dialog_pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
-		matches = re.finditer(dialog_pattern, content, re.MULTILINE | re.DOTALL)
+	def load_ir(self, script: ScriptFile) -> None:
+		"""Load dialogs from parsed script IR"""
+		if self.verbose:
+			print(f"Loading {script.path}...")
 
-		for match in matches:
-			dialog_id = match.group(1)
-			dialog_content = match.group(2).strip()
-			lines = [line.strip() for line in dialog_content.split('\n') if line.strip()]
-			self.dialogs[dialog_id] = lines
+		for dialog_id, dialog in script.dialogs.items():
+			self.dialogs[dialog_id] = dialog.lines()
 
 		if self.verbose:
 			print(f"  Loaded {len(self.dialogs)} dialogs")
@@ -30,23 +30,35 @@ Metrics:
 - Time to kill
 - Survivability index
 
+Areas are scored from the whole encounter table (difficulty_curve):
+every encounter zone, formation and enemy against the party expected at
+that point of the game.
+
 Usage:
 	python ffmq_difficulty_analyzer.py rom.sfc --analyze
 	python ffmq_difficulty_analyzer.py rom.sfc --graph difficulty.png
 	python ffmq_difficulty_analyzer.py rom.sfc --balance --target normal
 	python ffmq_difficulty_analyzer.py rom.sfc --export-report report.json
-	python ffmq_difficulty_analyzer.py rom.sfc --compare rom2.sfc
+	python ffmq_difficulty_analyzer.py rom.sfc --table encounters.csv
+	python ffmq_difficulty_analyzer.py rom.sfc --compare rom2.sfc --output delta.csv
+	python ffmq_difficulty_analyzer.py rom.sfc --analyze --curve party.json
 """
 
 import argparse
 import json
-import struct
 import math
+import sys
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from record_tables import ENEMY_COMBAT
+from difficulty_curve import ColumnTable, DifficultyCurve, PartyCurve
+
 
 class DifficultyLevel(Enum):
 	"""Difficulty levels"""
@@ -144,9 +156,11 @@ class FFMQDifficultyDatabase:
 class FFMQDifficultyAnalyzer:
 	"""Analyze FFMQ difficulty progression"""
 	
-	def __init__(self, rom_path: Path, verbose: bool = False):
+	def __init__(self, rom_path: Path, verbose: bool = False, party: Optional[PartyCurve] = None):
 		self.rom_path = rom_path
 		self.verbose = verbose
+		self.party = party or PartyCurve.from_progression(FFMQDifficultyDatabase.EXPECTED_PROGRESSION)
+		self._curve: Optional[DifficultyCurve] = None
 		
 		with open(rom_path, 'rb') as f:
 			self.rom_data = bytearray(f.read())
@@ -154,52 +168,38 @@ class FFMQDifficultyAnalyzer:
 		if self.verbose:
 			print(f"Loaded FFMQ ROM: {rom_path} ({len(self.rom_data):,} bytes)")
 	
+	def curve(self) -> DifficultyCurve:
+		"""Encounter table for the whole ROM (built once)"""
+		if self._curve is None:
+			self._curve = DifficultyCurve.from_rom(self.rom_data, self.party, FFMQDifficultyDatabase.AREAS)
+			if self.verbose:
+				print(f"Joined {len(self._curve.enemies):,} zone/formation/enemy rows "
+					  f"({len(self._curve.encounters):,} encounters, {len(self._curve.areas)} areas)")
+		return self._curve
+	
 	def extract_enemy_stats(self, enemy_id: int) -> Tuple[int, int, int]:
 		"""Extract enemy HP, attack, defense"""
-		# Enemy data at 0x1A0000
-		offset = 0x1A0000 + (enemy_id * 32)
+		enemies = ENEMY_COMBAT.view(self.rom_data)
 		
-		if offset + 32 > len(self.rom_data):
+		if enemy_id >= len(enemies):
 			return (0, 0, 0)
 		
-		hp = struct.unpack_from('<H', self.rom_data, offset)[0]
-		attack = self.rom_data[offset + 4]
-		defense = self.rom_data[offset + 5]
-		
-		return (hp, attack, defense)
+		record = enemies[enemy_id]
+		return (int(record['hp']), int(record['attack']), int(record['defense']))
 	
 	def analyze_area(self, area_id: int) -> Optional[AreaStats]:
 		"""Analyze difficulty statistics for an area"""
-		# Get encounters for area (simplified - would read from encounter zones)
-		# This is example logic
-		
-		# Sample 10 random enemies from area
-		enemy_ids = range(area_id * 8, (area_id + 1) * 8)
+		areas = self.curve().areas
+		matches = np.flatnonzero(areas['area'] == area_id)
 		
-		total_hp = 0
-		total_attack = 0
-		count = 0
-		
-		for enemy_id in enemy_ids:
-			hp, attack, defense = self.extract_enemy_stats(enemy_id)
-			if hp > 0:
-				total_hp += hp
-				total_attack += attack
-				count += 1
-		
-		if count == 0:
+		if not len(matches):
 			return None
 		
-		avg_hp = total_hp / count
-		avg_attack = total_attack / count
-		
-		# Get expected player stats for area
-		expected_level, expected_hp, expected_attack, expected_defense = \
-			FFMQDifficultyDatabase.EXPECTED_PROGRESSION.get(area_id, (1, 50, 10, 5))
+		row = areas.take(matches[0]).columns
 		
-		# Calculate difficulty metrics
-		time_to_kill = avg_hp / expected_attack if expected_attack > 0 else 99
-		survivability = expected_hp / avg_attack if avg_attack > 0 else 99
+		# Turns to kill one enemy, and turns the party survives a whole formation
+		time_to_kill = float(row['turns_to_kill'])
+		survivability = float(row['party_hp'] / row['taken']) if row['taken'] > 0 else 99
 		
 		# Difficulty rating (0-100)
 		difficulty = (time_to_kill * 2 + (10 - survivability)) * 5
@@ -207,13 +207,13 @@ class FFMQDifficultyAnalyzer:
 		
 		area_stats = AreaStats(
 			area_id=area_id,
-			area_name=FFMQDifficultyDatabase.AREAS.get(area_id, f"Area {area_id}"),
-			average_enemy_level=area_id * 5,
-			average_enemy_hp=avg_hp,
-			average_enemy_damage=avg_attack,
-			recommended_player_level=expected_level,
-			experience_rate=100 + area_id * 50,
-			gold_rate=50 + area_id * 25,
+			area_name=str(row['name']),
+			average_enemy_level=float(row['enemy_level']),
+			average_enemy_hp=float(row['enemy_hp']),
+			average_enemy_damage=float(row['enemy_attack']),
+			recommended_player_level=int(row['level']),
+			experience_rate=float(row['exp_per_minute']),
+			gold_rate=float(row['gold_per_minute']),
 			difficulty_rating=difficulty
 		)
 		
@@ -225,43 +225,41 @@ class FFMQDifficultyAnalyzer:
 		area_stats = []
 		bottlenecks = []
 		recommendations = []
+		curve = self.curve()
 		
-		# Analyze each area
-		for area_id in range(len(FFMQDifficultyDatabase.AREAS)):
-			stats = self.analyze_area(area_id)
-			if stats:
-				area_stats.append(stats)
-				
-				# Create progression point
-				expected_level, expected_hp, expected_attack, expected_defense = \
-					FFMQDifficultyDatabase.EXPECTED_PROGRESSION[area_id]
-				
-				ttk = stats.average_enemy_hp / expected_attack if expected_attack > 0 else 0
-				surv = expected_hp / stats.average_enemy_damage if stats.average_enemy_damage > 0 else 0
-				
-				point = ProgressionPoint(
-					point_id=area_id,
-					player_level=expected_level,
-					expected_hp=expected_hp,
-					expected_damage=expected_attack,
-					expected_defense=expected_defense,
-					enemy_hp=int(stats.average_enemy_hp),
-					enemy_damage=int(stats.average_enemy_damage),
-					time_to_kill=ttk,
-					survivability=surv,
-					difficulty_score=stats.difficulty_rating
-				)
-				progression_points.append(point)
-				
-				# Detect bottlenecks
-				if stats.difficulty_rating > 75:
-					bottlenecks.append(f"{stats.area_name}: Very high difficulty ({stats.difficulty_rating:.1f})")
-				
-				if ttk > 20:
-					bottlenecks.append(f"{stats.area_name}: Enemies too tanky (TTK: {ttk:.1f} turns)")
-				
-				if surv < 3:
-					bottlenecks.append(f"{stats.area_name}: Player too fragile ({surv:.1f} turn survivability)")
+		# Analyze each area with encounters
+		for row in curve.areas.rows():
+			stats = self.analyze_area(row['area'])
+			area_stats.append(stats)
+			
+			ttk = row['turns_to_kill']
+			surv = row['party_hp'] / row['taken'] if row['taken'] > 0 else 0
+			
+			point = ProgressionPoint(
+				point_id=row['area'],
+				player_level=row['level'],
+				expected_hp=row['party_hp'],
+				expected_damage=int(row['dealt']),
+				expected_defense=int(self.party.defense[self.party.point(np.array([row['area']]))[0]]),
+				enemy_hp=int(stats.average_enemy_hp),
+				enemy_damage=int(row['taken']),
+				time_to_kill=ttk,
+				survivability=surv,
+				difficulty_score=stats.difficulty_rating
+			)
+			progression_points.append(point)
+			
+			# Detect bottlenecks
+			if stats.difficulty_rating > 75:
+				bottlenecks.append(f"{stats.area_name}: Very high difficulty ({stats.difficulty_rating:.1f})")
+			
+			if ttk > 20:
+				bottlenecks.append(f"{stats.area_name}: Enemies too tanky (TTK: {ttk:.1f} turns)")
+			
+			if surv < 3:
+				bottlenecks.append(f"{stats.area_name}: Player too fragile ({surv:.1f} turn survivability)")
+		
+		bottlenecks.extend(curve.spikes())
 		
 		# Generate recommendations
 		avg_difficulty = sum(a.difficulty_rating for a in area_stats) / len(area_stats) if area_stats else 0
@@ -295,6 +293,11 @@ class FFMQDifficultyAnalyzer:
 		
 		return report
 	
+	def compare(self, other_path: Path) -> ColumnTable:
+		"""Per-area deltas of another ROM (e.g. a hard-mode mod) against this one"""
+		other = FFMQDifficultyAnalyzer(other_path, verbose=self.verbose, party=self.party)
+		return self.curve().compare(other.curve())
+	
 	def export_report(self, output_path: Path) -> None:
 		"""Export difficulty report to JSON"""
 		report = self.analyze_progression()
@@ -306,16 +309,80 @@ class FFMQDifficultyAnalyzer:
 			print(f"✓ Exported difficulty report to {output_path}")
 
 
+def _change(base: float, other: float) -> str:
+	if math.isnan(base) or math.isnan(other):
+		return "n/a"
+	if base == 0:
+		return "+0%" if other == 0 else "new"
+	return f"{(other - base) / base * 100:+.0f}%"
+
+
+def print_comparison(delta: ColumnTable, base_name: str, other_name: str) -> None:
+	"""Per-area delta report"""
+	print(f"\n=== Difficulty Delta: {other_name} vs {base_name} ===\n")
+	print(f"{'Area':<20} {'Enemy HP':>9} {'Dealt':>7} {'Taken':>7} {'Turns':>7} "
+		  f"{'Danger':>14} {'EXP/min':>8} {'GP/min':>8}")
+	print("=" * 88)
+	
+	regressions = []
+	for row in delta.rows():
+		danger = f"{row['danger_other']:.2f} ({_change(row['danger_base'], row['danger_other'])})"
+		print(f"{row['name']:<20} "
+			  f"{_change(row['enemy_hp_base'], row['enemy_hp_other']):>9} "
+			  f"{_change(row['dealt_base'], row['dealt_other']):>7} "
+			  f"{_change(row['taken_base'], row['taken_other']):>7} "
+			  f"{_change(row['clear_turns_base'], row['clear_turns_other']):>7} "
+			  f"{danger:>14} "
+			  f"{_change(row['exp_per_minute_base'], row['exp_per_minute_other']):>8} "
+			  f"{_change(row['gold_per_minute_base'], row['gold_per_minute_other']):>8}")
+		
+		if row['spike_other'] and not row['spike_base']:
+			regressions.append(f"{row['name']}: New danger spike")
+		if row['max_danger_other'] >= 1 > row['max_danger_base']:
+			regressions.append(f"{row['name']}: Encounters now expected to wipe the party "
+							   f"(worst {row['max_danger_other']:.2f} of party HP)")
+	
+	if regressions:
+		print(f"\nBalance regressions ({len(regressions)}):\n")
+		for regression in regressions:
+			print(f"  ⚠️  {regression}")
+
+
 def main():
 	parser = argparse.ArgumentParser(description='FFMQ Difficulty Progression Analyzer')
 	parser.add_argument('rom', type=str, help='FFMQ ROM file')
 	parser.add_argument('--analyze', action='store_true', help='Analyze difficulty')
 	parser.add_argument('--export-report', type=str, help='Export report to JSON')
+	parser.add_argument('--table', type=str, help='Export zone/formation/enemy table (.csv or .json)')
+	parser.add_argument('--compare', type=str, help='Second ROM to diff against (per-area deltas)')
+	parser.add_argument('--output', type=str, help='Write the comparison (.csv or .json)')
+	parser.add_argument('--curve', type=str, help='Party curve JSON (list of progression points)')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
 	
 	args = parser.parse_args()
 	
-	analyzer = FFMQDifficultyAnalyzer(Path(args.rom), verbose=args.verbose)
+	party = PartyCurve.from_json(Path(args.curve)) if args.curve else None
+	analyzer = FFMQDifficultyAnalyzer(Path(args.rom), verbose=args.verbose, party=party)
+	
+	# Compare two ROMs
+	if args.compare:
+		delta = analyzer.compare(Path(args.compare))
+		print_comparison(delta, Path(args.rom).name, Path(args.compare).name)
+		
+		if args.output:
+			output = Path(args.output)
+			count = delta.to_json(output) if output.suffix == '.json' else delta.to_csv(output)
+			print(f"\n✓ Wrote {count} areas to {output}")
+		
+		return 0
+	
+	# Export encounter table
+	if args.table:
+		table = analyzer.curve().enemies
+		output = Path(args.table)
+		count = table.to_json(output) if output.suffix == '.json' else table.to_csv(output)
+		print(f"✓ Exported {count:,} encounter rows to {output}")
+		return 0
 	
 	# Analyze difficulty
 	if args.analyze:
@@ -351,7 +418,7 @@ def main():
 		analyzer.export_report(Path(args.export_report))
 		return 0
 	
-	print("Use --analyze or --export-report")
+	print("Use --analyze, --export-report, --table or --compare")
 	return 0
 
 
@@ -29,7 +29,6 @@ Usage:
 """
 
 import argparse
-import re
 import json
 import csv
 import sqlite3
@@ -38,6 +37,8 @@ from typing import Dict, List, Set, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from collections import Counter, defaultdict
 
+from script_ir import OpKind, ScriptFile, ScriptOp, load_script, load_scripts
+
 
 @dataclass
 class ParameterValue:
@@ -138,48 +139,39 @@ class ParameterValueExtractor:
 	def __init__(self, verbose: bool = False):
 		self.verbose = verbose
 		self.dialogs: Dict[str, List[str]] = {}
+		self.dialog_ops: Dict[str, List[ScriptOp]] = {}
 		self.parameter_values: List[ParameterValue] = []
 		self.command_stats: Dict[str, CommandParameterInfo] = {}
 
 	def parse_script_file(self, script_path: Path) -> None:
 		"""Parse script file into dialog dictionary"""
-		if self.verbose:
-			print(f"Parsing {script_path}...")
-
-		with open(script_path, 'r', encoding='utf-8') as f:
-			content = f.read()
+		self.load_ir(load_script(script_path))
 
-		# Split by dialog markers
-		dialog_pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
-		matches = re.finditer(dialog_pattern, content, re.MULTILINE | re.DOTALL)
+	def load_ir(self, script: ScriptFile) -> None:
+		"""Load dialogs from parsed script IR"""
+		if self.verbose:
+			print(f"Loading {script.path}...")
 
-		for match in matches:
-			dialog_id = match.group(1)
-			dialog_content = match.group(2).strip()
-			lines = [line.strip() for line in dialog_content.split('\n') if line.strip()]
-			self.dialogs[dialog_id] = lines
+		for dialog_id, dialog in script.dialogs.items():
+			self.dialog_ops[dialog_id] = [op for op in dialog.ops if op.kind != OpKind.BLANK]
+			self.dialogs[dialog_id] = dialog.lines()
 
 	def extract_parameters(self) -> None:
 		"""Extract all parameter values from dialogs"""
 		if self.verbose:
 			print(f"\nExtracting parameters from {len(self.dialogs)} dialogs...")
 
-		for dialog_id, lines in self.dialogs.items():
-			for line_num, line in enumerate(lines, 1):
-				# Skip text lines
-				if line.startswith('"'):
-					continue
-
-				# Parse command and parameters
-				parts = line.split()
-				if not parts:
+		for dialog_id, ops in self.dialog_ops.items():
+			lines = self.dialogs[dialog_id]
+			for line_num, op in enumerate(ops, 1):
+				# Skip text, labels and comments
+				if op.kind != OpKind.COMMAND:
 					continue
 
-				command = parts[0]
-				params = parts[1:]
+				command = op.name
 
 				# Extract each parameter
-				for pos, param in enumerate(params):
+				for pos, param in enumerate(op.params):
 					# Get context (surrounding lines)
 					context_lines = []
 					for i in range(max(0, line_num - 2), min(len(lines), line_num + 2)):
@@ -268,11 +260,11 @@ class ParameterValueExtractor:
 		if self.verbose:
 			print(f"  Analyzed {len(self.command_stats)} commands")
 
-	def build_database(self, script_paths: List[Path]) -> ParameterDatabase:
-		"""Build complete parameter database"""
+	def build_database(self, script_paths: List[Path], scripts: Optional[List[ScriptFile]] = None) -> ParameterDatabase:
+		"""Build complete parameter database (scripts: IR already parsed for script_paths)"""
 		# Parse all scripts
-		for path in script_paths:
-			self.parse_script_file(path)
+		for script in scripts if scripts is not None else load_scripts(script_paths):
+			self.load_ir(script)
 
 		# Extract and analyze
 		self.extract_parameters()
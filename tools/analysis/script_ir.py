@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Script IR - Shared parsed representation of event/dialog scripts
+
+Every script analyzer (linter, optimizer, parameter database, flow
+visualizer, dependency graph, usage profiler, translation memory) reads
+the same dialog script text. This module tokenizes a script file once
+into a compact typed intermediate representation that all of them
+consume, instead of each tool re-parsing the text with its own regexes.
+
+Features:
+- One tokenizer for both script dialects:
+	DIALOG <id>: blocks with `COMMAND p1 p2` and "quoted text" lines
+	[DIALOG n] blocks with `[COMMAND:p1:p2]` and bare text lines
+- Typed ops: commands (name, parameters), text runs, labels, comments
+- Per-file cache keyed by content hash (marshal + zlib, versioned)
+- Parallel parsing of cache misses across processes
+
+Differences from the per-tool parsers it replaced:
+- Every analyzer sees both dialects. The linter, optimizer, parameter
+  database, flow visualizer and translation memory used to read only
+  DIALOG <id>: blocks, and the usage profiler only [DIALOG n] blocks, so
+  their reports can now include dialogs they used to skip
+- Plain commands may contain digits after the first character;
+  the dependency graph used to skip those lines
+
+IR Layout:
+- ScriptFile: path, content hash, every op in file order, dialogs by ID
+- DialogIR: dialog ID, header line, the ops inside the dialog
+- ScriptOp: (kind, line, raw, name, args, params, text)
+
+Usage:
+	from script_ir import load_scripts
+	for script in load_scripts([Path('dialogs.txt')]):
+		for dialog in script.dialogs.values():
+			for op in dialog.commands():
+				print(op.name, op.params)
+
+	python script_ir.py dialogs.txt --stats
+	python script_ir.py scripts/*.txt --clear-cache
+"""
+
+import argparse
+import hashlib
+import marshal
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+IR_VERSION = 1
+CACHE_MAGIC = b'FFIR'
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'ffmq' / 'script_ir'
+
+
+class OpKind(IntEnum):
+	"""Kind of a script line"""
+	BLANK = 0
+	COMMENT = 1
+	DIALOG = 2		# Dialog header
+	LABEL = 3
+	COMMAND = 4
+	TEXT = 5
+
+
+class ScriptOp(NamedTuple):
+	"""One tokenized script line"""
+	kind: OpKind
+	line: int			# 1-based line number in the file
+	raw: str			# Original line, without the newline
+	name: str = ""		# Command, label or dialog ID
+	args: str = ""		# Unsplit parameter text
+	params: Tuple[str, ...] = ()
+	text: str = ""		# Text run contents (quotes removed)
+
+	@property
+	def stripped(self) -> str:
+		return self.raw.strip()
+
+
+@dataclass
+class DialogIR:
+	"""One dialog: header plus the ops up to the next dialog"""
+	dialog_id: str
+	line: int
+	ops: List[ScriptOp] = field(default_factory=list)
+
+	def lines(self) -> List[str]:
+		"""Stripped, non-blank source lines"""
+		return [op.stripped for op in self.ops if op.kind != OpKind.BLANK]
+
+	def raw_lines(self) -> List[str]:
+		"""Source lines with surrounding whitespace, blank edges trimmed"""
+		lines = [op.raw for op in self._trimmed()]
+		if lines:
+			lines[0] = lines[0].lstrip()
+			lines[-1] = lines[-1].rstrip()
+		return lines
+
+	def _trimmed(self) -> List[ScriptOp]:
+		ops = self.ops
+		start, end = 0, len(ops)
+		while start < end and ops[start].kind == OpKind.BLANK:
+			start += 1
+		while end > start and ops[end - 1].kind == OpKind.BLANK:
+			end -= 1
+		return ops[start:end]
+
+	def commands(self) -> List[ScriptOp]:
+		return [op for op in self.ops if op.kind == OpKind.COMMAND]
+
+	def text_runs(self) -> List[ScriptOp]:
+		return [op for op in self.ops if op.kind == OpKind.TEXT]
+
+	def labels(self) -> List[str]:
+		return [op.name for op in self.ops if op.kind == OpKind.LABEL]
+
+	def quoted_text(self) -> List[str]:
+		"""Contents of fully quoted text lines"""
+		return [op.text for op in self.ops
+				if op.kind == OpKind.TEXT and len(op.stripped) > 1
+				and op.stripped.startswith('"') and op.stripped.endswith('"')]
+
+
+@dataclass
+class ScriptFile:
+	"""Parsed script file"""
+	path: str
+	content_hash: str
+	ops: List[ScriptOp]
+	dialogs: Dict[str, DialogIR] = field(default_factory=dict)
+
+	def commands(self) -> Iterator[ScriptOp]:
+		"""Every command in the file, inside dialogs or not"""
+		return (op for op in self.ops if op.kind == OpKind.COMMAND)
+
+
+# ------------------------------------------------------------------
+# Tokenizer
+# ------------------------------------------------------------------
+
+PLAIN_DIALOG = re.compile(r'^DIALOG\s+(\S+):(.*)$')
+PLAIN_DIALOG_START = re.compile(r'^DIALOG\s+')
+BRACKET_DIALOG = re.compile(r'^\[DIALOG\s+(\d+)\]')
+BRACKET_COMMAND = re.compile(r'^\[([A-Z_0-9]+)(?::(.+))?\]')
+PLAIN_COMMAND = re.compile(r'^([A-Z_][A-Z_0-9]*)(?:\s+(.+))?$')
+LABEL = re.compile(r'^\.?([A-Za-z_][A-Za-z0-9_]*):$')
+
+
+def tokenize_line(raw: str, line: int, bracket: bool = False) -> ScriptOp:
+	"""
+	Classify a single line (dialog headers are handled by parse_script).
+
+	Args:
+		bracket: Line belongs to a [DIALOG n] block, where only bracketed
+			lines are commands and everything else is text
+	"""
+	stripped = raw.strip()
+
+	if not stripped:
+		return ScriptOp(OpKind.BLANK, line, raw)
+
+	if stripped.startswith(';'):
+		return ScriptOp(OpKind.COMMENT, line, raw, text=stripped[1:].strip())
+
+	if stripped.startswith('"'):
+		text = stripped[1:-1] if len(stripped) > 1 and stripped.endswith('"') else stripped[1:]
+		return ScriptOp(OpKind.TEXT, line, raw, text=text)
+
+	if stripped.startswith('['):
+		match = BRACKET_COMMAND.match(stripped)
+		if match:
+			args = match.group(2) or ""
+			params = tuple(p.strip() for p in args.split(':')) if args else ()
+			return ScriptOp(OpKind.COMMAND, line, raw, match.group(1), args, params)
+		return ScriptOp(OpKind.TEXT, line, raw, text=stripped)
+
+	if bracket:
+		return ScriptOp(OpKind.TEXT, line, raw, text=stripped)
+
+	match = LABEL.match(stripped)
+	if match:
+		return ScriptOp(OpKind.LABEL, line, raw, match.group(1))
+
+	match = PLAIN_COMMAND.match(stripped)
+	if match:
+		args = match.group(2) or ""
+		return ScriptOp(OpKind.COMMAND, line, raw, match.group(1), args, tuple(args.split()))
+
+	return ScriptOp(OpKind.TEXT, line, raw, text=stripped)
+
+
+def parse_script(content: str, path: str = "") -> ScriptFile:
+	"""Tokenize script text into a ScriptFile"""
+	ops: List[ScriptOp] = []
+	dialogs: Dict[str, DialogIR] = {}
+	current: Optional[DialogIR] = None
+	bracket = False
+
+	lines = content.split('\n')
+	if lines and not lines[-1]:
+		lines.pop()		# Trailing newline
+
+	for line, raw in enumerate(lines, 1):
+		raw = raw.rstrip('\r')
+
+		header = PLAIN_DIALOG.match(raw) or BRACKET_DIALOG.match(raw.strip())
+		if header:
+			dialog_id = header.group(1)
+			op = ScriptOp(OpKind.DIALOG, line, raw, dialog_id)
+			ops.append(op)
+			current = DialogIR(dialog_id=dialog_id, line=line)
+			dialogs[dialog_id] = current
+			bracket = header.re is BRACKET_DIALOG
+
+			# Content after "DIALOG id:" on the same line belongs to the dialog
+			rest = header.group(2) if header.re is PLAIN_DIALOG else ""
+			if rest.strip():
+				op = tokenize_line(rest, line)
+				ops.append(op)
+				current.ops.append(op)
+			continue
+
+		if PLAIN_DIALOG_START.match(raw):
+			# Malformed header still ends the previous dialog
+			current = None
+			bracket = False
+
+		op = tokenize_line(raw, line, bracket)
+		ops.append(op)
+		if current is not None:
+			current.ops.append(op)
+
+	return ScriptFile(path=path, content_hash="", ops=ops, dialogs=dialogs)
+
+
+# ------------------------------------------------------------------
+# Binary cache
+# ------------------------------------------------------------------
+
+def _encode(script: ScriptFile) -> bytes:
+	"""Serialize ops as plain tuples; dialogs as (id, line, first op, op count)"""
+	index = {id(op): i for i, op in enumerate(script.ops)}
+	ops = [(int(op.kind), op.line, op.raw, op.name, op.args, op.params, op.text) for op in script.ops]
+	dialogs = []
+	for dialog in script.dialogs.values():
+		first = index[id(dialog.ops[0])] if dialog.ops else len(ops)
+		dialogs.append((dialog.dialog_id, dialog.line, first, len(dialog.ops)))
+
+	payload = marshal.dumps((IR_VERSION, ops, dialogs))
+	return CACHE_MAGIC + bytes([marshal.version]) + zlib.compress(payload, 1)
+
+
+def _decode(blob: bytes, path: str, content_hash: str) -> Optional[ScriptFile]:
+	if not blob.startswith(CACHE_MAGIC) or blob[4] != marshal.version:
+		return None
+	try:
+		version, raw_ops, raw_dialogs = marshal.loads(zlib.decompress(blob[5:]))
+	except (ValueError, EOFError, TypeError, zlib.error):
+		return None
+	if version != IR_VERSION:
+		return None
+
+	ops = [ScriptOp(OpKind(k), line, raw, name, args, params, text)
+		   for k, line, raw, name, args, params, text in raw_ops]
+
+	dialogs = {}
+	for dialog_id, line, first, count in raw_dialogs:
+		dialogs[dialog_id] = DialogIR(dialog_id=dialog_id, line=line, ops=ops[first:first + count])
+
+	return ScriptFile(path=path, content_hash=content_hash, ops=ops, dialogs=dialogs)
+
+
+def _cache_path(cache_dir: Path, content_hash: str) -> Path:
+	return cache_dir / f"{content_hash}.ir"
+
+
+def _parse_bytes(data: bytes, path: str) -> ScriptFile:
+	return parse_script(data.decode('utf-8', errors='replace'), path)
+
+
+def _parse_and_encode(data: bytes, path: str) -> bytes:
+	"""Worker: parse one file's contents and return its cache blob"""
+	return _encode(_parse_bytes(data, path))
+
+
+def load_script(path: Path, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> ScriptFile:
+	"""Parse one script file, using the cache when possible"""
+	return load_scripts([path], cache_dir=cache_dir, workers=1)[0]
+
+
+def load_scripts(paths: Iterable[Path], cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+				 workers: Optional[int] = None) -> List[ScriptFile]:
+	"""
+	Parse many script files.
+
+	Cached IR is reused when a file's content hash matches; the remaining
+	files are parsed in parallel and written back to the cache.
+
+	Args:
+		paths: Script files
+		cache_dir: IR cache directory (None disables caching)
+		workers: Process count for parsing misses (default: CPU count)
+
+	Returns:
+		ScriptFile per path, in the same order
+	"""
+	paths = [Path(p) for p in paths]
+	results: List[Optional[ScriptFile]] = [None] * len(paths)
+	misses: Dict[int, Tuple[bytes, str]] = {}	# Index -> (contents, content hash)
+
+	for i, path in enumerate(paths):
+		data = path.read_bytes()
+		content_hash = hashlib.sha1(data).hexdigest()
+		if cache_dir is not None:
+			cached = _cache_path(cache_dir, content_hash)
+			if cached.exists():
+				results[i] = _decode(cached.read_bytes(), str(path), content_hash)
+		if results[i] is None:
+			misses[i] = (data, content_hash)
+
+	# Workers get the bytes already read and return cache blobs, which are
+	# decoded here and written to the cache as they are
+	blobs: Dict[int, bytes] = {}
+	if len(misses) > 1 and workers != 1:
+		pending = list(misses)
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			encoded = executor.map(_parse_and_encode, [misses[i][0] for i in pending],
+								   [str(paths[i]) for i in pending])
+			blobs = dict(zip(pending, encoded))
+		for i, blob in blobs.items():
+			results[i] = _decode(blob, str(paths[i]), misses[i][1])
+	else:
+		for i, (data, content_hash) in misses.items():
+			results[i] = _parse_bytes(data, str(paths[i]))
+			results[i].content_hash = content_hash
+
+	if cache_dir is not None and misses:
+		try:
+			cache_dir.mkdir(parents=True, exist_ok=True)
+			for i, (_, content_hash) in misses.items():
+				blob = blobs[i] if i in blobs else _encode(results[i])
+				_cache_path(cache_dir, content_hash).write_bytes(blob)
+		except OSError:
+			pass	# Cache is an optimization only
+
+	return results
+
+
+def clear_cache(cache_dir: Path = DEFAULT_CACHE_DIR) -> int:
+	"""Delete cached IR files, returning how many were removed"""
+	removed = 0
+	if cache_dir.exists():
+		for path in cache_dir.glob('*.ir'):
+			path.unlink()
+			removed += 1
+	return removed
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Parse event scripts into the shared IR')
+	parser.add_argument('scripts', type=Path, nargs='*', help='Script files')
+	parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help='IR cache directory')
+	parser.add_argument('--no-cache', action='store_true', help='Parse without the cache')
+	parser.add_argument('--workers', type=int, help='Parser processes')
+	parser.add_argument('--stats', action='store_true', help='Print per-file op counts')
+	parser.add_argument('--clear-cache', action='store_true', help='Delete cached IR first')
+
+	args = parser.parse_args()
+
+	if args.clear_cache:
+		print(f"Removed {clear_cache(args.cache_dir)} cached IR files")
+
+	cache_dir = None if args.no_cache else args.cache_dir
+	scripts = load_scripts(args.scripts, cache_dir=cache_dir, workers=args.workers)
+
+	for script in scripts:
+		print(f"{script.path}: {len(script.dialogs)} dialogs, {len(script.ops)} lines")
+		if args.stats:
+			for kind in OpKind:
+				count = sum(1 for op in script.ops if op.kind == kind)
+				if count:
+					print(f"  {kind.name:<8} {count:>6}")
+
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -40,6 +40,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, Counter
 
+from script_ir import ScriptFile, load_script, load_scripts
+
 
 class RuleSeverity(Enum):
 	"""Severity levels for lint rules"""
@@ -178,21 +180,15 @@ class ScriptLinter:
 
 	def parse_script_file(self, script_path: Path) -> None:
 		"""Parse script file into dialog dictionary"""
-		if self.verbose:
-			print(f"Parsing {script_path}...")
+		self.load_ir(load_script(script_path))
 
-		with open(script_path, 'r', encoding='utf-8') as f:
-			content = f.read()
-
-		# Split by dialog markers
-		dialog_pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
-		matches = re.finditer(dialog_pattern, content, re.MULTILINE | re.DOTALL)
+	def load_ir(self, script: ScriptFile) -> None:
+		"""Load dialogs from parsed script IR"""
+		if self.verbose:
+			print(f"Loading {script.path}...")
 
-		for match in matches:
-			dialog_id = match.group(1)
-			dialog_content = match.group(2).strip()
-			lines = dialog_content.split('\n')
-			self.dialogs[dialog_id] = lines
+		for dialog_id, dialog in script.dialogs.items():
+			self.dialogs[dialog_id] = dialog.raw_lines()
 
 	def check_line_length(self, dialog_id: str, line_num: int, line: str) -> None:
 		"""Check if line exceeds maximum length"""
@@ -500,11 +496,11 @@ class ScriptLinter:
 			self.check_line_length(dialog_id, line_num, line)
 			self.check_trailing_whitespace(dialog_id, line_num, line)
 
-	def lint(self, script_paths: List[Path]) -> LintReport:
-		"""Lint all scripts"""
+	def lint(self, script_paths: List[Path], scripts: Optional[List[ScriptFile]] = None) -> LintReport:
+		"""Lint all scripts (scripts: IR already parsed for script_paths)"""
 		# Parse all scripts
-		for path in script_paths:
-			self.parse_script_file(path)
+		for script in scripts if scripts is not None else load_scripts(script_paths):
+			self.load_ir(script)
 
 		if self.verbose:
 			print(f"\nLinting {len(self.dialogs)} dialogs...")
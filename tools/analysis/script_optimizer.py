@@ -37,6 +37,8 @@ from dataclasses import dataclass, field
 from collections import Counter, defaultdict
 from enum import Enum
 
+from script_ir import ScriptFile, load_script, load_scripts
+
 
 class OptimizationType(Enum):
 	"""Types of optimizations available"""
@@ -150,21 +152,15 @@ class ScriptOptimizer:
 
 	def parse_script_file(self, script_path: Path) -> None:
 		"""Parse script file into dialog dictionary"""
-		if self.verbose:
-			print(f"Parsing {script_path}...")
+		self.load_ir(load_script(script_path))
 
-		with open(script_path, 'r', encoding='utf-8') as f:
-			content = f.read()
-
-		# Split by dialog markers
-		dialog_pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
-		matches = re.finditer(dialog_pattern, content, re.MULTILINE | re.DOTALL)
+	def load_ir(self, script: ScriptFile) -> None:
+		"""Load dialogs from parsed script IR"""
+		if self.verbose:
+			print(f"Loading {script.path}...")
 
-		for match in matches:
-			dialog_id = match.group(1)
-			dialog_content = match.group(2).strip()
-			lines = [line.strip() for line in dialog_content.split('\n') if line.strip()]
-			self.dialogs[dialog_id] = lines
+		for dialog_id, dialog in script.dialogs.items():
+			self.dialogs[dialog_id] = dialog.lines()
 
 	def calculate_byte_size(self, lines: List[str]) -> int:
 		"""Estimate byte size of compiled script"""
@@ -478,11 +474,11 @@ class ScriptOptimizer:
 						code_after=f"MEMORY_WRITE {address} {accesses[i].value}\n...\n; Use register value"
 					))
 
-	def analyze(self, script_paths: List[Path]) -> OptimizationReport:
-		"""Perform complete optimization analysis"""
+	def analyze(self, script_paths: List[Path], scripts: Optional[List[ScriptFile]] = None) -> OptimizationReport:
+		"""Perform complete optimization analysis (scripts: IR already parsed for script_paths)"""
 		# Parse all scripts
-		for path in script_paths:
-			self.parse_script_file(path)
+		for script in scripts if scripts is not None else load_scripts(script_paths):
+			self.load_ir(script)
 
 		total_lines = sum(len(lines) for lines in self.dialogs.values())
 		total_bytes = sum(self.calculate_byte_size(lines) for lines in self.dialogs.values())
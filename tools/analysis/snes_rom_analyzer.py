@@ -28,12 +28,14 @@ Usage:
 import argparse
 import json
 import struct
-import math
+import sys
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass, asdict
 from enum import Enum
-from collections import Counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from rom_statistics import compute_block_statistics
 
 try:
 	from PIL import Image, ImageDraw
@@ -327,10 +329,7 @@ class SNESROMAnalyzer:
 	def validate_checksum(self, header: ROMHeader) -> Tuple[bool, int]:
 		"""Validate ROM checksum"""
 		# Calculate checksum (sum of all bytes)
-		calculated = 0
-		
-		for byte in self.rom_data[self.header_offset:]:
-			calculated = (calculated + byte) & 0xFFFF
+		calculated = sum(self.rom_data[self.header_offset:]) & 0xFFFF
 		
 		# For small ROMs, mirror the data to fill 2MB
 		rom_size_kb = (len(self.rom_data) - self.header_offset) // 1024
@@ -343,28 +342,10 @@ class SNESROMAnalyzer:
 		
 		return (checksum_valid, calculated)
 	
-	def analyze_entropy(self, block_size: int = 256) -> List[float]:
+	def analyze_entropy(self, block_size: int = 256, stride: Optional[int] = None) -> List[float]:
 		"""Calculate entropy for each block (measures compression/randomness)"""
-		entropies = []
-		
-		for i in range(0, len(self.rom_data), block_size):
-			block = self.rom_data[i:i + block_size]
-			
-			if len(block) == 0:
-				entropies.append(0.0)
-				continue
-			
-			# Calculate entropy
-			counter = Counter(block)
-			entropy = 0.0
-			
-			for count in counter.values():
-				probability = count / len(block)
-				entropy -= probability * math.log2(probability)
-			
-			entropies.append(entropy)
-		
-		return entropies
+		stats = compute_block_statistics(self.rom_data, block_size, stride)
+		return stats.entropy.tolist()
 	
 	def generate_entropy_map(self, output_path: Path, width: int = 256) -> None:
 		"""Generate visual entropy map"""
@@ -412,32 +393,21 @@ class SNESROMAnalyzer:
 		banks = []
 		bank_size = 0x8000  # 32KB per bank
 		
-		for bank_num in range(self.rom_size // bank_size):
-			offset = bank_num * bank_size
-			bank_data = self.rom_data[offset:offset + bank_size]
-			
-			if len(bank_data) == 0:
-				continue
-			
-			# Calculate statistics
-			zero_bytes = sum(1 for b in bank_data if b == 0x00)
-			ff_bytes = sum(1 for b in bank_data if b == 0xFF)
+		full_size = (self.rom_size // bank_size) * bank_size
+		stats = compute_block_statistics(self.rom_data[:full_size], bank_size, keep_histograms=True)
+		
+		for bank_num in range(len(stats)):
+			size = int(stats.lengths[bank_num])
+			zero_bytes = int(stats.histograms[bank_num, 0x00])
+			ff_bytes = int(stats.histograms[bank_num, 0xFF])
+			entropy = float(stats.entropy[bank_num])
 			
 			# Estimate if code vs data
 			# Code typically has more varied bytes, data more repeated
-			unique_bytes = len(set(bank_data))
-			
-			# Calculate entropy
-			counter = Counter(bank_data)
-			entropy = 0.0
-			for count in counter.values():
-				prob = count / len(bank_data)
-				entropy -= prob * math.log2(prob)
-			
 			bank_type = "unknown"
-			if zero_bytes > len(bank_data) * 0.9:
+			if zero_bytes > size * 0.9:
 				bank_type = "empty/zero"
-			elif ff_bytes > len(bank_data) * 0.9:
+			elif ff_bytes > size * 0.9:
 				bank_type = "empty/FF"
 			elif entropy > 6.5:
 				bank_type = "compressed/data"
@@ -448,11 +418,11 @@ class SNESROMAnalyzer:
 			
 			banks.append({
 				'bank': bank_num,
-				'offset': f"0x{offset:06X}",
-				'size': len(bank_data),
+				'offset': f"0x{int(stats.offsets[bank_num]):06X}",
+				'size': size,
 				'zero_bytes': zero_bytes,
 				'ff_bytes': ff_bytes,
-				'unique_bytes': unique_bytes,
+				'unique_bytes': int(stats.unique[bank_num]),
 				'entropy': round(entropy, 2),
 				'estimated_type': bank_type
 			})
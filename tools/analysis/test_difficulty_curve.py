@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Difficulty Curve - Test Suite
+
+Checks the vectorized zone/formation/enemy join against the formation
+editor and damage calculator record by record, the encounter and area
+reductions, and ROM-vs-ROM deltas through the analyzer.
+
+Usage:
+	python test_difficulty_curve.py
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'encounter'))
+
+from difficulty_curve import (
+	BATTLE_OVERHEAD, PARTY_ACCURACY, PARTY_CRITICAL, SECONDS_PER_STEP, SECONDS_PER_TURN,
+	DifficultyCurve, PartyCurve
+)
+from ffmq_damage_calculator import AttackData, AttackerStats, DamageType, DefenderStats, Element, FFMQDamageCalculator
+from ffmq_difficulty_analyzer import FFMQDifficultyAnalyzer
+from ffmq_formation_editor import FFMQFormationEditor
+from record_tables import EDITOR_ENEMIES, EDITOR_ITEMS, ENCOUNTER_ZONES
+
+PROGRESSION = {0: (1, 80, 20, 5), 3: (12, 300, 50, 25), 6: (30, 900, 110, 70)}
+
+
+def sample_rom(seed: int = 0) -> bytearray:
+	rng = np.random.default_rng(seed)
+	rom = bytearray(rng.integers(0, 256, 0x344000, dtype=np.uint8).tobytes())
+	zones = ENCOUNTER_ZONES.view(rom)
+	zones['map_id'] = np.where(np.arange(512) < 30, np.arange(512) % 9, 0xFF)
+	zones['slots']['weight'][:3] = 0				# Unweighted zones roll uniformly
+	enemies = EDITOR_ENEMIES.view(rom)
+	for name, low, high in (('hp', 20, 400), ('attack', 10, 60), ('defense', 5, 50), ('evade', 0, 10),
+							('speed', 20, 70), ('exp', 1, 100), ('gold', 1, 100), ('critical', 0, 20)):
+		enemies[name] = rng.integers(low, high, 256)
+	items = EDITOR_ITEMS.view(rom)
+	items['attack'] = rng.integers(5, 40, 256)
+	items['accuracy'] = rng.integers(-5, 5, 256)
+	items['defense'] = rng.integers(5, 40, 256)
+	return rom
+
+
+class TestJoin(unittest.TestCase):
+	def test_rows_match_editor_and_calculator(self):
+		rom = sample_rom()
+		path = Path(tempfile.mkstemp(suffix='.sfc')[1])
+		path.write_bytes(rom)
+		editor = FFMQFormationEditor(path)
+		path.unlink()
+
+		curve = PartyCurve.from_points([
+			{'area': 0, 'level': 1, 'hp': 80, 'attack': 20, 'defense': 5, 'weapon': 7},
+			{'area': 4, 'level': 20, 'hp': 500, 'attack': 70, 'defense': 40, 'speed': 60, 'armor': 9},
+		])
+		table = DifficultyCurve.from_rom(rom, curve).enemies
+		calculator = FFMQDamageCalculator()
+		items, enemies = EDITOR_ITEMS.view(rom), EDITOR_ENEMIES.view(rom)
+		attack = AttackData("Attack", DamageType.PHYSICAL, 0, Element.NONE)
+
+		expected = []
+		for zone in editor.list_encounter_zones():
+			point = 0 if zone.map_id < 4 else 1
+			weapon = items[7] if point == 0 else None
+			defense = curve.defense[point] + (int(items['defense'][9]) if point == 1 else 0)
+			total = sum(zone.weights)
+			for formation_id, weight in zip(zone.formations, zone.weights):
+				probability = weight / total if total else 1 / len(zone.formations)
+				elapsed = 0.0
+				for slot in editor.extract_formation(formation_id).enemies:
+					if not slot.active:
+						continue
+					enemy = enemies[slot.enemy_id]
+					dealt = calculator.calculate_physical_damage(
+						AttackerStats(1, int(curve.attack[point]), 0, PARTY_ACCURACY, PARTY_CRITICAL,
+									  int(weapon['attack']) if weapon is not None else 0),
+						DefenderStats(1, int(enemy['defense']), 0, int(enemy['evade']), 1, 1),
+						AttackData("Attack", DamageType.PHYSICAL, 0, Element.NONE,
+								   accuracy_modifier=int(weapon['accuracy']) if weapon is not None else 0),
+					).expected_damage
+					hit = calculator.calculate_physical_damage(
+						AttackerStats(1, int(enemy['attack']), 0, 0, min(100, int(enemy['critical']))),
+						DefenderStats(1, defense, 0, 0, 1, 1), attack,
+					).expected_damage
+					elapsed += int(enemy['hp']) / dealt
+					taken = hit * int(enemy['speed']) / curve.speed[point]
+					expected.append((zone.zone_id, formation_id, slot.enemy_id, probability, dealt, taken,
+									 taken * elapsed))
+
+		self.assertEqual(len(table), len(expected))
+		self.assertEqual(list(zip(table['zone'].tolist(), table['formation'].tolist(), table['enemy'].tolist())),
+						 [row[:3] for row in expected])
+		for column, index in (('probability', 3), ('dealt', 4), ('taken', 5), ('damage_taken', 6)):
+			np.testing.assert_allclose(table[column], [row[index] for row in expected], rtol=1e-12, err_msg=column)
+
+
+class TestReports(unittest.TestCase):
+	def setUp(self):
+		self.curve = DifficultyCurve.from_rom(sample_rom(), PartyCurve.from_progression(PROGRESSION))
+
+	def test_encounter_and_area_reductions(self):
+		enemies, encounters, areas = self.curve.enemies, self.curve.encounters, self.curve.areas
+		first = 7
+		rows = enemies['encounter'] == np.unique(enemies['encounter'])[first]
+		self.assertAlmostEqual(encounters['clear_turns'][first], enemies['turns_to_kill'][rows].sum())
+		self.assertEqual(encounters['exp'][first], enemies['exp'][rows].sum())
+		self.assertAlmostEqual(encounters['seconds'][first],
+							   enemies['encounter_rate'][rows][0] * SECONDS_PER_STEP + BATTLE_OVERHEAD
+							   + encounters['clear_turns'][first] * SECONDS_PER_TURN)
+
+		self.assertEqual(areas['area'].tolist(), list(range(9)))
+		self.assertEqual(areas['level'].tolist(), [1, 1, 1, 12, 12, 12, 30, 30, 30])
+		self.assertEqual(int(areas['formations'].sum()), len(encounters))
+		self.assertEqual(int(areas['zones'].sum()), 30)
+		area = encounters['area'] == 4
+		weight = encounters['probability'][area]
+		self.assertAlmostEqual(areas['danger'][4], np.average(encounters['danger'][area], weights=weight))
+		self.assertAlmostEqual(areas['exp_per_minute'][4], 60 * np.average(encounters['exp'][area], weights=weight)
+							   / np.average(encounters['seconds'][area], weights=weight))
+		self.assertEqual(areas['max_danger'][4], encounters['danger'][area].max())
+
+		# An under-geared point at map 5 shows up as a spike there
+		weak = PartyCurve.from_progression({**PROGRESSION, 5: (14, 150, 30, 10)})
+		curve = DifficultyCurve.from_rom(sample_rom(), weak)
+		danger = curve.areas['danger']
+		spikes = [i for i in range(1, len(danger)) if danger[i] > 1.5 * danger[i - 1]]
+		self.assertEqual(np.flatnonzero(curve.areas['spike']).tolist(), spikes)
+		self.assertIn(5, spikes)
+		self.assertIn(f"Area 5: Danger spike ({danger[5]:.2f} of party HP per encounter)", curve.spikes())
+
+	def test_rom_delta_report(self):
+		vanilla = sample_rom()
+		hard = bytearray(vanilla)
+		enemies = EDITOR_ENEMIES.view(hard)
+		enemies['hp'] = enemies['hp'] * 2
+		ENCOUNTER_ZONES.view(hard)['map_id'][ENCOUNTER_ZONES.view(hard)['map_id'] == 8] = 9
+
+		with tempfile.TemporaryDirectory() as tmp:
+			paths = [Path(tmp) / 'vanilla.sfc', Path(tmp) / 'hard.sfc', Path(tmp) / 'party.json']
+			paths[0].write_bytes(vanilla)
+			paths[1].write_bytes(hard)
+			paths[2].write_text(json.dumps([
+				{'area': area, 'level': level, 'hp': hp, 'attack': attack, 'defense': defense}
+				for area, (level, hp, attack, defense) in PROGRESSION.items()
+			]))
+			analyzer = FFMQDifficultyAnalyzer(paths[0], party=PartyCurve.from_json(paths[2]))
+			delta = analyzer.compare(paths[1])
+			rows = {row['area']: row for row in delta.rows()}
+
+		self.assertEqual(sorted(rows), list(range(10)))
+		for area in range(8):
+			self.assertAlmostEqual(rows[area]['enemy_hp_delta'], rows[area]['enemy_hp_base'])
+			self.assertGreater(rows[area]['danger_delta'], 0)
+			self.assertLess(rows[area]['exp_per_minute_delta'], 0)
+		self.assertTrue(np.isnan(rows[8]['danger_other']) and np.isnan(rows[9]['danger_base']))
+		self.assertEqual(analyzer.analyze_progression().area_stats[3].recommended_player_level, 12)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script IR - Test Suite
+
+Checks the shared tokenizer against the per-analyzer parsing it replaced,
+and the content-hash cache round trip.
+
+Usage:
+	python test_script_ir.py
+"""
+
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from script_ir import OpKind, load_scripts, parse_script
+
+
+PLAIN_SCRIPT = """; sample script
+DIALOG INTRO_1:
+	"Welcome to Foresta!"   
+	SET_FLAG 0x10
+	MEMORY_WRITE $7E0100 5
+loop:
+	"Hello there"
+	WAIT 30
+	END
+
+DIALOG INTRO_2:
+	CALL 0E/8000
+	JUMP loop
+"""
+
+BRACKET_SCRIPT = """[DIALOG 1]
+Hello there
+YES
+[MEMORY_WRITE:$10:2]
+[END]
+"""
+
+
+class TestScriptIR(unittest.TestCase):
+	"""Test tokenizer and cache"""
+
+	def test_matches_dialog_regex(self):
+		"""Test dialog line views match the old regex split"""
+		pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
+		expected = {m.group(1): m.group(2).strip().split('\n')
+					for m in re.finditer(pattern, PLAIN_SCRIPT, re.MULTILINE | re.DOTALL)}
+
+		script = parse_script(PLAIN_SCRIPT)
+		self.assertEqual({k: d.raw_lines() for k, d in script.dialogs.items()}, expected)
+		self.assertEqual(script.dialogs['INTRO_1'].lines()[0], '"Welcome to Foresta!"')
+
+	def test_typed_ops(self):
+		"""Test commands, text and labels"""
+		dialog = parse_script(PLAIN_SCRIPT).dialogs['INTRO_1']
+		self.assertEqual([(op.name, op.params) for op in dialog.commands()],
+						 [('SET_FLAG', ('0x10',)), ('MEMORY_WRITE', ('$7E0100', '5')),
+						  ('WAIT', ('30',)), ('END', ())])
+		self.assertEqual(dialog.quoted_text(), ['Welcome to Foresta!', 'Hello there'])
+		self.assertEqual(dialog.labels(), ['loop'])
+
+	def test_bracket_dialect(self):
+		"""Test bare lines are text inside [DIALOG n] blocks"""
+		dialog = parse_script(BRACKET_SCRIPT).dialogs['1']
+		self.assertEqual([op.kind for op in dialog.ops],
+						 [OpKind.TEXT, OpKind.TEXT, OpKind.COMMAND, OpKind.COMMAND])
+		self.assertEqual(dialog.commands()[0].params, ('$10', '2'))
+
+	def test_cache_round_trip(self):
+		"""Test cached IR equals a fresh parse, including parallel misses"""
+		with tempfile.TemporaryDirectory() as tmp:
+			tmp = Path(tmp)
+			paths = [tmp / 'plain.txt', tmp / 'bracket.txt']
+			paths[0].write_text(PLAIN_SCRIPT)
+			paths[1].write_text(BRACKET_SCRIPT)
+
+			fresh = load_scripts(paths, cache_dir=tmp / 'cache', workers=2)
+			cached = load_scripts(paths, cache_dir=tmp / 'cache')
+			self.assertEqual(len(list((tmp / 'cache').glob('*.ir'))), 2)
+
+			for a, b in zip(fresh, cached):
+				self.assertEqual(a.content_hash, b.content_hash)
+				self.assertEqual(a.ops, b.ops)
+				self.assertEqual({k: d.ops for k, d in a.dialogs.items()},
+								 {k: d.ops for k, d in b.dialogs.items()})
+
+
+if __name__ == '__main__':
+	unittest.main()
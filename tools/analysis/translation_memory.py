@@ -42,6 +42,8 @@ from collections import Counter
 from xml.etree import ElementTree as ET
 from xml.dom import minidom
 
+from script_ir import ScriptFile, load_script, load_scripts
+
 
 @dataclass
 class TranslationUnit:
@@ -146,33 +148,14 @@ class TranslationMemoryBuilder:
 
 	def parse_script_file(self, script_path: Path) -> Dict[str, List[str]]:
 		"""Parse script file into dialog dictionary"""
-		if self.verbose:
-			print(f"Parsing {script_path}...")
-
-		dialogs = {}
-
-		with open(script_path, 'r', encoding='utf-8') as f:
-			content = f.read()
+		return self.dialogs_from_ir(load_script(script_path))
 
-		# Split by dialog markers
-		dialog_pattern = r'^DIALOG\s+(\S+):(.*?)(?=^DIALOG\s+|\Z)'
-		matches = re.finditer(dialog_pattern, content, re.MULTILINE | re.DOTALL)
-
-		for match in matches:
-			dialog_id = match.group(1)
-			dialog_content = match.group(2).strip()
-
-			# Extract text lines only (quoted strings)
-			text_lines = []
-			for line in dialog_content.split('\n'):
-				line = line.strip()
-				if line.startswith('"') and line.endswith('"'):
-					text = line[1:-1]  # Remove quotes
-					text_lines.append(text)
-
-			dialogs[dialog_id] = text_lines
+	def dialogs_from_ir(self, script: ScriptFile) -> Dict[str, List[str]]:
+		"""Extract text lines only (quoted strings) from parsed script IR"""
+		if self.verbose:
+			print(f"Loading {script.path}...")
 
-		return dialogs
+		return {dialog_id: dialog.quoted_text() for dialog_id, dialog in script.dialogs.items()}
 
 	def normalize_text(self, text: str) -> str:
 		"""Normalize text for comparison"""
@@ -358,11 +341,13 @@ class TranslationMemoryBuilder:
 			terminology_count=len(self.terminology)
 		)
 
-	def build_memory(self, source_path: Path, target_path: Path, creator: str = "TranslationMemoryBuilder") -> TranslationMemory:
-		"""Build complete translation memory"""
+	def build_memory(self, source_path: Path, target_path: Path, creator: str = "TranslationMemoryBuilder",
+	                 scripts: Optional[Tuple[ScriptFile, ScriptFile]] = None) -> TranslationMemory:
+		"""Build complete translation memory (scripts: IR already parsed for source/target)"""
 		# Parse scripts
-		self.source_dialogs = self.parse_script_file(source_path)
-		self.target_dialogs = self.parse_script_file(target_path)
+		source, target = scripts if scripts is not None else load_scripts([source_path, target_path])
+		self.source_dialogs = self.dialogs_from_ir(source)
+		self.target_dialogs = self.dialogs_from_ir(target)
 
 		# Align dialogs
 		self.align_dialogs()
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+FFMQ Battle Simulator - Discrete-event fights for balance testing
+
+The battle editor and the AI designer each had a toy loop that printed
+turns without turn order, statuses or healing. This engine plays whole
+fights: every combatant is scheduled on an event queue by speed, enemy
+turns run the AI designer's state machine (transitions, conditions,
+state-preferred actions), the party follows a simple heal/attack/spell
+policy with limited spell charges and potions, and status effects tick
+on their owner's turns.
+
+Engine:
+- Event queue ordered by time; a combatant acts every
+  ROUND_TIME * BASE_SPEED / speed time units (a speed-50 combatant acts
+  once per round), with a random initial offset of up to half a turn
+- Damage uses the calculator formulas through StatSpace (physical:
+  attack + weapon - defense / 2, spells: power * magic / 16 * element)
+  and the calculator's hit/critical/variance rolls
+- Statuses: poison (1/16 max HP per own turn), sleep and paralysis
+  (lose turns), confusion (attacks a random combatant), darkness (half
+  hit chance), silence (no spells); each lasts 3-5 of its owner's turns
+- Enemy DEFEND halves physical damage until its next turn, BUFF raises
+  attack by a quarter, HEAL/ITEM restores a quarter of max HP, FLEE
+  leaves the fight
+
+Batches:
+- Fight i rolls from random.Random seeded by SeedSequence(seed, i), so
+  results do not depend on the worker count or chunking
+- Fights fan out over a ProcessPoolExecutor
+- Per formation: win rate, round-count distribution, damage taken,
+  healing, potions, spell charges and deaths; --compare replays the same
+  fights against a modified ROM
+
+Usage:
+	python battle_simulator.py --demo --fights 2000
+	python battle_simulator.py rom.sfc --formation 0-15 --fights 5000 --workers 4
+	python battle_simulator.py rom.sfc --formation 12 --compare modded.sfc --fights 10000
+	python battle_simulator.py rom.sfc --formation 12 --party party.json --ai-file boss_ai.json
+	python battle_simulator.py --demo --log --seed 3
+"""
+
+import argparse
+import functools
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'ai'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'battlefield'))
+
+from ffmq_battle_editor import StatusApplication, StatusEffect
+from ffmq_damage_calculator import FFMQDamageCalculator
+from ffmq_enemy_ai import AIContext, AIState, ActionType, EnemyAI, FFMQEnemyAIDesigner, TargetType
+from record_tables import EDITOR_ENEMIES, FORMATIONS
+from stat_space import StatSpace
+
+
+ROUND_TIME = 100.0			# Time units per round
+BASE_SPEED = 50				# Speed that acts exactly once per round
+MAX_ROUNDS = 100			# Fights still running after this are timeouts
+HEAL_THRESHOLD = 0.35		# Party heals an ally below this HP fraction
+SPELL_ADVANTAGE = 1.5		# Party casts when a spell beats attacking by this factor
+POTION_HEAL_PERCENT = 30
+ENEMY_HEAL_PERCENT = 25
+EMPTY_SLOT = 0xFF
+
+# Party spells: school (charge pool), power, element; Cure heals
+SPELLS: Dict[str, Tuple[str, int, str]] = {'Cure': ('white', 40, 'none')}
+SPELLS.update({
+	name: ({'Fire': 'black', 'Blizzard': 'black', 'Aero': 'black'}.get(name, 'wizard'),
+		   data['power'], data['element'].value)
+	for name, data in FFMQDamageCalculator.SPELLS.items()
+})
+HEALING_SPELLS = ('Cure',)
+ELEMENTS = ('fire', 'water', 'earth', 'wind', 'holy', 'dark', 'poison')
+
+
+class Side(Enum):
+	"""Which side a combatant fights on"""
+	PARTY = "party"
+	ENEMY = "enemy"
+
+
+class Outcome(Enum):
+	"""How a fight ended"""
+	WIN = "win"
+	LOSS = "loss"
+	TIMEOUT = "timeout"
+
+
+OUTCOMES = list(Outcome)
+
+
+@dataclass
+class Combatant:
+	"""One fighter; the first block is configuration, the rest battle state"""
+	name: str
+	side: Side
+	max_hp: int
+	attack: int
+	defense: int
+	magic: int
+	speed: int
+	accuracy: int = 0
+	evasion: int = 0
+	critical_rate: int = 5
+	weapon_power: int = 0
+	resistances: Dict[str, float] = field(default_factory=dict)	# element -> damage multiplier
+	spells: List[str] = field(default_factory=list)
+	charges: Dict[str, int] = field(default_factory=dict)		# school -> casts left
+	ai: Optional[EnemyAI] = None
+	skill_power: int = 20
+
+	hp: int = -1
+	status: Dict[StatusEffect, int] = field(default_factory=dict)
+	state: AIState = AIState.IDLE
+	turns: int = 0
+	defending: bool = False
+	buffed: bool = False
+	fled: bool = False
+
+	def __post_init__(self):
+		if self.hp < 0:
+			self.hp = self.max_hp
+
+	def fresh(self) -> 'Combatant':
+		"""Copy with battle state reset"""
+		return replace(self, hp=self.max_hp, charges=dict(self.charges), status={},
+					   state=self.ai.current_state if self.ai else AIState.IDLE,
+					   turns=0, defending=False, buffed=False, fled=False)
+
+	@property
+	def active(self) -> bool:
+		return self.hp > 0 and not self.fled
+
+	@property
+	def effective_attack(self) -> int:
+		return self.attack * 5 // 4 if self.buffed else self.attack
+
+
+class FightResult(NamedTuple):
+	"""Outcome and resource use of one fight"""
+	outcome: Outcome
+	rounds: int
+	damage_dealt: int			# By the party
+	damage_taken: int			# By the party (before healing)
+	healing: int
+	potions: int
+	charges: int
+	deaths: int					# Party members down at the end
+	fled: int					# Enemies that fled
+
+
+ODDS_CACHE_SIZE = 4096					# Distinct stat tuples kept (one fight uses a handful)
+
+
+@functools.lru_cache(maxsize=ODDS_CACHE_SIZE)
+def _odds(kind: str, **stats) -> Tuple[float, float, float, float]:
+	"""(base, hit chance, critical chance, expected damage) from the calculator formulas"""
+	grid = StatSpace(**stats).evaluate(kind)
+	return (float(grid.base), float(grid.hit_chance), float(grid.critical_chance),
+			float(grid.expected_damage))
+
+
+class Battle:
+	"""One fight setup; run() plays it out with the given random source"""
+
+	def __init__(self, party: Sequence[Combatant], enemies: Sequence[Combatant], potions: int = 6,
+				 designer: Optional[FFMQEnemyAIDesigner] = None, max_rounds: int = MAX_ROUNDS):
+		self.party = list(party)
+		self.enemies = list(enemies)
+		self.potions = potions
+		self.designer = designer or FFMQEnemyAIDesigner()
+		self.max_rounds = max_rounds
+
+	# ------------------------------------------------------------------
+	# Fight loop
+	# ------------------------------------------------------------------
+
+	def run(self, rng: random.Random, log: Optional[Callable[[str], None]] = None) -> FightResult:
+		self.rng = rng
+		self.log = log
+		self.fighters = [c.fresh() for c in self.party + self.enemies]
+		self.potions_left = self.potions
+		self.totals = {'damage_dealt': 0, 'damage_taken': 0, 'healing': 0, 'charges': 0}
+
+		queue = []
+		for index, fighter in enumerate(self.fighters):
+			heapq.heappush(queue, (self._delay(fighter) * rng.uniform(0.5, 1.0), index))
+
+		now = 0.0
+		outcome = Outcome.TIMEOUT
+		while queue:
+			now, index = heapq.heappop(queue)
+			if now > self.max_rounds * ROUND_TIME:
+				now = self.max_rounds * ROUND_TIME
+				break
+			actor = self.fighters[index]
+			if not actor.active:
+				continue
+			self._turn(actor, now)
+			outcome = self._outcome()
+			if outcome != Outcome.TIMEOUT:
+				break
+			heapq.heappush(queue, (now + self._delay(actor), index))
+
+		party = self.fighters[:len(self.party)]
+		return FightResult(
+			outcome=outcome,
+			rounds=max(1, math.ceil(now / ROUND_TIME)),
+			damage_dealt=self.totals['damage_dealt'],
+			damage_taken=self.totals['damage_taken'],
+			healing=self.totals['healing'],
+			potions=self.potions - self.potions_left,
+			charges=self.totals['charges'],
+			deaths=sum(1 for c in party if c.hp <= 0),
+			fled=sum(1 for c in self.fighters[len(self.party):] if c.fled),
+		)
+
+	def _delay(self, fighter: Combatant) -> float:
+		return ROUND_TIME * BASE_SPEED / max(1, fighter.speed)
+
+	def _outcome(self) -> Outcome:
+		if not any(c.active for c in self.fighters if c.side == Side.PARTY):
+			return Outcome.LOSS
+		if not any(c.active for c in self.fighters if c.side == Side.ENEMY):
+			return Outcome.WIN
+		return Outcome.TIMEOUT
+
+	def _say(self, text: str) -> None:
+		if self.log:
+			self.log(text)
+
+	def _turn(self, actor: Combatant, now: float) -> None:
+		actor.turns += 1
+		actor.defending = False
+		prefix = f"[{now / ROUND_TIME:6.2f}] {actor.name}"
+
+		if actor.status:
+			if StatusEffect.POISON in actor.status:
+				self._damage(actor, max(1, actor.max_hp // 16), None)
+				self._say(f"{prefix} takes poison damage ({actor.hp}/{actor.max_hp})")
+				if actor.hp <= 0:
+					return
+			skip = [s for s in (StatusEffect.SLEEP, StatusEffect.PARALYSIS) if s in actor.status]
+			for status in list(actor.status):
+				actor.status[status] -= 1
+				if actor.status[status] <= 0:
+					del actor.status[status]
+			if skip:
+				self._say(f"{prefix} cannot move ({', '.join(s.value for s in skip)})")
+				return
+
+		if StatusEffect.CONFUSION in actor.status:
+			others = [c for c in self.fighters if c.active and c is not actor]
+			self._attack(actor, [self.rng.choice(others)], f"{prefix} (confused)")
+		elif actor.side == Side.PARTY:
+			self._party_turn(actor, prefix)
+		else:
+			self._enemy_turn(actor, prefix)
+
+	# ------------------------------------------------------------------
+	# Decisions
+	# ------------------------------------------------------------------
+
+	def _side(self, actor: Combatant, opponents: bool) -> List[Combatant]:
+		return [c for c in self.fighters if c.active and (c.side != actor.side) == opponents]
+
+	def _party_turn(self, actor: Combatant, prefix: str) -> None:
+		silenced = StatusEffect.SILENCE in actor.status
+		allies = self._side(actor, opponents=False)
+		wounded = min(allies, key=lambda c: c.hp / c.max_hp)
+		if wounded.hp < wounded.max_hp * HEAL_THRESHOLD:
+			cure = next((s for s in actor.spells if s in HEALING_SPELLS and self._can_cast(actor, s)), None)
+			if cure and not silenced:
+				self._say(f"{prefix} casts {cure} on {wounded.name}")
+				self._cast(actor, cure)
+				self._heal(wounded, self._spell_heal(actor, cure))
+				return
+			if self.potions_left > 0:
+				self.potions_left -= 1
+				self._say(f"{prefix} uses a potion on {wounded.name}")
+				self._heal(wounded, wounded.max_hp * POTION_HEAL_PERCENT // 100)
+				return
+
+		target = min(self._side(actor, opponents=True), key=lambda c: c.hp)
+		best, best_damage = None, self._physical_odds(actor, target)[3] * SPELL_ADVANTAGE
+		if not silenced:
+			for spell in actor.spells:
+				if spell in HEALING_SPELLS or not self._can_cast(actor, spell):
+					continue
+				expected = self._spell_odds(actor, target, *SPELLS[spell][1:])[3]
+				if expected > best_damage:
+					best, best_damage = spell, expected
+		if best:
+			self._say(f"{prefix} casts {best} on {target.name}")
+			self._cast(actor, best)
+			self._spell(actor, [target], *SPELLS[best][1:])
+		else:
+			self._attack(actor, [target], prefix)
+
+	def _enemy_turn(self, actor: Combatant, prefix: str) -> None:
+		allies = self._side(actor, opponents=False)
+		context = AIContext(hp_percent=actor.hp / actor.max_hp, turn=actor.turns,
+							statuses=len(actor.status), allies=len(allies) - 1, rng=self.rng)
+		action = None
+		if actor.ai:
+			actor.state = self.designer.next_state(actor.ai, actor.state, context)
+			action = self.designer.select_action(actor.ai, context=context, state=actor.state)
+		# By value: the designer may be running as __main__ with its own enum classes
+		action_type = ActionType(action.action_type.value) if action else ActionType.ATTACK
+		target_type = TargetType(action.target_type.value) if action else TargetType.ENEMY_RANDOM
+		if StatusEffect.SILENCE in actor.status and action_type in (ActionType.MAGIC, ActionType.SKILL,
+																	 ActionType.HEAL):
+			action_type, target_type = ActionType.ATTACK, TargetType.ENEMY_RANDOM
+
+		if action_type == ActionType.FLEE:
+			actor.fled = True
+			self._say(f"{prefix} flees")
+			return
+		if action_type == ActionType.DEFEND:
+			actor.defending = True
+			self._say(f"{prefix} defends")
+			return
+
+		targets = self._targets(actor, target_type)
+		if action_type in (ActionType.HEAL, ActionType.ITEM):
+			self._say(f"{prefix} heals {', '.join(t.name for t in targets)}")
+			for target in targets:
+				self._heal(target, target.max_hp * ENEMY_HEAL_PERCENT // 100)
+		elif action_type == ActionType.BUFF:
+			self._say(f"{prefix} powers up {', '.join(t.name for t in targets)}")
+			for target in targets:
+				target.buffed = True
+		elif action_type in (ActionType.MAGIC, ActionType.SKILL):
+			self._say(f"{prefix} uses {action.skill_name or action_type.value} "
+					  f"on {', '.join(t.name for t in targets)}")
+			self._spell(actor, targets, actor.skill_power, 'none')
+			if action_type == ActionType.SKILL and action.skill_id is not None:
+				status = list(StatusEffect)[action.skill_id % len(StatusEffect)]
+				for target in targets:
+					self._inflict(target, status, StatusApplication(status))
+		else:
+			self._attack(actor, targets, prefix)
+
+	def _targets(self, actor: Combatant, target_type: TargetType) -> List[Combatant]:
+		"""Resolve an AI target type; enemy/ally are relative to the actor"""
+		if target_type == TargetType.SELF:
+			return [actor]
+		opponents = self._side(actor, opponents=True)
+		allies = self._side(actor, opponents=False)
+		if target_type == TargetType.ALL_ENEMIES:
+			return opponents
+		if target_type == TargetType.ALL_ALLIES:
+			return allies
+		if target_type == TargetType.ENEMY_LOWEST_HP:
+			return [min(opponents, key=lambda c: c.hp)]
+		if target_type == TargetType.ENEMY_HIGHEST_HP:
+			return [max(opponents, key=lambda c: c.hp)]
+		if target_type == TargetType.ALLY_LOWEST_HP:
+			return [min(allies, key=lambda c: c.hp / c.max_hp)]
+		if target_type == TargetType.ALLY_RANDOM:
+			return [self.rng.choice(allies)]
+		return [self.rng.choice(opponents)]
+
+	# ------------------------------------------------------------------
+	# Effects
+	# ------------------------------------------------------------------
+
+	def _physical_odds(self, actor: Combatant, target: Combatant) -> Tuple[float, float, float, float]:
+		return _odds('physical', attack=actor.effective_attack, power=0, weapon_power=actor.weapon_power,
+					 defense=target.defense, evasion=target.evasion, accuracy=actor.accuracy,
+					 critical_rate=actor.critical_rate)
+
+	def _spell_odds(self, actor: Combatant, target: Combatant, power: int,
+					element: str) -> Tuple[float, float, float, float]:
+		return _odds('spell', power=power, magic=actor.magic, modifier=target.resistances.get(element, 1.0),
+					 evasion=target.evasion, accuracy=actor.accuracy)
+
+	def _roll(self, base: float, hit: float, critical: float) -> int:
+		"""One roll with the calculator's order of draws"""
+		if self.rng.random() >= hit:
+			return 0
+		multiplier = FFMQDamageCalculator.CRITICAL_MULTIPLIER if self.rng.random() < critical else 1.0
+		variance = self.rng.uniform(FFMQDamageCalculator.VARIANCE_MIN, FFMQDamageCalculator.VARIANCE_MAX)
+		return int(base * variance * multiplier)
+
+	def _attack(self, actor: Combatant, targets: List[Combatant], prefix: str) -> None:
+		for target in targets:
+			base, hit, critical, _ = self._physical_odds(actor, target)
+			if StatusEffect.DARKNESS in actor.status:
+				hit *= 0.5
+			damage = self._roll(base, hit, critical)
+			if target.defending:
+				damage //= 2
+			self._damage(target, damage, actor)
+			self._say(f"{prefix} attacks {target.name}: {damage if damage else 'miss'} "
+					  f"({target.hp}/{target.max_hp})")
+
+	def _spell(self, actor: Combatant, targets: List[Combatant], power: int, element: str) -> None:
+		for target in targets:
+			base, hit, critical, _ = self._spell_odds(actor, target, power, element)
+			self._damage(target, self._roll(base, hit, critical), actor)
+
+	def _spell_heal(self, actor: Combatant, spell: str) -> int:
+		power = SPELLS[spell][1]
+		return int(power * (actor.magic / 16.0) * self.rng.uniform(FFMQDamageCalculator.VARIANCE_MIN,
+																	FFMQDamageCalculator.VARIANCE_MAX))
+
+	def _can_cast(self, actor: Combatant, spell: str) -> bool:
+		return actor.charges.get(SPELLS[spell][0], 0) > 0
+
+	def _cast(self, actor: Combatant, spell: str) -> None:
+		actor.charges[SPELLS[spell][0]] -= 1
+		self.totals['charges'] += 1
+
+	def _damage(self, target: Combatant, damage: int, source: Optional[Combatant]) -> None:
+		damage = min(damage, target.hp)
+		target.hp -= damage
+		if target.side == Side.PARTY:
+			self.totals['damage_taken'] += damage
+		elif source is not None and source.side == Side.PARTY:
+			self.totals['damage_dealt'] += damage
+
+	def _heal(self, target: Combatant, amount: int) -> None:
+		amount = min(amount, target.max_hp - target.hp)
+		target.hp += amount
+		if target.side == Side.PARTY:
+			self.totals['healing'] += amount
+
+	def _inflict(self, target: Combatant, status: StatusEffect, application: StatusApplication) -> None:
+		if target.active and self.rng.random() < application.base_chance:
+			target.status[status] = self.rng.randint(application.duration_min, application.duration_max)
+			self._say(f"  {target.name} is afflicted with {status.value}")
+
+
+# ----------------------------------------------------------------------
+# Setups
+# ----------------------------------------------------------------------
+
+def default_party() -> List[Combatant]:
+	"""Mid-game hero and companion"""
+	return [
+		Combatant('Benjamin', Side.PARTY, max_hp=420, attack=62, defense=48, magic=36, speed=42,
+				  accuracy=10, critical_rate=12, weapon_power=24, spells=['Cure', 'Aero'],
+				  charges={'white': 4, 'black': 4}),
+		Combatant('Phoebe', Side.PARTY, max_hp=330, attack=48, defense=38, magic=58, speed=50,
+				  accuracy=10, critical_rate=10, weapon_power=20, spells=['Cure', 'Fire', 'Blizzard'],
+				  charges={'white': 3, 'black': 6}),
+	]
+
+
+def default_enemy(name: str, ai: Optional[EnemyAI] = None) -> Combatant:
+	"""Stand-alone enemy for AI tests without a ROM"""
+	return Combatant(name, Side.ENEMY, max_hp=900, attack=70, defense=40, magic=40, speed=38,
+					 accuracy=5, evasion=8, ai=ai, skill_power=24)
+
+
+def party_from_json(path: Path) -> Tuple[List[Combatant], int]:
+	"""Party members (Combatant fields) and shared potions from JSON
+
+	{"potions": 6, "members": [{"name": "Benjamin", "max_hp": 420, ...}]}
+	"""
+	with open(path, 'r', encoding='utf-8') as f:
+		data = json.load(f)
+	members = [Combatant(side=Side.PARTY, **member) for member in data['members']]
+	return members, data.get('potions', 6)
+
+
+def enemy_from_record(record: np.void, enemy_id: int, ai: Optional[EnemyAI]) -> Combatant:
+	"""Combatant from an editor enemy record"""
+	return Combatant(
+		f"Enemy {enemy_id}", Side.ENEMY,
+		max_hp=int(record['hp']), attack=int(record['attack']), defense=int(record['defense']),
+		magic=int(record['magic']), speed=int(record['speed']), evasion=int(record['evade']),
+		critical_rate=min(100, int(record['critical'])),
+		resistances={element: int(record[element]) / 100.0 for element in ELEMENTS},
+		ai=ai,
+	)
+
+
+def formation_enemies(rom: bytes, formation_id: int) -> List[int]:
+	"""Enemy IDs in a formation's occupied slots"""
+	slots = FORMATIONS.view(rom)[formation_id]['slots']['enemy']
+	return [int(enemy) for enemy in slots if enemy != EMPTY_SLOT]
+
+
+def formation_battle(rom: bytes, formation_id: int, party: Sequence[Combatant], potions: int = 6,
+					 designer: Optional[FFMQEnemyAIDesigner] = None, pattern: str = 'aggressive',
+					 max_rounds: int = MAX_ROUNDS) -> Battle:
+	"""Battle against a ROM formation; enemies without an imported AI get pattern"""
+	designer = designer or FFMQEnemyAIDesigner()
+	ais = {ai.enemy_id: ai for ai in designer.enemies.values()}
+	records = EDITOR_ENEMIES.view(rom)
+	enemies = []
+	for enemy_id in formation_enemies(rom, formation_id):
+		ai = ais.get(enemy_id) or designer.create_enemy_ai(enemy_id, f"Enemy {enemy_id}", pattern)
+		ais[enemy_id] = ai
+		enemies.append(enemy_from_record(records[enemy_id], enemy_id, ai))
+	return Battle(party, enemies, potions, designer, max_rounds)
+
+
+def demo_battle() -> Battle:
+	designer = FFMQEnemyAIDesigner()
+	enemies = [
+		replace(default_enemy('Brownie', designer.create_enemy_ai(1, 'Brownie', 'aggressive')), max_hp=420),
+		replace(default_enemy('Mage', designer.create_enemy_ai(2, 'Mage', 'support')), max_hp=300, attack=40),
+		replace(default_enemy('Goblin', designer.create_enemy_ai(3, 'Goblin', 'coward')), max_hp=360),
+	]
+	enemies[1].ai.actions[2].skill_id = 0		# Mage's magic poisons
+	enemies[1].ai.actions[2].action_type = ActionType.SKILL
+	return Battle(default_party(), enemies, designer=designer)
+
+
+# ----------------------------------------------------------------------
+# Batches
+# ----------------------------------------------------------------------
+
+def fight_rng(seed: int, index: int) -> random.Random:
+	"""Random source for fight index; depends only on (seed, index)"""
+	state = np.random.SeedSequence(seed, spawn_key=(index,)).generate_state(2, np.uint64)
+	return random.Random(int(state[0]) << 64 | int(state[1]))
+
+
+def _run_chunk(task: Tuple[Battle, int, int, int]) -> List[tuple]:
+	battle, seed, start, stop = task
+	return [tuple(battle.run(fight_rng(seed, index))) for index in range(start, stop)]
+
+
+@dataclass
+class BatchResult:
+	"""Per-fight results of a batch as arrays"""
+	outcome: np.ndarray			# Index into OUTCOMES
+	rounds: np.ndarray
+	damage_dealt: np.ndarray
+	damage_taken: np.ndarray
+	healing: np.ndarray
+	potions: np.ndarray
+	charges: np.ndarray
+	deaths: np.ndarray
+	fled: np.ndarray
+
+	@classmethod
+	def from_results(cls, results: Sequence[tuple]) -> 'BatchResult':
+		columns = list(zip(*results)) if results else [()] * len(FightResult._fields)
+		arrays = {name: np.array(values, dtype=np.int64) for name, values in zip(FightResult._fields[1:], columns[1:])}
+		outcome = np.array([OUTCOMES.index(o) for o in columns[0]], dtype=np.int8)
+		return cls(outcome=outcome, **arrays)
+
+	@property
+	def fights(self) -> int:
+		return len(self.outcome)
+
+	def rate(self, outcome: Outcome) -> float:
+		return float(np.mean(self.outcome == OUTCOMES.index(outcome))) if self.fights else 0.0
+
+	def round_histogram(self) -> np.ndarray:
+		return np.bincount(self.rounds)
+
+	def summary(self) -> dict:
+		wins = self.outcome == OUTCOMES.index(Outcome.WIN)
+		p5, p50, p95 = np.percentile(self.rounds, [5, 50, 95], method='inverted_cdf') if self.fights else (0, 0, 0)
+		return {
+			'fights': self.fights,
+			'win_rate': self.rate(Outcome.WIN),
+			'loss_rate': self.rate(Outcome.LOSS),
+			'timeout_rate': self.rate(Outcome.TIMEOUT),
+			'rounds_mean': float(self.rounds.mean()) if self.fights else 0.0,
+			'rounds_p5': int(p5), 'rounds_median': int(p50), 'rounds_p95': int(p95),
+			'win_rounds_mean': float(self.rounds[wins].mean()) if wins.any() else 0.0,
+			**{f'{name}_mean': float(getattr(self, name).mean()) if self.fights else 0.0
+			   for name in ('damage_dealt', 'damage_taken', 'healing', 'potions', 'charges', 'deaths', 'fled')},
+		}
+
+
+def simulate(battle: Battle, fights: int, seed: int = 0, workers: int = 1) -> BatchResult:
+	"""Play fights (deterministic for a seed, whatever the worker count)"""
+	if workers <= 1:
+		return BatchResult.from_results(_run_chunk((battle, seed, 0, fights)))
+
+	chunk = max(1, fights // (workers * 8))
+	tasks = [(battle, seed, start, min(fights, start + chunk)) for start in range(0, fights, chunk)]
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		results = [result for part in executor.map(_run_chunk, tasks) for result in part]
+	return BatchResult.from_results(results)
+
+
+def _parse_ids(text: str) -> List[int]:
+	ids = []
+	for part in text.split(','):
+		low, _, high = part.partition('-')
+		ids.extend(range(int(low, 0), int(high or low, 0) + 1))
+	return ids
+
+
+def print_summary(label: str, summary: dict, base: Optional[dict] = None) -> None:
+	line = (f"{label:>12}  win {summary['win_rate']:6.1%}  rounds {summary['rounds_mean']:5.1f} "
+			f"(p95 {summary['rounds_p95']:3d})  taken {summary['damage_taken_mean']:7.1f}  "
+			f"potions {summary['potions_mean']:4.2f}  charges {summary['charges_mean']:4.2f}  "
+			f"deaths {summary['deaths_mean']:4.2f}")
+	if base:
+		line += (f"  | win {summary['win_rate'] - base['win_rate']:+.1%}, "
+				 f"rounds {summary['rounds_mean'] - base['rounds_mean']:+.1f}")
+	print(line)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ discrete-event battle simulator')
+	parser.add_argument('rom', type=Path, nargs='?', help='FFMQ ROM file')
+	parser.add_argument('--formation', type=str, default='0', help='Formation IDs (e.g. 0-15,20)')
+	parser.add_argument('--demo', action='store_true', help='Built-in party vs three scripted enemies')
+	parser.add_argument('--fights', type=int, default=1000, help='Fights per formation')
+	parser.add_argument('--seed', type=int, default=0, help='Root seed')
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+	parser.add_argument('--party', type=Path, help='Party JSON (members and potions)')
+	parser.add_argument('--ai-file', type=Path, nargs='*', default=[], help='Enemy AI JSON from the AI designer')
+	parser.add_argument('--pattern', type=str, default='aggressive',
+						choices=list(FFMQEnemyAIDesigner.AI_PATTERNS), help='AI for enemies without a file')
+	parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS, help='Rounds before a timeout')
+	parser.add_argument('--compare', type=Path, help='Modified ROM to replay the same fights against')
+	parser.add_argument('--log', action='store_true', help='Print one fight turn by turn')
+	parser.add_argument('--output', type=Path, help='Write summaries to JSON')
+
+	args = parser.parse_args()
+
+	party, potions = party_from_json(args.party) if args.party else (default_party(), 6)
+	designer = FFMQEnemyAIDesigner()
+	for ai_file in args.ai_file:
+		designer.import_ai(ai_file)
+
+	if args.demo:
+		battles = {'demo': (demo_battle(), None)}
+	elif args.rom:
+		rom = args.rom.read_bytes()
+		modded = args.compare.read_bytes() if args.compare else None
+		battles = {}
+		for formation_id in _parse_ids(args.formation):
+			battle = formation_battle(rom, formation_id, party, potions, designer, args.pattern, args.max_rounds)
+			other = (formation_battle(modded, formation_id, party, potions, designer, args.pattern, args.max_rounds)
+					 if modded else None)
+			battles[f"formation {formation_id}"] = (battle, other)
+	else:
+		print("Error: give a ROM file or --demo")
+		return 1
+
+	if args.log:
+		battle = next(iter(battles.values()))[0]
+		result = battle.run(fight_rng(args.seed, 0), log=print)
+		print(f"\n{result.outcome.value} in {result.rounds} rounds: {result}")
+		return 0
+
+	summaries = {}
+	start = time.perf_counter()
+	for label, (battle, other) in battles.items():
+		summary = simulate(battle, args.fights, args.seed, args.workers).summary()
+		summaries[label] = summary
+		print_summary(label, summary)
+		if other:
+			modded_summary = simulate(other, args.fights, args.seed, args.workers).summary()
+			summaries[f"{label} (modded)"] = modded_summary
+			print_summary('modded', modded_summary, summary)
+	elapsed = time.perf_counter() - start
+	total = args.fights * sum(2 if other else 1 for _, other in battles.values())
+	print(f"\n{total:,} fights in {elapsed:.1f} s ({total / elapsed:,.0f}/s, {args.workers} workers)")
+
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(summaries, f, indent='\t')
+		print(f"✓ Wrote {args.output}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
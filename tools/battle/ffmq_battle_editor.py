@@ -24,7 +24,7 @@ Features:
 - AI script editor
 - Reward calculator
 - Export/import
-- Simulation mode
+- Simulation mode (full fights via battle_simulator.py)
 
 Usage:
 	python ffmq_battle_editor.py --extract rom.smc battle.json
@@ -36,12 +36,16 @@ Usage:
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 import random
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from record_tables import DAMAGE_FORMULA, ELEMENT_TABLE
+
 
 class Element(Enum):
 	"""Elements"""
@@ -126,8 +130,8 @@ class BattleEditor:
 	"""Battle system editor"""
 	
 	# ROM offsets (example)
-	DAMAGE_FORMULA_OFFSET = 0x180000
-	ELEMENT_TABLE_OFFSET = 0x180100
+	DAMAGE_FORMULA_OFFSET = DAMAGE_FORMULA.offset
+	ELEMENT_TABLE_OFFSET = ELEMENT_TABLE.offset
 	AI_PATTERN_OFFSET = 0x180200
 	REWARD_TABLE_OFFSET = 0x180400
 	
@@ -176,29 +180,22 @@ class BattleEditor:
 			print("Error: No ROM loaded")
 			return self.battle_system
 		
-		# Extract damage formula
-		offset = self.DAMAGE_FORMULA_OFFSET
+		# Extract damage formula (factors stored in percent)
+		formula = DAMAGE_FORMULA.view(self.rom_data)
 		
-		if offset + 16 <= len(self.rom_data):
+		if len(formula):
+			record = formula[0]
 			self.battle_system.damage_formula = DamageFormula(
-				base_multiplier=self.rom_data[offset] / 100.0,
-				attack_factor=self.rom_data[offset + 1] / 100.0,
-				defense_factor=self.rom_data[offset + 2] / 100.0,
-				variance=self.rom_data[offset + 3] / 100.0,
-				crit_multiplier=self.rom_data[offset + 4] / 100.0,
-				crit_rate=self.rom_data[offset + 5] / 100.0
+				**{name: int(record[name]) / 100.0 for name in DAMAGE_FORMULA.dtype.names}
 			)
 		
-		# Extract elemental modifiers
-		offset = self.ELEMENT_TABLE_OFFSET
+		# Extract elemental modifiers (5x5 element table)
+		multipliers = ELEMENT_TABLE.view(self.rom_data)['multiplier']
 		
-		for i in range(25):  # 5x5 element table
-			if offset + 1 > len(self.rom_data):
-				break
-			
+		for i, percent in enumerate(multipliers.tolist()):
 			attacker_elem = Element(i // 5)
 			defender_elem = Element(i % 5)
-			multiplier = self.rom_data[offset] / 100.0
+			multiplier = percent / 100.0
 			
 			modifier = ElementalModifier(
 				attacker_element=attacker_elem,
@@ -207,7 +204,6 @@ class BattleEditor:
 			)
 			
 			self.battle_system.elemental_modifiers.append(modifier)
-			offset += 1
 		
 		if self.verbose:
 			print("✓ Extracted battle system")
@@ -220,27 +216,20 @@ class BattleEditor:
 			print("Error: No ROM loaded")
 			return False
 		
-		# Write damage formula
-		offset = self.DAMAGE_FORMULA_OFFSET
+		# Write damage formula (record view writes through to the ROM)
 		formula = self.battle_system.damage_formula
+		formula_table = DAMAGE_FORMULA.view(self.rom_data)
 		
-		if offset + 16 <= len(self.rom_data):
-			self.rom_data[offset] = int(formula.base_multiplier * 100)
-			self.rom_data[offset + 1] = int(formula.attack_factor * 100)
-			self.rom_data[offset + 2] = int(formula.defense_factor * 100)
-			self.rom_data[offset + 3] = int(formula.variance * 100)
-			self.rom_data[offset + 4] = int(formula.crit_multiplier * 100)
-			self.rom_data[offset + 5] = int(formula.crit_rate * 100)
+		if len(formula_table):
+			record = formula_table[0]
+			for name in DAMAGE_FORMULA.dtype.names:
+				record[name] = round(getattr(formula, name) * 100)
 		
 		# Write elemental modifiers
-		offset = self.ELEMENT_TABLE_OFFSET
-		
-		for modifier in self.battle_system.elemental_modifiers:
-			if offset >= len(self.rom_data):
-				break
-			
-			self.rom_data[offset] = int(modifier.multiplier * 100)
-			offset += 1
+		multipliers = ELEMENT_TABLE.view(self.rom_data)['multiplier']
+		values = [round(m.multiplier * 100) for m in self.battle_system.elemental_modifiers]
+		values = values[:len(multipliers)]
+		multipliers[:len(values)] = values
 		
 		if self.verbose:
 			print("✓ Inserted battle system")
@@ -285,33 +274,18 @@ class BattleEditor:
 		return 1.0
 	
 	def simulate_battle(self, attacker_id: int, defender_id: int, 
-					   rounds: int = 10) -> Dict[str, Any]:
-		"""Simulate battle rounds"""
-		results: Dict[str, Any] = {
-			'total_damage': 0,
-			'average_damage': 0.0,
-			'min_damage': 999999,
-			'max_damage': 0,
-			'crits': 0,
-			'rounds': rounds
-		}
+					   rounds: int = 10, seed: int = 0) -> Dict[str, Any]:
+		"""Simulate full fights (battle_simulator) and summarize them"""
+		from battle_simulator import Battle, default_enemy, default_party, simulate
 		
 		# Example stats
-		attack = 50 + (attacker_id * 5)
-		defense = 30 + (defender_id * 3)
-		level = 10
-		
-		damages = []
-		
-		for i in range(rounds):
-			damage = self.calculate_damage(attack, defense, level)
-			damages.append(damage)
-			
-			results['total_damage'] += damage
-			results['min_damage'] = min(results['min_damage'], damage)
-			results['max_damage'] = max(results['max_damage'], damage)
+		party = default_party()[:1]
+		party[0].attack = 50 + (attacker_id * 5)
+		enemy = default_enemy(f"Enemy {defender_id}")
+		enemy.defense = 30 + (defender_id * 3)
 		
-		results['average_damage'] = results['total_damage'] / rounds if rounds > 0 else 0
+		results: Dict[str, Any] = simulate(Battle(party, [enemy]), rounds, seed).summary()
+		results['rounds'] = rounds
 		
 		return results
 	
@@ -411,7 +385,7 @@ def main():
 					   metavar=('ATTACKER_ID', 'DEFENDER_ID'),
 					   help='Simulate battle')
 	parser.add_argument('--rounds', type=int, default=10,
-					   help='Simulation rounds')
+					   help='Fights to simulate')
 	parser.add_argument('--file', type=str, metavar='FILE',
 					   help='Battle system JSON file')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
@@ -471,12 +445,13 @@ def main():
 		print(f"\n=== Battle Simulation ===\n")
 		print(f"Attacker ID: {attacker_id}")
 		print(f"Defender ID: {defender_id}")
-		print(f"Rounds: {results['rounds']}")
+		print(f"Fights: {results['rounds']}")
 		print()
-		print(f"Total Damage: {results['total_damage']:,}")
-		print(f"Average Damage: {results['average_damage']:.1f}")
-		print(f"Min Damage: {results['min_damage']}")
-		print(f"Max Damage: {results['max_damage']}")
+		print(f"Win Rate: {results['win_rate'] * 100:.1f}%")
+		print(f"Rounds: {results['rounds_mean']:.1f} (median {results['rounds_median']}, p95 {results['rounds_p95']})")
+		print(f"Damage Dealt: {results['damage_dealt_mean']:.1f}")
+		print(f"Damage Taken: {results['damage_taken_mean']:.1f}")
+		print(f"Potions Used: {results['potions_mean']:.2f}")
 		
 		return 0
 	
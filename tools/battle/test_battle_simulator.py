@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Battle Simulator - Test Suite
+
+Checks speed-based turn order, AI state transitions, statuses and
+healing, ROM formations, and that batches are reproducible whatever the
+worker count.
+
+Usage:
+	python test_battle_simulator.py
+"""
+
+import random
+import sys
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from battle_simulator import (
+	ELEMENTS, Battle, Outcome, default_enemy, default_party, fight_rng, formation_battle, simulate
+)
+from ffmq_battle_editor import StatusEffect
+from ffmq_enemy_ai import AIContext, AIState, ActionType, FFMQEnemyAIDesigner
+from record_tables import EDITOR_ENEMIES, FORMATIONS
+
+
+def sample_rom(hp_scale: float = 1.0) -> bytearray:
+	rng = np.random.default_rng(0)
+	rom = bytearray(rng.integers(0, 256, 0x340000, dtype=np.uint8).tobytes())
+	enemies = EDITOR_ENEMIES.view(rom)
+	enemies['hp'] = rng.integers(100, 600, 256) * hp_scale
+	enemies['attack'] = rng.integers(5, 25, 256)
+	enemies['defense'] = rng.integers(10, 60, 256)
+	enemies['speed'] = rng.integers(20, 60, 256)
+	enemies['evade'] = rng.integers(0, 10, 256)
+	enemies['magic'] = rng.integers(5, 25, 256)
+	enemies['critical'] = 5
+	for element in ELEMENTS:
+		enemies[element] = 100
+	FORMATIONS.view(rom)['slots']['enemy'][:, 3:] = 0xFF
+	return rom
+
+
+class TestEngine(unittest.TestCase):
+	def test_speed_sets_turn_order(self):
+		hero = replace(default_party()[0], speed=100, max_hp=5000)
+		enemy = replace(default_enemy('Slime'), speed=25, max_hp=30000, attack=1)
+		lines = []
+		Battle([hero], [enemy], max_rounds=40).run(random.Random(1), log=lines.append)
+		hero_turns = sum(1 for line in lines if 'Benjamin' in line.split(']')[1].split()[0])
+		enemy_turns = sum(1 for line in lines if line.split(']')[1].split()[0] == 'Slime')
+		self.assertAlmostEqual(hero_turns / enemy_turns, 4.0, delta=0.2)
+
+	def test_state_machine_and_flee(self):
+		designer = FFMQEnemyAIDesigner()
+		ai = designer.create_enemy_ai(7, 'Coward', 'coward')
+		self.assertEqual(designer.next_state(ai, AIState.IDLE, AIContext(hp_percent=0.5)), AIState.IDLE)
+		self.assertEqual(designer.next_state(ai, AIState.IDLE, AIContext(hp_percent=0.2)), AIState.FLEEING)
+		action = designer.select_action(ai, context=AIContext(hp_percent=0.4))
+		self.assertEqual(action.action_type, ActionType.DEFEND)
+
+		enemy = replace(default_enemy('Coward', ai), max_hp=600, attack=20)
+		lines = []
+		result = Battle(default_party(), [enemy], designer=designer).run(random.Random(4), log=lines.append)
+		self.assertEqual(result.outcome, Outcome.WIN)
+		self.assertEqual(result.fled, 1)
+		self.assertTrue(any('Coward defends' in line for line in lines))
+		self.assertTrue(lines[-1].endswith('Coward flees'))
+
+	def test_statuses_and_resources(self):
+		designer = FFMQEnemyAIDesigner()
+		ai = designer.create_enemy_ai(1, 'Witch', 'aggressive')
+		ai.actions[1].skill_id = list(StatusEffect).index(StatusEffect.SLEEP)
+		witch = replace(default_enemy('Witch', ai), max_hp=3000)
+		party = default_party()
+		battle = Battle(party, [witch], potions=3, designer=designer)
+
+		lines = []
+		result = battle.run(random.Random(2), log=lines.append)
+		self.assertTrue(any('afflicted with sleep' in line for line in lines))
+		self.assertTrue(any('cannot move' in line for line in lines))
+		self.assertLessEqual(result.potions, 3)
+		self.assertLessEqual(result.charges, sum(sum(member.charges.values()) for member in party))
+		self.assertEqual(party[0].charges, default_party()[0].charges)		# Templates untouched
+
+		poisoned = replace(default_party()[0], status={StatusEffect.POISON: 5})
+		fighter = poisoned.fresh()
+		self.assertEqual(fighter.status, {})
+		battle = Battle([poisoned], [replace(witch, max_hp=10 ** 6, attack=0, ai=None)], max_rounds=3)
+		battle.run(random.Random(0))
+		hero = battle.fighters[0]
+		hero.status[StatusEffect.POISON] = 2
+		hp = hero.hp
+		battle._turn(hero, 0.0)
+		self.assertEqual(hero.hp, hp - 420 // 16)
+		self.assertEqual(hero.status[StatusEffect.POISON], 1)
+
+
+class TestBatches(unittest.TestCase):
+	def test_reproducible_across_workers(self):
+		battle = formation_battle(sample_rom(), 5, default_party())
+		self.assertEqual(len(battle.enemies), 3)
+		serial = simulate(battle, 120, seed=11, workers=1)
+		parallel = simulate(battle, 120, seed=11, workers=2)
+		for name in ('outcome', 'rounds', 'damage_taken', 'potions', 'charges'):
+			self.assertEqual(getattr(serial, name).tolist(), getattr(parallel, name).tolist(), name)
+		self.assertEqual(tuple(battle.run(fight_rng(11, 7)))[1:], tuple(serial.rounds[7:8]) +
+						 tuple(getattr(serial, name)[7] for name in
+							   ('damage_dealt', 'damage_taken', 'healing', 'potions', 'charges', 'deaths', 'fled')))
+
+		summary = serial.summary()
+		self.assertAlmostEqual(summary['win_rate'] + summary['loss_rate'] + summary['timeout_rate'], 1.0)
+		self.assertEqual(int(serial.round_histogram().sum()), 120)
+
+	def test_balance_mod_is_measurable(self):
+		party = default_party()
+		base = simulate(formation_battle(sample_rom(), 9, party), 300, seed=1).summary()
+		harder = simulate(formation_battle(sample_rom(hp_scale=2.5), 9, party), 300, seed=1).summary()
+		self.assertGreater(harder['rounds_mean'], base['rounds_mean'])
+		self.assertGreater(harder['damage_taken_mean'], base['damage_taken_mean'])
+		self.assertLessEqual(harder['win_rate'], base['win_rate'])
+
+
+if __name__ == '__main__':
+	unittest.main()
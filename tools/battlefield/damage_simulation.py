@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+FFMQ Damage Simulation - Vectorized Monte Carlo kernel for damage rolls
+
+FFMQDamageCalculator.simulate_attack_trials used to roll one attack per
+loop iteration and build a DamageResult for each, which kept trial counts
+around 10^4. This module rolls whole batches of attacks as NumPy arrays
+using the same formula as the scalar calculator:
+
+	hit       = hit_roll < hit_chance
+	critical  = hit & (crit_roll < critical_chance)
+	variance  = 7/8 + (9/8 - 7/8) * variance_roll
+	damage    = int(base * variance [* 2 if critical]), 0 on a miss
+
+Hit, critical and variance are masks/arrays over the batch; elemental
+modifiers and defense are already folded into the base damage by the
+scalar calculator, so one kernel serves physical attacks and spells.
+
+Features:
+- 10^7 trials in about a second (batched, bounded memory)
+- Full damage histogram, mean/std and percentiles
+- Kill-probability curves: P(kill in <= n attacks) for a given HP
+- Reproducible with a seeded np.random.Generator
+- physical_kernel() takes explicit draws, so it can be checked
+  roll-for-roll against the scalar formula
+
+Usage:
+	python damage_simulation.py --base 80 --hit 0.9 --crit 0.15 --trials 10000000
+	python damage_simulation.py --base 80 --hp 500 --max-attacks 12 --seed 1
+	python damage_simulation.py --benchmark
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+VARIANCE_MIN = 7.0 / 8.0
+VARIANCE_MAX = 9.0 / 8.0
+CRITICAL_MULTIPLIER = 2.0
+BATCH_SIZE = 1 << 20		# Trials rolled per batch (fixed, so seeded runs repeat exactly)
+FFT_THRESHOLD = 1 << 20		# Direct convolution below this many multiply-adds
+
+
+def physical_kernel(
+	base_damage: float,
+	hit_chance: float,
+	critical_chance: float,
+	hit_roll: np.ndarray,
+	crit_roll: np.ndarray,
+	variance_roll: np.ndarray,
+	critical_multiplier: float = CRITICAL_MULTIPLIER
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""Damage and critical mask for explicit uniform [0, 1) draws
+
+	Parameters broadcast against the draws, so a column of base damages
+	against a row of draws rolls every stat combination with the same
+	dice (common random numbers).
+	"""
+	hit = hit_roll < hit_chance
+	critical = hit & (crit_roll < critical_chance)
+	variance = VARIANCE_MIN + (VARIANCE_MAX - VARIANCE_MIN) * variance_roll
+	damage = base_damage * variance
+	damage = np.where(critical, damage * critical_multiplier, damage)
+	damage = np.where(hit, damage, 0.0)
+	return damage.astype(np.int64), critical
+
+
+@dataclass
+class DamageDistribution:
+	"""Damage histogram over all trials (misses count as 0 damage)"""
+	trials: int
+	histogram: np.ndarray		# histogram[d] = trials that dealt d damage
+	criticals: int
+
+	@property
+	def hits(self) -> int:
+		"""Trials that dealt damage"""
+		return self.trials - int(self.histogram[0])
+
+	@property
+	def pmf(self) -> np.ndarray:
+		return self.histogram / self.trials
+
+	@property
+	def min_damage(self) -> int:
+		"""Smallest non-zero damage (0 if nothing hit)"""
+		nonzero = np.flatnonzero(self.histogram[1:])
+		return int(nonzero[0]) + 1 if len(nonzero) else 0
+
+	@property
+	def max_damage(self) -> int:
+		nonzero = np.flatnonzero(self.histogram)
+		return int(nonzero[-1]) if len(nonzero) else 0
+
+	def mean(self, hits_only: bool = False) -> float:
+		counts = self.histogram.copy()
+		if hits_only:
+			counts[0] = 0
+		total = counts.sum()
+		return float(np.dot(np.arange(len(counts)), counts) / total) if total else 0.0
+
+	def std(self) -> float:
+		values = np.arange(len(self.histogram))
+		mean = self.mean()
+		return float(np.sqrt(np.dot((values - mean) ** 2, self.histogram) / self.trials))
+
+	def percentiles(self, q: Sequence[float] = (5, 25, 50, 75, 95)) -> Dict[float, int]:
+		"""Inverted-CDF percentiles: smallest damage with CDF >= q%"""
+		cdf = np.cumsum(self.histogram)
+		targets = np.asarray(q, dtype=np.float64) / 100.0 * self.trials
+		values = np.searchsorted(cdf, np.maximum(targets, 1), side='left')
+		return {p: int(v) for p, v in zip(q, values)}
+
+	def kill_probability(self, hp: int, max_attacks: int) -> np.ndarray:
+		"""curve[n - 1] = P(total damage >= hp within n attacks)
+
+		Cumulative damage is tracked exactly up to hp; anything at or past
+		hp is folded into one absorbing 'dead' bin after every attack.
+		"""
+		hp = max(1, int(hp))
+		pmf = self.pmf[:hp + 1].copy()
+		if len(self.histogram) > hp + 1:
+			pmf[hp] += self.pmf[hp + 1:].sum()
+		alive = np.zeros(hp)
+		alive[0] = 1.0
+		dead = 0.0
+		curve = np.empty(max_attacks)
+		for n in range(max_attacks):
+			total = _convolve(alive, pmf)
+			dead += total[hp:].sum()
+			alive = np.clip(total[:hp], 0.0, None)
+			curve[n] = min(1.0, dead)
+		return curve
+
+	def attacks_to_kill(self, hp: int, probability: float = 0.5, max_attacks: int = 256) -> Optional[int]:
+		"""Fewest attacks that kill with at least the given probability"""
+		curve = self.kill_probability(hp, max_attacks)
+		reached = np.flatnonzero(curve >= probability)
+		return int(reached[0]) + 1 if len(reached) else None
+
+	def summary(self) -> dict:
+		"""Same keys as the old per-trial simulation (averages over hits)"""
+		hits = self.hits
+		return {
+			'trials': self.trials,
+			'hits': hits,
+			'hit_rate': (hits / self.trials) * 100 if self.trials > 0 else 0,
+			'crits': self.criticals,
+			'crit_rate': (self.criticals / hits) * 100 if hits > 0 else 0,
+			'average_damage': self.mean(hits_only=True),
+			'min_damage': self.min_damage,
+			'max_damage': self.max_damage,
+			'damage_range': self.max_damage - self.min_damage,
+			'percentiles': self.percentiles(),
+		}
+
+
+def _convolve(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+	if len(a) * len(b) <= FFT_THRESHOLD:
+		return np.convolve(a, b)
+	size = len(a) + len(b) - 1
+	n = 1 << (size - 1).bit_length()
+	return np.fft.irfft(np.fft.rfft(a, n) * np.fft.rfft(b, n), n)[:size]
+
+
+def simulate_damage(
+	base_damage: float,
+	hit_chance: float,
+	critical_chance: float,
+	trials: int,
+	rng: Optional[np.random.Generator] = None,
+	critical_multiplier: float = CRITICAL_MULTIPLIER
+) -> DamageDistribution:
+	"""Roll trials attacks in batches and histogram the damage"""
+	rng = rng if rng is not None else np.random.default_rng()
+	size = int(base_damage * VARIANCE_MAX * max(1.0, critical_multiplier)) + 2
+	histogram = np.zeros(size, dtype=np.int64)
+	criticals = 0
+	for start in range(0, trials, BATCH_SIZE):
+		count = min(BATCH_SIZE, trials - start)
+		hit_roll, crit_roll, variance_roll = rng.random((3, count))
+		damage, critical = physical_kernel(base_damage, hit_chance, critical_chance,
+										   hit_roll, crit_roll, variance_roll, critical_multiplier)
+		histogram += np.bincount(damage, minlength=size)[:size]
+		criticals += int(np.count_nonzero(critical & (damage > 0)))
+	return DamageDistribution(trials=trials, histogram=histogram, criticals=criticals)
+
+
+def benchmark(trials: int = 10_000_000) -> None:
+	rng = np.random.default_rng(0)
+	start = time.perf_counter()
+	distribution = simulate_damage(120.0, 0.9, 0.15, trials, rng)
+	simulate_s = time.perf_counter() - start
+
+	start = time.perf_counter()
+	curve = distribution.kill_probability(2000, 32)
+	curve_ms = (time.perf_counter() - start) * 1000
+
+	print(f"{trials:,} trials: {simulate_s:.2f} s ({trials / simulate_s / 1e6:.1f} M/s)")
+	print(f"  mean {distribution.mean():.2f}, percentiles {distribution.percentiles()}")
+	print(f"  kill curve (2000 HP, 32 attacks): {curve_ms:.1f} ms, "
+		  f"P(kill in 20) = {curve[19]:.4f}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ vectorized damage simulation')
+	parser.add_argument('--base', type=float, default=80.0, help='Base damage (after defense/element)')
+	parser.add_argument('--hit', type=float, default=0.9, help='Hit chance (0-1)')
+	parser.add_argument('--crit', type=float, default=0.15, help='Critical chance (0-1)')
+	parser.add_argument('--trials', type=int, default=1_000_000, help='Number of trials')
+	parser.add_argument('--seed', type=int, help='Random seed')
+	parser.add_argument('--hp', type=int, help='Target HP for the kill-probability curve')
+	parser.add_argument('--max-attacks', type=int, default=10, help='Length of the kill curve')
+	parser.add_argument('--benchmark', action='store_true', help='Time 10^7 trials')
+
+	args = parser.parse_args()
+
+	if args.benchmark:
+		benchmark()
+		return 0
+
+	distribution = simulate_damage(args.base, args.hit, args.crit, args.trials,
+								   np.random.default_rng(args.seed))
+	summary = distribution.summary()
+	print(f"\n=== Simulation ({summary['trials']:,} trials) ===\n")
+	print(f"Hit Rate: {summary['hit_rate']:.2f}%")
+	print(f"Crit Rate: {summary['crit_rate']:.2f}%")
+	print(f"Average Damage: {summary['average_damage']:.2f} (per hit), {distribution.mean():.2f} (per attack)")
+	print(f"Damage Range: {summary['min_damage']} - {summary['max_damage']}")
+	print("Percentiles: " + ", ".join(f"p{p:g}={v}" for p, v in summary['percentiles'].items()))
+
+	if args.hp:
+		print(f"\nKill probability vs {args.hp} HP:")
+		for n, p in enumerate(distribution.kill_probability(args.hp, args.max_attacks), 1):
+			print(f"  <= {n:3d} attacks: {p:.4f}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -19,6 +19,10 @@ Features:
 - Export damage tables
 - Compare weapon/spell effectiveness
 - Simulate battles with damage calculations
+- Vectorized Monte Carlo trials (10^7 in about a second) with
+  percentiles and kill-probability curves
+- Damage tables and stat searches evaluated as broadcast grids
+  (see stat_space.py for ROM-wide grids and constraint queries)
 - Find optimal stat builds
 - Detect damage overflow/underflow
 - Formula reverse engineering tools
@@ -39,6 +43,7 @@ Usage:
 	python ffmq_damage_calculator.py --physical --attack 100 --defense 50
 	python ffmq_damage_calculator.py --spell fire --magic 80 --resistance weak
 	python ffmq_damage_calculator.py --critical-rate 25 --trials 1000
+	python ffmq_damage_calculator.py --physical --trials 10000000 --seed 1 --kill-curve 10
 	python ffmq_damage_calculator.py --export-damage-table --level-range 1-40
 	python ffmq_damage_calculator.py --compare-weapons "Sword,Axe,Claw"
 	python ffmq_damage_calculator.py --optimal-stats --target-damage 500
@@ -54,6 +59,11 @@ from typing import List, Tuple, Optional, Dict, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+import numpy as np
+
+from damage_simulation import DamageDistribution, simulate_damage
+from stat_space import StatSpace
+
 
 class DamageType(Enum):
 	"""Type of damage"""
@@ -305,51 +315,42 @@ class FFMQDamageCalculator:
 			was_critical=was_critical
 		)
 	
+	def simulate_attack_distribution(
+		self,
+		attacker: AttackerStats,
+		defender: DefenderStats,
+		attack: AttackData,
+		trials: int = 1000,
+		rng: Optional[np.random.Generator] = None
+	) -> DamageDistribution:
+		"""Roll many attacks at once and return the full damage distribution"""
+		if attack.damage_type == DamageType.PHYSICAL:
+			result = self.calculate_physical_damage(attacker, defender, attack)
+		else:
+			result = self.calculate_spell_damage(attacker, defender, attack)
+		
+		return simulate_damage(
+			result.base_damage,
+			result.hit_chance,
+			result.critical_chance,
+			trials,
+			rng,
+			critical_multiplier=self.CRITICAL_MULTIPLIER
+		)
+	
 	def simulate_attack_trials(
 		self,
 		attacker: AttackerStats,
 		defender: DefenderStats,
 		attack: AttackData,
-		trials: int = 1000
+		trials: int = 1000,
+		seed: Optional[int] = None
 	) -> Dict[str, Any]:
 		"""Simulate many attacks to get statistical data"""
-		damages = []
-		crits = 0
-		hits = 0
-		
-		for _ in range(trials):
-			if attack.damage_type == DamageType.PHYSICAL:
-				result = self.calculate_physical_damage(attacker, defender, attack, roll_variance=True)
-			else:
-				result = self.calculate_spell_damage(attacker, defender, attack, roll_variance=True)
-			
-			if result.actual_damage is not None and result.actual_damage > 0:
-				damages.append(result.actual_damage)
-				hits += 1
-				
-				if result.was_critical:
-					crits += 1
-		
-		if damages:
-			avg_damage = sum(damages) / len(damages)
-			min_damage = min(damages)
-			max_damage = max(damages)
-		else:
-			avg_damage = 0
-			min_damage = 0
-			max_damage = 0
-		
-		return {
-			'trials': trials,
-			'hits': hits,
-			'hit_rate': (hits / trials) * 100 if trials > 0 else 0,
-			'crits': crits,
-			'crit_rate': (crits / hits) * 100 if hits > 0 else 0,
-			'average_damage': avg_damage,
-			'min_damage': min_damage,
-			'max_damage': max_damage,
-			'damage_range': max_damage - min_damage
-		}
+		distribution = self.simulate_attack_distribution(
+			attacker, defender, attack, trials, np.random.default_rng(seed)
+		)
+		return distribution.summary()
 	
 	def export_damage_table(
 		self,
@@ -360,47 +361,22 @@ class FFMQDamageCalculator:
 	) -> None:
 		"""Export damage table for various stat combinations"""
 		
+		space = StatSpace(magic=50, accuracy=100, critical_rate=15, evasion=10, power=20, hp=500)
+		space.axis('level', range(level_range[0], level_range[1] + 1))
+		space.axis('attack', range(attack_range[0], attack_range[1] + 1, 10))
+		space.axis('defense', range(defense_range[0], defense_range[1] + 1, 10))
+		grid = space.evaluate('physical')
+		
+		columns = [labels.ravel() for labels in np.meshgrid(*grid.axes.values(), indexing='ij')]
+		columns += [grid.values(name).ravel() for name in ('base', 'average_damage', 'expected_damage')]
+		
 		with open(output_path, 'w', newline='') as f:
 			writer = csv.writer(f)
 			writer.writerow(['Level', 'Attack', 'Defense', 'Base Damage', 'Avg Damage', 'Expected Damage (w/ Crit)'])
-			
-			for level in range(level_range[0], level_range[1] + 1):
-				for attack in range(attack_range[0], attack_range[1] + 1, 10):
-					for defense in range(defense_range[0], defense_range[1] + 1, 10):
-						attacker = AttackerStats(
-							level=level,
-							attack=attack,
-							magic=50,
-							accuracy=100,
-							critical_rate=15
-						)
-						
-						defender = DefenderStats(
-							level=level,
-							defense=defense,
-							magic_defense=50,
-							evasion=10,
-							hp=500,
-							max_hp=500
-						)
-						
-						attack_data = AttackData(
-							name="Basic Attack",
-							damage_type=DamageType.PHYSICAL,
-							base_power=20,
-							element=Element.NONE
-						)
-						
-						result = self.calculate_physical_damage(attacker, defender, attack_data)
-						
-						writer.writerow([
-							level,
-							attack,
-							defense,
-							f"{result.base_damage:.1f}",
-							f"{result.average_damage:.1f}",
-							f"{result.expected_damage:.1f}"
-						])
+			writer.writerows(
+				[level, attack, defense, f"{base:.1f}", f"{average:.1f}", f"{expected:.1f}"]
+				for level, attack, defense, base, average, expected in zip(*(c.tolist() for c in columns))
+			)
 		
 		if self.verbose:
 			print(f"✓ Exported damage table to {output_path}")
@@ -413,60 +389,29 @@ class FFMQDamageCalculator:
 		max_magic: int = 255
 	) -> Dict[str, Any]:
 		"""Find optimal stat allocation to reach target damage"""
-		best_attack = 0
-		best_magic = 0
-		best_difference = float('inf')
-		
-		# Try physical builds
-		for attack in range(10, max_attack + 1, 5):
-			attacker = AttackerStats(
-				level=30,
-				attack=attack,
-				magic=50,
-				accuracy=100,
-				critical_rate=15,
-				weapon_power=30
-			)
-			
-			attack_data = AttackData(
-				name="Physical Attack",
-				damage_type=DamageType.PHYSICAL,
-				base_power=30,
-				element=Element.NONE
-			)
-			
-			result = self.calculate_physical_damage(attacker, defender, attack_data)
-			difference = abs(result.expected_damage - target_damage)
-			
-			if difference < best_difference:
-				best_difference = difference
-				best_attack = attack
-				best_magic = 50
-		
-		# Try magic builds
-		for magic in range(10, max_magic + 1, 5):
-			attacker = AttackerStats(
-				level=30,
-				attack=50,
-				magic=magic,
-				accuracy=100,
-				critical_rate=0
-			)
-			
-			spell_data = AttackData(
-				name="Fire",
-				damage_type=DamageType.MAGICAL,
-				base_power=20,
-				element=Element.FIRE
-			)
-			
-			result = self.calculate_spell_damage(attacker, defender, spell_data)
-			difference = abs(result.expected_damage - target_damage)
-			
-			if difference < best_difference:
-				best_difference = difference
-				best_attack = 50
-				best_magic = magic
+		defense = {'defense': defender.defense, 'evasion': defender.evasion}
+		
+		# Physical builds: attack axis, weapon power 30, 30-power attack
+		physical = StatSpace(weapon_power=30, power=30, accuracy=100, critical_rate=15, **defense)
+		physical.axis('attack', range(10, max_attack + 1, 5))
+		physical_grid = physical.evaluate('physical')
+		physical_diff = np.abs(physical_grid.values('expected_damage') - target_damage)
+		
+		# Magic builds: magic axis, Fire at the defender's fire resistance
+		modifier = defender.elemental_resistance.get(Element.FIRE, ElementalModifier.NORMAL).value
+		magic = StatSpace(power=20, accuracy=100, critical_rate=0, modifier=modifier, **defense)
+		magic.axis('magic', range(10, max_magic + 1, 5))
+		magic_grid = magic.evaluate('spell')
+		magic_diff = np.abs(magic_grid.values('expected_damage') - target_damage)
+		
+		# First minimum wins; physical builds win ties (as when tried first)
+		best_attack, best_magic, best_difference = 0, 0, float('inf')
+		if len(physical_diff) and physical_diff.min() < best_difference:
+			index = int(physical_diff.argmin())
+			best_attack, best_magic, best_difference = int(physical_grid.axes['attack'][index]), 50, float(physical_diff[index])
+		if len(magic_diff) and magic_diff.min() < best_difference:
+			index = int(magic_diff.argmin())
+			best_attack, best_magic, best_difference = 50, int(magic_grid.axes['magic'][index]), float(magic_diff[index])
 		
 		return {
 			'target_damage': target_damage,
@@ -476,6 +421,17 @@ class FFMQDamageCalculator:
 		}
 
 
+def print_distribution(distribution: DamageDistribution, defender: DefenderStats, kill_curve: Optional[int]) -> None:
+	"""Print percentiles and, if requested, the kill-probability curve"""
+	percentiles = distribution.percentiles()
+	print("Percentiles: " + ", ".join(f"p{p}={v}" for p, v in percentiles.items()))
+	
+	if kill_curve:
+		print(f"\nKill Probability ({defender.hp} HP):")
+		for n, p in enumerate(distribution.kill_probability(defender.hp, kill_curve), 1):
+			print(f"  <= {n:2d} attacks: {p * 100:6.2f}%")
+
+
 def main():
 	parser = argparse.ArgumentParser(description='FFMQ Damage & Attack Formula Calculator')
 	parser.add_argument('--physical', action='store_true', help='Calculate physical damage')
@@ -487,6 +443,8 @@ def main():
 	parser.add_argument('--critical-rate', type=int, default=15, help='Critical hit rate (0-100)')
 	parser.add_argument('--resistance', type=str, choices=['immune', 'resistant', 'normal', 'weak'], default='normal', help='Elemental resistance')
 	parser.add_argument('--trials', type=int, default=1000, help='Number of simulation trials')
+	parser.add_argument('--seed', type=int, help='Random seed for reproducible trials')
+	parser.add_argument('--kill-curve', type=int, metavar='N', help='Print P(kill in <= n attacks) for n up to N')
 	parser.add_argument('--export-damage-table', action='store_true', help='Export damage table')
 	parser.add_argument('--level-range', type=str, default='1-40', help='Level range (min-max)')
 	parser.add_argument('--optimal-stats', action='store_true', help='Find optimal stats')
@@ -554,12 +512,16 @@ def main():
 		print(f"Hit Chance: {result.hit_chance * 100:.1f}%")
 		
 		# Run trials
-		trials = calculator.simulate_attack_trials(attacker, defender, attack_data, trials=args.trials)
+		distribution = calculator.simulate_attack_distribution(
+			attacker, defender, attack_data, args.trials, np.random.default_rng(args.seed)
+		)
+		trials = distribution.summary()
 		print(f"\n=== Simulation ({trials['trials']} trials) ===\n")
 		print(f"Hit Rate: {trials['hit_rate']:.1f}%")
 		print(f"Crit Rate: {trials['crit_rate']:.1f}%")
 		print(f"Average Damage: {trials['average_damage']:.1f}")
 		print(f"Damage Range: {trials['min_damage']} - {trials['max_damage']}")
+		print_distribution(distribution, defender, args.kill_curve)
 		
 		return 0
 	
@@ -591,11 +553,15 @@ def main():
 			print(f"Hit Chance: {result.hit_chance * 100:.1f}%")
 			
 			# Run trials
-			trials = calculator.simulate_attack_trials(attacker, defender, attack_data, trials=args.trials)
+			distribution = calculator.simulate_attack_distribution(
+				attacker, defender, attack_data, args.trials, np.random.default_rng(args.seed)
+			)
+			trials = distribution.summary()
 			print(f"\n=== Simulation ({trials['trials']} trials) ===\n")
 			print(f"Hit Rate: {trials['hit_rate']:.1f}%")
 			print(f"Average Damage: {trials['average_damage']:.1f}")
 			print(f"Damage Range: {trials['min_damage']} - {trials['max_damage']}")
+			print_distribution(distribution, defender, args.kill_curve)
 		else:
 			print(f"Unknown spell: {spell_name}")
 			print(f"Known spells: {', '.join(calculator.SPELLS.keys())}")
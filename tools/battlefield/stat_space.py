@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+FFMQ Stat Space - Broadcast damage grids and constraint queries
+
+The damage calculator evaluates its formulas for one attacker/defender
+pair at a time, and its damage table and optimal-stat search loop over
+stat values in Python. A StatSpace names a set of axes (level, attack,
+defense, element, or whole ROM tables such as every enemy and every
+weapon) and evaluates the same formulas once over the broadcast grid.
+Each stat is stored only along the axes it varies on, so a
+level x attack x defense x element grid costs one attack x defense
+array, not a full 4-D block.
+
+Features:
+- Physical and spell formulas identical to FFMQDamageCalculator
+- Axes backed by ROM tables: every weapon x enemy or spell x enemy
+  pairing (record_tables views) in one evaluation
+- Kill probabilities for n attacks using shared dice across the grid
+  (common random numbers), so they rise monotonically with attack/magic
+- Constraint queries ("minimum attack to 2-shot enemy 12 at level 20
+  with >= 95% probability") by vectorized bisection over a stat axis
+- CSV and NPZ export, matplotlib heatmaps
+
+The calculator's formulas do not use level; the level axis is kept (as
+in the damage table) and costs nothing, since no stat varies along it.
+
+Usage:
+	python stat_space.py grid --output grid.npz
+	python stat_space.py grid --output grid.csv --attack-range 10-200 --defense-range 10-150
+	python stat_space.py query rom.sfc --enemy 12 --level 20 --hits 2 --probability 0.95
+	python stat_space.py heatmap rom.sfc --output weapons.png --level 20 --attack 80
+	python stat_space.py benchmark
+"""
+
+import argparse
+import csv
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+
+from damage_simulation import CRITICAL_MULTIPLIER, VARIANCE_MAX, VARIANCE_MIN, physical_kernel
+from record_tables import EDITOR_ENEMIES, EDITOR_ITEMS, EDITOR_SPELLS
+
+try:
+	import matplotlib
+	matplotlib.use('Agg')
+	import matplotlib.pyplot as plt
+	MATPLOTLIB_AVAILABLE = True
+except ImportError:
+	MATPLOTLIB_AVAILABLE = False
+
+
+BASE_HIT_RATE = 90			# Physical hit rate before accuracy/evasion (percent)
+SPELL_HIT_RATE = 95
+KILL_CHUNK = 1 << 22		# Damage samples held in memory at once by kill queries
+WEAPON_TYPE = 1				# item_type of weapons in the editor item table
+
+# Calculator resistance levels (ElementalModifier)
+MODIFIERS = {'immune': 0.0, 'resistant': 0.5, 'normal': 1.0, 'weak': 1.5}
+# Editor enemy resistance columns, indexed by element id (0 = no element)
+RESISTANCES = ('fire', 'water', 'earth', 'wind', 'holy', 'dark', 'poison')
+
+DEFAULTS = {
+	'attack': 50, 'magic': 50, 'weapon_power': 0, 'power': 20, 'defense': 30, 'evasion': 10,
+	'accuracy': 100, 'accuracy_modifier': 0, 'critical_rate': 15, 'critical_modifier': 0,
+	'ignore_defense': False, 'modifier': 1.0, 'hp': 1000,
+}
+
+
+@dataclass
+class DamageGrid:
+	"""Formula results over named axes; arrays broadcast to shape"""
+	kind: str
+	axes: Dict[str, np.ndarray]
+	base: np.ndarray
+	hit_chance: np.ndarray
+	critical_chance: np.ndarray
+	hp: np.ndarray
+	critical_multiplier: float = CRITICAL_MULTIPLIER
+
+	@property
+	def shape(self) -> Tuple[int, ...]:
+		return tuple(len(labels) for labels in self.axes.values())
+
+	@property
+	def average_damage(self) -> np.ndarray:
+		return (self.base * VARIANCE_MIN + self.base * VARIANCE_MAX) / 2.0
+
+	@property
+	def expected_damage(self) -> np.ndarray:
+		"""Average damage accounting for critical hits and misses"""
+		average = self.average_damage
+		critical = average * self.critical_multiplier
+		return ((average * (1.0 - self.critical_chance)) + (critical * self.critical_chance)) * self.hit_chance
+
+	def values(self, name: str) -> np.ndarray:
+		"""Read-only full-shape view of a result ('expected_damage', 'base', ...)"""
+		return np.broadcast_to(getattr(self, name), self.shape)
+
+	def index(self, axis: str, label) -> int:
+		matches = np.flatnonzero(self.axes[axis] == label)
+		if not len(matches):
+			raise KeyError(f"{label!r} not on axis '{axis}'")
+		return int(matches[0])
+
+	def select(self, **labels) -> 'DamageGrid':
+		"""Grid with the given axes fixed to one label each (and dropped)"""
+		names = list(self.axes)
+		picks = {names.index(axis): self.index(axis, label) for axis, label in labels.items()}
+
+		def take(array: np.ndarray) -> np.ndarray:
+			index = tuple(
+				(0 if array.shape[i] == 1 else picks[i]) if i in picks else slice(None)
+				for i in range(array.ndim)
+			)
+			return array[index]
+
+		return DamageGrid(
+			kind=self.kind,
+			axes={name: values for name, values in self.axes.items() if name not in labels},
+			base=take(self.base),
+			hit_chance=take(self.hit_chance),
+			critical_chance=take(self.critical_chance),
+			hp=take(self.hp),
+			critical_multiplier=self.critical_multiplier,
+		)
+
+	def kill_probability(self, hits: int, samples: int = 4096,
+						 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+		"""P(total damage >= hp within hits attacks) for every cell"""
+		rng = rng if rng is not None else np.random.default_rng()
+		draws = rng.random((hits, 3, samples))
+		cells = [np.broadcast_to(array, self.shape).ravel()
+				 for array in (self.base, self.hit_chance, self.critical_chance, self.hp)]
+		return _kill_probability(*cells, draws, self.critical_multiplier).reshape(self.shape)
+
+	def min_stat(self, axis: str, hits: int, probability: float = 0.95, samples: int = 4096,
+				 seed: Optional[int] = 0, **fixed):
+		"""Smallest label on axis that kills within hits attacks with the given probability
+
+		The axis must be sorted with damage non-decreasing along it
+		(attack, magic, weapon power). Returns an int (None if no label
+		is enough) when every other axis is fixed, otherwise an array
+		over the remaining axes with -1 where no label is enough.
+		"""
+		grid = self.select(**fixed)
+		position = list(grid.axes).index(axis)
+		labels = grid.axes[axis]
+		arrays = [np.moveaxis(np.broadcast_to(array, grid.shape), position, -1)
+				  for array in (grid.base, grid.hit_chance, grid.critical_chance, grid.hp)]
+		draws = np.random.default_rng(seed).random((hits, 3, samples))
+
+		# Bisect every cell at once: answer index in [lo, hi], hi == len(labels) if none.
+		# No label below the first whose best possible rolls reach hp can work.
+		base, hit_chance, critical_chance, hp = arrays
+		best = base * VARIANCE_MAX * np.where(critical_chance > 0, grid.critical_multiplier, 1.0)
+		possible = (hits * best >= hp) & (hit_chance > 0)
+		lo = np.where(possible.any(axis=-1), possible.argmax(axis=-1), len(labels))
+		hi = np.full(lo.shape, len(labels), dtype=np.int64)
+		while True:
+			active = lo < hi
+			if not active.any():
+				break
+			mid = (lo + hi) // 2
+			cells = [np.take_along_axis(array, np.minimum(mid, len(labels) - 1)[..., None], -1)[..., 0][active]
+					 for array in arrays]
+			reached = np.zeros(lo.shape, dtype=bool)
+			reached[active] = _kill_probability(*cells, draws, grid.critical_multiplier) >= probability
+			hi = np.where(active & reached, mid, hi)
+			lo = np.where(active & ~reached, mid + 1, lo)
+
+		result = np.where(lo < len(labels), labels[np.minimum(lo, len(labels) - 1)], -1)
+		if result.ndim == 0:
+			return int(result) if lo < len(labels) else None
+		return result
+
+	def to_csv(self, path: Path, **fixed) -> int:
+		"""Write one row per cell; returns the row count"""
+		grid = self.select(**fixed)
+		columns = [label.ravel().tolist() for label in np.meshgrid(*grid.axes.values(), indexing='ij')]
+		for name in ('base', 'average_damage', 'expected_damage', 'hit_chance', 'critical_chance'):
+			columns.append(np.round(grid.values(name), 3).ravel().tolist())
+		with open(path, 'w', newline='') as f:
+			writer = csv.writer(f)
+			writer.writerow(list(grid.axes) + ['base_damage', 'average_damage', 'expected_damage',
+											   'hit_chance', 'critical_chance'])
+			writer.writerows(zip(*columns))
+		return len(columns[0]) if columns else 0
+
+	def to_npz(self, path: Path) -> None:
+		"""Save axes and the (unbroadcast) result arrays"""
+		np.savez_compressed(
+			path,
+			kind=self.kind,
+			axis_names=np.array(list(self.axes)),
+			critical_multiplier=self.critical_multiplier,
+			base=self.base,
+			hit_chance=self.hit_chance,
+			critical_chance=self.critical_chance,
+			hp=self.hp,
+			**{f'axis_{name}': labels for name, labels in self.axes.items()}
+		)
+
+	@classmethod
+	def load_npz(cls, path: Path) -> 'DamageGrid':
+		with np.load(path) as data:
+			return cls(
+				kind=str(data['kind']),
+				axes={str(name): data[f'axis_{name}'] for name in data['axis_names']},
+				base=data['base'],
+				hit_chance=data['hit_chance'],
+				critical_chance=data['critical_chance'],
+				hp=data['hp'],
+				critical_multiplier=float(data['critical_multiplier']),
+			)
+
+	def heatmap(self, path: Path, x: str, y: str, value: str = 'expected_damage', **fixed) -> Optional[Path]:
+		"""Plot value over two axes (all others fixed) to an image"""
+		if not MATPLOTLIB_AVAILABLE:
+			print("Error: matplotlib required for heatmaps")
+			return None
+
+		grid = self.select(**fixed)
+		if set(grid.axes) != {x, y}:
+			raise ValueError(f"Fix every axis except {x} and {y}: {list(grid.axes)}")
+		data = grid.values(value)
+		if list(grid.axes) != [y, x]:
+			data = data.T
+
+		figure, axis = plt.subplots(figsize=(10, 7))
+		image = axis.imshow(data, origin='lower', aspect='auto', cmap='viridis',
+							extent=_extent(grid.axes[x]) + _extent(grid.axes[y]))
+		axis.set_xlabel(x)
+		axis.set_ylabel(y)
+		title = ', '.join(f"{name}={label}" for name, label in fixed.items())
+		axis.set_title(f"{value} ({self.kind}{': ' + title if title else ''})")
+		figure.colorbar(image, ax=axis, label=value)
+		figure.savefig(path, dpi=100, bbox_inches='tight')
+		plt.close(figure)
+		return Path(path)
+
+
+def _extent(labels: np.ndarray) -> list:
+	if labels.dtype.kind not in 'iuf':
+		return [-0.5, len(labels) - 0.5]
+	return [float(labels[0]), float(labels[-1])]
+
+
+def _kill_probability(base: np.ndarray, hit_chance: np.ndarray, critical_chance: np.ndarray,
+					  hp: np.ndarray, draws: np.ndarray, critical_multiplier: float) -> np.ndarray:
+	"""Kill probability per cell, every cell rolling the same draws"""
+	samples = draws.shape[-1]
+	chunk = max(1, KILL_CHUNK // samples)
+	probability = np.empty(len(base))
+	for start in range(0, len(base), chunk):
+		part = slice(start, start + chunk)
+		total = np.zeros((len(base[part]), samples), dtype=np.int64)
+		for hit_roll, crit_roll, variance_roll in draws:
+			total += physical_kernel(base[part, None], hit_chance[part, None], critical_chance[part, None],
+									 hit_roll, crit_roll, variance_roll, critical_multiplier)[0]
+		probability[part] = (total >= hp[part, None]).mean(axis=1)
+	return probability
+
+
+class StatSpace:
+	"""Named axes and the stats each one supplies
+
+	An axis has labels and one or more stats that vary along it
+	(an 'attack' axis supplies attack; an 'enemy' axis supplies defense,
+	evasion and hp). Stats may also span several axes (an element
+	modifier per spell x enemy) or be fixed scalars. Anything not given
+	uses DEFAULTS, which match the damage calculator's CLI.
+	"""
+
+	def __init__(self, **fixed):
+		self.axes: Dict[str, np.ndarray] = {}
+		self.stats: Dict[str, Tuple[Tuple[str, ...], np.ndarray]] = {}
+		for name, value in fixed.items():
+			self.set(name, value)
+
+	def axis(self, name: str, labels: Iterable, **stats) -> 'StatSpace':
+		"""Add an axis; with no stats given, the labels are the stat of the same name (if any)"""
+		labels = np.asarray(list(labels) if not isinstance(labels, np.ndarray) else labels)
+		self.axes[name] = labels
+		if not stats and name in DEFAULTS:
+			stats = {name: labels}
+		for stat, values in stats.items():
+			self.set(stat, values, (name,))
+		return self
+
+	def set(self, name: str, values, axes: Sequence[str] = ()) -> 'StatSpace':
+		"""Set a stat, fixed or varying along the named axes (in values' axis order)"""
+		if name not in DEFAULTS:
+			raise KeyError(f"Unknown stat '{name}'")
+		values = np.asarray(values)
+		expected = tuple(len(self.axes[axis]) for axis in axes)
+		if values.shape != expected:
+			raise ValueError(f"{name}: shape {values.shape} does not match axes {tuple(axes)} {expected}")
+		self.stats[name] = (tuple(axes), values)
+		return self
+
+	def stat(self, name: str) -> np.ndarray:
+		"""Stat shaped to broadcast over the axes (ints widened to int64)"""
+		axes, values = self.stats.get(name, ((), np.asarray(DEFAULTS[name])))
+		if values.dtype.kind in 'iub' and values.dtype != np.bool_:
+			values = values.astype(np.int64)
+		names = list(self.axes)
+		positions = [names.index(axis) for axis in axes]
+		values = np.transpose(values, np.argsort(positions))
+		shape = [1] * len(names)
+		for position in positions:
+			shape[position] = len(self.axes[names[position]])
+		return values.reshape(shape)
+
+	def evaluate(self, kind: str = 'physical') -> DamageGrid:
+		"""Damage formula over the whole space"""
+		stat = self.stat
+		if kind == 'physical':
+			attack = stat('attack') + stat('power') + stat('weapon_power')
+			mitigation = np.where(stat('ignore_defense'), 0, stat('defense') // 2)
+			base = np.maximum(1.0, (attack - mitigation).astype(np.float64))
+			critical = np.minimum(100, stat('critical_rate') + stat('critical_modifier')) / 100.0
+			hit = np.minimum(
+				100, BASE_HIT_RATE + stat('accuracy') - stat('evasion') + stat('accuracy_modifier')
+			) / 100.0
+		elif kind == 'spell':
+			base = np.maximum(1.0, stat('power').astype(np.float64) * (stat('magic') / 16.0) * stat('modifier'))
+			critical = np.zeros([1] * len(self.axes))
+			hit = np.minimum(100, SPELL_HIT_RATE + stat('accuracy') - (stat('evasion') // 2)) / 100.0
+		else:
+			raise ValueError(f"Unknown damage kind '{kind}'")
+
+		return DamageGrid(kind=kind, axes=dict(self.axes), base=base, hit_chance=hit,
+						  critical_chance=critical, hp=stat('hp'))
+
+
+# ----------------------------------------------------------------------
+# Spaces
+# ----------------------------------------------------------------------
+
+def stat_grid(levels: Iterable[int] = range(1, 42), attacks: Iterable[int] = range(0, 256),
+			  defenses: Iterable[int] = range(0, 256), stat: str = 'attack', **fixed) -> StatSpace:
+	"""level x attack (or magic) x defense x element (resistance level) space"""
+	return (StatSpace(**fixed)
+			.axis('level', levels)
+			.axis(stat, attacks)
+			.axis('defense', defenses)
+			.axis('element', list(MODIFIERS), modifier=list(MODIFIERS.values())))
+
+
+def rom_space(rom: bytes, kind: str = 'physical', levels: Iterable[int] = range(1, 42),
+			  stats: Iterable[int] = range(0, 256), **fixed) -> StatSpace:
+	"""Every weapon (or spell) against every enemy in the ROM tables
+
+	Physical: level x attack x weapon x enemy; the weapon supplies its
+	attack as weapon power and its accuracy bonus. Spell: level x magic
+	x spell x enemy, with each enemy's resistance to the spell's element
+	as the modifier. Enemies with 0 HP are skipped.
+	"""
+	enemies = EDITOR_ENEMIES.view(rom)
+	enemy_ids = np.flatnonzero(enemies['hp'] > 0)
+	enemies = enemies[enemy_ids]
+
+	space = StatSpace(**fixed).axis('level', levels)
+	if kind == 'physical':
+		items = EDITOR_ITEMS.view(rom)
+		weapon_ids = np.flatnonzero(items['item_type'] == WEAPON_TYPE)
+		space.axis('attack', stats)
+		space.axis('weapon', weapon_ids, weapon_power=items['attack'][weapon_ids],
+				   accuracy_modifier=items['accuracy'][weapon_ids])
+	elif kind == 'spell':
+		spells = EDITOR_SPELLS.view(rom)
+		spell_ids = np.flatnonzero(spells['base_power'] > 0)
+		space.axis('magic', stats)
+		space.axis('spell', spell_ids, power=spells['base_power'][spell_ids])
+	else:
+		raise ValueError(f"Unknown damage kind '{kind}'")
+
+	space.axis('enemy', enemy_ids, defense=enemies['defense'], evasion=enemies['evade'], hp=enemies['hp'])
+	if kind == 'spell':
+		resist = np.column_stack([np.full(len(enemies), 100)] + [enemies[name] for name in RESISTANCES])
+		elements = np.minimum(spells['element'][spell_ids], len(RESISTANCES))
+		space.set('modifier', resist[:, elements].T / 100.0, ('spell', 'enemy'))
+	return space
+
+
+def benchmark() -> None:
+	start = time.perf_counter()
+	grid = stat_grid().evaluate()
+	expected = grid.values('expected_damage')
+	grid_ms = (time.perf_counter() - start) * 1000
+	print(f"level x attack x defense x element {grid.shape} = {expected.size:,} cells: {grid_ms:.1f} ms")
+
+	rng = np.random.default_rng(0)
+	rom = bytearray(rng.integers(0, 256, 0x100000, dtype=np.uint8).tobytes())
+	items = EDITOR_ITEMS.view(rom)
+	items['item_type'] = np.where(np.arange(256) < 48, WEAPON_TYPE, 0)
+	items['attack'] = rng.integers(5, 120, 256)
+	enemies = EDITOR_ENEMIES.view(rom)
+	enemies['hp'] = np.where(np.arange(256) < 200, rng.integers(50, 4000, 256), 0)
+	enemies['defense'] = rng.integers(0, 200, 256)
+
+	start = time.perf_counter()
+	grid = rom_space(rom).evaluate()
+	expected = np.asarray(grid.expected_damage)
+	rom_ms = (time.perf_counter() - start) * 1000
+	print(f"ROM level x attack x weapon x enemy {grid.shape} "
+		  f"({np.prod(grid.shape):,} cells, {expected.size:,} evaluated): {rom_ms:.1f} ms")
+
+	start = time.perf_counter()
+	minimum = grid.min_stat('attack', hits=2, probability=0.95, samples=2048, level=20)
+	query_ms = (time.perf_counter() - start) * 1000
+	print(f"Min attack to 2-shot, every weapon x enemy at level 20 {minimum.shape}: {query_ms:.0f} ms "
+		  f"({np.count_nonzero(minimum >= 0):,} reachable)")
+
+
+def _parse_range(text: str, step: int = 1) -> range:
+	low, high = map(int, text.split('-'))
+	return range(low, high + 1, step)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ broadcast damage grids and stat queries')
+	parser.add_argument('command', choices=['grid', 'query', 'heatmap', 'benchmark'])
+	parser.add_argument('rom', type=Path, nargs='?', help='ROM file (query/heatmap over ROM tables)')
+	parser.add_argument('--kind', choices=['physical', 'spell'], default='physical', help='Damage formula')
+	parser.add_argument('--level-range', type=str, default='1-41', help='Level range (min-max)')
+	parser.add_argument('--attack-range', type=str, default='0-255', help='Attack/magic range (min-max)')
+	parser.add_argument('--defense-range', type=str, default='0-255', help='Defense range (grid)')
+	parser.add_argument('--enemy', type=int, help='Enemy ID to fix')
+	parser.add_argument('--weapon', type=int, help='Weapon (or spell) ID to fix')
+	parser.add_argument('--level', type=int, default=20, help='Level to fix')
+	parser.add_argument('--attack', type=int, help='Attack/magic to fix (heatmap)')
+	parser.add_argument('--hits', type=int, default=2, help='Attacks allowed for the kill')
+	parser.add_argument('--probability', type=float, default=0.95, help='Required kill probability')
+	parser.add_argument('--samples', type=int, default=4096, help='Dice samples per query')
+	parser.add_argument('--output', type=Path, help='Output file (.csv, .npz or image)')
+
+	args = parser.parse_args()
+
+	if args.command == 'benchmark':
+		benchmark()
+		return 0
+
+	stat_name = 'attack' if args.kind == 'physical' else 'magic'
+	table_name = 'weapon' if args.kind == 'physical' else 'spell'
+	levels, stats = _parse_range(args.level_range), _parse_range(args.attack_range)
+
+	if args.command == 'grid':
+		if args.rom:
+			grid = rom_space(args.rom.read_bytes(), args.kind, levels, stats).evaluate(args.kind)
+		else:
+			grid = stat_grid(levels, stats, _parse_range(args.defense_range), stat_name).evaluate(args.kind)
+		output = args.output or Path('damage_grid.npz')
+		if output.suffix == '.csv':
+			rows = grid.to_csv(output)
+			print(f"✓ Exported {rows:,} rows to {output}")
+		else:
+			grid.to_npz(output)
+			print(f"✓ Saved {grid.shape} grid to {output}")
+		return 0
+
+	if not args.rom:
+		print(f"Error: {args.command} needs a ROM file")
+		return 1
+	grid = rom_space(args.rom.read_bytes(), args.kind, levels, stats).evaluate(args.kind)
+	fixed = {'level': args.level}
+	if args.enemy is not None:
+		fixed['enemy'] = args.enemy
+	if args.weapon is not None:
+		fixed[table_name] = args.weapon
+
+	if args.command == 'query':
+		minimum = grid.min_stat(stat_name, args.hits, args.probability, args.samples, **fixed)
+		if np.ndim(minimum) == 0:
+			target = ', '.join(f"{name} {label}" for name, label in fixed.items())
+			print(f"Minimum {stat_name} to kill in {args.hits} with >= {args.probability:.0%} ({target}): "
+				  f"{minimum if minimum is not None else 'not reachable'}")
+			return 0
+		remaining = [name for name in grid.axes if name not in fixed and name != stat_name]
+		print(f"Minimum {stat_name} to kill in {args.hits} with >= {args.probability:.0%} "
+			  f"({' x '.join(remaining)}; -1 = not reachable):")
+		for index in np.ndindex(minimum.shape):
+			labels = ', '.join(f"{name} {grid.axes[name][i]}" for name, i in zip(remaining, index))
+			print(f"  {labels}: {minimum[index]}")
+		return 0
+
+	if args.attack is None:
+		print("Error: heatmap needs --attack to fix the stat axis")
+		return 1
+	fixed[stat_name] = args.attack
+	output = args.output or Path('damage_heatmap.png')
+	return 0 if grid.heatmap(output, 'enemy', table_name, **fixed) else 1
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Damage Simulation - Test Suite
+
+Checks the vectorized kernel roll-for-roll against the scalar calculator,
+seeded reproducibility, histogram statistics and kill-probability curves.
+
+Usage:
+	python test_damage_simulation.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import ffmq_damage_calculator
+from damage_simulation import BATCH_SIZE, physical_kernel, simulate_damage
+from ffmq_damage_calculator import (
+	AttackData, AttackerStats, DamageType, DefenderStats, Element, ElementalModifier, FFMQDamageCalculator
+)
+
+
+class ScriptedRandom:
+	"""Stands in for the random module, replaying one trial's draws"""
+
+	def __init__(self, hit_roll: float, crit_roll: float, variance_roll: float):
+		self.rolls = [hit_roll, crit_roll]
+		self.variance_roll = variance_roll
+
+	def random(self) -> float:
+		return self.rolls.pop(0)
+
+	def uniform(self, a: float, b: float) -> float:
+		return a + (b - a) * self.variance_roll
+
+
+def make_combatants(critical_rate: int = 30, evasion: int = 25):
+	attacker = AttackerStats(level=20, attack=61, magic=43, accuracy=5, critical_rate=critical_rate, weapon_power=7)
+	defender = DefenderStats(level=20, defense=37, magic_defense=20, evasion=evasion, hp=900, max_hp=900,
+							 elemental_resistance={Element.FIRE: ElementalModifier.WEAK})
+	return attacker, defender
+
+
+class TestKernel(unittest.TestCase):
+	def test_matches_scalar_formula(self):
+		calculator = FFMQDamageCalculator()
+		attacker, defender = make_combatants()
+		attacks = [
+			AttackData("Axe", DamageType.PHYSICAL, 13, Element.NONE),
+			AttackData("Fire", DamageType.MAGICAL, 20, Element.FIRE),
+		]
+		hit_roll, crit_roll, variance_roll = np.random.default_rng(5).random((3, 2000))
+
+		for attack in attacks:
+			if attack.damage_type == DamageType.PHYSICAL:
+				formula = calculator.calculate_physical_damage
+			else:
+				formula = calculator.calculate_spell_damage
+			result = formula(attacker, defender, attack)
+			damage, critical = physical_kernel(result.base_damage, result.hit_chance, result.critical_chance,
+											   hit_roll, crit_roll, variance_roll)
+
+			expected_damage, expected_critical = [], []
+			for rolls in zip(hit_roll, crit_roll, variance_roll):
+				with mock.patch.object(ffmq_damage_calculator, 'random', ScriptedRandom(*rolls)):
+					rolled = formula(attacker, defender, attack, roll_variance=True)
+				expected_damage.append(rolled.actual_damage)
+				expected_critical.append(rolled.was_critical)
+
+			self.assertEqual(damage.tolist(), expected_damage, attack.name)
+			self.assertEqual(critical.tolist(), expected_critical, attack.name)
+			self.assertGreater(len(set(expected_damage)), 10)
+
+	def test_seeded_and_batched(self):
+		trials = BATCH_SIZE + 1234		# Spans two batches
+		first = simulate_damage(75.0, 0.8, 0.2, trials, np.random.default_rng(9))
+		second = simulate_damage(75.0, 0.8, 0.2, trials, np.random.default_rng(9))
+		self.assertEqual(first.histogram.tolist(), second.histogram.tolist())
+		self.assertEqual(first.criticals, second.criticals)
+		self.assertEqual(int(first.histogram.sum()), trials)
+
+		rng = np.random.default_rng(9)
+		damage = np.concatenate([
+			physical_kernel(75.0, 0.8, 0.2, *rng.random((3, count)))[0]
+			for count in (BATCH_SIZE, 1234)
+		])
+		self.assertAlmostEqual(first.mean(), damage.mean(), places=9)
+		self.assertAlmostEqual(first.std(), damage.std(), places=9)
+		self.assertEqual(first.min_damage, int(damage[damage > 0].min()))
+		self.assertEqual(first.max_damage, int(damage.max()))
+		q = (1, 5, 50, 90, 99.9)
+		expected = np.percentile(damage, q, method='inverted_cdf')
+		self.assertEqual(list(first.percentiles(q).values()), expected.astype(int).tolist())
+
+	def test_summary_keeps_trial_keys(self):
+		calculator = FFMQDamageCalculator()
+		attacker, defender = make_combatants()
+		attack = AttackData("Sword", DamageType.PHYSICAL, 10, Element.NONE)
+		summary = calculator.simulate_attack_trials(attacker, defender, attack, trials=200000, seed=3)
+		result = calculator.calculate_physical_damage(attacker, defender, attack)
+		self.assertAlmostEqual(summary['hit_rate'] / 100, result.hit_chance, delta=0.005)
+		self.assertAlmostEqual(summary['crit_rate'] / 100, result.critical_chance, delta=0.005)
+		self.assertEqual(summary, calculator.simulate_attack_trials(attacker, defender, attack, 200000, seed=3))
+
+
+class TestKillCurve(unittest.TestCase):
+	def test_curve_matches_sampled_sums(self):
+		distribution = simulate_damage(60.0, 0.85, 0.25, 400000, np.random.default_rng(1))
+		curve = distribution.kill_probability(500, 16)
+		self.assertTrue(np.all(np.diff(curve) >= -1e-12))
+		self.assertGreater(curve[-1], 0.999)
+
+		rng = np.random.default_rng(2)
+		attacks = 16
+		damage = physical_kernel(60.0, 0.85, 0.25, *rng.random((3, 100000 * attacks)))[0]
+		sampled = (np.cumsum(damage.reshape(-1, attacks), axis=1) >= 500).mean(axis=0)
+		np.testing.assert_allclose(curve, sampled, atol=0.01)
+
+		self.assertEqual(distribution.attacks_to_kill(500, 0.5), int(np.argmax(curve >= 0.5)) + 1)
+		self.assertAlmostEqual(distribution.kill_probability(1, 1)[0], distribution.hits / distribution.trials)
+
+	def test_fft_path_matches_direct(self):
+		distribution = simulate_damage(400.0, 0.9, 0.1, 200000, np.random.default_rng(4))
+		with mock.patch('damage_simulation.FFT_THRESHOLD', 0):
+			fft = distribution.kill_probability(6000, 20)
+		with mock.patch('damage_simulation.FFT_THRESHOLD', 1 << 62):
+			direct = distribution.kill_probability(6000, 20)
+		np.testing.assert_allclose(fft, direct, atol=1e-9)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Stat Space - Test Suite
+
+Checks broadcast grids against the scalar calculator, ROM table pairings,
+constraint queries against a full scan, and CSV/NPZ/heatmap export.
+
+Usage:
+	python test_stat_space.py
+"""
+
+import csv
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_damage_calculator import (
+	AttackData, AttackerStats, DamageType, DefenderStats, Element, ElementalModifier, FFMQDamageCalculator
+)
+from record_tables import EDITOR_ENEMIES, EDITOR_ITEMS, EDITOR_SPELLS
+from stat_space import MATPLOTLIB_AVAILABLE, MODIFIERS, DamageGrid, StatSpace, rom_space, stat_grid
+
+
+def sample_rom(seed: int = 0) -> bytearray:
+	rng = np.random.default_rng(seed)
+	rom = bytearray(rng.integers(0, 256, 0x100000, dtype=np.uint8).tobytes())
+	items = EDITOR_ITEMS.view(rom)
+	items['item_type'] = np.where(np.arange(256) < 6, 1, 0)
+	items['attack'] = rng.integers(5, 60, 256)
+	items['accuracy'] = rng.integers(-5, 10, 256)
+	enemies = EDITOR_ENEMIES.view(rom)
+	enemies['hp'] = np.where(np.arange(256) < 10, rng.integers(50, 600, 256), 0)
+	enemies['defense'] = rng.integers(0, 120, 256)
+	enemies['evade'] = rng.integers(0, 30, 256)
+	spells = EDITOR_SPELLS.view(rom)
+	spells['base_power'] = np.where(np.arange(128) < 5, rng.integers(10, 80, 128), 0)
+	spells['element'] = np.arange(128) % 8
+	return rom
+
+
+class TestFormulas(unittest.TestCase):
+	def test_grid_matches_calculator(self):
+		calculator = FFMQDamageCalculator()
+		space = stat_grid(levels=[1, 30], attacks=range(0, 256, 7), defenses=range(0, 256, 9),
+						  accuracy=3, evasion=17, critical_rate=22, weapon_power=11, power=9)
+		physical = space.evaluate('physical')
+		space = stat_grid(levels=[1, 30], attacks=range(0, 256, 7), defenses=range(0, 256, 9),
+						  stat='magic', accuracy=3, evasion=17, power=9)
+		spell = space.evaluate('spell')
+
+		rng = np.random.default_rng(0)
+		for _ in range(300):
+			index = tuple(int(rng.integers(n)) for n in physical.shape)
+			level, stat, defense, element = (labels[i] for labels, i in zip(physical.axes.values(), index))
+			attacker = AttackerStats(level=int(level), attack=int(stat), magic=int(stat), accuracy=3,
+									 critical_rate=22, weapon_power=11)
+			defender = DefenderStats(level=int(level), defense=int(defense), magic_defense=0, evasion=17, hp=1000,
+									 max_hp=1000, elemental_resistance={Element.FIRE: ElementalModifier[element.upper()]})
+			for grid, damage_type, formula in (
+				(physical, DamageType.PHYSICAL, calculator.calculate_physical_damage),
+				(spell, DamageType.MAGICAL, calculator.calculate_spell_damage),
+			):
+				result = formula(attacker, defender, AttackData("Test", damage_type, 9, Element.FIRE))
+				for name, value in (('base', result.base_damage), ('average_damage', result.average_damage),
+									('expected_damage', result.expected_damage), ('hit_chance', result.hit_chance),
+									('critical_chance', result.critical_chance)):
+					self.assertEqual(float(grid.values(name)[index]), value, (name, damage_type, index))
+
+	def test_stats_span_axes_and_validate(self):
+		space = StatSpace().axis('spell', [0, 1]).axis('enemy', [5, 6, 7])
+		space.set('modifier', [[0.0, 0.5, 1.0], [1.5, 2.0, 0.5]], ('spell', 'enemy'))
+		self.assertEqual(space.stat('modifier').shape, (2, 3))
+		space = StatSpace().axis('enemy', [5, 6, 7]).axis('spell', [0, 1])
+		space.set('modifier', [[0.0, 0.5, 1.0], [1.5, 2.0, 0.5]], ('spell', 'enemy'))
+		self.assertEqual(space.stat('modifier')[2, 0], 1.0)
+		with self.assertRaises(ValueError):
+			space.set('hp', [1, 2], ('enemy',))
+		with self.assertRaises(KeyError):
+			space.set('luck', 3)
+
+
+class TestRomQueries(unittest.TestCase):
+	def test_rom_pairings(self):
+		rom = sample_rom()
+		grid = rom_space(rom, levels=[20], stats=range(0, 256, 4)).evaluate('physical')
+		self.assertEqual(grid.shape, (1, 64, 6, 10))
+		items, enemies = EDITOR_ITEMS.view(rom), EDITOR_ENEMIES.view(rom)
+		cell = grid.select(level=20, attack=40, weapon=3, enemy=7)
+		self.assertEqual(float(cell.base), max(1.0, 40 + 20 + items['attack'][3] - enemies['defense'][7] // 2))
+		self.assertEqual(int(cell.hp), enemies['hp'][7])
+
+		spells = rom_space(rom, 'spell', levels=[20], stats=[64]).evaluate('spell')
+		resist = ('none', 'fire', 'water', 'earth', 'wind', 'holy', 'dark', 'poison')
+		for spell in range(5):
+			element = EDITOR_SPELLS.view(rom)['element'][spell]
+			expected = 1.0 if element == 0 else enemies[resist[element]][2] / 100.0
+			power = EDITOR_SPELLS.view(rom)['base_power'][spell]
+			self.assertAlmostEqual(float(spells.select(level=20, magic=64, spell=spell, enemy=2).base),
+								   max(1.0, power * 4.0 * expected))
+
+	def test_min_stat_matches_scan(self):
+		grid = rom_space(sample_rom(), levels=[20]).evaluate('physical')
+		minimum = grid.min_stat('attack', hits=2, probability=0.9, samples=512, seed=3, level=20)
+		self.assertEqual(minimum.shape, (6, 10))
+
+		probability = grid.select(level=20).kill_probability(2, 512, np.random.default_rng(3))
+		self.assertTrue(np.all(np.diff(probability, axis=0) >= 0))
+		reached = probability >= 0.9
+		scan = np.where(reached.any(axis=0), reached.argmax(axis=0), -1)
+		self.assertEqual(minimum.tolist(), scan.tolist())
+		self.assertTrue((scan > 0).any() and (scan == -1).any())
+
+		weapon, enemy = np.argwhere(minimum > 0)[0]
+		single = grid.min_stat('attack', hits=2, probability=0.9, samples=512, seed=3,
+							   level=20, weapon=grid.axes['weapon'][weapon], enemy=grid.axes['enemy'][enemy])
+		self.assertEqual(single, minimum[weapon, enemy])
+		weapon, enemy = np.argwhere(minimum == -1)[0]
+		self.assertIsNone(grid.min_stat('attack', hits=2, level=20, weapon=grid.axes['weapon'][weapon],
+										enemy=grid.axes['enemy'][enemy]))
+
+
+class TestExport(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.dir = Path(self.tmp.name)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_npz_and_csv(self):
+		grid = stat_grid(levels=range(1, 42), attacks=range(0, 256, 5), defenses=range(0, 256, 5)).evaluate()
+		grid.to_npz(self.dir / 'grid.npz')
+		loaded = DamageGrid.load_npz(self.dir / 'grid.npz')
+		self.assertEqual(list(loaded.axes), ['level', 'attack', 'defense', 'element'])
+		self.assertEqual(loaded.axes['element'].tolist(), list(MODIFIERS))
+		np.testing.assert_array_equal(loaded.values('expected_damage'), grid.values('expected_damage'))
+
+		rows = grid.to_csv(self.dir / 'grid.csv', level=10, element='weak')
+		with open(self.dir / 'grid.csv', newline='') as f:
+			table = list(csv.DictReader(f))
+		self.assertEqual(rows, len(table))
+		self.assertEqual(rows, 52 * 52)
+		row = table[53]
+		self.assertEqual((row['attack'], row['defense']), ('5', '5'))
+		self.assertAlmostEqual(float(row['expected_damage']),
+							   float(grid.values('expected_damage')[9, 1, 1, 3]), places=3)
+
+	@unittest.skipUnless(MATPLOTLIB_AVAILABLE, "matplotlib not installed")
+	def test_heatmap(self):
+		grid = rom_space(sample_rom(), levels=[20]).evaluate('physical')
+		path = grid.heatmap(self.dir / 'map.png', 'enemy', 'weapon', level=20, attack=80)
+		self.assertTrue(path.stat().st_size > 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -43,17 +43,23 @@ Usage:
 	python ffmq_debug_tool.py rom.sfc --generate-gg --cheat all-items
 	python ffmq_debug_tool.py rom.sfc --list-cheats
 	python ffmq_debug_tool.py rom.sfc --search-value 255 --range 0x7E0000-0x7E1FFF
+	python ffmq_debug_tool.py rom.sfc --search-pattern "A9 ?? 8D ?? 21"
+	python ffmq_debug_tool.py rom.sfc --search-pointers 0x0C8000-0x0CFFFF
 	python ffmq_debug_tool.py rom.sfc --watch-address 0x7E1234
 """
 
 import argparse
 import json
 import struct
+import sys
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from rom_search import ROMSearch
+
 
 class CheatType(Enum):
 	"""Cheat categories"""
@@ -158,6 +164,8 @@ class FFMQDebugTool:
 		with open(rom_path, 'rb') as f:
 			self.rom_data = bytearray(f.read())
 		
+		self.searcher = ROMSearch(self.rom_data)
+		
 		if self.verbose:
 			print(f"Loaded ROM: {rom_path} ({len(self.rom_data):,} bytes)")
 	
@@ -183,6 +191,7 @@ class FFMQDebugTool:
 				if self.verbose:
 					print(f"  Patched {address:08X}: {original:02X} -> {value:02X}")
 		
+		self.searcher.invalidate()
 		return True
 	
 	def generate_game_genie(self, address: int, value: int) -> str:
@@ -200,26 +209,20 @@ class FFMQDebugTool:
 	
 	def search_value(self, value: int, start: int, end: int) -> List[int]:
 		"""Search for value in ROM"""
-		addresses = []
-		
-		for addr in range(start, end):
-			if addr < len(self.rom_data):
-				if self.rom_data[addr] == value:
-					addresses.append(addr)
-		
-		return addresses
+		return self.searcher.find_value(value, 1, start, end).tolist()
 	
 	def search_word(self, value: int, start: int, end: int) -> List[int]:
 		"""Search for 16-bit word in ROM"""
-		addresses = []
-		
-		for addr in range(start, end - 1):
-			if addr + 1 < len(self.rom_data):
-				word = struct.unpack_from('<H', self.rom_data, addr)[0]
-				if word == value:
-					addresses.append(addr)
-		
-		return addresses
+		return self.searcher.find_value(value, 2, start, end - 1).tolist()
+	
+	def search_pattern(self, pattern: str, start: int, end: int) -> List[int]:
+		"""Search for hex pattern with wildcards (e.g. "A9 ?? 8D")"""
+		return self.searcher.find_masked(pattern, start, end).tolist()
+	
+	def search_pointers(self, target_start: int, target_end: int) -> List[Tuple[int, int]]:
+		"""Find 24-bit pointers targeting an address range"""
+		offsets, targets = self.searcher.find_long_pointers(target_start, target_end)
+		return list(zip(offsets.tolist(), targets.tolist()))
 	
 	def read_memory(self, address: int, length: int = 1) -> bytes:
 		"""Read from ROM"""
@@ -236,6 +239,7 @@ class FFMQDebugTool:
 		for i, byte in enumerate(data):
 			self.rom_data[address + i] = byte
 		
+		self.searcher.invalidate()
 		return True
 	
 	def create_cheat_database(self) -> List[CheatCode]:
@@ -279,6 +283,8 @@ def main():
 	parser.add_argument('--all-items', action='store_true', help='Get all items')
 	parser.add_argument('--search-value', type=int, help='Search for byte value')
 	parser.add_argument('--search-word', type=int, help='Search for 16-bit value')
+	parser.add_argument('--search-pattern', type=str, help='Search for hex pattern with ?? wildcards')
+	parser.add_argument('--search-pointers', type=str, help='Find 24-bit pointers into range (e.g., 0x0C8000-0x0CFFFF)')
 	parser.add_argument('--range', type=str, help='Search range (e.g., 0x000000-0x0FFFFF)')
 	parser.add_argument('--generate-gg', action='store_true', help='Generate Game Genie codes')
 	parser.add_argument('--save-rom', type=str, help='Save modified ROM')
@@ -331,8 +337,8 @@ def main():
 		
 		return 0
 	
-	# Search value
-	if args.search_value is not None:
+	# Search value / word / pattern
+	if args.search_value is not None or args.search_word is not None or args.search_pattern:
 		# Parse range
 		if args.range:
 			parts = args.range.split('-')
@@ -342,10 +348,18 @@ def main():
 			start = 0
 			end = len(tool.rom_data)
 		
-		addresses = tool.search_value(args.search_value, start, end)
+		if args.search_pattern:
+			addresses = tool.search_pattern(args.search_pattern, start, end)
+			label = f"Pattern: {args.search_pattern}"
+		elif args.search_word is not None:
+			addresses = tool.search_word(args.search_word, start, end)
+			label = f"Word: {args.search_word} (0x{args.search_word:04X})"
+		else:
+			addresses = tool.search_value(args.search_value, start, end)
+			label = f"Value: {args.search_value} (0x{args.search_value:02X})"
 		
 		print(f"\n=== Search Results ===\n")
-		print(f"Value: {args.search_value} (0x{args.search_value:02X})")
+		print(label)
 		print(f"Range: {start:08X}-{end:08X}")
 		print(f"Found: {len(addresses)} occurrences\n")
 		
@@ -357,6 +371,22 @@ def main():
 		
 		return 0
 	
+	# Search pointers
+	if args.search_pointers:
+		parts = args.search_pointers.split('-')
+		pointers = tool.search_pointers(int(parts[0], 16), int(parts[1], 16))
+		
+		print(f"\n=== Pointer Search ===\n")
+		print(f"Found: {len(pointers)} pointers\n")
+		
+		for addr, target in pointers[:50]:
+			print(f"  {addr:08X} -> ${target:06X}")
+		
+		if len(pointers) > 50:
+			print(f"  ... and {len(pointers) - 50} more")
+		
+		return 0
+	
 	# Generate Game Genie codes
 	if args.generate_gg:
 		cheats = tool.create_cheat_database()
@@ -372,7 +402,7 @@ def main():
 		
 		return 0
 	
-	print("Use --list-cheats, --cheat, or --search-value")
+	print("Use --list-cheats, --cheat, --search-value or --search-pattern")
 	return 0
 
 
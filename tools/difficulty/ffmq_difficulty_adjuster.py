@@ -43,11 +43,15 @@ Usage:
 import argparse
 import json
 import struct
+import sys
 from pathlib import Path
 from typing import Dict, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from record_tables import ENEMY_STATS, scale
+
 
 class DifficultyPreset(Enum):
 	"""Difficulty preset"""
@@ -99,7 +103,7 @@ class DifficultyAdjuster:
 	"""Difficulty adjuster"""
 	
 	# ROM offsets (example addresses - would need to be verified)
-	ENEMY_STATS_BASE = 0x0F0000
+	ENEMY_STATS_BASE = ENEMY_STATS.offset
 	PLAYER_STATS_BASE = 0x0F8000
 	EXP_TABLE_BASE = 0x0FA000
 	GIL_TABLE_BASE = 0x0FA800
@@ -246,40 +250,16 @@ class DifficultyAdjuster:
 		if self.rom_data is None:
 			return
 		
-		# Example: Modify 50 enemy entries
-		for i in range(50):
-			offset = self.ENEMY_STATS_BASE + (i * 32)
-			
-			if offset + 32 > len(self.rom_data):
-				break
-			
-			# Read current stats
-			hp = struct.unpack('<H', self.rom_data[offset:offset+2])[0]
-			attack = self.rom_data[offset+2]
-			defense = self.rom_data[offset+3]
-			speed = self.rom_data[offset+4]
-			magic = self.rom_data[offset+5]
-			
-			# Apply multipliers
-			new_hp = int(hp * self.config.enemy_hp_mult)
-			new_attack = int(attack * self.config.enemy_attack_mult)
-			new_defense = int(defense * self.config.enemy_defense_mult)
-			new_speed = int(speed * self.config.enemy_speed_mult)
-			new_magic = int(magic * self.config.enemy_magic_mult)
-			
-			# Clamp values
-			new_hp = min(65535, new_hp)
-			new_attack = min(255, new_attack)
-			new_defense = min(255, new_defense)
-			new_speed = min(255, new_speed)
-			new_magic = min(255, new_magic)
-			
-			# Write back
-			struct.pack_into('<H', self.rom_data, offset, new_hp)
-			self.rom_data[offset+2] = new_attack
-			self.rom_data[offset+3] = new_defense
-			self.rom_data[offset+4] = new_speed
-			self.rom_data[offset+5] = new_magic
+		# Record view over the ROM: scaling writes straight through,
+		# clamped to each field's range
+		enemies = ENEMY_STATS.view(self.rom_data)
+		scale(enemies, {
+			'hp': self.config.enemy_hp_mult,
+			'attack': self.config.enemy_attack_mult,
+			'defense': self.config.enemy_defense_mult,
+			'speed': self.config.enemy_speed_mult,
+			'magic': self.config.enemy_magic_mult,
+		})
 	
 	def _modify_player_stats(self) -> None:
 		"""Modify player statistics"""
@@ -368,26 +348,9 @@ class DifficultyAdjuster:
 		if self.rom_data is None:
 			return
 		
-		# Example: Modify 20 boss entries
-		boss_base = self.ENEMY_STATS_BASE + (30 * 32)  # Assume bosses start at enemy 30
-		
-		for i in range(20):
-			offset = boss_base + (i * 32)
-			
-			if offset + 32 > len(self.rom_data):
-				break
-			
-			hp = struct.unpack('<H', self.rom_data[offset:offset+2])[0]
-			attack = self.rom_data[offset+2]
-			
-			new_hp = int(hp * self.config.boss_hp_mult)
-			new_attack = int(attack * self.config.boss_attack_mult)
-			
-			new_hp = min(65535, new_hp)
-			new_attack = min(255, new_attack)
-			
-			struct.pack_into('<H', self.rom_data, offset, new_hp)
-			self.rom_data[offset+2] = new_attack
+		# Example: 20 boss entries (assume bosses start at enemy 30)
+		bosses = ENEMY_STATS.view(self.rom_data)[30:50]
+		scale(bosses, {'hp': self.config.boss_hp_mult, 'attack': self.config.boss_attack_mult})
 	
 	def revert_changes(self) -> bool:
 		"""Revert to original ROM"""
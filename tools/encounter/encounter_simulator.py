@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+FFMQ Encounter Simulator - Step counter and encounter RNG over map walks
+
+The formation editor changes encounter rates and weights as raw bytes.
+This module shows what those bytes do in play: it walks the tiles of a
+map, steps the encounter counter and rolls the game's own RNG routine
+(RNG_GenerateRandom, $00:9783) for every walker at once, so a million
+walks of a dungeon take a few seconds.
+
+Model:
+- RNG: 16-bit seed, seed = seed * 5 + $3711 + frame counter with the
+  65816 carries, result = high byte (mod N when N > 0). rng_reference()
+  follows the routine instruction by instruction; rng_next() is the
+  vectorized form the simulator uses
+- Step counter: reset on entering the map and after each battle. Each
+  step on a tile inside an active zone (first zone whose rectangle holds
+  the tile, rate > 0, at least one formation) adds one; once past half
+  the zone's rate, every step rolls RNG(rate) and a roll below
+  ENCOUNTER_CHANCE starts a battle, so battles come every `rate` steps
+  on average
+- Formation: a second full-byte roll scaled onto the zone's cumulative
+  weights (all-zero weights roll the slots uniformly, as in the
+  difficulty curve)
+- Frame counter: FRAMES_PER_STEP per step plus the battle's length
+- Battle length: BATTLE_OVERHEAD + clear turns x SECONDS_PER_TURN from
+  the difficulty curve's zone x formation table
+- Walkers differ only in the seed and frame counter they start with
+
+Traversals run from a map's entrance (map header) to each of its doors
+(door table), x first then y. Other paths can be given as tile lists.
+
+Features:
+- Expected encounters per traversal, spread, chance of none
+- Formation frequency per traversal
+- Walking and battle time per traversal
+- What-if comparison of two ROMs with the same walkers (common random
+  numbers, so small rate changes show up clearly)
+- CSV/JSON export of the traversal table
+
+Usage:
+	python encounter_simulator.py rom.sfc
+	python encounter_simulator.py rom.sfc --map 3 --walks 1000000 --formations
+	python encounter_simulator.py rom.sfc --compare edited.sfc --output delta.csv
+	python encounter_simulator.py rom.sfc --curve party.json --output traversals.json
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'analysis'))
+
+from difficulty_curve import (
+	BATTLE_OVERHEAD, EMPTY, SECONDS_PER_STEP, SECONDS_PER_TURN, ColumnTable, DifficultyCurve, PartyCurve
+)
+from record_tables import DOOR_TABLE, ENCOUNTER_ZONES, FORMATIONS, MAP_HEADERS
+
+
+RNG_CONSTANT = 0x3711
+ENCOUNTER_CHANCE = 2			# Roll of RNG(rate) below this starts a battle
+FRAMES_PER_SECOND = 60
+FRAMES_PER_STEP = round(SECONDS_PER_STEP * FRAMES_PER_SECOND)
+
+# Traversal columns compared between ROMs
+TRAVERSAL_METRICS = ('encounters', 'no_encounter', 'battle_seconds', 'total_seconds')
+
+
+# ----------------------------------------------------------------------
+# RNG
+# ----------------------------------------------------------------------
+
+def rng_reference(seed: int, frame: int, modulo: int = 0) -> Tuple[int, int]:
+	"""
+	RNG_GenerateRandom one instruction at a time (16-bit A, binary mode)
+
+	Returns:
+		(new seed, result)
+	"""
+	original = seed & 0xFFFF
+	a = original
+	carry = a >> 15									# ASL A
+	a = (a << 1) & 0xFFFF
+	carry = a >> 15									# ASL A
+	a = (a << 1) & 0xFFFF
+	for operand in (original, RNG_CONSTANT, frame & 0xFFFF):	# ADC $701FFE / ADC #$3711 / ADC $0E96
+		total = a + operand + carry
+		carry = total >> 16
+		a = total & 0xFFFF
+	result = a >> 8									# SEP #$20 / XBA
+	if modulo:
+		result %= modulo							# $4204 / $4206 -> $4216
+	return a, result
+
+
+def rng_next(seeds: np.ndarray, frames: np.ndarray, modulo=0) -> Tuple[np.ndarray, np.ndarray]:
+	"""rng_reference over arrays of seeds and frame counters (modulo may be an array)"""
+	seeds = np.asarray(seeds, dtype=np.int64)
+	carry = (seeds >> 14) & 1						# Bit shifted out by the second ASL
+	total = ((seeds << 2) & 0xFFFF) + seeds + carry
+	total = (total & 0xFFFF) + RNG_CONSTANT + (total >> 16)
+	total = (total & 0xFFFF) + (np.asarray(frames, dtype=np.int64) & 0xFFFF) + (total >> 16)
+	seeds = total & 0xFFFF
+	result = seeds >> 8
+	modulo = np.asarray(modulo, dtype=np.int64)
+	return seeds, np.where(modulo > 0, result % np.maximum(modulo, 1), result)
+
+
+# ----------------------------------------------------------------------
+# Zones and traversals
+# ----------------------------------------------------------------------
+
+@dataclass
+class ZoneTable:
+	"""Encounter zones as arrays, with battle seconds per formation slot"""
+	map_id: np.ndarray				# (zones,), EMPTY = unused
+	rect: np.ndarray				# (zones, 4) x1 y1 x2 y2, inclusive
+	rate: np.ndarray				# (zones,)
+	formations: np.ndarray			# (zones, 8), EMPTY = no formation
+	cumulative: np.ndarray			# (zones, 8) cumulative roll weights
+	seconds: np.ndarray				# (zones, 8) battle length per slot
+
+	@classmethod
+	def from_rom(cls, rom: bytes, curve: Optional[PartyCurve] = None) -> 'ZoneTable':
+		zones = ENCOUNTER_ZONES.view(rom)
+		formation = zones['slots']['formation'].astype(np.int64)
+		valid = (formation != EMPTY) & (formation < len(FORMATIONS.view(rom)))
+		weight = np.where(valid, zones['slots']['weight'], 0).astype(np.int64)
+		weight = np.where(weight.sum(axis=1, keepdims=True) > 0, weight, valid)
+
+		# Battle length per zone x formation from the difficulty curve's encounters
+		encounters = DifficultyCurve.from_rom(rom, curve or default_curve()).encounters
+		lengths = np.full((len(zones), 256), BATTLE_OVERHEAD)
+		lengths[encounters['zone'], encounters['formation']] = (BATTLE_OVERHEAD
+																+ encounters['clear_turns'] * SECONDS_PER_TURN)
+
+		return cls(
+			map_id=zones['map_id'].astype(np.int64),
+			rect=np.stack([zones[name].astype(np.int64) for name in ('x1', 'y1', 'x2', 'y2')], axis=1),
+			rate=zones['encounter_rate'].astype(np.int64),
+			formations=np.where(valid, formation, EMPTY),
+			cumulative=np.cumsum(weight, axis=1),
+			seconds=np.where(valid, lengths[np.arange(len(zones))[:, None], np.minimum(formation, 255)], 0.0),
+		)
+
+	@property
+	def active(self) -> np.ndarray:
+		"""Zones that can start a battle"""
+		return (self.map_id != EMPTY) & (self.rate > 0) & (self.cumulative[:, -1] > 0)
+
+	def zone_at(self, map_id: int, tiles: np.ndarray) -> np.ndarray:
+		"""Active zone index for each (x, y) tile on a map, -1 where none"""
+		tiles = np.asarray(tiles, dtype=np.int64).reshape(-1, 2)
+		candidates = np.flatnonzero(self.active & (self.map_id == map_id))
+		x1, y1, x2, y2 = self.rect[candidates].T
+		inside = ((tiles[:, :1] >= x1) & (tiles[:, :1] <= x2) & (tiles[:, 1:] >= y1) & (tiles[:, 1:] <= y2))
+		return np.where(inside.any(axis=1), candidates[inside.argmax(axis=1)] if len(candidates) else -1, -1)
+
+
+@dataclass
+class Traversal:
+	"""Tiles stepped on, in order, on one map"""
+	name: str
+	map_id: int
+	tiles: np.ndarray				# (steps, 2)
+
+	@classmethod
+	def between(cls, name: str, map_id: int, start: Tuple[int, int], end: Tuple[int, int]) -> 'Traversal':
+		"""Manhattan walk, x first then y (start tile not counted)"""
+		(x0, y0), (x1, y1) = start, end
+		xs = x0 + np.sign(x1 - x0) * np.arange(1, abs(x1 - x0) + 1)
+		ys = y0 + np.sign(y1 - y0) * np.arange(1, abs(y1 - y0) + 1)
+		tiles = np.concatenate([np.stack([xs, np.full(len(xs), y0)], axis=1),
+								np.stack([np.full(len(ys), x1), ys], axis=1)])
+		return cls(name, map_id, tiles.astype(np.int64).reshape(-1, 2))
+
+	@property
+	def steps(self) -> int:
+		return len(self.tiles)
+
+
+def traversals(rom: bytes, map_ids: Optional[Sequence[int]] = None) -> List[Traversal]:
+	"""Entrance-to-door walks for every door record on a known map"""
+	headers = MAP_HEADERS.view(rom)
+	doors = DOOR_TABLE.view(rom)
+	walks = []
+	for index, (source, x, y, dest) in enumerate(zip(doors['source_map'].tolist(), doors['source_x'].tolist(),
+													 doors['source_y'].tolist(), doors['dest_map'].tolist())):
+		if source >= len(headers) or (map_ids is not None and source not in map_ids):
+			continue
+		entrance = (int(headers['entrance_x'][source]), int(headers['entrance_y'][source]))
+		walks.append(Traversal.between(f"Map {source} -> {dest} (door {index})", source, entrance, (x, y)))
+	return walks
+
+
+def default_curve() -> PartyCurve:
+	from ffmq_difficulty_analyzer import FFMQDifficultyDatabase
+	return PartyCurve.from_progression(FFMQDifficultyDatabase.EXPECTED_PROGRESSION)
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+
+@dataclass
+class WalkResult:
+	"""Per-walker outcome of one traversal"""
+	traversal: Traversal
+	encounters: np.ndarray			# Battles per walker
+	battle_seconds: np.ndarray		# Time in battle per walker
+	formation_counts: np.ndarray	# (256,) battles per formation, all walkers
+	seeds: np.ndarray				# Final RNG seed per walker
+	frames: np.ndarray				# Final frame counter per walker
+	zone_steps: int					# Steps inside an active zone
+
+	@property
+	def walks(self) -> int:
+		return len(self.encounters)
+
+	@property
+	def walk_seconds(self) -> float:
+		return self.traversal.steps * SECONDS_PER_STEP
+
+	def formation_frequency(self) -> Dict[int, float]:
+		"""Share of battles per formation, most common first"""
+		total = self.formation_counts.sum()
+		order = np.argsort(-self.formation_counts, kind='stable')
+		return {int(f): float(self.formation_counts[f] / total) for f in order if self.formation_counts[f]}
+
+	def summary(self) -> Dict[str, object]:
+		return {
+			'map': self.traversal.map_id,
+			'name': self.traversal.name,
+			'steps': self.traversal.steps,
+			'zone_steps': self.zone_steps,
+			'walk_seconds': self.walk_seconds,
+			'encounters': float(self.encounters.mean()),
+			'encounters_std': float(self.encounters.std()),
+			'no_encounter': float((self.encounters == 0).mean()),
+			'battle_seconds': float(self.battle_seconds.mean()),
+			'total_seconds': self.walk_seconds + float(self.battle_seconds.mean()),
+		}
+
+
+class EncounterSimulator:
+	"""Lockstep simulation of many walkers over a traversal"""
+
+	def __init__(self, zones: ZoneTable):
+		self.zones = zones
+
+	@classmethod
+	def from_rom(cls, rom: bytes, curve: Optional[PartyCurve] = None) -> 'EncounterSimulator':
+		return cls(ZoneTable.from_rom(rom, curve))
+
+	@staticmethod
+	def initial_state(walks: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+		"""Random starting RNG seeds and frame counters"""
+		rng = np.random.default_rng(seed)
+		return rng.integers(0, 0x10000, walks), rng.integers(0, 0x10000, walks)
+
+	def simulate(self, traversal: Traversal, walks: int = 100_000, seed: int = 0,
+				 initial: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> WalkResult:
+		"""
+		Walk a traversal with many walkers
+
+		Args:
+			initial: (seeds, frames) per walker; drawn from `seed` if omitted
+		"""
+		zones = self.zones
+		seeds, frames = initial if initial is not None else self.initial_state(walks, seed)
+		seeds = np.array(seeds, dtype=np.int64)
+		frames = np.array(frames, dtype=np.int64)
+		count = len(seeds)
+		counter = np.zeros(count, dtype=np.int64)
+		encounters = np.zeros(count, dtype=np.int64)
+		battle = np.zeros(count)
+		formation_counts = np.zeros(256, dtype=np.int64)
+
+		path = zones.zone_at(traversal.map_id, traversal.tiles).tolist()
+		for zone in path:
+			if zone >= 0:
+				rate = int(zones.rate[zone])
+				counter += 1
+				rolling = np.flatnonzero(counter > rate // 2)
+				seeds[rolling], roll = rng_next(seeds[rolling], frames[rolling], rate)
+				fight = rolling[roll < ENCOUNTER_CHANCE]
+				if len(fight):
+					seeds[fight], byte = rng_next(seeds[fight], frames[fight])
+					cumulative = zones.cumulative[zone]
+					slot = np.searchsorted(cumulative, byte * cumulative[-1] // 256, side='right')
+					seconds = zones.seconds[zone][slot]
+					encounters[fight] += 1
+					battle[fight] += seconds
+					frames[fight] += np.round(seconds * FRAMES_PER_SECOND).astype(np.int64)
+					counter[fight] = 0
+					formation_counts += np.bincount(zones.formations[zone][slot], minlength=256)
+			frames = (frames + FRAMES_PER_STEP) & 0xFFFF
+
+		return WalkResult(traversal, encounters, battle, formation_counts, seeds, frames,
+						  sum(zone >= 0 for zone in path))
+
+	def walk_reference(self, traversal: Traversal, seed: int, frame: int) -> Tuple[List[int], int, int]:
+		"""
+		One walker with rng_reference and plain Python
+
+		Returns:
+			(formations fought, final seed, final frame counter)
+		"""
+		zones = self.zones
+		fought = []
+		counter = 0
+		candidates = [(index, zones.rect[index].tolist()) for index in range(len(zones.map_id))
+					  if zones.active[index] and zones.map_id[index] == traversal.map_id]
+		for x, y in traversal.tiles.tolist():
+			zone = next((index for index, (x1, y1, x2, y2) in candidates if x1 <= x <= x2 and y1 <= y <= y2), -1)
+			if zone >= 0:
+				rate = int(zones.rate[zone])
+				counter += 1
+				if counter > rate // 2:
+					seed, roll = rng_reference(seed, frame, rate)
+					if roll < ENCOUNTER_CHANCE:
+						seed, byte = rng_reference(seed, frame)
+						cumulative = zones.cumulative[zone].tolist()
+						target = byte * cumulative[-1] // 256
+						slot = next(i for i, total in enumerate(cumulative) if total > target)
+						fought.append(int(zones.formations[zone][slot]))
+						frame += int(round(zones.seconds[zone][slot] * FRAMES_PER_SECOND))
+						counter = 0
+			frame = (frame + FRAMES_PER_STEP) & 0xFFFF
+		return fought, seed, frame
+
+	def run(self, paths: Sequence[Traversal], walks: int = 100_000, seed: int = 0) -> List[WalkResult]:
+		"""Every traversal with the same starting walkers"""
+		initial = self.initial_state(walks, seed)
+		return [self.simulate(traversal, initial=initial) for traversal in paths]
+
+
+def traversal_table(results: Sequence[WalkResult]) -> ColumnTable:
+	"""One row per traversal"""
+	if not results:
+		return ColumnTable({})
+	rows = [result.summary() for result in results]
+	return ColumnTable({name: np.array([row[name] for row in rows], dtype=object if name == 'name' else None)
+						for name in rows[0]})
+
+
+def compare(base: bytes, other: bytes, paths: Optional[Sequence[Traversal]] = None,
+			walks: int = 100_000, seed: int = 0, curve: Optional[PartyCurve] = None) -> ColumnTable:
+	"""
+	Base/other/delta per traversal for two ROMs
+
+	Traversals come from the base ROM's map data (or are given), so the
+	comparison isolates the encounter tables; both ROMs use the same walkers.
+	"""
+	paths = list(paths) if paths is not None else traversals(base)
+	tables = [traversal_table(EncounterSimulator.from_rom(rom, curve).run(paths, walks, seed))
+			  for rom in (base, other)]
+	if not paths:
+		return ColumnTable({})
+	columns = {name: tables[0][name] for name in ('map', 'name', 'steps')}
+	for metric in TRAVERSAL_METRICS:
+		columns[f'{metric}_base'] = tables[0][metric].astype(np.float64)
+		columns[f'{metric}_other'] = tables[1][metric].astype(np.float64)
+		columns[f'{metric}_delta'] = columns[f'{metric}_other'] - columns[f'{metric}_base']
+	return ColumnTable(columns)
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def print_results(results: Sequence[WalkResult], formations: bool = False) -> None:
+	print(f"\n{'Traversal':<34} {'Steps':>6} {'Battles':>8} {'Std':>6} {'None':>6} {'Battle s':>9} {'Total s':>8}")
+	print("=" * 83)
+	for result in results:
+		row = result.summary()
+		print(f"{row['name'][:34]:<34} {row['steps']:>6} {row['encounters']:>8.2f} {row['encounters_std']:>6.2f} "
+			  f"{row['no_encounter']:>6.1%} {row['battle_seconds']:>9.1f} {row['total_seconds']:>8.1f}")
+		if formations:
+			for formation, share in list(result.formation_frequency().items())[:8]:
+				print(f"    Formation {formation:3d}: {share:6.1%}")
+
+
+def print_comparison(delta: ColumnTable, base_name: str, other_name: str) -> None:
+	print(f"\n=== Encounters: {base_name} -> {other_name} ===\n")
+	print(f"{'Traversal':<34} {'Battles':>16} {'None':>16} {'Total s':>18}")
+	print("=" * 87)
+	for row in delta.rows():
+		print(f"{row['name'][:34]:<34} "
+			  f"{row['encounters_base']:>6.2f} -> {row['encounters_other']:<6.2f} "
+			  f"{row['no_encounter_base']:>6.1%} -> {row['no_encounter_other']:<6.1%} "
+			  f"{row['total_seconds_base']:>7.1f} -> {row['total_seconds_other']:<7.1f}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ Encounter Simulator')
+	parser.add_argument('rom', type=str, help='FFMQ ROM file')
+	parser.add_argument('--map', type=int, action='append', dest='maps', help='Only traversals on this map')
+	parser.add_argument('--walks', type=int, default=100_000, help='Walkers per traversal')
+	parser.add_argument('--seed', type=int, default=0, help='Seed for the walkers\' starting state')
+	parser.add_argument('--formations', action='store_true', help='Show formation frequency')
+	parser.add_argument('--compare', type=str, metavar='ROM', help='What-if comparison against another ROM')
+	parser.add_argument('--curve', type=str, metavar='FILE', help='Party curve JSON for battle lengths')
+	parser.add_argument('--output', type=str, help='Write the traversal table (.csv or .json)')
+
+	args = parser.parse_args()
+
+	rom = Path(args.rom).read_bytes()
+	curve = PartyCurve.from_json(Path(args.curve)) if args.curve else None
+	paths = traversals(rom, args.maps)
+	if not paths:
+		print("No traversals (no door records on the selected maps)")
+		return 1
+
+	started = time.perf_counter()
+	if args.compare:
+		table = compare(rom, Path(args.compare).read_bytes(), paths, args.walks, args.seed, curve)
+		print_comparison(table, Path(args.rom).name, Path(args.compare).name)
+	else:
+		results = EncounterSimulator.from_rom(rom, curve).run(paths, args.walks, args.seed)
+		table = traversal_table(results)
+		print_results(results, args.formations)
+	print(f"\n{len(paths)} traversals x {args.walks:,} walks in {time.perf_counter() - started:.1f}s")
+
+	if args.output:
+		output = Path(args.output)
+		count = table.to_json(output) if output.suffix == '.json' else table.to_csv(output)
+		print(f"✓ Wrote {count} rows to {output}")
+
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
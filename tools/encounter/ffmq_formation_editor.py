@@ -44,17 +44,22 @@ Usage:
 	python ffmq_formation_editor.py rom.sfc --edit-formation 10 --slot 0 --enemy 5
 	python ffmq_formation_editor.py rom.sfc --list-zones 0
 	python ffmq_formation_editor.py rom.sfc --edit-zone 0 5 --rate 20
+	python ffmq_formation_editor.py rom.sfc --edit-zone 5 --rate 40 --simulate
 	python ffmq_formation_editor.py rom.sfc --export formations.json
 """
 
 import argparse
 import json
 import struct
+import sys
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from record_tables import ENCOUNTER_ZONES, FORMATIONS
+
 
 class FormationType(Enum):
 	"""Formation types"""
@@ -117,16 +122,16 @@ class EncounterZone:
 class FFMQFormationDatabase:
 	"""Database of FFMQ formations and encounters"""
 	
-	# Formation data location
-	FORMATION_DATA_OFFSET = 0x330000
-	NUM_FORMATIONS = 256
-	FORMATION_SIZE = 32
+	# Formation data location (record layout: record_tables.FORMATIONS)
+	FORMATION_DATA_OFFSET = FORMATIONS.offset
+	NUM_FORMATIONS = FORMATIONS.count
+	FORMATION_SIZE = FORMATIONS.stride
 	ENEMIES_PER_FORMATION = 8
 	
-	# Encounter zone data
-	ENCOUNTER_ZONE_OFFSET = 0x340000
-	NUM_ENCOUNTER_ZONES = 512
-	ZONE_SIZE = 32
+	# Encounter zone data (record layout: record_tables.ENCOUNTER_ZONES)
+	ENCOUNTER_ZONE_OFFSET = ENCOUNTER_ZONES.offset
+	NUM_ENCOUNTER_ZONES = ENCOUNTER_ZONES.count
+	ZONE_SIZE = ENCOUNTER_ZONES.stride
 	
 	# Known formations
 	FORMATIONS = {
@@ -186,26 +191,14 @@ class FFMQFormationEditor:
 		if formation_id >= FFMQFormationDatabase.NUM_FORMATIONS:
 			return None
 		
-		offset = FFMQFormationDatabase.FORMATION_DATA_OFFSET + (formation_id * FFMQFormationDatabase.FORMATION_SIZE)
+		formations = FORMATIONS.view(self.rom_data)
 		
-		if offset + FFMQFormationDatabase.FORMATION_SIZE > len(self.rom_data):
+		if formation_id >= len(formations):
 			return None
 		
-		# Read formation header
-		formation_flags = self.rom_data[offset]
-		
 		# Read enemy slots
 		enemies = []
-		for slot_id in range(FFMQFormationDatabase.ENEMIES_PER_FORMATION):
-			slot_offset = offset + 1 + (slot_id * 3)
-			
-			if slot_offset + 3 > len(self.rom_data):
-				break
-			
-			enemy_id = self.rom_data[slot_offset]
-			x = self.rom_data[slot_offset + 1]
-			y = self.rom_data[slot_offset + 2]
-			
+		for slot_id, (enemy_id, x, y) in enumerate(formations[formation_id]['slots'].tolist()):
 			active = (enemy_id != 0xFF)
 			
 			if enemy_id == 0xFF:
@@ -262,20 +255,21 @@ class FFMQFormationEditor:
 		if slot_id >= FFMQFormationDatabase.ENEMIES_PER_FORMATION:
 			return False
 		
-		offset = FFMQFormationDatabase.FORMATION_DATA_OFFSET + (formation_id * FFMQFormationDatabase.FORMATION_SIZE)
-		slot_offset = offset + 1 + (slot_id * 3)
+		formations = FORMATIONS.view(self.rom_data)
 		
-		if slot_offset + 3 > len(self.rom_data):
+		if formation_id >= len(formations):
 			return False
 		
+		slot = formations['slots'][formation_id, slot_id]
+		
 		# Set enemy ID
-		self.rom_data[slot_offset] = enemy_id
+		slot['enemy'] = enemy_id
 		
 		# Set position
 		if x is not None:
-			self.rom_data[slot_offset + 1] = min(x, 255)
+			slot['x'] = min(x, 255)
 		if y is not None:
-			self.rom_data[slot_offset + 2] = min(y, 255)
+			slot['y'] = min(y, 255)
 		
 		if self.verbose:
 			enemy_name = FFMQFormationDatabase.get_enemy_name(enemy_id)
@@ -288,18 +282,13 @@ class FFMQFormationEditor:
 		if zone_id >= FFMQFormationDatabase.NUM_ENCOUNTER_ZONES:
 			return None
 		
-		offset = FFMQFormationDatabase.ENCOUNTER_ZONE_OFFSET + (zone_id * FFMQFormationDatabase.ZONE_SIZE)
+		zones = ENCOUNTER_ZONES.view(self.rom_data)
 		
-		if offset + FFMQFormationDatabase.ZONE_SIZE > len(self.rom_data):
+		if zone_id >= len(zones):
 			return None
 		
-		# Read zone data
-		map_id = self.rom_data[offset]
-		x1 = self.rom_data[offset + 1]
-		y1 = self.rom_data[offset + 2]
-		x2 = self.rom_data[offset + 3]
-		y2 = self.rom_data[offset + 4]
-		encounter_rate = self.rom_data[offset + 5]
+		record = zones[zone_id]
+		map_id = int(record['map_id'])
 		
 		# Check if zone is active
 		if map_id == 0xFF:
@@ -308,15 +297,7 @@ class FFMQFormationEditor:
 		# Read formations (up to 8)
 		formations = []
 		weights = []
-		for i in range(8):
-			form_offset = offset + 8 + (i * 2)
-			
-			if form_offset + 2 > len(self.rom_data):
-				break
-			
-			formation_id = self.rom_data[form_offset]
-			weight = self.rom_data[form_offset + 1]
-			
+		for formation_id, weight in record['slots'].tolist():
 			if formation_id != 0xFF:
 				formations.append(formation_id)
 				weights.append(weight)
@@ -324,13 +305,13 @@ class FFMQFormationEditor:
 		zone = EncounterZone(
 			zone_id=zone_id,
 			map_id=map_id,
-			x1=x1,
-			y1=y1,
-			x2=x2,
-			y2=y2,
+			x1=int(record['x1']),
+			y1=int(record['y1']),
+			x2=int(record['x2']),
+			y2=int(record['y2']),
 			formations=formations,
 			weights=weights,
-			encounter_rate=encounter_rate
+			encounter_rate=int(record['encounter_rate'])
 		)
 		
 		return zone
@@ -357,12 +338,12 @@ class FFMQFormationEditor:
 		if zone_id >= FFMQFormationDatabase.NUM_ENCOUNTER_ZONES:
 			return False
 		
-		offset = FFMQFormationDatabase.ENCOUNTER_ZONE_OFFSET + (zone_id * FFMQFormationDatabase.ZONE_SIZE)
+		zones = ENCOUNTER_ZONES.view(self.rom_data)
 		
-		if offset + FFMQFormationDatabase.ZONE_SIZE > len(self.rom_data):
+		if zone_id >= len(zones):
 			return False
 		
-		self.rom_data[offset + 5] = min(rate, 255)
+		zones['encounter_rate'][zone_id] = min(rate, 255)
 		
 		if self.verbose:
 			print(f"✓ Set zone {zone_id} encounter rate to {rate} steps")
@@ -413,6 +394,9 @@ def main():
 	parser.add_argument('--show-zone', type=int, help='Show zone details')
 	parser.add_argument('--edit-zone', type=int, help='Edit encounter zone')
 	parser.add_argument('--rate', type=int, help='Encounter rate (steps)')
+	parser.add_argument('--simulate', action='store_true',
+						help='Simulate walks of the zone\'s map before and after the edit')
+	parser.add_argument('--walks', type=int, default=100_000, help='Walkers per traversal for --simulate')
 	parser.add_argument('--export', type=str, help='Export to JSON')
 	parser.add_argument('--save', type=str, help='Save modified ROM')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
@@ -514,6 +498,18 @@ def main():
 	if args.edit_zone is not None and args.rate is not None:
 		success = editor.modify_encounter_rate(args.edit_zone, args.rate)
 		
+		if success and args.simulate:
+			from encounter_simulator import compare, print_comparison, traversals
+			
+			original = Path(args.rom).read_bytes()
+			zone = editor.extract_encounter_zone(args.edit_zone)
+			paths = traversals(original, [zone.map_id]) if zone else []
+			if paths:
+				delta = compare(original, editor.rom_data, paths, args.walks)
+				print_comparison(delta, Path(args.rom).name, f"zone {args.edit_zone} rate {args.rate}")
+			else:
+				print(f"No traversals on the map of zone {args.edit_zone}")
+		
 		if success and args.save:
 			editor.save_rom(Path(args.save))
 		
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Encounter Simulator - Test Suite
+
+Checks the vectorized RNG and walkers against the instruction-level RNG
+and a one-walker reference, encounter and formation rates against the
+zone data, traversals built from the map tables, and ROM-vs-ROM deltas.
+
+Usage:
+	python test_encounter_simulator.py
+"""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from encounter_simulator import (
+	BATTLE_OVERHEAD, EncounterSimulator, Traversal, compare, rng_next, rng_reference, traversals
+)
+from difficulty_curve import DifficultyCurve, PartyCurve, SECONDS_PER_TURN
+from ffmq_formation_editor import FFMQFormationEditor
+from record_tables import DOOR_TABLE, EDITOR_ENEMIES, ENCOUNTER_ZONES, FORMATIONS, MAP_HEADERS
+
+CURVE = PartyCurve.from_progression({0: (5, 120, 30, 10)})
+
+
+def sample_rom() -> bytearray:
+	rom = bytearray(0x344000)
+	zones = ENCOUNTER_ZONES.view(rom)
+	zones['map_id'] = 0xFF
+	zones['slots']['formation'] = 0xFF
+	zones[0] = (3, 0, 0, 20, 20, 12, [(1, 3), (2, 1)] + [(0xFF, 0)] * 6)
+	zones[1] = (3, 21, 0, 60, 60, 30, [(4, 0), (5, 0)] + [(0xFF, 0)] * 6)		# Uniform
+	zones[2] = (3, 0, 21, 20, 60, 0, [(6, 1)] + [(0xFF, 0)] * 7)			# Rate 0
+	zones[3] = (3, 0, 0, 20, 20, 2, [(7, 1)] + [(0xFF, 0)] * 7)			# Behind zone 0
+	formations = FORMATIONS.view(rom)['slots']['enemy']
+	formations[:] = 0xFF
+	formations[1:8, :3] = np.arange(1, 22).reshape(7, 3)
+	enemies = EDITOR_ENEMIES.view(rom)
+	enemies['hp'][:30] = np.arange(30) * 20 + 50
+	enemies['defense'][:30] = 5
+	return rom
+
+
+def square_walk(start, size: int, laps: int) -> Traversal:
+	x, y = start
+	corners = [(x + size, y), (x + size, y + size), (x, y + size), (x, y)]
+	tiles = []
+	for _ in range(laps):
+		for corner in corners:
+			part = Traversal.between('', 3, (x, y), corner).tiles
+			tiles.append(part)
+			x, y = corner
+	return Traversal('Square', 3, np.concatenate(tiles))
+
+
+class TestRNG(unittest.TestCase):
+	def test_vectorized_matches_reference(self):
+		# $4000: the second ASL shifts a 1 into the carry, which the first ADC adds
+		self.assertEqual(rng_reference(0x4000, 0), (0x7712, 0x77))
+		self.assertEqual(rng_reference(0xFFFF, 0xFFFF, 7), (0x370E, 0x37 % 7))
+
+		rng = np.random.default_rng(0)
+		seeds, frames = rng.integers(0, 0x10000, (2, 50000))
+		modulo = rng.integers(0, 256, 50000)
+		new_seeds, results = rng_next(seeds, frames, modulo)
+		expected = [rng_reference(s, f, m) for s, f, m in zip(seeds.tolist(), frames.tolist(), modulo.tolist())]
+		self.assertEqual(list(zip(new_seeds.tolist(), results.tolist())), expected)
+
+
+class TestWalks(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.rom = sample_rom()
+		cls.simulator = EncounterSimulator.from_rom(cls.rom, CURVE)
+
+	def test_walkers_match_reference(self):
+		path = Traversal.between('Cross', 3, (0, 5), (45, 70))
+		seeds, frames = EncounterSimulator.initial_state(300, seed=4)
+		result = self.simulator.simulate(path, initial=(seeds, frames))
+		self.assertEqual((path.steps, result.zone_steps), (110, 100))		# y 61..70 is past zone 1
+		fought = []
+		for walker, (seed, frame) in enumerate(zip(seeds.tolist(), frames.tolist())):
+			formations, final_seed, final_frame = self.simulator.walk_reference(path, seed, frame)
+			self.assertEqual((final_seed, final_frame), (result.seeds[walker], result.frames[walker]))
+			self.assertEqual(len(formations), result.encounters[walker])
+			fought += formations
+		self.assertEqual(np.bincount(fought, minlength=256).tolist(), result.formation_counts.tolist())
+
+	def test_rates_and_weights(self):
+		zones = self.simulator.zones
+		self.assertEqual(zones.zone_at(3, [(5, 5), (30, 5), (5, 30), (70, 70)]).tolist(), [0, 1, -1, -1])
+		encounters = DifficultyCurve.from_rom(self.rom, CURVE).encounters
+		first = np.flatnonzero((encounters['zone'] == 0) & (encounters['formation'] == 1))[0]
+		self.assertAlmostEqual(zones.seconds[0, 0], BATTLE_OVERHEAD + encounters['clear_turns'][first] * SECONDS_PER_TURN)
+
+		inside = self.simulator.simulate(square_walk((2, 2), 15, 20), walks=20000, seed=1)
+		steps_per_battle = inside.traversal.steps / inside.encounters.mean()
+		self.assertLess(abs(steps_per_battle - 12) / 12, 0.15)
+		share = inside.formation_frequency()
+		self.assertEqual(list(share), [1, 2])
+		self.assertAlmostEqual(share[1], 0.75, delta=0.02)
+		self.assertNotIn(7, share)
+
+		uniform = self.simulator.simulate(square_walk((25, 5), 30, 5), walks=20000, seed=1).formation_frequency()
+		self.assertAlmostEqual(uniform[4], 0.5, delta=0.02)
+
+		quiet = self.simulator.simulate(Traversal.between('Quiet', 3, (5, 21), (5, 60)), walks=1000)
+		self.assertEqual((quiet.zone_steps, quiet.encounters.sum()), (0, 0))
+
+	def test_million_walks(self):
+		path = Traversal.between('Long', 3, (0, 0), (60, 20))
+		started = time.perf_counter()
+		result = self.simulator.simulate(path, walks=1_000_000)
+		self.assertLess(time.perf_counter() - started, 15.0)
+		self.assertEqual(result.walks, 1_000_000)
+		self.assertAlmostEqual(result.summary()['encounters'], result.encounters.mean())
+
+
+class TestMapsAndCompare(unittest.TestCase):
+	def test_traversals_and_compare(self):
+		rom = sample_rom()
+		headers, doors = MAP_HEADERS.view(rom), DOOR_TABLE.view(rom)
+		headers[3] = (64, 64, 0, 0, 2, 3)
+		doors['source_map'] = 0xFF
+		doors[5] = (3, 40, 9, 4, 0, 0)
+		paths = traversals(rom)
+		self.assertEqual([(p.name, p.map_id, p.steps) for p in paths], [("Map 3 -> 4 (door 5)", 3, 38 + 6)])
+		self.assertEqual(paths[0].tiles[-1].tolist(), [40, 9])
+		self.assertEqual(traversals(rom, [2]), [])
+
+		same = compare(rom, bytes(rom), walks=2000, curve=CURVE)
+		self.assertEqual(same['encounters_delta'].tolist(), [0.0])
+
+		# Slower rates set through the formation editor mean fewer, cheaper walks
+		with tempfile.TemporaryDirectory() as folder:
+			path = Path(folder) / 'rom.sfc'
+			path.write_bytes(rom)
+			editor = FFMQFormationEditor(path)
+			editor.modify_encounter_rate(0, 200)
+			editor.modify_encounter_rate(1, 200)
+			delta = compare(rom, editor.rom_data, walks=5000, curve=CURVE)
+		self.assertLess(delta['encounters_other'][0], delta['encounters_base'][0])
+		self.assertLess(delta['total_seconds_delta'][0], 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
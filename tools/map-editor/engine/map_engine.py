@@ -4,11 +4,20 @@ Map Engine for FFMQ Map Editor
 Handles map data, tile operations, and undo/redo
 """
 
+import itertools
 import numpy as np
-from typing import Optional, Tuple, List
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import IntEnum
 
+from engine.region_ops import (RegionEdit, apply_mask, flood_region, rectangle_mask,
+							   select_tiles, stamp_mask)
+from utils.config import Config
+from utils.edit_history import EditHistory, HistoryEntry
+from utils.map_serializer import MapCache, MapSerializer, RomMap
+from utils.rom_handler import ROMHandler
+
 class MapType(IntEnum):
 	"""Map type enumeration"""
 	OVERWORLD = 0
@@ -49,6 +58,12 @@ class Tile:
 	priority: bool = False
 	collision: int = 0
 
+class MapChange(NamedTuple):
+	"""Tiles changed by an edit, sent to MapEngine listeners"""
+	layer: Optional[LayerType]		# None = whole map replaced
+	ys: Optional[np.ndarray]		# None = whole layer
+	xs: Optional[np.ndarray]
+
 class MapData:
 	"""Container for map layer data"""
 	
@@ -90,23 +105,6 @@ class MapData:
 			return self.bg3_attrs
 		raise ValueError(f"Invalid layer: {layer}")
 
-class UndoAction:
-	"""Represents an undoable action"""
-	
-	def __init__(self, action_type: str, layer: LayerType, 
-				 tiles: List[Tuple[int, int, int]]):
-		"""
-		Initialize undo action
-		
-		Args:
-			action_type: Type of action (paint, fill, etc.)
-			layer: Layer that was modified
-			tiles: List of (x, y, old_tile_id) tuples
-		"""
-		self.action_type = action_type
-		self.layer = layer
-		self.tiles = tiles
-
 class MapEngine:
 	"""Core map engine for editing maps"""
 	
@@ -118,36 +116,205 @@ class MapEngine:
 		self.header = MapHeader()
 		self.map_data: Optional[MapData] = None
 		
-		# Undo/redo stacks
-		self.undo_stack: List[UndoAction] = []
-		self.redo_stack: List[UndoAction] = []
-		self.max_undo = 100
+		# Undo/redo history, bounded by memory rather than action count
+		budget = config.get('undo_budget_mb', 32) if config else 32
+		if isinstance(config, Config):
+			journal = config.get_path('undo_journal')
+		else:
+			journal = Path(config['undo_journal']) if config and config.get('undo_journal') else None
+		self.history = EditHistory(budget * 1024 * 1024, journal)
+		
+		# What the current map was opened from, stored in the journal for recovery
+		self.map_source: Dict[str, Any] = {}
+		
+		# Brush stroke currently being painted (edits in one stroke undo together)
+		self._stroke_ids = itertools.count(1)
+		self.current_stroke: Optional[int] = None
+		
+		# ROM the current map was loaded from
+		self.rom: Optional[ROMHandler] = None
+		self.map_cache: Optional[MapCache] = None
+		
+		# Callbacks notified of every tile change (renderers, minimap)
+		self.listeners: List[Callable[[MapChange], None]] = []
 		
 		# Modified flag
 		self.modified = False
 	
+	def add_listener(self, callback: Callable[[MapChange], None]) -> None:
+		"""Register a callback for tile changes"""
+		if callback not in self.listeners:
+			self.listeners.append(callback)
+	
+	def remove_listener(self, callback: Callable[[MapChange], None]) -> None:
+		"""Unregister a tile change callback"""
+		if callback in self.listeners:
+			self.listeners.remove(callback)
+	
+	def _notify(self, layer: Optional[LayerType] = None, ys: Optional[np.ndarray] = None,
+				xs: Optional[np.ndarray] = None) -> None:
+		change = MapChange(layer, ys, xs)
+		for callback in self.listeners:
+			callback(change)
+	
+	@property
+	def undo_stack(self) -> Deque[HistoryEntry]:
+		return self.history.undo_stack
+	
+	@property
+	def redo_stack(self) -> Deque[HistoryEntry]:
+		return self.history.redo_stack
+	
 	def new_map(self, width: int, height: int, 
-				map_type: MapType = MapType.OVERWORLD) -> None:
-		"""Create a new map"""
+				map_type: MapType = MapType.OVERWORLD, recover: bool = False) -> None:
+		"""
+		Create a new map
+		
+		Args:
+			recover: Replay the edit journal of a crashed session onto the new map
+		"""
 		self.header = MapHeader(
 			width=width,
 			height=height,
 			map_type=map_type
 		)
 		self.map_data = MapData(width, height)
-		self.undo_stack.clear()
-		self.redo_stack.clear()
+		self.map_source = {'width': width, 'height': height, 'map_type': int(map_type)}
 		self.modified = False
+		self._reset_history(recover)
+		self._notify()
 	
-	def load_map(self, filepath: str) -> bool:
-		"""Load a map from file"""
-		# TODO: Implement map loading from FFMQ format
-		return False
+	def _reset_history(self, recover: bool = False) -> None:
+		"""Start a fresh history (and journal) for the current map data"""
+		self.history.clear()
+		for layer in LayerType:
+			self.history.register(self._layer_key(layer), self.map_data.get_layer(layer))
+		
+		recovered = False
+		try:
+			recovered = recover and self.history.recover() > 0
+		finally:
+			# A failed recovery has already moved the journal aside
+			if recovered:
+				self.modified = True
+			else:
+				self.history.checkpoint(self.map_source)
 	
-	def save_map(self, filepath: str) -> bool:
-		"""Save map to file"""
-		# TODO: Implement map saving to FFMQ format
-		return False
+	def recover_session(self) -> bool:
+		"""
+		Reopen the map a crashed session was editing and replay its journal
+		
+		The journal names its map (ROM path and map ID, or the size of a
+		blank map), which is rebuilt before the edits are replayed. A
+		journal that cannot be replayed is renamed aside, never truncated.
+		
+		Returns:
+			True if edits were recovered, False if there was no journal
+		
+		Raises:
+			ValueError: The journal could not be replayed (it is kept aside)
+		"""
+		if not self.has_recovery_journal():
+			return False
+		
+		source = self.history.journal_identity()
+		if not source:
+			aside = self.history.set_aside_journal()
+			raise ValueError(f"Journal does not name its map (kept as {aside})")
+		
+		if 'rom_path' in source:
+			if not self.load_map(source['rom_path'], source['map_id'], recover=True):
+				aside = self.history.set_aside_journal()
+				raise ValueError(f"Could not reopen map {source['map_id']} of {source['rom_path']} "
+								 f"(journal kept as {aside})")
+		else:
+			self.new_map(source['width'], source['height'], MapType(source['map_type']), recover=True)
+		return True
+	
+	def has_recovery_journal(self) -> bool:
+		"""Check for an edit journal left by a session that did not exit cleanly"""
+		path = self.history.journal_path
+		return path is not None and path.exists() and path.stat().st_size > 0
+	
+	def shutdown(self) -> None:
+		"""Clean exit: the journal is no longer needed"""
+		self.history.discard_journal()
+	
+	def load_map(self, filepath: str, map_id: int = 0, recover: bool = False) -> bool:
+		"""
+		Load a map from a ROM file
+		
+		The first load of a ROM decodes every map into the bulk cache
+		(keyed by ROM hash); later opens read from the memory-mapped cache.
+		
+		Args:
+			recover: Replay the edit journal of a crashed session onto the map
+		"""
+		if self.rom is None or self.rom.rom_path != Path(filepath):
+			rom = ROMHandler()
+			if not rom.load_rom(filepath):
+				return False
+			self.rom = rom
+			self.map_cache = None
+		
+		if self.map_cache is None:
+			cache_dir = self.config.get('map_cache_dir', 'data/map_cache') if self.config else None
+			if cache_dir:
+				self.map_cache = MapCache.open(self.rom, Path(cache_dir))
+		
+		if self.map_cache is not None:
+			rom_map = self.map_cache.get(map_id)
+		else:
+			rom_map = MapSerializer(self.rom).read_map(map_id)
+		if rom_map is None:
+			return False
+		
+		header = dict(rom_map.header)
+		if header['map_type'] in MapType._value2member_map_:
+			header['map_type'] = MapType(header['map_type'])
+		self.header = MapHeader(**header)
+		
+		self.map_data = MapData(rom_map.width, rom_map.height)
+		for layer in LayerType:
+			self.map_data.get_layer(layer)[:] = rom_map.tiles[layer]
+			self.map_data.get_attrs(layer)[:] = rom_map.attrs[layer]
+		
+		self.map_source = {'rom_path': str(Path(filepath).resolve()), 'map_id': map_id}
+		self.modified = False
+		self._reset_history(recover)
+		self._notify()
+		return True
+	
+	def save_map(self, filepath: Optional[str] = None) -> bool:
+		"""
+		Write the current map into the loaded ROM and save it
+		
+		Unchanged layers keep their original compressed bytes; changed
+		layers are recompressed in place or relocated into free space.
+		"""
+		if self.map_data is None or self.rom is None:
+			return False
+		
+		rom_map = RomMap(
+			self.header.map_id,
+			{name: int(value) for name, value in vars(self.header).items()},
+			np.stack([self.map_data.get_layer(layer) for layer in LayerType]),
+			np.stack([self.map_data.get_attrs(layer) for layer in LayerType]),
+		)
+		free_space = self.config.get('map_free_space') if self.config else None
+		free_regions = [(int(start), int(end)) for start, end in free_space] if free_space else None
+		MapSerializer(self.rom, free_regions).write_map(rom_map)
+		
+		if not self.rom.save_rom(filepath):
+			return False
+		
+		# The ROM hash changed: the bulk cache is rebuilt on next load
+		self.map_cache = None
+		self.rom.rom_path = Path(filepath) if filepath else self.rom.rom_path
+		self.map_source = {'rom_path': str(Path(self.rom.rom_path).resolve()), 'map_id': self.header.map_id}
+		self.history.checkpoint(self.map_source)
+		self.modified = False
+		return True
 	
 	def get_tile(self, x: int, y: int, layer: LayerType) -> Optional[int]:
 		"""Get tile ID at position"""
@@ -173,18 +340,21 @@ class MapEngine:
 		old_tile = int(layer_data[y, x])
 		
 		if old_tile != tile_id:
-			# Record for undo
-			self._record_undo('paint', layer, [(x, y, old_tile)])
-			
 			# Set new tile
 			layer_data[y, x] = tile_id
 			self.modified = True
+			self._notify(layer, np.array([y]), np.array([x]))
+			
+			# Record for undo
+			self.history.record_cells(self._layer_key(layer), np.array([y * layer_data.shape[1] + x]),
+									  np.array([old_tile], dtype=layer_data.dtype), 'paint',
+									  self.current_stroke)
 		
 		return True
 	
 	def flood_fill(self, x: int, y: int, tile_id: int, 
-				   layer: LayerType) -> bool:
-		"""Flood fill from position"""
+				   layer: LayerType, connectivity: int = 4) -> bool:
+		"""Flood fill from position (iterative scanline fill)"""
 		if self.map_data is None:
 			return False
 		
@@ -192,45 +362,11 @@ class MapEngine:
 			return False
 		
 		layer_data = self.map_data.get_layer(layer)
-		target_tile = int(layer_data[y, x])
-		
-		if target_tile == tile_id:
+		if int(layer_data[y, x]) == tile_id:
 			return False  # Already the right tile
 		
-		# Perform flood fill and record changed tiles
-		changed_tiles = []
-		self._flood_fill_recursive(x, y, target_tile, tile_id, 
-								   layer_data, changed_tiles)
-		
-		if changed_tiles:
-			self._record_undo('fill', layer, changed_tiles)
-			self.modified = True
-		
-		return True
-	
-	def _flood_fill_recursive(self, x: int, y: int, target: int, 
-							 replacement: int, layer_data: np.ndarray,
-							 changed_tiles: List[Tuple[int, int, int]]) -> None:
-		"""Recursive flood fill helper"""
-		if not self._is_valid_pos(x, y):
-			return
-		
-		if layer_data[y, x] != target:
-			return
-		
-		# Record old tile and set new one
-		changed_tiles.append((x, y, target))
-		layer_data[y, x] = replacement
-		
-		# Recursively fill neighbors
-		self._flood_fill_recursive(x + 1, y, target, replacement, 
-								   layer_data, changed_tiles)
-		self._flood_fill_recursive(x - 1, y, target, replacement, 
-								   layer_data, changed_tiles)
-		self._flood_fill_recursive(x, y + 1, target, replacement, 
-								   layer_data, changed_tiles)
-		self._flood_fill_recursive(x, y - 1, target, replacement, 
-								   layer_data, changed_tiles)
+		mask = flood_region(layer_data, x, y, connectivity)
+		return self.fill_mask(mask, tile_id, layer, 'fill')
 	
 	def paint_rectangle(self, x1: int, y1: int, x2: int, y2: int,
 					   tile_id: int, layer: LayerType) -> bool:
@@ -238,89 +374,112 @@ class MapEngine:
 		if self.map_data is None:
 			return False
 		
-		# Ensure coordinates are in bounds
-		x1 = max(0, min(x1, self.header.width - 1))
-		x2 = max(0, min(x2, self.header.width - 1))
-		y1 = max(0, min(y1, self.header.height - 1))
-		y2 = max(0, min(y2, self.header.height - 1))
+		mask = rectangle_mask(self.map_data.get_layer(layer).shape, x1, y1, x2, y2)
+		self.fill_mask(mask, tile_id, layer, 'rectangle')
+		return True
+	
+	def fill_mask(self, mask: np.ndarray, tile_id: int, layer: LayerType,
+				  action_type: str = 'fill_mask') -> bool:
+		"""Set every tile under a boolean mask"""
+		return self.apply_region(mask, tile_id, layer, action_type)
+	
+	def replace_all(self, old_tile: int, new_tile: int, layer: LayerType) -> int:
+		"""Replace every occurrence of a tile, returning how many changed"""
+		if self.map_data is None:
+			return 0
 		
-		# Ensure x1 <= x2 and y1 <= y2
-		if x1 > x2:
-			x1, x2 = x2, x1
-		if y1 > y2:
-			y1, y2 = y2, y1
+		mask = select_tiles(self.map_data.get_layer(layer), old_tile)
+		count = int(mask.sum()) if old_tile != new_tile else 0
+		self.apply_region(mask, new_tile, layer, 'replace')
+		return count
+	
+	def stamp_pattern(self, x: int, y: int, pattern: np.ndarray, layer: LayerType,
+					  transparent: Optional[int] = None) -> bool:
+		"""Stamp a 2D tile pattern with its top-left corner at (x, y)"""
+		if self.map_data is None:
+			return False
 		
 		layer_data = self.map_data.get_layer(layer)
-		changed_tiles = []
-		
-		# Fill rectangle
-		for y in range(y1, y2 + 1):
-			for x in range(x1, x2 + 1):
-				old_tile = int(layer_data[y, x])
-				if old_tile != tile_id:
-					changed_tiles.append((x, y, old_tile))
-					layer_data[y, x] = tile_id
-		
-		if changed_tiles:
-			self._record_undo('rectangle', layer, changed_tiles)
-			self.modified = True
+		mask, values = stamp_mask(layer_data.shape, pattern, x, y, transparent)
+		return self.apply_region(mask, values, layer, 'stamp')
+	
+	def select_by_tile(self, tile_ids: Union[int, Iterable[int]],
+					   layer: LayerType) -> Optional[np.ndarray]:
+		"""Mask of all tiles with the given ID(s)"""
+		if self.map_data is None:
+			return None
+		return select_tiles(self.map_data.get_layer(layer), tile_ids)
+	
+	def select_region(self, x: int, y: int, layer: LayerType,
+					  connectivity: int = 4) -> Optional[np.ndarray]:
+		"""Mask of the contiguous region under (x, y) (magic wand)"""
+		if self.map_data is None:
+			return None
+		return flood_region(self.map_data.get_layer(layer), x, y, connectivity)
+	
+	def apply_region(self, mask: np.ndarray, values: Union[int, np.ndarray],
+					 layer: LayerType, action_type: str) -> bool:
+		"""Write values under mask as one undoable action"""
+		if self.map_data is None:
+			return False
+		
+		edit = apply_mask(self.map_data.get_layer(layer), mask, values, action_type, layer)
+		if edit is None:
+			return False
 		
+		self._record_undo(edit)
+		self.modified = True
+		xs, ys = edit.positions()
+		self._notify(layer, ys, xs)
 		return True
 	
+	def begin_stroke(self) -> None:
+		"""Start a brush stroke; its edits coalesce into one undo step"""
+		self.current_stroke = next(self._stroke_ids)
+	
+	def end_stroke(self) -> None:
+		"""Finish the current brush stroke"""
+		self.current_stroke = None
+	
 	def undo(self) -> bool:
 		"""Undo last action"""
-		if not self.undo_stack:
+		entry = self.history.undo()
+		if entry is None:
 			return False
-		
-		action = self.undo_stack.pop()
-		layer_data = self.map_data.get_layer(action.layer)
-		
-		# Record current state for redo
-		redo_tiles = []
-		for x, y, old_tile in action.tiles:
-			current_tile = int(layer_data[y, x])
-			redo_tiles.append((x, y, current_tile))
-			layer_data[y, x] = old_tile
-		
-		# Add to redo stack
-		redo_action = UndoAction(action.action_type, action.layer, redo_tiles)
-		self.redo_stack.append(redo_action)
-		
+		self.modified = True
+		self._notify_entry(entry)
 		return True
 	
 	def redo(self) -> bool:
 		"""Redo last undone action"""
-		if not self.redo_stack:
+		entry = self.history.redo()
+		if entry is None:
 			return False
-		
-		action = self.redo_stack.pop()
-		layer_data = self.map_data.get_layer(action.layer)
-		
-		# Record current state for undo
-		undo_tiles = []
-		for x, y, old_tile in action.tiles:
-			current_tile = int(layer_data[y, x])
-			undo_tiles.append((x, y, current_tile))
-			layer_data[y, x] = old_tile
-		
-		# Add back to undo stack
-		undo_action = UndoAction(action.action_type, action.layer, undo_tiles)
-		self.undo_stack.append(undo_action)
-		
+		self.modified = True
+		self._notify_entry(entry)
 		return True
 	
-	def _record_undo(self, action_type: str, layer: LayerType,
-					tiles: List[Tuple[int, int, int]]) -> None:
-		"""Record an action for undo"""
-		action = UndoAction(action_type, layer, tiles)
-		self.undo_stack.append(action)
-		
-		# Trim undo stack if too large
-		if len(self.undo_stack) > self.max_undo:
-			self.undo_stack.pop(0)
-		
-		# Clear redo stack when new action is performed
-		self.redo_stack.clear()
+	def _notify_entry(self, entry: HistoryEntry) -> None:
+		"""Notify listeners of the tiles touched by a history entry"""
+		for delta in entry.deltas:
+			layer = LayerType(int(delta.key[len('layer'):]))
+			indices = getattr(delta, 'indices', None)
+			if indices is None:
+				self._notify(layer)
+			else:
+				ys, xs = np.divmod(indices.astype(np.intp), self.header.width)
+				self._notify(layer, ys, xs)
+	
+	def _record_undo(self, edit: RegionEdit) -> None:
+		"""Record an applied region edit in the history"""
+		layer_data = self.map_data.get_layer(edit.layer)
+		xs, ys = edit.positions()
+		self.history.record_cells(self._layer_key(edit.layer), ys * layer_data.shape[1] + xs,
+								  edit.old_values, edit.action_type, self.current_stroke)
+	
+	@staticmethod
+	def _layer_key(layer: LayerType) -> str:
+		return f'layer{int(layer)}'
 	
 	def _is_valid_pos(self, x: int, y: int) -> bool:
 		"""Check if position is within map bounds"""
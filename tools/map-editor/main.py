@@ -73,6 +73,14 @@ class FFMQMapEditor:
 		# Keyboard state
 		self.keys_pressed = set()
 		
+		# Replay edits left over from a session that did not exit cleanly
+		if self.map_engine.has_recovery_journal():
+			self.logger.info("Recovering unsaved edits from journal...")
+			try:
+				self.map_engine.recover_session()
+			except ValueError as e:
+				self.logger.warning(f"Could not recover edits: {e}")
+		
 		self.logger.info("Map Editor initialized successfully")
 	
 	def handle_events(self):
@@ -92,10 +100,14 @@ class FFMQMapEditor:
 			
 			elif event.type == pygame.MOUSEBUTTONDOWN:
 				self.mouse_pressed[event.button - 1] = True
+				if event.button == 1:
+					self.map_engine.begin_stroke()
 				self.handle_mouse_click(event.button, event.pos)
 			
 			elif event.type == pygame.MOUSEBUTTONUP:
 				self.mouse_pressed[event.button - 1] = False
+				if event.button == 1:
+					self.map_engine.end_stroke()
 			
 			elif event.type == pygame.MOUSEMOTION:
 				self.mouse_pos = event.pos
@@ -266,13 +278,19 @@ class FFMQMapEditor:
 		"""Open an existing map"""
 		self.logger.info("Opening map...")
 		# TODO: Show file open dialog
-		pass
+		rom_path = self.config.get('rom_path')
+		if not rom_path:
+			self.logger.warning("No ROM configured (set rom_path)")
+			return
+		if not self.map_engine.load_map(rom_path, self.map_engine.header.map_id):
+			self.logger.warning(f"Could not load map {self.map_engine.header.map_id}")
 	
 	def save_map(self):
 		"""Save the current map"""
 		self.logger.info("Saving map...")
 		# TODO: Show file save dialog
-		pass
+		if not self.map_engine.save_map():
+			self.logger.warning("Map not saved (no ROM loaded)")
 	
 	def undo(self):
 		"""Undo last action"""
@@ -336,6 +354,7 @@ class FFMQMapEditor:
 			self.clock.tick(self.fps)
 		
 		self.logger.info("Shutting down...")
+		self.map_engine.shutdown()
 		pygame.quit()
 		sys.exit(0)
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked map renderer
+Chunk invalidation from edit events, composition and minimap colors
+"""
+
+import os
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pygame
+
+from engine.map_engine import MapEngine, MapType, LayerType
+from ui.chunk_renderer import ChunkRenderer, placeholder_colors
+
+
+class TestChunkRenderer(unittest.TestCase):
+	"""Test chunk cache behaviour"""
+
+	@classmethod
+	def setUpClass(cls):
+		pygame.init()
+		cls.screen = pygame.display.set_mode((320, 240))
+
+	@classmethod
+	def tearDownClass(cls):
+		pygame.quit()
+
+	def setUp(self):
+		self.engine = MapEngine(None)
+		self.engine.new_map(64, 48, MapType.TOWN)
+		self.renderer = ChunkRenderer(tile_size=4)
+		self.renderer.attach(self.engine)
+		self.rect = self.screen.get_rect()
+		self.colors = placeholder_colors()
+
+	def test_draw_visible_chunks_only(self):
+		"""Test a frame builds each visible chunk once, then reuses it"""
+		self.assertEqual(self.renderer.chunk_grid(), (4, 3))
+		drawn = self.renderer.draw(self.screen, self.rect, 0, 0)
+		self.assertEqual(drawn, 12)
+		self.assertEqual(self.renderer.chunks_built, 12)
+
+		self.renderer.draw(self.screen, self.rect, 0, 0)
+		self.assertEqual(self.renderer.chunks_built, 12)
+
+	def test_edit_rebuilds_touched_chunk(self):
+		"""Test painting only rebuilds the chunk under the brush"""
+		self.renderer.draw(self.screen, self.rect, 0, 0)
+		self.engine.set_tile(20, 5, 7, LayerType.BG1_GROUND)
+		self.assertNotIn((1, 0), self.renderer.surfaces)
+		self.assertIn((0, 0), self.renderer.surfaces)
+
+		self.renderer.draw(self.screen, self.rect, 0, 0)
+		self.assertEqual(self.renderer.chunks_built, 13)
+		self.assertEqual(tuple(self.screen.get_at((20 * 4 + 1, 5 * 4 + 1)))[:3],
+						 tuple(self.colors[LayerType.BG1_GROUND, 7]))
+
+		self.engine.undo()
+		self.assertNotIn((1, 0), self.renderer.surfaces)
+
+	def test_upper_layers_compose_over_ground(self):
+		"""Test the topmost non-empty layer wins and hidden layers are skipped"""
+		self.engine.set_tile(2, 2, 5, LayerType.BG1_GROUND)
+		self.engine.set_tile(2, 2, 9, LayerType.BG2_UPPER)
+		top, tiles = self.renderer.compose(0, 0)
+		self.assertEqual((top[2, 2], tiles[2, 2]), (LayerType.BG2_UPPER, 9))
+
+		self.renderer.set_layer_visible(LayerType.BG2_UPPER, False)
+		top, tiles = self.renderer.compose(0, 0)
+		self.assertEqual((top[2, 2], tiles[2, 2]), (LayerType.BG1_GROUND, 5))
+
+	def test_minimap_follows_edits(self):
+		"""Test the minimap image updates from dirty chunks only"""
+		rgb = self.renderer.minimap_rgb()
+		self.assertEqual(rgb.shape, (48, 64, 3))
+		self.assertFalse(self.renderer.minimap_dirty)
+
+		self.engine.paint_rectangle(40, 30, 45, 33, 12, LayerType.BG3_EVENTS)
+		self.assertEqual(self.renderer.minimap_dirty, {(2, 1), (2, 2)})
+		rgb = self.renderer.minimap_rgb()
+		np.testing.assert_array_equal(rgb[31, 42], self.colors[LayerType.BG3_EVENTS, 12])
+		np.testing.assert_array_equal(rgb[0, 0], self.colors[LayerType.BG1_GROUND, 0])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for the edit history subsystem
+Delta packing, byte budget, stroke coalescing and journal recovery
+"""
+
+import unittest
+import numpy as np
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.map_engine import MapEngine, MapType, LayerType
+from utils.edit_history import ArrayDelta, EditHistory, XorDelta
+
+
+class TestEditHistory(unittest.TestCase):
+	"""Test the generic history"""
+
+	def setUp(self):
+		self.data = np.zeros((64, 64), dtype=np.uint8)
+		self.history = EditHistory(budget_bytes=4096)
+		self.history.register('layer', self.data)
+
+	def edit(self, window, value, group=None):
+		before = self.data.copy()
+		self.data[window] = value
+		self.history.record_diff('layer', before, 'edit', group)
+
+	def test_small_edit_packed_as_indices(self):
+		"""Test sparse edits store only the changed cells"""
+		self.edit((5, slice(0, 4)), 7)
+		delta = self.history.undo_stack[-1].deltas[0]
+		self.assertIsInstance(delta, ArrayDelta)
+		self.assertEqual(delta.indices.dtype, np.uint16)
+		self.assertEqual(delta.nbytes, 4 * 2 + 4 + 4)
+
+	def test_large_edit_packed_as_xor(self):
+		"""Test whole-layer edits compress and undo/redo both ways"""
+		self.data[::2] = 3
+		before = self.data.copy()
+		self.edit(slice(None), 9)
+		self.assertIsInstance(self.history.undo_stack[-1].deltas[0], XorDelta)
+		self.assertLess(self.history.nbytes, 200)
+
+		self.history.undo()
+		np.testing.assert_array_equal(self.data, before)
+		self.history.redo()
+		self.assertTrue((self.data == 9).all())
+
+	def test_byte_budget_evicts_oldest(self):
+		"""Test history stays under budget by dropping the oldest entries"""
+		for i in range(200):
+			self.edit((i % 64, slice(0, 16)), i % 250 + 1)
+		self.assertLessEqual(self.history.nbytes, self.history.budget_bytes)
+		self.assertLess(len(self.history.undo_stack), 200)
+
+	def test_byte_budget_counts_redo(self):
+		"""Test redo entries are evicted too, the farthest redo first"""
+		for i in range(6):
+			self.edit((i, slice(0, 16)), i + 1)
+		for _ in range(5):
+			self.history.undo()
+		self.history.budget_bytes = self.history.nbytes // 2
+		self.history._enforce_budget()
+
+		self.assertLessEqual(self.history.nbytes, self.history.budget_bytes)
+		self.assertEqual(len(self.history.undo_stack), 1)
+		self.assertLess(len(self.history.redo_stack), 5)
+		self.assertEqual(self.history.nbytes, sum(entry.nbytes for entry in self.history.redo_stack)
+						 + self.history.undo_stack[0].nbytes)
+		while self.history.redo():
+			pass
+		self.assertEqual(self.data[1, 0], 2)			# The nearest redo entries survive
+
+	def test_stroke_coalescing(self):
+		"""Test edits in one group undo as a single step"""
+		for x in range(10):
+			self.edit((3, x), 5, group=1)
+		self.edit((3, 0), 6, group=1)
+		self.assertEqual(len(self.history.undo_stack), 1)
+		self.assertEqual(self.history.undo_stack[0].deltas[0].indices.size, 10)
+
+		self.history.undo()
+		self.assertFalse(self.data.any())
+
+	def test_mixed_group_keeps_order(self):
+		"""Test a group mixing index and XOR deltas undoes and redoes in order"""
+		self.edit((0, 0), 1, group=2)
+		self.edit(slice(0, 8), 2, group=2)
+		self.edit((0, 5), 3, group=2)
+		deltas = self.history.undo_stack[-1].deltas
+		self.assertEqual([type(delta) for delta in deltas], [ArrayDelta, XorDelta, ArrayDelta])
+		after = self.data.copy()
+
+		self.history.undo()
+		self.assertFalse(self.data.any())
+		self.history.redo()
+		np.testing.assert_array_equal(self.data, after)
+		self.assertEqual((self.data[0, 0], self.data[0, 5]), (2, 3))
+
+	def test_item_targets(self):
+		"""Test mapping targets such as dialog text"""
+		texts = {1: 'Hello'}
+		self.history.register('dialog', texts)
+		texts[1] = 'Hi'
+		self.history.record_item('dialog', 1, 'Hello', 'Hi', 'text')
+		texts[2] = 'New'
+		self.history.record_item('dialog', 2, None, 'New', 'text')
+
+		self.history.undo()
+		self.history.undo()
+		self.assertEqual(texts, {1: 'Hello'})
+
+
+class TestEngineHistory(unittest.TestCase):
+	"""Test MapEngine integration and crash recovery"""
+
+	def setUp(self):
+		self.temp = tempfile.TemporaryDirectory()
+		self.journal = Path(self.temp.name) / 'journal.bin'
+		config = {'undo_journal': str(self.journal)}
+		self.engine = MapEngine(config)
+		self.engine.new_map(32, 32, MapType.TOWN)
+
+	def tearDown(self):
+		self.engine.history.close_journal()
+		self.temp.cleanup()
+
+	def test_brush_stroke_single_undo(self):
+		"""Test a dragged pencil stroke undoes in one step"""
+		self.engine.begin_stroke()
+		for x in range(8):
+			self.engine.set_tile(x, 4, 2, LayerType.BG1_GROUND)
+		self.engine.end_stroke()
+		self.engine.set_tile(0, 0, 3, LayerType.BG1_GROUND)
+
+		self.assertEqual(len(self.engine.undo_stack), 2)
+		self.engine.undo()
+		self.engine.undo()
+		self.assertFalse(self.engine.map_data.get_layer(LayerType.BG1_GROUND).any())
+
+	def test_recover_after_crash(self):
+		"""Test a new session replays the journal of an unclean exit"""
+		self.engine.flood_fill(0, 0, 4, LayerType.BG2_UPPER)
+		self.engine.set_tile(1, 1, 7, LayerType.BG1_GROUND)
+		self.engine.set_tile(2, 2, 8, LayerType.BG1_GROUND)
+		self.engine.undo()
+		expected = [self.engine.map_data.get_layer(layer).copy() for layer in LayerType]
+
+		# Simulate a crash: the journal is never discarded
+		self.engine.history.close_journal()
+
+		recovered = MapEngine({'undo_journal': str(self.journal)})
+		self.assertTrue(recovered.has_recovery_journal())
+		self.assertTrue(recovered.recover_session())
+		self.assertEqual((recovered.get_map_size(), recovered.header.map_type), ((32, 32), MapType.TOWN))
+		for layer, layer_data in zip(LayerType, expected):
+			np.testing.assert_array_equal(recovered.map_data.get_layer(layer), layer_data)
+
+		# The undone edit is still redoable after recovery
+		self.assertTrue(recovered.redo())
+		self.assertEqual(recovered.get_tile(2, 2, LayerType.BG1_GROUND), 8)
+		recovered.shutdown()
+		self.assertFalse(self.journal.exists())
+
+
+if __name__ == '__main__':
+	unittest.main()
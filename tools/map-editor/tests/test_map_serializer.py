@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for ROM map serialization
+Layer round trips, byte-identical saves, relocation and the bulk cache
+"""
+
+import unittest
+import numpy as np
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.map_engine import MapEngine, LayerType
+from utils.compression import FFMQCompression
+from utils.map_serializer import LAYER_COUNT, MapCache, MapSerializer, RomMap
+from utils.rom_handler import ROMHandler
+
+
+def make_map(map_id: int, width: int, height: int, seed: int) -> RomMap:
+	"""Map with flat areas and a few noisy patches, like real tilemaps"""
+	rng = np.random.default_rng(seed)
+	tiles = np.zeros((LAYER_COUNT, height, width), dtype=np.uint8)
+	attrs = np.zeros((LAYER_COUNT, height, width), dtype=np.uint8)
+	tiles[0] = 0x10 + seed
+	tiles[0, 2:5, 3:9] = rng.integers(0, 256, (3, 6))
+	tiles[1, height // 2:] = 0x22
+	attrs[0, :, ::4] = 0x20
+	header = {
+		'map_id': map_id, 'map_type': 1, 'width': width, 'height': height,
+		'tileset_id': 2, 'palette_id': 3, 'music_id': 0x104, 'encounter_rate': 5,
+		'encounter_group': 6, 'spawn_x': 4, 'spawn_y': 7, 'flags': 1,
+	}
+	return RomMap(map_id, header, tiles, attrs)
+
+
+class TestMapSerializer(unittest.TestCase):
+	"""Test map read/write against a synthetic ROM"""
+
+	def setUp(self):
+		self.rom = ROMHandler()
+		self.rom.rom_data = bytearray([0xFF]) * 0x40000
+		self.rom.rom_data[0x28000:0x31800] = bytes(0x9800)	# Empty headers and pointers
+
+		self.serializer = MapSerializer(self.rom)
+		self.maps = [make_map(i, 16 + 2 * i, 12, i) for i in range(3)]
+		for rom_map in self.maps:
+			self.serializer.write_map(rom_map)
+
+		self.temp = tempfile.TemporaryDirectory()
+		self.rom_path = Path(self.temp.name) / 'test.sfc'
+		self.rom.rom_path = self.rom_path
+		self.rom.save_rom()
+
+	def tearDown(self):
+		self.temp.cleanup()
+
+	def test_read_back(self):
+		"""Test headers, tiles and attributes survive a write/read"""
+		for expected in self.maps:
+			rom_map = self.serializer.read_map(expected.map_id)
+			self.assertEqual(rom_map.header, expected.header)
+			np.testing.assert_array_equal(rom_map.tiles, expected.tiles)
+			np.testing.assert_array_equal(rom_map.attrs, expected.attrs)
+		self.assertIsNone(self.serializer.read_map(3))
+		self.assertIsNone(self.serializer.layer_blob(0, 2))	# All-zero layer is not stored
+
+	def test_unchanged_save_is_byte_identical(self):
+		"""Test saving unchanged maps leaves the ROM untouched"""
+		before = bytes(self.rom.rom_data)
+		for map_id in range(3):
+			self.assertEqual(self.serializer.write_map(self.serializer.read_map(map_id)), [])
+		self.assertEqual(bytes(self.rom.rom_data), before)
+
+		# Recompressing decoded layers reproduces the stored bytes exactly
+		for map_id in range(3):
+			for layer in range(2):
+				_, blob = self.serializer.layer_blob(map_id, layer)
+				raw = FFMQCompression.decompress_map(blob)
+				self.assertEqual(FFMQCompression.compress_map(raw), blob)
+
+	def test_grown_layer_relocated(self):
+		"""Test a layer that no longer fits moves and frees its old slot"""
+		old_address, old_blob = self.serializer.layer_blob(1, 0)
+		rom_map = self.serializer.read_map(1)
+		rom_map.tiles[0] = np.random.default_rng(9).integers(0, 256, rom_map.tiles[0].shape)
+
+		self.assertEqual(self.serializer.write_map(rom_map), [0])
+		new_address, _ = self.serializer.layer_blob(1, 0)
+		self.assertNotEqual(new_address, old_address)
+		self.assertEqual(bytes(self.rom.rom_data[old_address:old_address + len(old_blob) + 2]),
+						 b'\xff' * (len(old_blob) + 2))
+		self.assertEqual(new_address // 0x8000, (new_address + 0x200) // 0x8000)
+
+		np.testing.assert_array_equal(self.serializer.read_map(1).tiles, rom_map.tiles)
+		np.testing.assert_array_equal(self.serializer.read_map(2).tiles, self.maps[2].tiles)
+
+	def test_allocate_only_known_free_space(self):
+		"""Test a 0xFF table inside a bank is not taken for free space"""
+		self.rom.rom_data[0x38000:0x40000] = b'\x11' * 0x8000
+		self.rom.rom_data[0x39000:0x3A000] = b'\xff' * 0x1000		# 0xFF-filled table
+		tail = self.serializer.free_runs(self.serializer.data_start)[1].max()
+
+		address = self.serializer.allocate(0x200)
+		self.assertNotEqual(address // 0x8000, 0x39000 // 0x8000)
+		self.assertLessEqual(address + 0x200, tail)
+
+		self.rom.rom_data[0x31800:0x38000] = b'\x11' * 0x6800	# No padding left: expand
+		self.assertEqual(self.serializer.allocate(0x200), 0x40000)
+
+		configured = MapSerializer(self.rom, free_regions=[(0x39000, 0x3A000)])
+		self.assertEqual(configured.allocate(0x200), 0x39001)
+
+	def test_bulk_cache(self):
+		"""Test the memory-mapped cache matches direct reads"""
+		cache_dir = Path(self.temp.name) / 'cache'
+		cache = MapCache.open(self.rom, cache_dir)
+		self.assertIsInstance(cache.tiles, np.memmap)
+		self.assertEqual(cache.map_ids(), [0, 1, 2])
+		for expected in self.maps:
+			rom_map = cache.get(expected.map_id)
+			self.assertEqual(rom_map.header, expected.header)
+			np.testing.assert_array_equal(rom_map.attrs, expected.attrs)
+
+		self.assertEqual(MapCache.open(self.rom, cache_dir).path, cache.path)
+		self.assertEqual(len(list(cache_dir.glob('*.npz'))), 1)
+
+	def test_engine_load_edit_save(self):
+		"""Test MapEngine loads from the ROM and saves edits back"""
+		config = {'map_cache_dir': str(Path(self.temp.name) / 'cache')}
+		engine = MapEngine(config)
+		self.assertTrue(engine.load_map(str(self.rom_path), 2))
+		self.assertEqual(engine.get_map_size(), (20, 12))
+		np.testing.assert_array_equal(engine.map_data.bg1_attrs, self.maps[2].attrs[0])
+
+		engine.flood_fill(0, 11, 0x33, LayerType.BG2_UPPER)
+		self.assertTrue(engine.save_map())
+
+		reloaded = MapEngine(config)
+		self.assertTrue(reloaded.load_map(str(self.rom_path), 2))
+		np.testing.assert_array_equal(reloaded.map_data.bg2_tiles, engine.map_data.bg2_tiles)
+		np.testing.assert_array_equal(reloaded.map_data.bg1_tiles, self.maps[2].tiles[0])
+
+	def test_engine_recovers_rom_map(self):
+		"""Test a crashed session on a ROM map reopens that map, or keeps its journal aside"""
+		journal = Path(self.temp.name) / 'journal' / 'edits.bin'
+		config = {'map_cache_dir': str(Path(self.temp.name) / 'cache'), 'undo_journal': str(journal)}
+		engine = MapEngine(config)
+		self.assertTrue(engine.load_map(str(self.rom_path), 1))
+		engine.set_tile(2, 3, 0x44, LayerType.BG1_GROUND)
+		edited = engine.map_data.bg1_tiles.copy()
+		engine.history.close_journal()		# Crash
+
+		recovered = MapEngine(config)
+		self.assertTrue(recovered.recover_session())
+		self.assertEqual(recovered.header.map_id, 1)
+		np.testing.assert_array_equal(recovered.map_data.bg1_tiles, edited)
+		recovered.history.close_journal()	# Crash again, after the ROM changed underneath
+		saved = journal.read_bytes()
+
+		self.maps[1].tiles[0, 0, 0] ^= 0xFF
+		self.serializer.write_map(self.maps[1])
+		self.rom.save_rom()
+		failed = MapEngine(config)
+		with self.assertRaises(ValueError):
+			failed.recover_session()
+		aside = list(journal.parent.glob('edits.*.failed.bin'))
+		self.assertEqual(len(aside), 1)
+		self.assertEqual(aside[0].read_bytes(), saved)
+
+		# Opening another map starts a new journal without touching the old one
+		self.assertTrue(failed.load_map(str(self.rom_path), 0))
+		self.assertEqual(aside[0].read_bytes(), saved)
+		failed.shutdown()
+
+
+if __name__ == '__main__':
+	unittest.main()
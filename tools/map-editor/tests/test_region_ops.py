@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for map region operations
+Scanline flood fill, mask edits and vectorized undo records
+"""
+
+import unittest
+import numpy as np
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.map_engine import MapEngine, MapType, LayerType
+from engine.region_ops import flood_region
+
+
+def reference_flood(layer: np.ndarray, x: int, y: int) -> np.ndarray:
+	"""Breadth-first 4-connected fill, one cell at a time"""
+	h, w = layer.shape
+	target = layer[y, x]
+	mask = np.zeros((h, w), dtype=bool)
+	queue = deque([(x, y)])
+	while queue:
+		cx, cy = queue.popleft()
+		if 0 <= cx < w and 0 <= cy < h and not mask[cy, cx] and layer[cy, cx] == target:
+			mask[cy, cx] = True
+			queue.extend(((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)))
+	return mask
+
+
+class TestRegionOps(unittest.TestCase):
+	"""Test region operations"""
+
+	def setUp(self):
+		"""Set up test fixtures"""
+		self.engine = MapEngine(None)
+		self.engine.new_map(64, 64, MapType.DUNGEON)
+		self.layer = self.engine.map_data.get_layer(LayerType.BG1_GROUND)
+
+	def test_flood_matches_reference(self):
+		"""Test scanline fill against a cell-by-cell fill on noisy maps"""
+		rng = np.random.default_rng(5)
+		for _ in range(20):
+			layer = rng.integers(0, 2, (40, 50)).astype(np.uint8)
+			x, y = int(rng.integers(0, 50)), int(rng.integers(0, 40))
+			np.testing.assert_array_equal(flood_region(layer, x, y), reference_flood(layer, x, y))
+
+	def test_diagonal_connectivity(self):
+		"""Test 8-connected fill crosses corners"""
+		layer = np.eye(8, dtype=np.uint8)
+		self.assertEqual(int(flood_region(layer, 0, 0).sum()), 1)
+		self.assertEqual(int(flood_region(layer, 0, 0, connectivity=8).sum()), 8)
+
+	def test_large_fill_no_recursion(self):
+		"""Test a full 256x256 fill is fast and a single undo record"""
+		self.engine.new_map(256, 256, MapType.OVERWORLD)
+
+		start = time.perf_counter()
+		self.engine.flood_fill(100, 100, 9, LayerType.BG1_GROUND)
+		elapsed = time.perf_counter() - start
+
+		self.assertTrue((self.engine.map_data.get_layer(LayerType.BG1_GROUND) == 9).all())
+		self.assertEqual(len(self.engine.undo_stack), 1)
+		self.assertLess(self.engine.undo_stack[0].nbytes, 1024)
+		self.assertLess(elapsed, 0.05)
+
+	def test_undo_redo_region(self):
+		"""Test undo restores every tile of a region edit"""
+		self.layer[10:20, 10:20] = 3
+		before = self.layer.copy()
+
+		self.engine.replace_all(3, 4, LayerType.BG1_GROUND)
+		self.assertEqual(int((self.layer == 4).sum()), 100)
+
+		self.engine.undo()
+		np.testing.assert_array_equal(self.layer, before)
+
+		self.engine.redo()
+		self.assertEqual(int((self.layer == 4).sum()), 100)
+
+	def test_stamp_pattern(self):
+		"""Test stamping clips to the map and honours transparency"""
+		pattern = np.array([[1, 0], [2, 3]], dtype=np.uint8)
+		self.engine.stamp_pattern(63, 63, pattern, LayerType.BG1_GROUND)
+		self.assertEqual(int(self.layer[63, 63]), 1)
+
+		self.engine.stamp_pattern(0, 0, pattern, LayerType.BG1_GROUND, transparent=1)
+		self.assertEqual(self.layer[0:2, 0:2].tolist(), [[0, 0], [2, 3]])
+
+	def test_select_by_tile(self):
+		"""Test multi-tile selection and mask fill"""
+		self.layer[0, :] = 5
+		self.layer[1, :] = 6
+		mask = self.engine.select_by_tile([5, 6], LayerType.BG1_GROUND)
+		self.assertEqual(int(mask.sum()), 128)
+
+		self.engine.fill_mask(mask, 7, LayerType.BG1_GROUND)
+		self.assertTrue((self.layer[:2] == 7).all())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Chunked map renderer for FFMQ Map Editor
+Caches the map as pre-composed chunk surfaces and redraws only what changed
+
+The map is split into 16x16-tile chunks. Each chunk's layers are composed
+once into a single surface (top visible non-empty layer per tile, gathered
+from a per-layer tile atlas with NumPy) and cached. MapEngine change events
+drop only the chunks an edit touched, so a frame costs one blit per visible
+chunk regardless of map size, and a paint stroke rebuilds one or two chunks.
+
+The minimap reads a tile-resolution color image kept by the same cache
+(mean color of each atlas tile), refreshed only for dirty chunks.
+
+Usage:
+	renderer = ChunkRenderer(tile_size=16)
+	renderer.attach(map_engine)
+	renderer.draw(screen, view_rect, camera_x, camera_y)
+
+	# Headless benchmark (pygame dummy video driver)
+	python ui/chunk_renderer.py --benchmark --size 256 --frames 300
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+import numpy as np
+import pygame
+
+if __name__ == '__main__':
+	sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.map_engine import LayerType, MapChange, MapEngine
+
+
+CHUNK_TILES = 16
+EMPTY_LAYER = len(LayerType)	# Atlas slot for tiles with no visible layer
+EMPTY_COLOR = (30, 30, 30)
+
+
+def placeholder_colors() -> np.ndarray:
+	"""(layers + 1, 256, 3) tile colors matching the classic per-tile renderer"""
+	ids = np.arange(256)
+	base = np.stack([(ids * 37) % 256, (ids * 73) % 256, (ids * 109) % 256], axis=1)
+
+	colors = np.empty((EMPTY_LAYER + 1, 256, 3), dtype=np.uint8)
+	colors[LayerType.BG1_GROUND] = base
+	colors[LayerType.BG2_UPPER] = np.minimum(base + 40, 255)
+	colors[LayerType.BG3_EVENTS] = base // 2
+	colors[:, 0] = EMPTY_COLOR
+	colors[EMPTY_LAYER] = EMPTY_COLOR
+	return colors
+
+
+def tileset_pixels(surface: pygame.Surface, tiles_per_row: int = 16,
+				   tile_px: int = 8) -> np.ndarray:
+	"""(256, tile_px, tile_px, 3) pixels [x, y] of a TilesetManager tileset surface"""
+	pixels = pygame.surfarray.array3d(surface)
+	rows = pixels.shape[1] // tile_px
+	grid = pixels[:tiles_per_row * tile_px, :rows * tile_px].reshape(
+		tiles_per_row, tile_px, rows, tile_px, 3)
+	tiles = grid.transpose(2, 0, 1, 3, 4).reshape(-1, tile_px, tile_px, 3)
+
+	atlas = np.zeros((256, tile_px, tile_px, 3), dtype=np.uint8)
+	atlas[:min(256, len(tiles))] = tiles[:256]
+	return atlas
+
+
+class ChunkRenderer:
+	"""Chunk surface cache for one MapEngine"""
+
+	def __init__(self, tile_size: int = 16, chunk_tiles: int = CHUNK_TILES,
+				 max_cached: int = 256):
+		"""
+		Args:
+			tile_size: On-screen tile size in pixels
+			chunk_tiles: Chunk edge in tiles
+			max_cached: Chunk surfaces kept (least recently drawn evicted first)
+		"""
+		self.tile_size = tile_size
+		self.chunk_tiles = chunk_tiles
+		self.max_cached = max_cached
+
+		self.engine: Optional[MapEngine] = None
+		self.visible_layers: Set[LayerType] = set(LayerType)
+
+		# Tile appearance: (layers + 1, 256, tw, th, 3) pixels and mean colors
+		self.tileset_atlas: Optional[np.ndarray] = None
+		self.atlas = np.zeros((0,))
+		self.mean_colors = np.zeros((0,))
+		self._build_atlas()
+
+		self.surfaces: 'OrderedDict[Tuple[int, int], pygame.Surface]' = OrderedDict()
+		self.minimap = np.zeros((0, 0, 3), dtype=np.uint8)
+		self.minimap_dirty: Set[Tuple[int, int]] = set()
+		self.chunks_built = 0
+
+	# ------------------------------------------------------------------
+	# Setup
+	# ------------------------------------------------------------------
+
+	def attach(self, engine: MapEngine) -> None:
+		"""Follow a MapEngine's edits (no-op if already attached)"""
+		if self.engine is engine:
+			return
+		self.detach()
+		self.engine = engine
+		engine.add_listener(self.on_map_change)
+		self.invalidate_all()
+
+	def detach(self) -> None:
+		if self.engine is not None:
+			self.engine.remove_listener(self.on_map_change)
+			self.engine = None
+
+	def set_tileset(self, surface: Optional[pygame.Surface]) -> None:
+		"""Use tileset graphics (None = placeholder colors)"""
+		self.tileset_atlas = None if surface is None else tileset_pixels(surface)
+		self._build_atlas()
+		self.invalidate_all()
+
+	def set_tile_size(self, tile_size: int) -> None:
+		"""Change on-screen tile size (zoom)"""
+		tile_size = max(1, int(tile_size))
+		if tile_size != self.tile_size:
+			self.tile_size = tile_size
+			self._build_atlas()
+			self.surfaces.clear()
+
+	def set_layer_visible(self, layer: LayerType, visible: bool) -> None:
+		if (layer in self.visible_layers) != visible:
+			self.visible_layers.symmetric_difference_update({layer})
+			self.invalidate_all()
+
+	def _build_atlas(self) -> None:
+		"""Scale tile pixels to the current tile size for every layer"""
+		size = self.tile_size
+		colors = placeholder_colors()
+
+		if self.tileset_atlas is None:
+			atlas = np.broadcast_to(colors[:, :, None, None, :],
+									(EMPTY_LAYER + 1, 256, size, size, 3)).copy()
+		else:
+			src = self.tileset_atlas.shape[1]
+			index = np.arange(size) * src // size
+			tiles = self.tileset_atlas[:, index][:, :, index].astype(np.int16)
+			atlas = np.empty((EMPTY_LAYER + 1, 256, size, size, 3), dtype=np.uint8)
+			atlas[LayerType.BG1_GROUND] = tiles
+			atlas[LayerType.BG2_UPPER] = np.minimum(tiles + 40, 255)
+			atlas[LayerType.BG3_EVENTS] = tiles // 2
+			atlas[EMPTY_LAYER] = EMPTY_COLOR
+
+		self.atlas = atlas
+		self.mean_colors = atlas.reshape(EMPTY_LAYER + 1, 256, -1, 3).mean(axis=2).astype(np.uint8)
+
+	# ------------------------------------------------------------------
+	# Invalidation
+	# ------------------------------------------------------------------
+
+	def on_map_change(self, change: MapChange) -> None:
+		"""MapEngine listener"""
+		if change.layer is None:
+			self.invalidate_all()
+		elif change.ys is None:
+			self.invalidate_all(resize=False)
+		else:
+			self.invalidate_tiles(change.ys, change.xs)
+
+	def invalidate_all(self, resize: bool = True) -> None:
+		"""Drop every chunk (map replaced, tileset or visibility changed)"""
+		self.surfaces.clear()
+		map_data = self.engine.map_data if self.engine else None
+		if map_data is None:
+			self.minimap = np.zeros((0, 0, 3), dtype=np.uint8)
+			self.minimap_dirty.clear()
+			return
+
+		if resize or self.minimap.shape[:2] != (map_data.height, map_data.width):
+			self.minimap = np.zeros((map_data.height, map_data.width, 3), dtype=np.uint8)
+		cx, cy = self.chunk_grid()
+		self.minimap_dirty = {(x, y) for y in range(cy) for x in range(cx)}
+
+	def invalidate_tiles(self, ys: np.ndarray, xs: np.ndarray) -> None:
+		"""Drop the chunks containing the given tiles"""
+		if len(ys) == 0:
+			return
+		cx, _ = self.chunk_grid()
+		codes = np.unique((np.asarray(ys) // self.chunk_tiles) * cx + np.asarray(xs) // self.chunk_tiles)
+		for code in codes.tolist():
+			key = (code % cx, code // cx)
+			self.surfaces.pop(key, None)
+			self.minimap_dirty.add(key)
+
+	def chunk_grid(self) -> Tuple[int, int]:
+		"""(chunks across, chunks down)"""
+		map_data = self.engine.map_data
+		n = self.chunk_tiles
+		return -(-map_data.width // n), -(-map_data.height // n)
+
+	# ------------------------------------------------------------------
+	# Composition
+	# ------------------------------------------------------------------
+
+	def _chunk_bounds(self, cx: int, cy: int) -> Tuple[int, int, int, int]:
+		map_data = self.engine.map_data
+		n = self.chunk_tiles
+		return cy * n, min((cy + 1) * n, map_data.height), cx * n, min((cx + 1) * n, map_data.width)
+
+	def compose(self, cx: int, cy: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""(atlas layer, tile ID) of the topmost visible tile in a chunk"""
+		y0, y1, x0, x1 = self._chunk_bounds(cx, cy)
+		map_data = self.engine.map_data
+
+		top = np.full((y1 - y0, x1 - x0), EMPTY_LAYER, dtype=np.intp)
+		tiles = np.zeros((y1 - y0, x1 - x0), dtype=np.intp)
+		for layer in LayerType:
+			if layer not in self.visible_layers:
+				continue
+			data = map_data.get_layer(layer)[y0:y1, x0:x1]
+			# Ground always draws; upper layers are transparent where empty
+			cover = np.ones(data.shape, dtype=bool) if layer == LayerType.BG1_GROUND else data != 0
+			top[cover] = layer
+			tiles[cover] = data[cover]
+		return top, tiles
+
+	def chunk_pixels(self, cx: int, cy: int) -> np.ndarray:
+		"""(width px, height px, 3) surfarray-ordered pixels of a chunk"""
+		top, tiles = self.compose(cx, cy)
+		h, w = top.shape
+		size = self.tile_size
+		# (h, w, tx, ty, 3) -> (w, tx, h, ty, 3): x-major like surfarray
+		gathered = self.atlas[top, tiles]
+		return gathered.transpose(1, 2, 0, 3, 4).reshape(w * size, h * size, 3)
+
+	def chunk_surface(self, cx: int, cy: int) -> pygame.Surface:
+		"""Cached surface for a chunk, rebuilding it if dirty"""
+		key = (cx, cy)
+		surface = self.surfaces.get(key)
+		if surface is None:
+			surface = pygame.surfarray.make_surface(self.chunk_pixels(cx, cy))
+			self.surfaces[key] = surface
+			self.chunks_built += 1
+			while len(self.surfaces) > self.max_cached:
+				self.surfaces.popitem(last=False)
+		else:
+			self.surfaces.move_to_end(key)
+		return surface
+
+	def draw(self, screen: pygame.Surface, rect: pygame.Rect,
+			 camera_x: float, camera_y: float) -> int:
+		"""
+		Blit the visible chunks into rect
+
+		Args:
+			camera_x, camera_y: Map tile at the top-left of rect
+
+		Returns:
+			Number of chunks drawn
+		"""
+		if self.engine is None or self.engine.map_data is None:
+			return 0
+
+		span = self.chunk_tiles * self.tile_size
+		cols, rows = self.chunk_grid()
+		origin_x = rect.x - camera_x * self.tile_size
+		origin_y = rect.y - camera_y * self.tile_size
+
+		first_x = max(0, int((rect.x - origin_x) // span))
+		first_y = max(0, int((rect.y - origin_y) // span))
+		last_x = min(cols, int((rect.right - origin_x) // span) + 1)
+		last_y = min(rows, int((rect.bottom - origin_y) // span) + 1)
+
+		previous_clip = screen.get_clip()
+		screen.set_clip(rect)
+		drawn = 0
+		for cy in range(first_y, last_y):
+			for cx in range(first_x, last_x):
+				screen.blit(self.chunk_surface(cx, cy),
+							(int(origin_x + cx * span), int(origin_y + cy * span)))
+				drawn += 1
+		screen.set_clip(previous_clip)
+		return drawn
+
+	# ------------------------------------------------------------------
+	# Minimap
+	# ------------------------------------------------------------------
+
+	def minimap_rgb(self) -> np.ndarray:
+		"""(height, width, 3) tile colors of the whole map"""
+		for cx, cy in self.minimap_dirty:
+			y0, y1, x0, x1 = self._chunk_bounds(cx, cy)
+			top, tiles = self.compose(cx, cy)
+			self.minimap[y0:y1, x0:x1] = self.mean_colors[top, tiles]
+		self.minimap_dirty.clear()
+		return self.minimap
+
+	def minimap_surface(self, scale: float) -> Optional[pygame.Surface]:
+		"""Minimap image at scale pixels per tile"""
+		rgb = self.minimap_rgb()
+		if rgb.size == 0:
+			return None
+		h, w = rgb.shape[:2]
+		surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+		size = (max(1, int(w * scale)), max(1, int(h * scale)))
+		return pygame.transform.scale(surface, size)
+
+
+def run_benchmark(size: int, frames: int, view: Tuple[int, int], tile_size: int) -> None:
+	"""Frame times for full per-tile redraw vs the chunk cache, idle and painting"""
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	pygame.init()
+	screen = pygame.display.set_mode(view)
+	rect = screen.get_rect()
+
+	engine = MapEngine(None)
+	engine.new_map(size, size)
+	rng = np.random.default_rng(0)
+	for layer in LayerType:
+		data = engine.map_data.get_layer(layer)
+		data[:] = rng.integers(0, 64, data.shape)
+	engine._notify()
+
+	renderer = ChunkRenderer(tile_size)
+	renderer.attach(engine)
+	colors = placeholder_colors()
+
+	def full_redraw():
+		visible_w = min(size, view[0] // tile_size + 1)
+		visible_h = min(size, view[1] // tile_size + 1)
+		for layer in LayerType:
+			data = engine.map_data.get_layer(layer)
+			for y in range(visible_h):
+				for x in range(visible_w):
+					tile_id = int(data[y, x])
+					if tile_id == 0 and layer != LayerType.BG1_GROUND:
+						continue
+					pygame.draw.rect(screen, colors[layer, tile_id].tolist(),
+									 (x * tile_size, y * tile_size, tile_size, tile_size))
+
+	def chunked():
+		renderer.draw(screen, rect, 0, 0)
+
+	def measure(draw, paint: bool) -> np.ndarray:
+		times = []
+		engine.begin_stroke()
+		for frame in range(frames):
+			if paint:
+				x = frame % min(size, view[0] // tile_size)
+				engine.set_tile(x, frame % 8, int(rng.integers(1, 64)), LayerType.BG1_GROUND)
+			start = time.perf_counter()
+			draw()
+			times.append(time.perf_counter() - start)
+		engine.end_stroke()
+		return np.array(times) * 1000
+
+	print(f"Map {size}x{size}, view {view[0]}x{view[1]}, tile {tile_size}px, {frames} frames")
+	for name, draw in (('full redraw', full_redraw), ('chunked', chunked)):
+		for mode, paint in (('idle', False), ('painting', True)):
+			times = measure(draw, paint)
+			print(f"  {name:<12} {mode:<9} mean {times.mean():7.2f} ms   "
+				  f"p95 {np.percentile(times, 95):7.2f} ms")
+	print(f"  chunks built: {renderer.chunks_built}")
+	pygame.quit()
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Chunked map renderer')
+	parser.add_argument('--benchmark', action='store_true', help='Run the headless frame-time benchmark')
+	parser.add_argument('--size', type=int, default=256, help='Map width/height in tiles')
+	parser.add_argument('--frames', type=int, default=200, help='Frames per measurement')
+	parser.add_argument('--view', type=int, nargs=2, default=(1100, 860), help='View size in pixels')
+	parser.add_argument('--tile-size', type=int, default=16, help='Tile size in pixels')
+	args = parser.parse_args()
+
+	if not args.benchmark:
+		parser.print_help()
+		return 1
+
+	run_benchmark(args.size, args.frames, tuple(args.view), args.tile_size)
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
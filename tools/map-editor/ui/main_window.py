@@ -5,7 +5,8 @@ Main window component for map editing
 
 import pygame
 from typing import Tuple, Optional
-from engine.map_engine import MapEngine, LayerType
+from engine.map_engine import MapEngine
+from ui.chunk_renderer import ChunkRenderer
 
 class MainWindow:
 	"""Main map editing window"""
@@ -24,6 +25,9 @@ class MainWindow:
 		self.zoom = 1.0
 		self.tile_size = config.get('tile_size', 16)
 		
+		# Cached chunk surfaces, refreshed from map edit events
+		self.renderer = ChunkRenderer(self.tile_size)
+		
 		# Grid settings
 		self.show_grid = config.get('show_grid', True)
 		self.grid_color = config.get('grid_color', (100, 100, 100))
@@ -128,71 +132,21 @@ class MainWindow:
 	def _render_map(self, screen: pygame.Surface, map_engine: MapEngine):
 		"""Render the map layers"""
 		tile_size = int(self.tile_size * self.zoom)
+		self.renderer.attach(map_engine)
+		self.renderer.set_tile_size(tile_size)
+		self.renderer.draw(screen, pygame.Rect(self.x, self.y, self.width, self.height),
+						   self.camera_x, self.camera_y)
 		
-		# Calculate visible tile range
-		start_x = max(0, int(self.camera_x))
-		start_y = max(0, int(self.camera_y))
-		end_x = min(map_engine.header.width, 
-				   int(self.camera_x + self.width / tile_size) + 2)
-		end_y = min(map_engine.header.height,
-				   int(self.camera_y + self.height / tile_size) + 2)
-		
-		# Render each layer
-		for layer in [LayerType.BG1_GROUND, LayerType.BG2_UPPER, 
-					 LayerType.BG3_EVENTS]:
-			self._render_layer(screen, map_engine, layer, 
-							 start_x, start_y, end_x, end_y, tile_size)
-		
-		# Render grid
+		# Render grid over the visible tile range
 		if self.show_grid:
+			start_x = max(0, int(self.camera_x))
+			start_y = max(0, int(self.camera_y))
+			end_x = min(map_engine.header.width, 
+					   int(self.camera_x + self.width / tile_size) + 2)
+			end_y = min(map_engine.header.height,
+					   int(self.camera_y + self.height / tile_size) + 2)
 			self._render_grid(screen, start_x, start_y, end_x, end_y, tile_size)
 	
-	def _render_layer(self, screen: pygame.Surface, map_engine: MapEngine,
-					 layer: LayerType, start_x: int, start_y: int,
-					 end_x: int, end_y: int, tile_size: int):
-		"""Render a single map layer"""
-		layer_data = map_engine.map_data.get_layer(layer)
-		
-		# For now, render tiles as colored rectangles
-		# TODO: Load and render actual tileset graphics
-		for y in range(start_y, end_y):
-			for x in range(start_x, end_x):
-				tile_id = layer_data[y, x]
-				
-				if tile_id == 0 and layer != LayerType.BG1_GROUND:
-					continue  # Skip empty tiles on upper layers
-				
-				screen_x, screen_y = self.map_to_screen((x, y))
-				
-				# Simple color coding by tile ID
-				color = self._get_tile_color(tile_id, layer)
-				
-				pygame.draw.rect(screen, color,
-							   (screen_x, screen_y, tile_size, tile_size))
-	
-	def _get_tile_color(self, tile_id: int, layer: LayerType) -> Tuple[int, int, int]:
-		"""Get a color for a tile (placeholder for actual graphics)"""
-		if tile_id == 0:
-			return (30, 30, 30)  # Empty tile
-		
-		# Generate color based on tile ID
-		r = (tile_id * 37) % 256
-		g = (tile_id * 73) % 256
-		b = (tile_id * 109) % 256
-		
-		# Adjust brightness based on layer
-		if layer == LayerType.BG2_UPPER:
-			r = min(255, r + 40)
-			g = min(255, g + 40)
-			b = min(255, b + 40)
-		elif layer == LayerType.BG3_EVENTS:
-			# Events layer - more transparent/faded
-			r = r // 2
-			g = g // 2
-			b = b // 2
-		
-		return (r, g, b)
-	
 	def _render_grid(self, screen: pygame.Surface, start_x: int, start_y: int,
 					end_x: int, end_y: int, tile_size: int):
 		"""Render the grid overlay"""
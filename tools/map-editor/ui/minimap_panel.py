@@ -7,6 +7,8 @@ Provides zoomed-out overview of entire map with viewport indicator
 import pygame
 from typing import Optional, Tuple
 
+from ui.chunk_renderer import ChunkRenderer
+
 
 class MinimapPanel:
 	"""Minimap panel showing entire map overview"""
@@ -34,6 +36,7 @@ class MinimapPanel:
 		self.show_grid = False
 
 		# Map cache
+		self.renderer: Optional[ChunkRenderer] = None
 		self.map_surface: Optional[pygame.Surface] = None
 		self.map_width = 0
 		self.map_height = 0
@@ -41,20 +44,29 @@ class MinimapPanel:
 		# Interaction
 		self.dragging = False
 
-	def update_map(self, map_engine, tileset_manager=None):
+	def update_map(self, map_engine, tileset_manager=None, renderer=None):
 		"""
 		Update minimap from map engine
 
 		Args:
 			map_engine: MapEngine instance
 			tileset_manager: TilesetManager instance (optional)
+			renderer: ChunkRenderer to share (default: the minimap's own)
 		"""
-		if map_engine.current_map is None:
+		if map_engine.map_data is None:
 			self.map_surface = None
 			return
 
-		self.map_width = map_engine.current_map.width
-		self.map_height = map_engine.current_map.height
+		if renderer is not None:
+			self.renderer = renderer
+		elif self.renderer is None:
+			self.renderer = ChunkRenderer()
+			if tileset_manager is not None and tileset_manager.current_tileset is not None:
+				self.renderer.set_tileset(tileset_manager.current_tileset)
+		self.renderer.attach(map_engine)
+
+		self.map_width = map_engine.map_data.width
+		self.map_height = map_engine.map_data.height
 
 		# Calculate scale to fit map in panel
 		padding = 20
@@ -65,58 +77,8 @@ class MinimapPanel:
 		scale_y = available_height / self.map_height
 		self.scale = min(scale_x, scale_y, 4.0)  # Max 4 pixels per tile
 
-		# Create minimap surface
-		mini_width = int(self.map_width * self.scale)
-		mini_height = int(self.map_height * self.scale)
-		self.map_surface = pygame.Surface((mini_width, mini_height))
-
-		# Render map
-		for y in range(self.map_height):
-			for x in range(self.map_width):
-				# Get tile from all layers
-				color = (0, 0, 0)
-
-				# Check BG3 (events) first
-				tile_id = map_engine.current_map.bg3_tiles[y, x]
-				if tile_id > 0:
-					color = self._get_tile_color(tile_id, 3)
-				else:
-					# Check BG2 (upper)
-					tile_id = map_engine.current_map.bg2_tiles[y, x]
-					if tile_id > 0:
-						color = self._get_tile_color(tile_id, 2)
-					else:
-						# Use BG1 (ground)
-						tile_id = map_engine.current_map.bg1_tiles[y, x]
-						color = self._get_tile_color(tile_id, 1)
-
-				# Draw tile (1 pixel or scaled)
-				tile_rect = pygame.Rect(
-					int(x * self.scale),
-					int(y * self.scale),
-					max(1, int(self.scale)),
-					max(1, int(self.scale))
-				)
-				pygame.draw.rect(self.map_surface, color, tile_rect)
-
-	def _get_tile_color(self, tile_id: int, layer: int) -> Tuple[int, int, int]:
-		"""Get color for tile in minimap"""
-		if tile_id == 0:
-			return (0, 0, 0)
-
-		# Simple color coding based on tile ID and layer
-		base_r = (tile_id * 37) % 256
-		base_g = (tile_id * 73) % 256
-		base_b = (tile_id * 109) % 256
-
-		# Adjust brightness by layer
-		brightness = [0.6, 0.8, 1.0][layer - 1]
-
-		r = int(base_r * brightness)
-		g = int(base_g * brightness)
-		b = int(base_b * brightness)
-
-		return (r, g, b)
+		# Downsampled from the renderer's chunk cache (only dirty chunks recomputed)
+		self.map_surface = self.renderer.minimap_surface(self.scale)
 
 	def handle_mouse_down(self, pos: Tuple[int, int], button: int) -> Optional[Tuple[int, int]]:
 		"""
@@ -40,6 +40,8 @@ class Config:
 		'last_project_dir': '',
 		'export_dir': 'data/exported_maps',
 		'tileset_cache_dir': 'data/tilesets',
+		'map_cache_dir': 'data/map_cache',
+		'map_free_space': [],  # [start, end) PC ranges for relocated layers ([] = 0xFF padding at bank ends)
 		
 		# Editor settings
 		'show_collision': True,
@@ -48,6 +50,8 @@ class Config:
 		'show_grid': True,
 		'auto_save': True,
 		'auto_save_interval': 300,  # seconds
+		'undo_budget_mb': 32,
+		'undo_journal': 'data/edit_journal.bin',  # Crash recovery ('' = off), relative to this file
 		
 		# Map defaults
 		'default_map_width': 64,
@@ -75,6 +79,14 @@ class Config:
 		"""Get a configuration value"""
 		return self.config.get(key, default)
 	
+	def get_path(self, key: str) -> Optional[Path]:
+		"""Get a path setting; relative paths are anchored to the config file's directory"""
+		value = self.config.get(key)
+		if not value:
+			return None
+		path = Path(value).expanduser()
+		return path if path.is_absolute() else self.config_path.parent / path
+	
 	def set(self, key: str, value: Any) -> None:
 		"""Set a configuration value"""
 		self.config[key] = value
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Edit History for FFMQ Editors
+Compact delta-based undo/redo shared by the map, tile, palette and dialog editors
+
+Editors register the objects they edit under a key (NumPy arrays such as
+map layers, tile pixels or palette colors; dicts such as dialog text by
+ID) and record changes as deltas against them:
+
+- ArrayDelta: packed flat indices plus old/new values (small edits)
+- XorDelta: zlib-compressed XOR of the whole array (large edits)
+- ItemDelta: old/new value of one mapping entry (text, properties)
+
+History is a deque ring bounded by bytes, not by entry count. Entries
+recorded with the same group (a brush stroke) are coalesced into one.
+An optional append-only journal lets a crashed session be replayed on
+top of the unchanged base data. The journal's BASE record also carries
+an identity supplied by the editor (which document the edits belong
+to), so the next session can reopen that document before replaying.
+
+Usage:
+	history = EditHistory(budget_bytes=16 << 20)
+	history.register('bg1', layer_array)
+	before = layer_array.copy()
+	...edit layer_array...
+	history.record_diff('bg1', before, label='fill')
+	history.undo()
+"""
+
+import hashlib
+import pickle
+import struct
+import time
+import zlib
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+
+DEFAULT_BUDGET = 32 * 1024 * 1024
+
+# Edits touching more than this fraction of an array try XOR+zlib packing
+XOR_THRESHOLD = 1 / 16
+
+
+def _index_dtype(size: int) -> np.dtype:
+	return np.dtype(np.uint16 if size <= 0x10000 else np.uint32)
+
+
+@dataclass
+class ArrayDelta:
+	"""Changed cells of one array as packed index/value arrays"""
+	key: str
+	indices: np.ndarray		# Flat indices (uint16/uint32)
+	old: np.ndarray
+	new: np.ndarray
+
+	@property
+	def nbytes(self) -> int:
+		return self.indices.nbytes + self.old.nbytes + self.new.nbytes
+
+	def apply(self, target: np.ndarray, forward: bool) -> None:
+		target.reshape(-1)[self.indices] = self.new if forward else self.old
+
+	def merge(self, later: 'ArrayDelta') -> 'ArrayDelta':
+		"""Combine with a later delta on the same array (first old, last new)"""
+		indices = np.concatenate([self.indices, later.indices])
+		old = np.concatenate([self.old, later.old])
+		new = np.concatenate([self.new, later.new])
+
+		# First occurrence keeps the original value, last occurrence the final one
+		unique, first = np.unique(indices, return_index=True)
+		_, last_rev = np.unique(indices[::-1], return_index=True)
+		last = indices.size - 1 - last_rev
+		return ArrayDelta(self.key, unique.astype(self.indices.dtype), old[first], new[last])
+
+
+@dataclass
+class XorDelta:
+	"""Whole-array XOR of before and after, zlib compressed"""
+	key: str
+	payload: bytes
+	dtype: str
+	size: int
+
+	@property
+	def nbytes(self) -> int:
+		return len(self.payload)
+
+	def apply(self, target: np.ndarray, forward: bool) -> None:
+		# XOR is its own inverse, so both directions are the same operation
+		xor = np.frombuffer(zlib.decompress(self.payload), dtype=self.dtype)
+		flat = target.reshape(-1)
+		flat ^= xor
+
+
+@dataclass
+class ItemDelta:
+	"""One entry of a mapping target (None = entry absent)"""
+	key: str
+	item: Any
+	old: Any
+	new: Any
+
+	@property
+	def nbytes(self) -> int:
+		return len(pickle.dumps((self.item, self.old, self.new)))
+
+	def apply(self, target: Dict, forward: bool) -> None:
+		value = self.new if forward else self.old
+		if value is None:
+			target.pop(self.item, None)
+		else:
+			target[self.item] = value
+
+
+Delta = Union[ArrayDelta, XorDelta, ItemDelta]
+
+
+@dataclass
+class HistoryEntry:
+	"""One undoable action, possibly spanning several targets"""
+	label: str
+	deltas: List[Delta]
+	group: Optional[Any] = None
+	timestamp: float = field(default_factory=time.time)
+
+	@property
+	def nbytes(self) -> int:
+		return sum(delta.nbytes for delta in self.deltas)
+
+
+class EditHistory:
+	"""Byte-budgeted undo/redo ring with stroke coalescing and a crash journal"""
+
+	def __init__(self, budget_bytes: int = DEFAULT_BUDGET, journal_path: Optional[Path] = None):
+		"""
+		Args:
+			budget_bytes: Memory allowed for undo + redo entries
+			journal_path: Append-only journal for crash recovery (None = off)
+		"""
+		self.budget_bytes = budget_bytes
+		self.targets: Dict[str, Any] = {}
+		self.undo_stack: Deque[HistoryEntry] = deque()
+		self.redo_stack: Deque[HistoryEntry] = deque()
+		self.nbytes = 0
+		self.journal_path = Path(journal_path) if journal_path else None
+		self._journal = None
+
+	# ------------------------------------------------------------------
+	# Targets
+	# ------------------------------------------------------------------
+
+	def register(self, key: str, target: Any) -> None:
+		"""Register an array or dict that deltas with this key apply to"""
+		self.targets[key] = target
+
+	def clear(self) -> None:
+		"""Drop all history (new document loaded)"""
+		self.undo_stack.clear()
+		self.redo_stack.clear()
+		self.nbytes = 0
+
+	# ------------------------------------------------------------------
+	# Recording
+	# ------------------------------------------------------------------
+
+	def pack_cells(self, key: str, indices: np.ndarray, old: np.ndarray,
+				   new: np.ndarray) -> Delta:
+		"""Smallest delta for changed cells (index/value arrays or XOR+zlib)"""
+		target = self.targets[key]
+		delta = ArrayDelta(key, np.asarray(indices).astype(_index_dtype(target.size)),
+						   np.asarray(old).copy(), np.asarray(new).copy())
+
+		if delta.indices.size > target.size * XOR_THRESHOLD and np.issubdtype(target.dtype, np.integer):
+			xor = np.zeros(target.size, dtype=target.dtype)
+			xor[delta.indices] = delta.old ^ delta.new
+			payload = zlib.compress(xor.tobytes(), 1)
+			if len(payload) < delta.nbytes:
+				return XorDelta(key, payload, target.dtype.str, target.size)
+
+		return delta
+
+	def record_diff(self, key: str, before: np.ndarray, label: str,
+					group: Optional[Any] = None) -> bool:
+		"""Record the change from a snapshot to the registered array's current state"""
+		before_flat = before.reshape(-1)
+		after_flat = self.targets[key].reshape(-1)
+		changed = np.flatnonzero(before_flat != after_flat)
+		if changed.size == 0:
+			return False
+		delta = self.pack_cells(key, changed, before_flat[changed], after_flat[changed])
+		self.record(HistoryEntry(label, [delta], group))
+		return True
+
+	def record_cells(self, key: str, indices: np.ndarray, old: np.ndarray, label: str,
+					 group: Optional[Any] = None) -> bool:
+		"""Record cells already written (flat indices and their previous values)"""
+		indices = np.asarray(indices)
+		if indices.size == 0:
+			return False
+		new = self.targets[key].reshape(-1)[indices]
+		self.record(HistoryEntry(label, [self.pack_cells(key, indices, old, new)], group))
+		return True
+
+	def record_item(self, key: str, item: Any, old: Any, new: Any, label: str,
+					group: Optional[Any] = None) -> None:
+		"""Record a mapping entry change (already applied)"""
+		self.record(HistoryEntry(label, [ItemDelta(key, item, old, new)], group))
+
+	def record(self, entry: HistoryEntry) -> None:
+		"""Push an entry, coalescing with the previous one if in the same group"""
+		self._drop_redo()
+
+		last = self.undo_stack[-1] if self.undo_stack else None
+		if entry.group is not None and last is not None and last.group == entry.group:
+			self.nbytes -= last.nbytes
+			last.deltas = self._coalesce(last.deltas, entry.deltas)
+			last.timestamp = entry.timestamp
+			self.nbytes += last.nbytes
+		else:
+			self.undo_stack.append(entry)
+			self.nbytes += entry.nbytes
+
+		self._write_journal(b'EDIT', entry)
+		self._enforce_budget()
+
+	@staticmethod
+	def _coalesce(earlier: List[Delta], later: List[Delta]) -> List[Delta]:
+		"""Append later deltas in order, merging only into an adjacent same-key ArrayDelta"""
+		merged = list(earlier)
+		for delta in later:
+			previous = merged[-1] if merged else None
+			if (isinstance(previous, ArrayDelta) and isinstance(delta, ArrayDelta)
+					and previous.key == delta.key):
+				merged[-1] = previous.merge(delta)
+			else:
+				merged.append(delta)
+		return merged
+
+	def _drop_redo(self) -> None:
+		self.nbytes -= sum(entry.nbytes for entry in self.redo_stack)
+		self.redo_stack.clear()
+
+	def _enforce_budget(self) -> None:
+		"""
+		Evict entries until under budget, farthest from the current state first:
+		the oldest undo entries, then the last redo entries (one entry is always kept)
+		"""
+		while self.nbytes > self.budget_bytes and len(self.undo_stack) + len(self.redo_stack) > 1:
+			stack = self.undo_stack if len(self.undo_stack) > 1 or not self.redo_stack else self.redo_stack
+			self.nbytes -= stack.popleft().nbytes
+
+	# ------------------------------------------------------------------
+	# Undo / redo
+	# ------------------------------------------------------------------
+
+	def can_undo(self) -> bool:
+		return bool(self.undo_stack)
+
+	def can_redo(self) -> bool:
+		return bool(self.redo_stack)
+
+	def undo(self) -> Optional[HistoryEntry]:
+		"""Revert the newest entry, returning it (None if nothing to undo)"""
+		if not self.undo_stack:
+			return None
+		entry = self.undo_stack.pop()
+		self._apply(entry, forward=False)
+		self.redo_stack.append(entry)
+		self._write_journal(b'UNDO')
+		return entry
+
+	def redo(self) -> Optional[HistoryEntry]:
+		"""Re-apply the most recently undone entry"""
+		if not self.redo_stack:
+			return None
+		entry = self.redo_stack.pop()
+		self._apply(entry, forward=True)
+		self.undo_stack.append(entry)
+		self._write_journal(b'REDO')
+		return entry
+
+	def _apply(self, entry: HistoryEntry, forward: bool) -> None:
+		deltas = entry.deltas if forward else reversed(entry.deltas)
+		for delta in deltas:
+			delta.apply(self.targets[delta.key], forward)
+
+	# ------------------------------------------------------------------
+	# Journal
+	# ------------------------------------------------------------------
+
+	def _target_hashes(self) -> Dict[str, str]:
+		hashes = {}
+		for key, target in self.targets.items():
+			if isinstance(target, np.ndarray):
+				data = target.tobytes()
+			else:
+				data = pickle.dumps(sorted(target.items(), key=repr))
+			hashes[key] = hashlib.sha1(data).hexdigest()
+		return hashes
+
+	def checkpoint(self, identity: Optional[Dict[str, Any]] = None) -> None:
+		"""
+		Start a fresh journal from the current state (call after saving)
+
+		Args:
+			identity: What the targets were loaded from, stored for recovery
+		"""
+		if self.journal_path is None:
+			return
+		self.close_journal()
+		self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+		self._journal = open(self.journal_path, 'wb')
+		self._write_journal(b'BASE', {'identity': identity, 'hashes': self._target_hashes()})
+
+	def close_journal(self) -> None:
+		if self._journal is not None:
+			self._journal.close()
+			self._journal = None
+
+	def discard_journal(self) -> None:
+		"""Close and delete the journal (clean shutdown)"""
+		self.close_journal()
+		if self.journal_path is not None and self.journal_path.exists():
+			self.journal_path.unlink()
+
+	def set_aside_journal(self) -> Optional[Path]:
+		"""Rename the journal out of the way so a new one cannot truncate it"""
+		self.close_journal()
+		if self.journal_path is None or not self.journal_path.exists():
+			return None
+		stamp = time.strftime('%Y%m%d-%H%M%S')
+		aside = self.journal_path.with_name(f"{self.journal_path.stem}.{stamp}.failed{self.journal_path.suffix}")
+		self.journal_path.rename(aside)
+		return aside
+
+	def journal_identity(self) -> Optional[Dict[str, Any]]:
+		"""Identity stored in the journal's BASE record (None if there is none)"""
+		if self.journal_path is None or not self.journal_path.exists():
+			return None
+		records = self.read_journal(self.journal_path)
+		if not records or records[0][0] != b'BASE':
+			return None
+		return records[0][1].get('identity')
+
+	def _write_journal(self, tag: bytes, payload: Any = None) -> None:
+		if self._journal is None:
+			return
+		data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+		self._journal.write(struct.pack('<4sI', tag, len(data)) + data)
+		self._journal.flush()
+
+	@staticmethod
+	def read_journal(journal_path: Path) -> List[tuple]:
+		"""(tag, payload) records; a torn final record is ignored"""
+		records = []
+		data = Path(journal_path).read_bytes()
+		offset = 0
+		while offset + 8 <= len(data):
+			tag, length = struct.unpack_from('<4sI', data, offset)
+			body = data[offset + 8:offset + 8 + length]
+			if len(body) < length:
+				break
+			try:
+				records.append((tag, pickle.loads(zlib.decompress(body))))
+			except (zlib.error, pickle.UnpicklingError, EOFError):
+				break
+			offset += 8 + length
+		return records
+
+	def recover(self) -> int:
+		"""
+		Replay the journal of a crashed session onto the registered targets.
+
+		The targets must be in the state the journal started from (the last
+		saved data). On a hash mismatch the journal is renamed aside (see
+		set_aside_journal) and ValueError is raised, so the unsaved edits
+		survive a later checkpoint().
+
+		Returns:
+			Number of records replayed
+		"""
+		if self.journal_path is None or not self.journal_path.exists():
+			return 0
+
+		records = self.read_journal(self.journal_path)
+		if not records or records[0][0] != b'BASE':
+			return 0
+
+		base = records[0][1]
+		current = self._target_hashes()
+		for key, digest in base['hashes'].items():
+			if key in current and current[key] != digest:
+				aside = self.set_aside_journal()
+				raise ValueError(f"Journal base does not match current '{key}' data (journal kept as {aside})")
+
+		# Replay without re-journaling, then start a journal that includes it
+		path, self.journal_path = self.journal_path, None
+		try:
+			for tag, payload in records[1:]:
+				if tag == b'EDIT':
+					self._apply(payload, forward=True)
+					self.record(payload)
+				elif tag == b'UNDO':
+					self.undo()
+				elif tag == b'REDO':
+					self.redo()
+		finally:
+			self.journal_path = path
+
+		self._rewrite_journal(base)
+		return len(records) - 1
+
+	def _rewrite_journal(self, base: Dict[str, str]) -> None:
+		"""Journal the recovered history so a second crash loses nothing"""
+		self.close_journal()
+		self._journal = open(self.journal_path, 'wb')
+		self._write_journal(b'BASE', base)
+		for entry in self.undo_stack:
+			self._write_journal(b'EDIT', entry)
+		for entry in reversed(self.redo_stack):
+			self._write_journal(b'EDIT', entry)
+		for _ in self.redo_stack:
+			self._write_journal(b'UNDO')
@@ -8,9 +8,13 @@ saving to ROM, searching, and bulk operations.
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import struct
+import sys
 
 from enemy_data import Enemy, EnemyFlags, ENEMY_NAMES
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'rom'))
+from record_tables import EDITOR_ENEMIES
+
 
 # ROM addresses for enemy data (these are example addresses - adjust for actual ROM)
 ENEMY_DATA_BASE = 0x0D0000  # Base address for enemy stats
@@ -28,7 +32,7 @@ class EnemyDatabase:
 	def __init__(self):
 		"""Initialize empty enemy database"""
 		self.enemies: Dict[int, Enemy] = {}
-		self.rom_data: Optional[bytes] = None
+		self.rom_data: Optional[bytearray] = None
 		self.rom_path: Optional[Path] = None
 	
 	def load_from_rom(self, rom_path: str):
@@ -43,13 +47,18 @@ class EnemyDatabase:
 			raise FileNotFoundError(f"ROM not found: {rom_path}")
 		
 		with open(rom_path_obj, 'rb') as f:
-			self.rom_data = f.read()
+			self.rom_data = bytearray(f.read())
 		
 		self.rom_path = rom_path_obj
 		self.enemies.clear()
 		
-		# Load each enemy
-		for enemy_id in range(ENEMY_COUNT):
+		self._load_records(range(ENEMY_COUNT))
+		
+		print(f"Loaded {len(self.enemies)} enemies from ROM")
+	
+	def _load_records(self, enemy_ids) -> None:
+		"""Parse enemies from the loaded ROM"""
+		for enemy_id in enemy_ids:
 			address = ENEMY_DATA_BASE + (enemy_id * ENEMY_SIZE)
 			
 			if address + ENEMY_SIZE > len(self.rom_data):
@@ -63,8 +72,22 @@ class EnemyDatabase:
 				enemy.name = ENEMY_NAMES[enemy_id]
 			
 			self.enemies[enemy_id] = enemy
+	
+	def table(self):
+		"""
+		Fixed part of every enemy record as a NumPy view over the loaded ROM
 		
-		print(f"Loaded {len(self.enemies)} enemies from ROM")
+		Assignments write straight into rom_data (and so into save_to_rom
+		output); call refresh_from_table() afterwards to update the
+		Enemy objects.
+		"""
+		if self.rom_data is None:
+			raise RuntimeError("No ROM data loaded")
+		return EDITOR_ENEMIES.view(self.rom_data)
+	
+	def refresh_from_table(self) -> None:
+		"""Re-read enemies without unsaved object edits from rom_data"""
+		self._load_records([enemy_id for enemy_id, enemy in self.enemies.items() if not enemy.modified])
 	
 	def save_to_rom(self, output_path: str):
 		"""
@@ -8,10 +8,14 @@ saving to ROM, searching, and shop management.
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import struct
+import sys
 import json
 
 from item_data import Item, ItemType, ItemFlags, EquipRestriction, ITEM_NAMES
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'rom'))
+from record_tables import EDITOR_ITEMS, EDITOR_ITEM_EFFECTS
+
 
 # ROM addresses for item data
 ITEM_DATA_BASE = 0x0F0000  # Base address for item data
@@ -29,7 +33,7 @@ class ItemDatabase:
 	def __init__(self):
 		"""Initialize empty item database"""
 		self.items: Dict[int, Item] = {}
-		self.rom_data: Optional[bytes] = None
+		self.rom_data: Optional[bytearray] = None
 		self.rom_path: Optional[Path] = None
 	
 	def load_from_rom(self, rom_path: str):
@@ -44,13 +48,18 @@ class ItemDatabase:
 			raise FileNotFoundError(f"ROM not found: {rom_path}")
 		
 		with open(rom_path_obj, 'rb') as f:
-			self.rom_data = f.read()
+			self.rom_data = bytearray(f.read())
 		
 		self.rom_path = rom_path_obj
 		self.items.clear()
 		
-		# Load each item
-		for item_id in range(ITEM_COUNT):
+		self._load_records(range(ITEM_COUNT))
+		
+		print(f"Loaded {len(self.items)} items from ROM")
+	
+	def _load_records(self, item_ids) -> None:
+		"""Parse items from the loaded ROM"""
+		for item_id in item_ids:
 			address = ITEM_DATA_BASE + (item_id * ITEM_SIZE)
 			
 			if address + ITEM_SIZE > len(self.rom_data):
@@ -64,8 +73,24 @@ class ItemDatabase:
 				item.name = ITEM_NAMES[item_id]
 			
 			self.items[item_id] = item
+	
+	def table(self, consumables: bool = False):
+		"""
+		Fixed part of every item record as a NumPy view over the loaded ROM
 		
-		print(f"Loaded {len(self.items)} items from ROM")
+		Equipment and consumables share the bytes after the header, so
+		consumables=True selects the effect layout instead of the stat
+		bonuses. Assignments write straight into rom_data (and so into
+		save_to_rom output); call refresh_from_table() afterwards to update
+		the Item objects.
+		"""
+		if self.rom_data is None:
+			raise RuntimeError("No ROM data loaded")
+		return (EDITOR_ITEM_EFFECTS if consumables else EDITOR_ITEMS).view(self.rom_data)
+	
+	def refresh_from_table(self) -> None:
+		"""Re-read items without unsaved object edits from rom_data"""
+		self._load_records([item_id for item_id, item in self.items.items() if not item.modified])
 	
 	def save_to_rom(self, output_path: str):
 		"""
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Map Serialization for FFMQ Map Editor
+Reads and writes complete maps (header, layers, attributes) in the ROM
+
+Layers are stored compressed (FFMQCompression) behind a size word, one
+pointer per layer after each map's header record. Each decompressed
+layer is width * height [tile_id, attributes] byte pairs.
+
+Features:
+- Vectorized layer decode into tile and attribute arrays
+- Write-back that leaves unchanged layers untouched (byte-identical ROM)
+- Changed layers recompressed in place, or relocated into known free space
+  (configured regions, or the 0xFF padding that runs to the end of a bank)
+- Bulk load of every map into one memory-mapped .npz cache keyed by ROM hash
+
+Usage:
+	rom = ROMHandler('ffmq.sfc')
+	serializer = MapSerializer(rom)
+	rom_map = serializer.read_map(5)
+	rom_map.tiles[0, 3, 4] = 0x21
+	serializer.write_map(rom_map)
+	rom.save_rom('ffmq_edited.sfc')
+
+	cache = MapCache.open(rom, Path('data/map_cache'))
+	rom_map = cache.get(5)
+"""
+
+import hashlib
+import zipfile
+import numpy as np
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .compression import FFMQCompression
+from .rom_handler import ROMHandler
+
+
+LAYER_COUNT = 3
+POINTER_RECORD_SIZE = 44	# 32-byte header area + 3 layer pointers
+FREE_BYTE = 0xFF
+BANK_SIZE = 0x8000
+
+HEADER_FIELDS = ('map_id', 'map_type', 'width', 'height', 'tileset_id', 'palette_id',
+				 'music_id', 'encounter_rate', 'encounter_group', 'spawn_x', 'spawn_y', 'flags')
+
+
+@dataclass
+class RomMap:
+	"""One map as stored in the ROM"""
+	map_id: int
+	header: Dict[str, int]
+	tiles: np.ndarray		# (3, height, width) uint8 tile IDs
+	attrs: np.ndarray		# (3, height, width) uint8 attribute bytes
+
+	@property
+	def width(self) -> int:
+		return self.header['width']
+
+	@property
+	def height(self) -> int:
+		return self.header['height']
+
+	def layer_bytes(self, layer: int) -> bytes:
+		"""Uncompressed [tile_id, attributes] stream for one layer"""
+		return np.stack([self.tiles[layer], self.attrs[layer]], axis=-1).tobytes()
+
+
+class MapSerializer:
+	"""Map read/write against a loaded ROMHandler"""
+
+	def __init__(self, rom: ROMHandler, free_regions: Optional[List[Tuple[int, int]]] = None):
+		"""
+		Args:
+			free_regions: PC ranges [start, end) that relocated layers may use.
+				None scans for 0xFF padding at bank ends instead, since 0xFF
+				runs in the middle of a bank are often tables or graphics.
+		"""
+		self.rom = rom
+		self.free_regions = free_regions
+		self.released: List[Tuple[int, int]] = []		# Slots freed by this serializer
+
+	# ------------------------------------------------------------------
+	# Reading
+	# ------------------------------------------------------------------
+
+	@property
+	def data_start(self) -> int:
+		"""First address after the layer pointer records"""
+		return self.rom.MAP_DATA_BASE + self.rom.MAX_MAPS * POINTER_RECORD_SIZE
+
+	def pointer_address(self, map_id: int, layer: int) -> int:
+		return self.rom.MAP_DATA_BASE + map_id * POINTER_RECORD_SIZE + 32 + layer * 4
+
+	def layer_blob(self, map_id: int, layer: int) -> Optional[Tuple[int, bytes]]:
+		"""
+		Locate a layer's compressed data
+
+		Returns:
+			(PC address of the size word, compressed bytes), or None if absent
+		"""
+		pointer = self.rom.read_dword(self.pointer_address(map_id, layer))
+		if pointer in (0, 0xFFFFFFFF):
+			return None
+
+		address = self.rom.snes_to_pc_address(pointer)
+		if not 0 <= address < len(self.rom.rom_data) - 2:
+			return None
+
+		size = self.rom.read_word(address)
+		if size == 0 or size > BANK_SIZE:
+			return None
+
+		return address, self.rom.read_bytes(address + 2, size)
+
+	def read_layer(self, map_id: int, layer: int, width: int,
+				   height: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""(tiles, attrs) arrays for one layer (zeros if the layer is absent)"""
+		blob = self.layer_blob(map_id, layer)
+		if blob is None:
+			empty = np.zeros((height, width), dtype=np.uint8)
+			return empty, empty.copy()
+
+		raw = FFMQCompression.decompress_layer(blob[1], width * height * 2)
+		pairs = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 2)
+		return pairs[..., 0].copy(), pairs[..., 1].copy()
+
+	def read_map(self, map_id: int) -> Optional[RomMap]:
+		"""Read a map, or None if the header is missing or empty"""
+		header = self.rom.read_map_header(map_id)
+		if not header or header['width'] == 0 or header['height'] == 0:
+			return None
+
+		width, height = header['width'], header['height']
+		tiles = np.zeros((LAYER_COUNT, height, width), dtype=np.uint8)
+		attrs = np.zeros((LAYER_COUNT, height, width), dtype=np.uint8)
+		for layer in range(LAYER_COUNT):
+			tiles[layer], attrs[layer] = self.read_layer(map_id, layer, width, height)
+
+		return RomMap(map_id, header, tiles, attrs)
+
+	def read_all(self) -> List[RomMap]:
+		"""Every non-empty map in the ROM"""
+		maps = []
+		for map_id in range(self.rom.MAX_MAPS):
+			rom_map = self.read_map(map_id)
+			if rom_map is not None:
+				maps.append(rom_map)
+		return maps
+
+	# ------------------------------------------------------------------
+	# Writing
+	# ------------------------------------------------------------------
+
+	def write_map(self, rom_map: RomMap) -> List[int]:
+		"""
+		Write a map back to the ROM
+
+		Only layers whose contents differ from the ROM are recompressed, so
+		saving an unchanged map leaves the ROM byte-identical.
+
+		Returns:
+			Layers that were rewritten
+		"""
+		self.rom.write_map_header(rom_map.map_id, rom_map.header)
+
+		written = []
+		for layer in range(LAYER_COUNT):
+			data = rom_map.layer_bytes(layer)
+			blob = self.layer_blob(rom_map.map_id, layer)
+			if blob is not None:
+				current = FFMQCompression.decompress_layer(blob[1], len(data))
+				if current == data:
+					continue
+			elif not any(data):
+				continue	# Absent layer is read as zeros
+
+			self.write_layer(rom_map.map_id, layer, data)
+			written.append(layer)
+
+		return written
+
+	def write_layer(self, map_id: int, layer: int, data: bytes) -> int:
+		"""
+		Compress a layer and store it, relocating if it outgrew its slot
+
+		Returns:
+			PC address of the stored layer
+		"""
+		compressed = FFMQCompression.compress_map(data)
+		required = len(compressed) + 2
+
+		blob = self.layer_blob(map_id, layer)
+		if blob is not None and required <= len(blob[1]) + 2:
+			address = blob[0]
+			slack = len(blob[1]) + 2 - required
+			self.rom.write_bytes(address + required, bytes([FREE_BYTE]) * slack)
+		else:
+			if blob is not None:
+				self.release(blob[0], len(blob[1]) + 2)
+			address = self.allocate(required)
+
+		self.rom.write_word(address, len(compressed))
+		self.rom.write_bytes(address + 2, compressed)
+		self.rom.write_dword(self.pointer_address(map_id, layer),
+							 self.rom.pc_to_snes_address(address))
+		return address
+
+	def free_runs(self, start: int = 0, known: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		(starts, ends) of free-byte runs at or after start, split at banks
+
+		A layer must not cross a LoROM bank, so runs are cut at every
+		bank boundary. known limits the runs to bytes marked True.
+		"""
+		rom = np.frombuffer(bytes(self.rom.rom_data), dtype=np.uint8)
+		banks = -(-len(rom) // BANK_SIZE)
+		free = np.zeros((banks, BANK_SIZE + 2), dtype=np.int8)
+		flat = np.zeros(banks * BANK_SIZE, dtype=bool)
+		flat[:len(rom)] = rom == FREE_BYTE
+		if known is not None:
+			flat[:len(known)] &= known
+		flat[:start] = False
+		free[:, 1:-1] = flat.reshape(banks, BANK_SIZE)
+
+		edges = np.diff(free, axis=1)
+		bank_s, starts = np.nonzero(edges == 1)
+		bank_e, ends = np.nonzero(edges == -1)
+		return bank_s * BANK_SIZE + starts, bank_e * BANK_SIZE + ends
+
+	def known_free(self) -> np.ndarray:
+		"""
+		Bytes allocate may use: the configured free regions, or else every
+		0xFF run that reaches the end of its bank, plus slots released here
+		"""
+		known = np.zeros(len(self.rom.rom_data), dtype=bool)
+		if self.free_regions is not None:
+			for start, end in self.free_regions:
+				known[start:end] = True
+		else:
+			starts, ends = self.free_runs(self.data_start)
+			for start, end in zip(starts.tolist(), ends.tolist()):
+				if end % BANK_SIZE == 0 or end == len(known):
+					known[start:end] = True
+		for start, end in self.released:
+			known[start:end] = True
+		return known
+
+	def allocate(self, size: int) -> int:
+		"""
+		First known free run after the pointer records that fits size bytes
+
+		The first byte of each run is skipped, since a free-looking 0xFF may
+		be the end marker of the data before it. The ROM is expanded by a
+		bank when nothing fits.
+		"""
+		starts, ends = self.free_runs(self.data_start, self.known_free())
+		fits = np.flatnonzero(ends - starts >= size + 1)
+		if fits.size:
+			return int(starts[fits[0]]) + 1
+
+		address = -(-len(self.rom.rom_data) // BANK_SIZE) * BANK_SIZE
+		self.rom.rom_data.extend(bytes([FREE_BYTE]) * (address + BANK_SIZE - len(self.rom.rom_data)))
+		return address
+
+	def release(self, address: int, size: int) -> None:
+		"""Return a region to free space"""
+		self.rom.write_bytes(address, bytes([FREE_BYTE]) * size)
+		self.released.append((address, address + size))
+
+
+class MapCache:
+	"""
+	All maps of one ROM in a single memory-mapped .npz file
+
+	The archive is stored uncompressed, so each member is a plain .npy
+	blob inside the zip and can be memory-mapped at its data offset:
+	opening a map only touches the pages of that map.
+	"""
+
+	def __init__(self, path: Path):
+		self.path = path
+		arrays = self._memmap_members(path)
+		self.tiles = arrays['tiles']
+		self.attrs = arrays['attrs']
+		self.index = arrays['index']		# (n, 4): map_id, offset, width, height
+		self.headers = arrays['headers']	# structured, one row per map
+		self._rows = {int(map_id): row for row, map_id in enumerate(self.index[:, 0])}
+
+	@staticmethod
+	def rom_hash(rom: ROMHandler) -> str:
+		return hashlib.sha1(bytes(rom.rom_data)).hexdigest()
+
+	@classmethod
+	def path_for(cls, rom: ROMHandler, cache_dir: Path) -> Path:
+		return Path(cache_dir) / f"maps_{cls.rom_hash(rom)[:16]}.npz"
+
+	@classmethod
+	def open(cls, rom: ROMHandler, cache_dir: Path) -> 'MapCache':
+		"""Open the cache for this ROM, building it on first use"""
+		path = cls.path_for(rom, cache_dir)
+		if not path.exists():
+			cls.build(MapSerializer(rom).read_all(), path)
+		return cls(path)
+
+	@staticmethod
+	def build(maps: List[RomMap], path: Path) -> None:
+		"""Pack maps into one archive"""
+		sizes = [LAYER_COUNT * m.width * m.height for m in maps]
+		offsets = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+
+		index = np.array([(m.map_id, offsets[i], m.width, m.height) for i, m in enumerate(maps)],
+						 dtype=np.int64).reshape(-1, 4)
+		headers = np.array([tuple(m.header[f] for f in HEADER_FIELDS) for m in maps],
+						   dtype=[(f, np.int32) for f in HEADER_FIELDS])
+		tiles = np.concatenate([m.tiles.reshape(-1) for m in maps] or [np.zeros(0, np.uint8)])
+		attrs = np.concatenate([m.attrs.reshape(-1) for m in maps] or [np.zeros(0, np.uint8)])
+
+		path.parent.mkdir(parents=True, exist_ok=True)
+		temp = path.with_suffix('.tmp.npz')
+		np.savez(temp, tiles=tiles, attrs=attrs, index=index, headers=headers)
+		temp.replace(path)
+
+	@staticmethod
+	def _memmap_members(path: Path) -> Dict[str, np.ndarray]:
+		arrays = {}
+		with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+			for info in archive.infolist():
+				name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+				if info.compress_type != zipfile.ZIP_STORED:
+					arrays[name] = np.load(archive.open(info))
+					continue
+
+				# Local file header: 30 fixed bytes + name + extra field
+				f.seek(info.header_offset + 26)
+				name_len, extra_len = np.frombuffer(f.read(4), dtype='<u2')
+				f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+
+				if np.lib.format.read_magic(f) == (1, 0):
+					shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+				else:
+					shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+				if dtype.hasobject or 0 in shape:
+					f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+					arrays[name] = np.lib.format.read_array(f)
+				else:
+					arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(),
+											 shape=shape, order='F' if fortran else 'C')
+		return arrays
+
+	def map_ids(self) -> List[int]:
+		return sorted(self._rows)
+
+	def get(self, map_id: int) -> Optional[RomMap]:
+		"""Map from the cache (arrays are copies, safe to edit)"""
+		row = self._rows.get(map_id)
+		if row is None:
+			return None
+
+		_, offset, width, height = (int(v) for v in self.index[row])
+		size = LAYER_COUNT * width * height
+		shape = (LAYER_COUNT, height, width)
+		header = {f: int(self.headers[row][f]) for f in HEADER_FIELDS}
+		return RomMap(map_id, header,
+					  np.array(self.tiles[offset:offset + size]).reshape(shape),
+					  np.array(self.attrs[offset:offset + size]).reshape(shape))
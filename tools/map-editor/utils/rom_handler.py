@@ -81,6 +81,12 @@ class ROMHandler:
 			return struct.unpack_from('<H', self.rom_data, address)[0]
 		return 0
 
+	def read_dword(self, address: int) -> int:
+		"""Read a 32-bit value (little-endian) from ROM"""
+		if self.rom_data and 0 <= address + 3 < len(self.rom_data):
+			return struct.unpack_from('<I', self.rom_data, address)[0]
+		return 0
+
 	def read_bytes(self, address: int, count: int) -> bytes:
 		"""Read multiple bytes from ROM"""
 		if self.rom_data and 0 <= address + count <= len(self.rom_data):
@@ -101,6 +107,13 @@ class ROMHandler:
 			return True
 		return False
 
+	def write_dword(self, address: int, value: int) -> bool:
+		"""Write a 32-bit value (little-endian) to ROM"""
+		if self.rom_data and 0 <= address + 3 < len(self.rom_data):
+			struct.pack_into('<I', self.rom_data, address, value & 0xFFFFFFFF)
+			return True
+		return False
+
 	def write_bytes(self, address: int, data: bytes) -> bool:
 		"""Write multiple bytes to ROM"""
 		if self.rom_data and 0 <= address + len(data) <= len(self.rom_data):
@@ -8,10 +8,14 @@ saving to ROM, searching, and spell learning data.
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import struct
+import sys
 import json
 
 from spell_data import Spell, SpellElement, SpellTarget, SpellFlags, SPELL_NAMES
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'rom'))
+from record_tables import EDITOR_SPELLS
+
 
 # ROM addresses for spell data
 SPELL_DATA_BASE = 0x0E0000  # Base address for spell data
@@ -29,7 +33,7 @@ class SpellDatabase:
 	def __init__(self):
 		"""Initialize empty spell database"""
 		self.spells: Dict[int, Spell] = {}
-		self.rom_data: Optional[bytes] = None
+		self.rom_data: Optional[bytearray] = None
 		self.rom_path: Optional[Path] = None
 	
 	def load_from_rom(self, rom_path: str):
@@ -44,13 +48,18 @@ class SpellDatabase:
 			raise FileNotFoundError(f"ROM not found: {rom_path}")
 		
 		with open(rom_path_obj, 'rb') as f:
-			self.rom_data = f.read()
+			self.rom_data = bytearray(f.read())
 		
 		self.rom_path = rom_path_obj
 		self.spells.clear()
 		
-		# Load each spell
-		for spell_id in range(SPELL_COUNT):
+		self._load_records(range(SPELL_COUNT))
+		
+		print(f"Loaded {len(self.spells)} spells from ROM")
+	
+	def _load_records(self, spell_ids) -> None:
+		"""Parse spells from the loaded ROM"""
+		for spell_id in spell_ids:
 			address = SPELL_DATA_BASE + (spell_id * SPELL_SIZE)
 			
 			if address + SPELL_SIZE > len(self.rom_data):
@@ -64,8 +73,22 @@ class SpellDatabase:
 				spell.name = SPELL_NAMES[spell_id]
 			
 			self.spells[spell_id] = spell
+	
+	def table(self):
+		"""
+		Fixed part of every spell record as a NumPy view over the loaded ROM
 		
-		print(f"Loaded {len(self.spells)} spells from ROM")
+		Assignments write straight into rom_data (and so into save_to_rom
+		output); call refresh_from_table() afterwards to update the
+		Spell objects.
+		"""
+		if self.rom_data is None:
+			raise RuntimeError("No ROM data loaded")
+		return EDITOR_SPELLS.view(self.rom_data)
+	
+	def refresh_from_table(self) -> None:
+		"""Re-read spells without unsaved object edits from rom_data"""
+		self._load_records([spell_id for spell_id, spell in self.spells.items() if not spell.modified])
 	
 	def save_to_rom(self, output_path: str):
 		"""
@@ -24,6 +24,22 @@ Network Protocol:
 - Input delay buffering
 - Prediction/rollback
 
+Framing:
+- Packets are type (u8) + size (u32) + payload; reads are buffered and
+  split on these headers, so packets split or merged by TCP stay intact
+- Shared player/input tables are guarded by a lock (one thread per client)
+- The host sends on every accepted client socket (replies go back to the
+  socket the request came in on); a joined client runs the same receive
+  loop on its connection
+- netplay_transport.py provides the asyncio transport with redundant
+  input history and a rollback buffer
+
+State sync (attach_state_sync / record_state):
+- Sync checks send the summary of 1 KiB page hashes (state_sync.py)
+- On a mismatch the non-authority peer sends a HASH_REPORT; the
+  authority answers with a STATE_DELTA holding only the differing pages,
+  which is verified, applied and handed to on_resync for resimulation
+
 Features:
 - Host netplay sessions
 - Join remote games
@@ -46,11 +62,14 @@ import json
 import struct
 import threading
 import time
+import zlib
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 
+from state_sync import StateSync, decode_delta, decode_report, encode_delta, encode_report
+
 
 class ConnectionState(Enum):
 	"""Connection state"""
@@ -71,6 +90,8 @@ class PacketType(Enum):
 	DISCONNECT = 4
 	CHAT = 5
 	LOBBY_INFO = 6
+	HASH_REPORT = 7
+	STATE_DELTA = 8
 
 
 @dataclass
@@ -126,7 +147,8 @@ class FFMQNetworkManager:
 	
 	# Packet size limits
 	MAX_PACKET_SIZE = 4096
-	HEADER_SIZE = 8
+	HEADER_SIZE = 5		# type (u8) + size (u32)
+	MAX_PAYLOAD = 1 << 20
 	
 	def __init__(self, verbose: bool = False):
 		self.verbose = verbose
@@ -138,6 +160,17 @@ class FFMQNetworkManager:
 		self.socket: Optional[socket.socket] = None
 		self.running = False
 		self.server_thread: Optional[threading.Thread] = None
+		self.receive_thread: Optional[threading.Thread] = None
+		self.peers: List[socket.socket] = []		# Accepted client sockets (host only)
+		self.lock = threading.Lock()		# Guards players, input_buffer, peers and state sync
+		self.send_lock = threading.Lock()	# Keeps packets from different threads whole
+		
+		# Paged state sync
+		self.state_sync: Optional[StateSync] = None
+		self.authority = False
+		self.on_resync: Optional[Callable[[int, bytes], None]] = None
+		self.remote_checks: Dict[int, int] = {}		# Frame -> remote summary, until compared
+		self.desync_frame: Optional[int] = None
 		
 		# Local player
 		self.local_player_id = 1
@@ -226,6 +259,12 @@ class FFMQNetworkManager:
 			self.socket.connect((host, port))
 			
 			self.state = ConnectionState.CONNECTING
+			self.running = True
+			
+			# Receive the host's packets on this connection
+			self.receive_thread = threading.Thread(target=self._receive_loop, args=(self.socket,))
+			self.receive_thread.daemon = True
+			self.receive_thread.start()
 			
 			# Send hello packet
 			self._send_hello()
@@ -261,21 +300,51 @@ class FFMQNetworkManager:
 	
 	def _handle_client(self, client_socket: socket.socket, address: Tuple) -> None:
 		"""Handle client connection"""
+		with self.lock:
+			self.peers.append(client_socket)
+		
+		try:
+			self._receive_loop(client_socket)
+		finally:
+			with self.lock:
+				self.peers.remove(client_socket)
+			client_socket.close()
+	
+	def _receive_loop(self, connection: socket.socket) -> None:
+		"""Read packets from one connection until it closes"""
+		pending = bytearray()
+		
 		while self.running:
 			try:
-				# Receive packet
-				data = client_socket.recv(self.MAX_PACKET_SIZE)
+				data = connection.recv(self.MAX_PACKET_SIZE)
 				
 				if not data:
 					break
 				
-				# Process packet
-				self._process_packet(data, client_socket)
+				pending += data
+				for packet in self._split_packets(pending):
+					self._process_packet(packet, connection)
 			
-			except:
+			except (OSError, ValueError):
+				break
+	
+	def _split_packets(self, pending: bytearray) -> List[bytes]:
+		"""Remove and return every complete packet at the front of pending"""
+		packets = []
+		offset = 0
+		
+		while len(pending) - offset >= self.HEADER_SIZE:
+			size = struct.unpack_from('<I', pending, offset + 1)[0]
+			if size > self.MAX_PAYLOAD:
+				raise ValueError(f"Packet too large: {size} bytes")
+			end = offset + self.HEADER_SIZE + size
+			if end > len(pending):
 				break
+			packets.append(bytes(pending[offset:end]))
+			offset = end
 		
-		client_socket.close()
+		del pending[:offset]
+		return packets
 	
 	def _send_hello(self) -> None:
 		"""Send hello packet"""
@@ -300,10 +369,8 @@ class FFMQNetworkManager:
 		self._send_packet(PacketType.INPUT, data)
 		
 		# Buffer locally
-		if frame not in self.input_buffer:
-			self.input_buffer[frame] = []
-		
-		self.input_buffer[frame].append(packet)
+		with self.lock:
+			self.input_buffer.setdefault(frame, []).append(packet)
 	
 	def send_state(self, frame: int, checksum: int, state_data: bytes) -> None:
 		"""Send state sync packet"""
@@ -318,17 +385,76 @@ class FFMQNetworkManager:
 		data = struct.pack('<II', frame, checksum)
 		self._send_packet(PacketType.SYNC_CHECK, data)
 	
-	def _send_packet(self, packet_type: PacketType, data: bytes) -> bool:
-		"""Send packet"""
-		if not self.socket:
+	def attach_state_sync(self, sync: StateSync, authority: bool,
+						  on_resync: Optional[Callable[[int, bytes], None]] = None) -> None:
+		"""
+		Enable paged sync checks
+		
+		Args:
+			authority: This peer's state wins a desync (normally the host)
+			on_resync: Called with (frame, repaired state) once a delta has
+				been applied; load it and resimulate the following frames
+		"""
+		self.state_sync = sync
+		self.authority = authority
+		self.on_resync = on_resync
+	
+	def record_state(self, frame: int, state: bytes) -> None:
+		"""Hash a frame's state; sync-check frames are snapshotted and sent"""
+		with self.lock:
+			summary = self.state_sync.record(frame, state)
+			if frame % self.SYNC_CHECK_INTERVAL:
+				return
+			self.state_sync.snapshot(frame, state)
+		
+		self.send_sync_check(frame, summary)
+		self._compare_sync(frame)
+	
+	def _compare_sync(self, frame: int) -> None:
+		"""Compare summaries once both sides have reached frame"""
+		with self.lock:
+			remote = self.remote_checks.get(frame)
+			local = self.state_sync.summary(frame)
+			if remote is None or local is None:
+				return
+			del self.remote_checks[frame]
+			if remote == local:
+				self.state_sync.mark_agreed(frame)
+				if self.desync_frame is not None and self.desync_frame <= frame:
+					self.desync_frame = None
+					self.state = ConnectionState.PLAYING
+				return
+			
+			self.state = ConnectionState.DESYNCED
+			self.desync_frame = frame
+			report = None if self.authority else self.state_sync.hash_report(frame)
+		
+		if self.verbose:
+			print(f"⚠️  Desync at frame {frame}: {local:08X} != {remote:08X}")
+		if report is not None:
+			self._send_packet(PacketType.HASH_REPORT, encode_report(report))
+	
+	def _send_packet(self, packet_type: PacketType, data: bytes,
+					 target: Optional[socket.socket] = None) -> bool:
+		"""Send packet to target, or to every client when hosting, or to the host"""
+		if target is not None:
+			targets = [target]
+		elif self.server_thread is not None:
+			with self.lock:
+				targets = list(self.peers)
+		else:
+			targets = [self.socket] if self.socket else []
+		if not targets:
 			return False
 		
 		try:
-			# Packet format: type (1 byte) + size (3 bytes) + data
+			# Packet format: type (1 byte) + size (4 bytes) + data
 			header = struct.pack('<BI', packet_type.value, len(data))
 			packet = header + data
 			
-			self.socket.sendall(packet)
+			with self.send_lock:
+				for connection in targets:
+					connection.sendall(packet)
 			
 			return True
 		
@@ -344,7 +470,10 @@ class FFMQNetworkManager:
 		
 		# Parse header
 		packet_type_value = struct.unpack('<B', data[0:1])[0]
-		packet_type = PacketType(packet_type_value)
+		try:
+			packet_type = PacketType(packet_type_value)
+		except ValueError:
+			return
 		size = struct.unpack('<I', data[1:5])[0]
 		payload = data[5:5+size]
 		
@@ -359,21 +488,27 @@ class FFMQNetworkManager:
 			self._handle_sync_check(payload)
 		elif packet_type == PacketType.CHAT:
 			self._handle_chat(payload)
+		elif packet_type == PacketType.HASH_REPORT:
+			self._handle_hash_report(payload, source)
+		elif packet_type == PacketType.STATE_DELTA:
+			self._handle_state_delta(payload)
 	
 	def _handle_hello(self, data: bytes, source: socket.socket) -> None:
 		"""Handle hello packet"""
 		try:
 			info = json.loads(data.decode())
 			
-			player_id = len(self.players) + 1
-			player = NetworkPlayer(
-				player_id=player_id,
-				name=info.get('player_name', f'Player{player_id}'),
-				ip_address=source.getpeername()[0],
-				port=source.getpeername()[1]
-			)
-			
-			self.players[player_id] = player
+			address = source.getpeername()
+			with self.lock:
+				player_id = len(self.players) + 1
+				player = NetworkPlayer(
+					player_id=player_id,
+					name=info.get('player_name', f'Player{player_id}'),
+					ip_address=address[0],
+					port=address[1]
+				)
+				
+				self.players[player_id] = player
 			
 			if self.verbose:
 				print(f"👤 Player joined: {player.name}")
@@ -395,10 +530,8 @@ class FFMQNetworkManager:
 		)
 		
 		# Buffer input
-		if frame not in self.input_buffer:
-			self.input_buffer[frame] = []
-		
-		self.input_buffer[frame].append(packet)
+		with self.lock:
+			self.input_buffer.setdefault(frame, []).append(packet)
 	
 	def _handle_state(self, data: bytes) -> None:
 		"""Handle state sync packet"""
@@ -418,10 +551,59 @@ class FFMQNetworkManager:
 		
 		frame, remote_checksum = struct.unpack('<II', data)
 		
-		# In real implementation, compare with local checksum
-		# For now, just log
 		if self.verbose:
 			print(f"🔍 Sync check at frame {frame}: {remote_checksum:08X}")
+		
+		if self.state_sync is None:
+			return
+		with self.lock:
+			self.remote_checks[frame] = remote_checksum
+		self._compare_sync(frame)
+	
+	def _handle_hash_report(self, data: bytes, source: Optional[socket.socket] = None) -> None:
+		"""Authority: answer a desync report with the differing pages"""
+		if self.state_sync is None or not self.authority:
+			return
+		
+		try:
+			report = decode_report(data)
+			with self.lock:
+				delta = self.state_sync.make_delta(report)
+				try:
+					first = self.state_sync.first_divergence(report)
+				except LookupError:
+					first = None		# Frames not recorded every frame
+		except (LookupError, ValueError, struct.error) as e:
+			if self.verbose:
+				print(f"Error answering hash report: {e}")
+			return
+		
+		if self.verbose:
+			print(f"🔍 Desync at frame {report.frame} (first diverged: {first}); "
+				  f"sending {len(delta.pages)} pages ({delta.size():,} bytes)")
+		self._send_packet(PacketType.STATE_DELTA, encode_delta(delta), source)
+	
+	def _handle_state_delta(self, data: bytes) -> None:
+		"""Apply the authority's pages and hand the repaired state back"""
+		if self.state_sync is None or self.authority:
+			return
+		
+		try:
+			delta = decode_delta(data)
+			with self.lock:
+				repaired = self.state_sync.apply_delta(delta)
+				if self.desync_frame is not None and self.desync_frame <= delta.frame:
+					self.desync_frame = None
+					self.state = ConnectionState.PLAYING
+		except (LookupError, ValueError, struct.error, zlib.error) as e:
+			if self.verbose:
+				print(f"Error applying state delta: {e}")
+			return
+		
+		if self.verbose:
+			print(f"✓ Resynced frame {delta.frame} ({len(delta.pages)} pages)")
+		if self.on_resync is not None:
+			self.on_resync(delta.frame, repaired)
 	
 	def _handle_chat(self, data: bytes) -> None:
 		"""Handle chat message"""
@@ -433,15 +615,10 @@ class FFMQNetworkManager:
 	
 	def get_inputs_for_frame(self, frame: int) -> Dict[int, int]:
 		"""Get all player inputs for frame"""
-		if frame not in self.input_buffer:
-			return {}
+		with self.lock:
+			packets = list(self.input_buffer.get(frame, ()))
 		
-		inputs = {}
-		
-		for packet in self.input_buffer[frame]:
-			inputs[packet.player_id] = packet.buttons
-		
-		return inputs
+		return {packet.player_id: packet.buttons for packet in packets}
 	
 	def calculate_latency(self, player_id: int) -> int:
 		"""Calculate player latency (simplified)"""
@@ -462,6 +639,15 @@ class FFMQNetworkManager:
 			
 			self.socket = None
 		
+		# Wake the receive threads blocked on client sockets
+		with self.lock:
+			peers = list(self.peers)
+		for peer in peers:
+			try:
+				peer.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+		
 		self.state = ConnectionState.DISCONNECTED
 		
 		if self.verbose:
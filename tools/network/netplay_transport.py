@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+FFMQ Netplay Transport - asyncio transport with rollback input buffer
+
+Wire format:
+- Stream transports (TCP): every message is a frame of
+  u16 length + message, decoded incrementally so split or merged reads
+  never corrupt a message
+- Datagram transports (UDP, loopback): one message per datagram
+- Message: 8-byte header (type u8, player u8, seq u16, ack u32) + payload
+- INPUT payload: first frame u32, count u8, count x buttons u16
+
+Input redundancy:
+- Every INPUT message carries all local inputs the peer has not yet
+  acknowledged (capped), so a lost packet is repaired by the next one
+  without a retransmit round trip
+- The ack field is the highest frame received contiguously from the
+  peer; the sender trims its history to frames after it
+- Round-trip time is measured from ack progress (no ping packets)
+
+Rollback buffer:
+- Per-player fixed ring arrays indexed by frame & (size - 1)
+- Missing remote inputs are predicted (repeat last known input); when
+  the real input arrives and differs, the earliest wrong frame is
+  reported for resimulation
+
+Testing:
+- LoopbackLink simulates latency, jitter and loss in-process
+- simulate() runs two sessions over a loopback link and verifies both
+  sides end with identical confirmed inputs
+
+Usage:
+	python netplay_transport.py --simulate --frames 600 --latency 80 --jitter 20 --loss 0.1
+	python netplay_transport.py --serve --port 7777
+	python netplay_transport.py --connect 127.0.0.1 --port 7777 --player 1
+"""
+
+import argparse
+import asyncio
+import random
+import struct
+import time
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class MessageType(Enum):
+	"""Netplay message type"""
+	HELLO = 0
+	WELCOME = 1
+	INPUT = 2
+	BYE = 3
+
+
+HEADER = struct.Struct('<BBHI')		# type, player, seq, ack frame
+LENGTH = struct.Struct('<H')
+INPUT_HEAD = struct.Struct('<IB')	# first frame, count
+BUTTONS = struct.Struct('<H')
+
+NO_FRAME = 0xFFFFFFFF
+MAX_MESSAGE = 0xFFFF
+MAX_REDUNDANT = 64					# Inputs per INPUT message
+DEFAULT_RING = 256					# Frames held per player (power of two)
+
+
+class Message(NamedTuple):
+	"""Decoded netplay message"""
+	type: MessageType
+	player: int
+	seq: int
+	ack: int				# -1 = nothing acknowledged yet
+	payload: bytes
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def encode_message(message_type: MessageType, player: int, seq: int, ack: int,
+				   payload: bytes = b'') -> bytes:
+	return HEADER.pack(message_type.value, player, seq & 0xFFFF,
+					   NO_FRAME if ack < 0 else ack) + payload
+
+
+def decode_message(data: bytes) -> Message:
+	if len(data) < HEADER.size:
+		raise ValueError(f"Message too short: {len(data)} bytes")
+	type_value, player, seq, ack = HEADER.unpack_from(data)
+	return Message(MessageType(type_value), player, seq, -1 if ack == NO_FRAME else ack,
+				   data[HEADER.size:])
+
+
+def encode_inputs(first_frame: int, buttons: List[int]) -> bytes:
+	return INPUT_HEAD.pack(first_frame, len(buttons)) + array('H', buttons).tobytes()
+
+
+def decode_inputs(payload: bytes) -> Tuple[int, array]:
+	if len(payload) < INPUT_HEAD.size:
+		raise ValueError(f"Input payload too short: {len(payload)} bytes")
+	first_frame, count = INPUT_HEAD.unpack_from(payload)
+	end = INPUT_HEAD.size + count * BUTTONS.size
+	if len(payload) < end:
+		raise ValueError("Truncated input payload")
+	buttons = array('H')
+	buttons.frombytes(payload[INPUT_HEAD.size:end])
+	return first_frame, buttons
+
+
+def frame_message(message: bytes) -> bytes:
+	"""Length-prefix a message for a stream transport"""
+	if len(message) > MAX_MESSAGE:
+		raise ValueError(f"Message too large: {len(message)} bytes")
+	return LENGTH.pack(len(message)) + message
+
+
+class FrameDecoder:
+	"""Incremental length-prefixed frame decoder for stream data"""
+
+	def __init__(self):
+		self.buffer = bytearray()
+
+	def feed(self, data: bytes) -> List[bytes]:
+		"""Add received bytes; return every complete message"""
+		self.buffer += data
+		messages = []
+		offset = 0
+		while len(self.buffer) - offset >= LENGTH.size:
+			(size,) = LENGTH.unpack_from(self.buffer, offset)
+			end = offset + LENGTH.size + size
+			if end > len(self.buffer):
+				break
+			messages.append(bytes(self.buffer[offset + LENGTH.size:end]))
+			offset = end
+		del self.buffer[:offset]
+		return messages
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+	"""Read one framed message (None at end of stream)"""
+	try:
+		header = await reader.readexactly(LENGTH.size)
+		(size,) = LENGTH.unpack(header)
+		return await reader.readexactly(size)
+	except asyncio.IncompleteReadError:
+		return None
+
+
+# ----------------------------------------------------------------------
+# Rollback input buffer
+# ----------------------------------------------------------------------
+
+class InputRing:
+	"""One player's inputs, indexed by frame in a fixed ring"""
+
+	def __init__(self, size: int = DEFAULT_RING):
+		if size & (size - 1):
+			raise ValueError("Ring size must be a power of two")
+		self.size = size
+		self.mask = size - 1
+		self.buttons = array('H', bytes(2 * size))
+		self.frames = array('q', [-1]) * size		# Frame stored in each slot
+		self.guess = array('H', bytes(2 * size))
+		self.guess_frames = array('q', [-1]) * size	# Frame predicted in each slot
+		self.confirmed = -1							# Highest contiguous frame
+		self.latest = -1							# Highest frame received
+
+	def get(self, frame: int) -> Optional[int]:
+		slot = frame & self.mask
+		return self.buttons[slot] if self.frames[slot] == frame else None
+
+	def put(self, frame: int, buttons: int) -> Optional[int]:
+		"""
+		Store a confirmed input
+
+		Returns:
+			frame if a different prediction was used for it, else None
+		"""
+		if frame <= self.confirmed or self.get(frame) is not None:
+			return None				# Duplicate (redundant copy)
+		if frame - self.confirmed > self.size:
+			raise OverflowError(f"Frame {frame} is more than {self.size} frames ahead")
+
+		slot = frame & self.mask
+		self.buttons[slot] = buttons
+		self.frames[slot] = frame
+		self.latest = max(self.latest, frame)
+		while self.get(self.confirmed + 1) is not None:
+			self.confirmed += 1
+
+		if self.guess_frames[slot] == frame:
+			self.guess_frames[slot] = -1
+			if self.guess[slot] != buttons:
+				return frame
+		return None
+
+	def predict(self, frame: int) -> int:
+		"""Confirmed input, or a repeat of the last confirmed input"""
+		known = self.get(frame)
+		if known is not None:
+			return known
+		last = self.get(self.confirmed) if self.confirmed >= 0 else None
+		guess = last or 0
+		slot = frame & self.mask
+		self.guess[slot] = guess
+		self.guess_frames[slot] = frame
+		return guess
+
+
+class RollbackBuffer:
+	"""Inputs of every player plus the earliest frame needing resimulation"""
+
+	def __init__(self, players: int, size: int = DEFAULT_RING):
+		self.rings = [InputRing(size) for _ in range(players)]
+		self.rollback_frame: Optional[int] = None
+		self.mispredictions = 0
+
+	def put(self, player: int, frame: int, buttons: int) -> None:
+		wrong = self.rings[player].put(frame, buttons)
+		if wrong is not None:
+			self.mispredictions += 1
+			if self.rollback_frame is None or wrong < self.rollback_frame:
+				self.rollback_frame = wrong
+
+	def inputs(self, frame: int) -> Tuple[int, ...]:
+		"""Every player's input for frame (predicted where unknown)"""
+		return tuple(ring.predict(frame) for ring in self.rings)
+
+	def confirmed_frame(self) -> int:
+		"""Highest frame with every player's input confirmed"""
+		return min(ring.confirmed for ring in self.rings)
+
+	def take_rollback(self) -> Optional[int]:
+		"""Earliest mispredicted frame since the last call (None = no rollback)"""
+		frame, self.rollback_frame = self.rollback_frame, None
+		return frame
+
+
+# ----------------------------------------------------------------------
+# Connections and sessions
+# ----------------------------------------------------------------------
+
+@dataclass
+class LinkStats:
+	"""Per-connection counters"""
+	sent: int = 0
+	received: int = 0
+	lost: int = 0				# Gaps in received sequence numbers
+	stale: int = 0				# Arrived after a newer packet
+	inputs_sent: int = 0
+	rtt_ms: float = 0.0
+
+
+class NetplayConnection:
+	"""Input exchange with one remote player"""
+
+	def __init__(self, buffer: RollbackBuffer, local: int, remote: int,
+				 send: Optional[Callable[[bytes], None]] = None,
+				 max_redundant: int = MAX_REDUNDANT):
+		self.buffer = buffer
+		self.local = local
+		self.remote = remote
+		self.send_bytes = send
+		self.max_redundant = max_redundant
+		self.seq = 0
+		self.remote_seq: Optional[int] = None
+		self.acked = -1							# Our frames the remote has contiguously
+		self.sent_at: Dict[int, float] = {}		# Frame -> first send time (for RTT)
+		self.stats = LinkStats()
+
+	def build_input(self) -> bytes:
+		"""INPUT message with every unacknowledged local input"""
+		ring = self.buffer.rings[self.local]
+		first = self.acked + 1
+		last = min(ring.confirmed, first + self.max_redundant - 1)
+		buttons = [ring.get(f) for f in range(first, last + 1)]
+		now = time.perf_counter()
+		for f in range(first, last + 1):
+			self.sent_at.setdefault(f, now)
+
+		self.seq = (self.seq + 1) & 0xFFFF
+		self.stats.sent += 1
+		self.stats.inputs_sent += len(buttons)
+		ack = self.buffer.rings[self.remote].confirmed
+		return encode_message(MessageType.INPUT, self.local, self.seq, ack,
+							  encode_inputs(first, buttons))
+
+	def send(self) -> None:
+		if self.send_bytes is not None:
+			self.send_bytes(self.build_input())
+
+	def receive(self, data: bytes) -> None:
+		message = decode_message(data)
+		if message.type != MessageType.INPUT or message.player != self.remote:
+			return
+		self.stats.received += 1
+
+		# Sequence tracking is statistics only: inputs are idempotent
+		if self.remote_seq is not None:
+			gap = (message.seq - self.remote_seq) & 0xFFFF
+			if gap == 0 or gap >= 0x8000:
+				self.stats.stale += 1
+			else:
+				self.stats.lost += gap - 1
+				self.remote_seq = message.seq
+		else:
+			self.remote_seq = message.seq
+
+		if message.ack > self.acked:
+			sent = self.sent_at.pop(message.ack, None)
+			if sent is not None:
+				self.stats.rtt_ms = (time.perf_counter() - sent) * 1000
+			for f in range(self.acked + 1, message.ack):
+				self.sent_at.pop(f, None)
+			self.acked = message.ack
+
+		first, buttons = decode_inputs(message.payload)
+		for offset, value in enumerate(buttons):
+			self.buffer.put(self.remote, first + offset, value)
+
+
+class NetplaySession:
+	"""Local player's view: rollback buffer plus one connection per remote"""
+
+	def __init__(self, local: int, players: int = 2, ring_size: int = DEFAULT_RING):
+		self.local = local
+		self.buffer = RollbackBuffer(players, ring_size)
+		self.connections: Dict[int, NetplayConnection] = {}
+		self.frame = -1
+
+	def connect(self, remote: int, send: Callable[[bytes], None]) -> NetplayConnection:
+		connection = NetplayConnection(self.buffer, self.local, remote, send)
+		self.connections[remote] = connection
+		return connection
+
+	def frames_ahead(self) -> int:
+		"""How far local input runs ahead of the slowest acknowledgement"""
+		if not self.connections:
+			return 0
+		return self.frame - min(c.acked for c in self.connections.values())
+
+	def can_advance(self) -> bool:
+		"""False when unacknowledged inputs would no longer fit in one message/ring"""
+		limit = min(MAX_REDUNDANT, self.buffer.rings[self.local].size // 2)
+		return self.frames_ahead() < limit
+
+	def add_local_input(self, buttons: int) -> int:
+		"""Record the next local frame and send it to every remote"""
+		self.frame += 1
+		self.buffer.put(self.local, self.frame, buttons)
+		for connection in self.connections.values():
+			connection.send()
+		return self.frame
+
+	def resend(self) -> None:
+		"""Send unacknowledged history again (idle keepalive)"""
+		for connection in self.connections.values():
+			connection.send()
+
+	def receive(self, data: bytes) -> None:
+		message = decode_message(data)
+		connection = self.connections.get(message.player)
+		if connection is not None:
+			connection.receive(data)
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+
+class LoopbackLink:
+	"""
+	In-process datagram link with simulated latency, jitter and loss
+
+	Delivery is scheduled on the running event loop; jitter can reorder
+	packets, like a real network.
+	"""
+
+	def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, loss: float = 0.0,
+				 seed: int = 0):
+		self.latency = latency_ms / 1000
+		self.jitter = jitter_ms / 1000
+		self.loss = loss
+		self.rng = random.Random(seed)
+		self.receivers: List[Optional[Callable[[bytes], None]]] = [None, None]
+		self.dropped = 0
+		self.delivered = 0
+
+	def endpoint(self, side: int, receiver: Callable[[bytes], None]) -> Callable[[bytes], None]:
+		"""Register side's receiver; return its send function"""
+		self.receivers[side] = receiver
+		return lambda data: self._send(1 - side, data)
+
+	def _send(self, to: int, data: bytes) -> None:
+		if self.rng.random() < self.loss:
+			self.dropped += 1
+			return
+		delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+		asyncio.get_running_loop().call_later(delay, self._deliver, to, data)
+
+	def _deliver(self, to: int, data: bytes) -> None:
+		receiver = self.receivers[to]
+		if receiver is not None:
+			self.delivered += 1
+			receiver(data)
+
+
+class DatagramEndpoint(asyncio.DatagramProtocol):
+	"""UDP transport for one NetplaySession"""
+
+	def __init__(self, session: NetplaySession):
+		self.session = session
+		self.transport: Optional[asyncio.DatagramTransport] = None
+
+	def connection_made(self, transport) -> None:
+		self.transport = transport
+
+	def datagram_received(self, data: bytes, address) -> None:
+		try:
+			self.session.receive(data)
+		except (ValueError, OverflowError):
+			pass					# Malformed datagram, or frames outside the ring window
+
+	def sender(self, address: Tuple[str, int]) -> Callable[[bytes], None]:
+		return lambda data: self.transport.sendto(data, address)
+
+
+class StreamRelay:
+	"""
+	asyncio TCP relay server: one coroutine per client, no threads
+
+	Clients send HELLO with their player number; every framed message is
+	forwarded to the other clients. All state lives on the event loop.
+	"""
+
+	def __init__(self, verbose: bool = False):
+		self.verbose = verbose
+		self.clients: Dict[int, asyncio.StreamWriter] = {}
+		self.server: Optional[asyncio.AbstractServer] = None
+
+	async def start(self, host: str = '127.0.0.1', port: int = 7777) -> int:
+		self.server = await asyncio.start_server(self._client, host, port)
+		return self.server.sockets[0].getsockname()[1]
+
+	async def close(self) -> None:
+		for writer in list(self.clients.values()):
+			writer.close()
+		if self.server is not None:
+			self.server.close()
+			await self.server.wait_closed()
+
+	async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		player = None
+		try:
+			hello = await read_frame(reader)
+			if hello is None:
+				return
+			message = decode_message(hello)
+			if message.type != MessageType.HELLO:
+				return
+			player = message.player
+			self.clients[player] = writer
+			writer.write(frame_message(encode_message(MessageType.WELCOME, player, 0, -1)))
+			await writer.drain()
+			if self.verbose:
+				print(f"👤 Player {player} connected")
+
+			while True:
+				data = await read_frame(reader)
+				if data is None:
+					break
+				for other, out in list(self.clients.items()):
+					if other != player:
+						out.write(frame_message(data))
+		except (ValueError, ConnectionError):
+			pass
+		finally:
+			if player is not None and self.clients.get(player) is writer:
+				del self.clients[player]
+			writer.close()
+
+
+async def connect_stream(session: NetplaySession, host: str, port: int,
+						 remotes: List[int]) -> Tuple[asyncio.StreamWriter, asyncio.Task]:
+	"""
+	Join a StreamRelay
+
+	Returns:
+		(writer, task feeding received messages into session)
+	"""
+	reader, writer = await asyncio.open_connection(host, port)
+	writer.write(frame_message(encode_message(MessageType.HELLO, session.local, 0, -1)))
+	welcome = await read_frame(reader)
+	if welcome is None or decode_message(welcome).type != MessageType.WELCOME:
+		raise ConnectionError("Relay did not acknowledge HELLO")
+
+	for remote in remotes:
+		session.connect(remote, lambda data: writer.write(frame_message(data)))
+
+	async def pump():
+		while True:
+			data = await read_frame(reader)
+			if data is None:
+				return
+			try:
+				session.receive(data)
+			except (ValueError, OverflowError):
+				pass				# Malformed message, or frames outside the ring window
+
+	return writer, asyncio.ensure_future(pump())
+
+
+# ----------------------------------------------------------------------
+# Simulation harness
+# ----------------------------------------------------------------------
+
+@dataclass
+class SimulationResult:
+	"""Outcome of a loopback netplay run"""
+	frames: int
+	consistent: bool
+	rollbacks: List[int]
+	mispredictions: List[int]
+	stalls: int
+	dropped: int
+	stats: List[LinkStats]
+	elapsed: float
+
+
+async def simulate(frames: int = 600, latency_ms: float = 60.0, jitter_ms: float = 15.0,
+				   loss: float = 0.05, seed: int = 0, frame_ms: float = 1000 / 60,
+				   time_scale: float = 1.0) -> SimulationResult:
+	"""
+	Run two sessions over a LoopbackLink
+
+	Each side produces pseudo-random button changes every frame; at the
+	end both sides must hold identical, fully confirmed inputs.
+
+	Args:
+		time_scale: Multiplies frame time, latency and jitter (< 1 runs faster)
+	"""
+	start = time.perf_counter()
+	link = LoopbackLink(latency_ms * time_scale, jitter_ms * time_scale, loss, seed)
+	sessions = [NetplaySession(0), NetplaySession(1)]
+	sessions[0].connect(1, link.endpoint(0, sessions[0].receive))
+	sessions[1].connect(0, link.endpoint(1, sessions[1].receive))
+
+	rngs = [random.Random(seed * 2 + 1), random.Random(seed * 2 + 2)]
+	truth = [[], []]
+	held = [0, 0]
+	rollbacks = [0, 0]
+	stalls = 0
+	tick = frame_ms * time_scale / 1000
+
+	# Confirmed inputs as each side saw them (the rings only keep recent frames)
+	seen = [[[], []], [[], []]]
+
+	def drain() -> None:
+		for side, session in enumerate(sessions):
+			for player, ring in enumerate(session.buffer.rings):
+				log = seen[side][player]
+				for f in range(len(log), ring.confirmed + 1):
+					log.append(ring.get(f))
+
+	while min(len(t) for t in truth) < frames:
+		for side, session in enumerate(sessions):
+			if len(truth[side]) >= frames:
+				session.resend()
+				continue
+			if not session.can_advance():
+				stalls += 1
+				session.resend()
+				continue
+			if rngs[side].random() < 0.2:
+				held[side] = rngs[side].getrandbits(12)
+			truth[side].append(held[side])
+			session.add_local_input(held[side])
+			session.buffer.inputs(session.frame)		# Predict the remote input
+			if session.buffer.take_rollback() is not None:
+				rollbacks[side] += 1
+		await asyncio.sleep(tick)
+		drain()
+
+	# Keep exchanging history until both sides have everything
+	deadline = time.perf_counter() + max(2.0, 50 * (latency_ms + jitter_ms) * time_scale / 1000)
+	while time.perf_counter() < deadline:
+		if all(s.buffer.confirmed_frame() >= frames - 1 for s in sessions):
+			break
+		for session in sessions:
+			session.resend()
+		await asyncio.sleep(tick)
+		drain()
+
+	consistent = all(seen[side][player] == truth[player] for side in (0, 1) for player in (0, 1))
+	return SimulationResult(
+		frames=frames,
+		consistent=consistent,
+		rollbacks=rollbacks,
+		mispredictions=[s.buffer.mispredictions for s in sessions],
+		stalls=stalls,
+		dropped=link.dropped,
+		stats=[s.connections[1 - s.local].stats for s in sessions],
+		elapsed=time.perf_counter() - start,
+	)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ asyncio netplay transport')
+	parser.add_argument('--simulate', action='store_true', help='Run the loopback harness')
+	parser.add_argument('--frames', type=int, default=600, help='Frames to simulate')
+	parser.add_argument('--latency', type=float, default=60.0, help='One-way latency (ms)')
+	parser.add_argument('--jitter', type=float, default=15.0, help='Latency jitter (ms)')
+	parser.add_argument('--loss', type=float, default=0.05, help='Packet loss (0-1)')
+	parser.add_argument('--seed', type=int, default=0, help='Simulation seed')
+	parser.add_argument('--time-scale', type=float, default=1.0, help='Speed up (<1) the simulation')
+	parser.add_argument('--serve', action='store_true', help='Run a TCP relay')
+	parser.add_argument('--connect', type=str, metavar='HOST', help='Connect to a relay')
+	parser.add_argument('--port', type=int, default=7777, help='Relay port')
+	parser.add_argument('--player', type=int, default=0, help='Local player number (0/1)')
+	parser.add_argument('--verbose', action='store_true', help='Verbose output')
+
+	args = parser.parse_args()
+
+	if args.simulate:
+		result = asyncio.run(simulate(args.frames, args.latency, args.jitter, args.loss,
+									  args.seed, time_scale=args.time_scale))
+		print(f"Frames: {result.frames}  Consistent: {result.consistent}  "
+			  f"({result.elapsed:.2f} s)")
+		print(f"Dropped packets: {result.dropped}  Stalls: {result.stalls}")
+		for side, stats in enumerate(result.stats):
+			print(f"  Player {side}: sent {stats.sent}, received {stats.received}, "
+				  f"lost {stats.lost}, rollbacks {result.rollbacks[side]}, "
+				  f"mispredicted {result.mispredictions[side]}, rtt {stats.rtt_ms:.1f} ms")
+		return 0 if result.consistent else 1
+
+	if args.serve:
+		async def serve():
+			relay = StreamRelay(verbose=args.verbose)
+			port = await relay.start('0.0.0.0', args.port)
+			print(f"🌐 Relay listening on port {port}")
+			await asyncio.Event().wait()
+		try:
+			asyncio.run(serve())
+		except KeyboardInterrupt:
+			pass
+		return 0
+
+	if args.connect:
+		async def play():
+			session = NetplaySession(args.player)
+			writer, pump = await connect_stream(session, args.connect, args.port, [1 - args.player])
+			print(f"🌐 Connected as player {args.player}")
+			while True:
+				if session.can_advance():
+					session.add_local_input(0)
+				else:
+					session.resend()
+				if args.verbose and session.frame % 60 == 0:
+					print(f"Frame {session.frame}, confirmed {session.buffer.confirmed_frame()}")
+				await asyncio.sleep(1 / 60)
+		try:
+			asyncio.run(play())
+		except (KeyboardInterrupt, ConnectionError) as e:
+			if isinstance(e, ConnectionError):
+				print(f"Error: {e}")
+		return 0
+
+	parser.print_help()
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+FFMQ State Sync - Paged state hashing, desync localization and delta resync
+
+A single whole-state checksum says *that* two peers diverged but not
+where or when, and repairing it means shipping the full state. This
+module splits the state (WRAM, or any save-state blob) into fixed pages
+so both questions have cheap answers.
+
+Hashing:
+- State is split into 1 KiB pages; each page gets a 32-bit hash
+  (CRC32 by default, xxh32 when the xxhash package is installed - both
+  peers must use the same algorithm)
+- A frame's summary is the CRC32 of its page hash vector; that is what
+  the periodic sync check sends
+
+History:
+- Per-frame page hash vectors live in a fixed ring (frames x pages
+  uint32 array), so the first diverging frame between the last agreed
+  check and a failed one can be found by bisection over summaries
+- Full state copies are kept only at sync-check frames (a few slots)
+
+Resync:
+- The desynced peer sends a hash report: its page hashes for the failed
+  frame, its last agreed frame and the summaries since then
+- The authority compares page vectors and sends only the differing
+  pages, each as zlib(authority page XOR page at the agreed frame); the
+  agreed snapshot is identical on both sides, so unchanged bytes XOR to
+  zero and compress away
+- The receiver patches its own snapshot and verifies the result against
+  the authority's summary before handing it back for resimulation
+- Resync bandwidth scales with the number (and entropy) of differing
+  pages, not with the state size
+
+Usage:
+	python state_sync.py --demo --frames 900 --corrupt-frame 250 --corrupt-pages 3
+	python state_sync.py --diff host.state client.state
+	python state_sync.py --benchmark --state-size 131072
+"""
+
+import argparse
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+import numpy as np
+
+try:
+	import xxhash
+except ImportError:
+	xxhash = None
+
+
+PAGE_SIZE = 1024
+WRAM_SIZE = 0x20000				# 128 KiB
+HISTORY_FRAMES = 1024			# Per-frame hash vectors kept
+SNAPSHOT_SLOTS = 4				# Full states kept (sync-check frames only)
+NO_BASE = 0xFFFFFFFF			# Delta against zeros (no agreed snapshot)
+
+REPORT_HEAD = struct.Struct('<IIHH')	# frame, base frame, pages, summaries
+DELTA_HEAD = struct.Struct('<IIIH')		# frame, base frame, summary, pages
+DELTA_PAGE = struct.Struct('<HI')		# page index, compressed length
+
+
+def _crc32(data) -> int:
+	return zlib.crc32(data)
+
+
+HASHES: Dict[str, Callable[[memoryview], int]] = {'crc32': _crc32}
+if xxhash is not None:
+	HASHES['xxh32'] = xxhash.xxh32_intdigest
+
+
+# ----------------------------------------------------------------------
+# Page hashing
+# ----------------------------------------------------------------------
+
+def page_count(state_size: int, page_size: int = PAGE_SIZE) -> int:
+	return -(-state_size // page_size)
+
+
+def page_hashes(state: bytes, page_size: int = PAGE_SIZE, algorithm: str = 'crc32') -> np.ndarray:
+	"""Hash of every page (the last page may be short)"""
+	hash_page = HASHES[algorithm]
+	view = memoryview(state)
+	return np.fromiter((hash_page(view[offset:offset + page_size])
+						for offset in range(0, len(view), page_size)),
+					   dtype=np.uint32, count=page_count(len(view), page_size))
+
+
+def summary_hash(hashes: np.ndarray) -> int:
+	"""Whole-state checksum derived from the page hash vector"""
+	return zlib.crc32(hashes.astype('<u4', copy=False).tobytes())
+
+
+def differing_pages(local: np.ndarray, remote: np.ndarray) -> List[int]:
+	if local.shape != remote.shape:
+		raise ValueError(f"Page vectors differ in size ({local.size} vs {remote.size})")
+	return np.flatnonzero(local != remote).tolist()
+
+
+class HashHistory:
+	"""Page hash vectors of recent frames, indexed by frame in a fixed ring"""
+
+	def __init__(self, pages: int, size: int = HISTORY_FRAMES):
+		self.size = size
+		self.hashes = np.zeros((size, pages), dtype=np.uint32)
+		self.summaries = np.zeros(size, dtype=np.uint32)
+		self.frames = np.full(size, -1, dtype=np.int64)
+		self.latest = -1
+
+	def put(self, frame: int, hashes: np.ndarray) -> int:
+		slot = frame % self.size
+		self.hashes[slot] = hashes
+		self.frames[slot] = frame
+		summary = summary_hash(hashes)
+		self.summaries[slot] = summary
+		self.latest = max(self.latest, frame)
+		return summary
+
+	def get(self, frame: int) -> Optional[np.ndarray]:
+		slot = frame % self.size
+		return self.hashes[slot] if frame >= 0 and self.frames[slot] == frame else None
+
+	def summary(self, frame: int) -> Optional[int]:
+		slot = frame % self.size
+		return int(self.summaries[slot]) if frame >= 0 and self.frames[slot] == frame else None
+
+	def oldest(self) -> int:
+		"""Oldest frame still held (assumes frames were recorded contiguously)"""
+		return max(0, self.latest - self.size + 1)
+
+
+def first_divergence(local: Callable[[int], Optional[int]], remote: Callable[[int], Optional[int]],
+					 agreed: int, diverged: int) -> int:
+	"""
+	Earliest frame in (agreed, diverged] whose summaries differ
+
+	Assumes a divergence persists once it happens (a desynced emulator
+	does not drift back into sync), so the frames form agree...differ
+	and O(log n) summary lookups are enough.
+	"""
+	low, high = agreed, diverged			# low agrees, high differs
+	while high - low > 1:
+		middle = (low + high) // 2
+		mine, theirs = local(middle), remote(middle)
+		if mine is None or theirs is None:
+			raise LookupError(f"No summary for frame {middle} (outside history)")
+		if mine == theirs:
+			low = middle
+		else:
+			high = middle
+	return high
+
+
+# ----------------------------------------------------------------------
+# Wire format
+# ----------------------------------------------------------------------
+
+class HashReport(NamedTuple):
+	"""Desynced peer's view of a failed sync-check frame"""
+	frame: int
+	base_frame: int					# Last agreed snapshot (NO_BASE = none)
+	hashes: np.ndarray				# Page hashes at frame
+	summaries: np.ndarray			# Summaries of the frames ending at frame
+
+	def summary_at(self, frame: int) -> Optional[int]:
+		index = frame - (self.frame - len(self.summaries) + 1)
+		return int(self.summaries[index]) if 0 <= index < len(self.summaries) else None
+
+
+class StateDelta(NamedTuple):
+	"""Authority's differing pages, XOR'd against the agreed snapshot"""
+	frame: int
+	base_frame: int
+	summary: int					# Authority summary at frame (for verification)
+	pages: Dict[int, bytes]			# Page index -> zlib(page XOR base page)
+
+	def size(self) -> int:
+		return DELTA_HEAD.size + sum(DELTA_PAGE.size + len(d) for d in self.pages.values())
+
+
+def encode_report(report: HashReport) -> bytes:
+	summaries = report.summaries[-0xFFFF:]
+	return (REPORT_HEAD.pack(report.frame, report.base_frame, len(report.hashes), len(summaries))
+			+ report.hashes.astype('<u4').tobytes() + summaries.astype('<u4').tobytes())
+
+
+def decode_report(payload: bytes) -> HashReport:
+	frame, base_frame, pages, count = REPORT_HEAD.unpack_from(payload)
+	values = np.frombuffer(payload, dtype='<u4', count=pages + count, offset=REPORT_HEAD.size)
+	return HashReport(frame, base_frame, values[:pages].astype(np.uint32),
+					  values[pages:].astype(np.uint32))
+
+
+def encode_delta(delta: StateDelta) -> bytes:
+	out = bytearray(DELTA_HEAD.pack(delta.frame, delta.base_frame, delta.summary, len(delta.pages)))
+	for page, data in sorted(delta.pages.items()):
+		out += DELTA_PAGE.pack(page, len(data))
+		out += data
+	return bytes(out)
+
+
+def decode_delta(payload: bytes) -> StateDelta:
+	frame, base_frame, summary, count = DELTA_HEAD.unpack_from(payload)
+	offset = DELTA_HEAD.size
+	pages = {}
+	for _ in range(count):
+		page, length = DELTA_PAGE.unpack_from(payload, offset)
+		offset += DELTA_PAGE.size
+		pages[page] = bytes(payload[offset:offset + length])
+		offset += length
+	if offset != len(payload):
+		raise ValueError(f"Delta payload length mismatch ({offset} != {len(payload)})")
+	return StateDelta(frame, base_frame, summary, pages)
+
+
+# ----------------------------------------------------------------------
+# Sync state per peer
+# ----------------------------------------------------------------------
+
+class StateSync:
+	"""
+	One peer's page hash history, snapshots and resync logic
+
+	Typical flow (see FFMQNetworkManager.record_state):
+	- record() every frame; snapshot() + send summary on sync-check frames
+	- matching remote summary -> mark_agreed()
+	- mismatch -> hash_report() to the authority
+	- authority: make_delta(report); receiver: apply_delta(delta)
+	"""
+
+	def __init__(self, state_size: int = WRAM_SIZE, page_size: int = PAGE_SIZE,
+				 history: int = HISTORY_FRAMES, snapshots: int = SNAPSHOT_SLOTS,
+				 algorithm: str = 'crc32'):
+		if algorithm not in HASHES:
+			raise ValueError(f"Unknown hash '{algorithm}' (available: {', '.join(HASHES)})")
+		self.state_size = state_size
+		self.page_size = page_size
+		self.pages = page_count(state_size, page_size)
+		self.algorithm = algorithm
+		self.history = HashHistory(self.pages, history)
+		self.snapshot_slots = snapshots
+		self.snapshots: 'OrderedDict[int, bytes]' = OrderedDict()
+		self.agreed: Set[int] = set()
+		self.agreed_frame = -1
+
+	# Recording
+
+	def hash_state(self, state: bytes) -> np.ndarray:
+		if len(state) != self.state_size:
+			raise ValueError(f"State is {len(state)} bytes, expected {self.state_size}")
+		return page_hashes(state, self.page_size, self.algorithm)
+
+	def record(self, frame: int, state: bytes) -> int:
+		"""Hash frame's state into the history; returns its summary"""
+		return self.history.put(frame, self.hash_state(state))
+
+	def summary(self, frame: int) -> Optional[int]:
+		return self.history.summary(frame)
+
+	def snapshot(self, frame: int, state: bytes) -> None:
+		"""Keep a full copy (sync-check frames only); the agreed base is never evicted"""
+		self.snapshots[frame] = bytes(state)
+		self.snapshots.move_to_end(frame)
+		while len(self.snapshots) > self.snapshot_slots:
+			victim = next(f for f in self.snapshots if f != self.agreed_frame)
+			del self.snapshots[victim]
+			self.agreed.discard(victim)
+
+	def mark_agreed(self, frame: int) -> None:
+		"""Both peers' summaries matched at frame"""
+		if frame in self.snapshots:
+			self.agreed.add(frame)
+			self.agreed_frame = max(self.agreed_frame, frame)
+
+	# Localization
+
+	def hash_report(self, frame: int) -> HashReport:
+		hashes = self.history.get(frame)
+		if hashes is None:
+			raise LookupError(f"Frame {frame} is not in the hash history")
+		first = max(self.history.oldest(), self.agreed_frame + 1, frame - 0xFFFE)
+		summaries = np.array([self.summary(f) or 0 for f in range(first, frame + 1)], dtype=np.uint32)
+		base = self.agreed_frame if self.agreed_frame >= 0 else NO_BASE
+		return HashReport(frame, base, hashes.copy(), summaries)
+
+	def diff_pages(self, frame: int, remote_hashes: np.ndarray) -> List[int]:
+		local = self.history.get(frame)
+		if local is None:
+			raise LookupError(f"Frame {frame} is not in the hash history")
+		return differing_pages(local, remote_hashes)
+
+	def first_divergence(self, report: HashReport) -> int:
+		"""Earliest diverging frame covered by the report's summaries"""
+		covered = report.frame - len(report.summaries) + 1
+		agreed = max(covered - 1, self.history.oldest() - 1)
+		if report.base_frame != NO_BASE:
+			agreed = max(agreed, report.base_frame)
+		return first_divergence(self.summary, report.summary_at, agreed, report.frame)
+
+	# Resync
+
+	def _base(self, base_frame: int) -> bytes:
+		if base_frame == NO_BASE:
+			return bytes(self.state_size)
+		if base_frame not in self.agreed:
+			raise LookupError(f"No agreed snapshot for frame {base_frame}")
+		return self.snapshots[base_frame]
+
+	def make_delta(self, report: HashReport, level: int = 6) -> StateDelta:
+		"""Differing pages at report.frame, XOR'd against the shared snapshot"""
+		if report.frame not in self.snapshots:
+			raise LookupError(f"No snapshot for frame {report.frame}")
+		base_frame = report.base_frame if report.base_frame in self.agreed else NO_BASE
+		base = np.frombuffer(self._base(base_frame), dtype=np.uint8)
+		state = np.frombuffer(self.snapshots[report.frame], dtype=np.uint8)
+
+		pages = {}
+		for page in self.diff_pages(report.frame, report.hashes):
+			span = slice(page * self.page_size, (page + 1) * self.page_size)
+			pages[page] = zlib.compress(np.bitwise_xor(state[span], base[span]).tobytes(), level)
+		return StateDelta(report.frame, base_frame, self.summary(report.frame), pages)
+
+	def apply_delta(self, delta: StateDelta) -> bytes:
+		"""
+		Repaired state for delta.frame (own snapshot with the authority's pages)
+
+		The result replaces the snapshot and is marked agreed; the caller
+		loads it and resimulates the frames after delta.frame.
+		"""
+		if delta.frame not in self.snapshots:
+			raise LookupError(f"No snapshot for frame {delta.frame}")
+		base = np.frombuffer(self._base(delta.base_frame), dtype=np.uint8)
+		state = np.frombuffer(self.snapshots[delta.frame], dtype=np.uint8).copy()
+
+		for page, data in delta.pages.items():
+			span = slice(page * self.page_size, (page + 1) * self.page_size)
+			xor = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+			if xor.size != base[span].size:
+				raise ValueError(f"Page {page} delta has {xor.size} bytes")
+			state[span] = np.bitwise_xor(xor, base[span])
+
+		repaired = state.tobytes()
+		summary = self.record(delta.frame, repaired)
+		if summary != delta.summary:
+			raise ValueError(f"Resync of frame {delta.frame} failed verification "
+							 f"({summary:08X} != {delta.summary:08X})")
+		self.snapshot(delta.frame, repaired)
+		self.mark_agreed(delta.frame)
+		return repaired
+
+
+# ----------------------------------------------------------------------
+# Demo
+# ----------------------------------------------------------------------
+
+def _step(state: np.ndarray, frame: int) -> None:
+	"""Deterministic stand-in for one emulated frame (reads feed later writes)"""
+	rng = np.random.default_rng(frame)
+	hot = rng.integers(0, 0x2000, 48)						# Stack, OAM buffer, counters
+	cold = rng.integers(0, len(state), 4)
+	sources = rng.integers(0, len(state), 52)
+	targets = np.concatenate([hot, cold])
+	state[targets] = (state[sources].astype(np.uint16) + frame).astype(np.uint8)
+
+
+def demo(frames: int, corrupt_frame: int, corrupt_pages: int, interval: int = 180,
+		 state_size: int = WRAM_SIZE, seed: int = 0) -> bool:
+	"""Two peers, one corrupted; detect, bisect, localize and resync"""
+	rng = np.random.default_rng(seed)
+	initial = rng.integers(0, 256, state_size, dtype=np.uint8)
+	initial[0x8000:] = 0									# Mostly-empty upper WRAM
+	host, client = initial.copy(), initial.copy()
+	syncs = [StateSync(state_size), StateSync(state_size)]
+	corrupted = rng.choice(page_count(state_size), corrupt_pages, replace=False) * PAGE_SIZE
+	ok = True
+
+	for frame in range(frames):
+		_step(host, frame)
+		_step(client, frame)
+		if frame == corrupt_frame:
+			client[corrupted + 17] ^= 0x5A
+		for sync, state in zip(syncs, (host, client)):
+			sync.record(frame, state.tobytes())
+
+		if frame % interval:
+			continue
+		for sync, state in zip(syncs, (host, client)):
+			sync.snapshot(frame, state.tobytes())
+		if syncs[0].summary(frame) == syncs[1].summary(frame):
+			for sync in syncs:
+				sync.mark_agreed(frame)
+			continue
+
+		report = syncs[1].hash_report(frame)
+		report_bytes = len(encode_report(report))
+		decoded = decode_report(encode_report(report))
+		first = syncs[0].first_divergence(decoded)
+		pages = syncs[0].diff_pages(frame, decoded.hashes)
+		delta = syncs[0].make_delta(decoded)
+		payload = encode_delta(delta)
+		repaired = syncs[1].apply_delta(decode_delta(payload))
+		client[:] = np.frombuffer(repaired, dtype=np.uint8)
+
+		ok &= first == corrupt_frame and np.array_equal(host, client)
+		print(f"✗ Desync at sync check {frame}: first diverging frame {first} "
+			  f"(injected {corrupt_frame})")
+		print(f"  Differing pages: {len(pages)}/{syncs[0].pages} {pages[:12]}"
+			  f"{' ...' if len(pages) > 12 else ''}")
+		print(f"  Report {report_bytes:,} B + delta {len(payload):,} B "
+			  f"vs full state {state_size:,} B ({len(payload) / state_size:.1%})")
+
+	final = frames - 1
+	ok &= syncs[0].record(final, host.tobytes()) == syncs[1].record(final, client.tobytes())
+	print(f"{'✓' if ok else '✗'} Peers {'in sync' if ok else 'still diverged'} at frame {final}")
+	return ok
+
+
+def benchmark(state_size: int, frames: int = 600) -> None:
+	state = np.random.default_rng(0).integers(0, 256, state_size, dtype=np.uint8).tobytes()
+	for algorithm in HASHES:
+		sync = StateSync(state_size, algorithm=algorithm)
+		start = time.perf_counter()
+		for frame in range(frames):
+			sync.record(frame, state)
+		elapsed = (time.perf_counter() - start) / frames
+		print(f"{algorithm:<6} {sync.pages} pages: {elapsed * 1e6:8.1f} µs/frame")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ paged state sync and desync localization')
+	parser.add_argument('--demo', action='store_true', help='Simulate a desync and resync')
+	parser.add_argument('--frames', type=int, default=900, help='Demo frames')
+	parser.add_argument('--corrupt-frame', type=int, default=250, help='Frame the client diverges')
+	parser.add_argument('--corrupt-pages', type=int, default=2, help='Pages corrupted at that frame')
+	parser.add_argument('--interval', type=int, default=180, help='Sync-check interval (frames)')
+	parser.add_argument('--diff', type=Path, nargs=2, metavar='STATE', help='Differing pages of two states')
+	parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Page size for --diff')
+	parser.add_argument('--benchmark', action='store_true', help='Time page hashing')
+	parser.add_argument('--state-size', type=int, default=WRAM_SIZE, help='State size (bytes)')
+
+	args = parser.parse_args()
+
+	if args.demo:
+		return 0 if demo(args.frames, args.corrupt_frame, args.corrupt_pages, args.interval,
+						 args.state_size) else 1
+
+	if args.diff:
+		first, second = (path.read_bytes() for path in args.diff)
+		if len(first) != len(second):
+			print(f"Error: states differ in size ({len(first):,} vs {len(second):,} bytes)")
+			return 1
+		pages = differing_pages(page_hashes(first, args.page_size), page_hashes(second, args.page_size))
+		print(f"{len(pages)} of {page_count(len(first), args.page_size)} pages differ")
+		for page in pages:
+			start = page * args.page_size
+			print(f"  Page {page:3d}: ${start:05X}-${min(start + args.page_size, len(first)) - 1:05X}")
+		return 0
+
+	if args.benchmark:
+		benchmark(args.state_size)
+		return 0
+
+	parser.print_help()
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
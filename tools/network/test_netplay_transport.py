@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Netplay Transport - Test Suite
+
+Checks framing under split/merged reads, the rollback ring, redundant
+input delivery over a lossy loopback link, and the localhost TCP relay.
+
+Usage:
+	python test_netplay_transport.py
+"""
+
+import asyncio
+import struct
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_network_manager import FFMQNetworkManager, PacketType
+from netplay_transport import (
+	HEADER, DatagramEndpoint, FrameDecoder, InputRing, MessageType, NetplaySession, RollbackBuffer, StreamRelay,
+	connect_stream, decode_inputs, decode_message, encode_inputs, encode_message, frame_message, simulate
+)
+
+
+class TestFraming(unittest.TestCase):
+	def test_split_and_merged_reads(self):
+		messages = [encode_message(MessageType.INPUT, 1, n, n - 1, bytes(n * 7)) for n in range(1, 20)]
+		stream = b''.join(frame_message(m) for m in messages)
+		for chunk in (1, 3, 50, len(stream)):
+			decoder = FrameDecoder()
+			received = []
+			for i in range(0, len(stream), chunk):
+				received += decoder.feed(stream[i:i + chunk])
+			self.assertEqual(received, messages)
+			self.assertEqual(decoder.buffer, bytearray())
+
+	def test_header(self):
+		message = decode_message(encode_message(MessageType.INPUT, 3, 70000, -1, b'xy'))
+		self.assertEqual((message.player, message.seq, message.ack, message.payload),
+						 (3, 70000 & 0xFFFF, -1, b'xy'))
+
+	def test_legacy_manager_framing(self):
+		manager = FFMQNetworkManager()
+		packets = [struct.pack('<BI', PacketType.INPUT.value, 10) + struct.pack('<IIH', f, 2, f)
+				   for f in range(5)]
+		stream = bytearray(b''.join(packets))
+		pending = bytearray()
+		out = []
+		for i in range(0, len(stream), 7):
+			pending += stream[i:i + 7]
+			out += manager._split_packets(pending)
+		self.assertEqual(out, packets)
+
+
+class TestRollback(unittest.TestCase):
+	def test_prediction_and_rollback(self):
+		buffer = RollbackBuffer(2, size=16)
+		buffer.put(1, 0, 5)
+		self.assertEqual(buffer.inputs(1), (0, 5))		# Player 1 predicted: repeat 5
+		self.assertEqual(buffer.inputs(2), (0, 5))
+		buffer.put(1, 2, 5)							# Correct guess, frame 1 still open
+		self.assertIsNone(buffer.take_rollback())
+		buffer.put(1, 1, 9)							# Wrong guess
+		self.assertEqual(buffer.take_rollback(), 1)
+		self.assertEqual(buffer.rings[1].confirmed, 2)
+
+	def test_ring_bounds(self):
+		ring = InputRing(8)
+		for f in range(20):
+			ring.put(f, f)
+		self.assertIsNone(ring.get(3))					# Overwritten
+		self.assertEqual(ring.get(19), 19)
+		self.assertIsNone(ring.put(19, 0))				# Duplicate ignored
+		with self.assertRaises(OverflowError):
+			ring.put(40, 1)
+
+
+	def test_bad_datagrams_dropped(self):
+		session = NetplaySession(0)
+		session.connect(1, lambda data: None)
+		endpoint = DatagramEndpoint(session)
+		good = encode_message(MessageType.INPUT, 1, 1, -1, encode_inputs(0, [7, 8]))
+		with self.assertRaises(ValueError):
+			decode_inputs(good[HEADER.size:HEADER.size + 3])
+		for data in (good[:3], good[:HEADER.size + 3], good[:-1],
+					 encode_message(MessageType.INPUT, 1, 2, -1, encode_inputs(10000, [1]))):
+			endpoint.datagram_received(data, ('127.0.0.1', 0))		# Must not raise
+		endpoint.datagram_received(good, ('127.0.0.1', 0))
+		self.assertEqual(session.buffer.rings[1].get(1), 8)
+
+
+class TestLoopback(unittest.TestCase):
+	def test_lossy_link_converges(self):
+		result = asyncio.run(simulate(frames=300, latency_ms=80, jitter_ms=30, loss=0.25,
+									  seed=3, time_scale=0.05))
+		self.assertTrue(result.consistent)
+		self.assertGreater(result.dropped, 0)
+		self.assertGreater(sum(s.lost for s in result.stats), 0)
+
+	def test_tcp_relay(self):
+		async def run():
+			relay = StreamRelay()
+			port = await relay.start('127.0.0.1', 0)
+			sessions = [NetplaySession(0), NetplaySession(1)]
+			links = [await connect_stream(s, '127.0.0.1', port, [1 - s.local]) for s in sessions]
+			for n in range(30):
+				for session in sessions:
+					session.add_local_input(n * (session.local + 1))
+				await asyncio.sleep(0.002)
+			for _ in range(100):
+				if all(s.buffer.confirmed_frame() >= 29 for s in sessions):
+					break
+				for session in sessions:
+					session.resend()
+				await asyncio.sleep(0.01)
+			for writer, pump in links:
+				pump.cancel()
+				writer.close()
+			await relay.close()
+			return sessions
+
+		sessions = asyncio.run(run())
+		for session in sessions:
+			self.assertEqual([session.buffer.rings[1].get(f) for f in range(30)],
+							 [n * 2 for n in range(30)])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+State Sync - Test Suite
+
+Checks page localization, bisection of the first diverging frame, delta
+resync round trips and bandwidth, and the manager's sync-check exchange.
+
+Usage:
+	python test_state_sync.py
+"""
+
+import random
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_network_manager import ConnectionState, FFMQNetworkManager
+from state_sync import (
+	PAGE_SIZE, StateSync, decode_delta, decode_report, encode_delta, encode_report, page_hashes
+)
+
+SIZE = 64 * PAGE_SIZE
+
+
+def random_state(seed: int) -> bytearray:
+	rng = random.Random(seed)
+	return bytearray(rng.getrandbits(8) for _ in range(SIZE))
+
+
+class TestLocalization(unittest.TestCase):
+	def test_pages_and_short_tail(self):
+		state = random_state(0)
+		other = bytearray(state)
+		other[5 * PAGE_SIZE + 3] ^= 1
+		other[40 * PAGE_SIZE] ^= 1
+		sync = StateSync(SIZE)
+		sync.record(0, bytes(state))
+		self.assertEqual(sync.diff_pages(0, page_hashes(bytes(other))), [5, 40])
+		self.assertEqual(len(page_hashes(bytes(100 + PAGE_SIZE))), 2)
+
+	def test_bisect_first_divergence(self):
+		host, client = StateSync(SIZE), StateSync(SIZE)
+		state = random_state(1)
+		other = bytearray(state)
+		for frame in range(300):
+			state[frame] = other[frame] = frame & 0xFF
+			if frame == 137:
+				other[9000] ^= 0xFF
+			host.record(frame, bytes(state))
+			client.record(frame, bytes(other))
+		report = decode_report(encode_report(client.hash_report(299)))
+		self.assertEqual(host.first_divergence(report), 137)
+
+
+class TestResync(unittest.TestCase):
+	def run_desync(self, corrupt_pages):
+		host, client = StateSync(SIZE), StateSync(SIZE)
+		state = random_state(2)
+		for sync in (host, client):
+			sync.record(0, bytes(state))
+			sync.snapshot(0, bytes(state))
+			sync.mark_agreed(0)
+
+		state[100:110] = bytes(10)							# Legitimate progress
+		other = bytearray(state)
+		for page in corrupt_pages:
+			other[page * PAGE_SIZE + 7] ^= 0x42
+		for sync, data in ((host, state), (client, other)):
+			sync.record(180, bytes(data))
+			sync.snapshot(180, bytes(data))
+
+		report = decode_report(encode_report(client.hash_report(180)))
+		self.assertEqual(report.base_frame, 0)
+		payload = encode_delta(host.make_delta(report))
+		self.assertEqual(client.apply_delta(decode_delta(payload)), bytes(state))
+		self.assertEqual(client.agreed_frame, 180)
+		return len(payload)
+
+	def test_bandwidth_scales_with_differences(self):
+		sizes = [self.run_desync(range(n)) for n in (1, 8, 32)]
+		self.assertLess(sizes[0], sizes[1])
+		self.assertLess(sizes[1], sizes[2])
+		self.assertLess(sizes[2], SIZE // 16)
+
+	def test_tampered_delta_rejected(self):
+		host, client = StateSync(SIZE), StateSync(SIZE)
+		for sync, seed in ((host, 3), (client, 4)):
+			sync.record(0, bytes(random_state(seed)))
+			sync.snapshot(0, bytes(random_state(seed)))
+		delta = host.make_delta(client.hash_report(0))
+		self.assertEqual(len(delta.pages), 64)				# No shared base: every page, raw
+		bad = delta._replace(summary=delta.summary ^ 1)
+		with self.assertRaises(ValueError):
+			client.apply_delta(bad)
+
+
+class TestManager(unittest.TestCase):
+	def test_sync_check_exchange(self):
+		host, client = FFMQNetworkManager(), FFMQNetworkManager()
+		for sender, receiver in ((host, client), (client, host)):
+			sender._send_packet = (lambda r: lambda t, d, target=None: r._process_packet(
+				bytes([t.value]) + len(d).to_bytes(4, 'little') + d, None) or True)(receiver)
+		repaired = []
+		host.attach_state_sync(StateSync(SIZE), authority=True)
+		client.attach_state_sync(StateSync(SIZE), authority=False,
+								 on_resync=lambda f, s: repaired.append((f, s)))
+
+		state = random_state(5)
+		host.record_state(0, bytes(state))
+		client.record_state(0, bytes(state))
+		self.assertEqual(client.state_sync.agreed_frame, 0)
+
+		interval = FFMQNetworkManager.SYNC_CHECK_INTERVAL
+		other = bytearray(state)
+		other[30 * PAGE_SIZE] ^= 1
+		host.record_state(interval, bytes(state))
+		client.record_state(interval, bytes(other))
+		self.assertEqual(host.state, ConnectionState.DESYNCED)
+		self.assertEqual(repaired, [(interval, bytes(state))])
+		self.assertIsNone(client.desync_frame)
+
+	def test_resync_over_tcp(self):
+		"""Test HASH_REPORT -> STATE_DELTA through real host and client sockets"""
+		host, client = FFMQNetworkManager(), FFMQNetworkManager()
+		resynced = threading.Event()
+		repaired = []
+		host.attach_state_sync(StateSync(SIZE), authority=True)
+		client.attach_state_sync(StateSync(SIZE), authority=False,
+								 on_resync=lambda f, s: (repaired.append((f, s)), resynced.set()))
+		try:
+			self.assertTrue(host.host_session(0))
+			port = host.socket.getsockname()[1]
+			self.assertTrue(client.join_session('127.0.0.1', port))
+			wait_for(lambda: host.players)
+
+			state = random_state(6)
+			other = bytearray(state)
+			other[12 * PAGE_SIZE] ^= 0x80
+			host.record_state(0, bytes(state))
+			client.record_state(0, bytes(other))
+
+			self.assertTrue(resynced.wait(5))
+			self.assertEqual(repaired, [(0, bytes(state))])
+			wait_for(lambda: host.state == ConnectionState.DESYNCED)
+			self.assertIsNone(client.desync_frame)
+		finally:
+			client.disconnect()
+			host.disconnect()
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+	deadline = time.monotonic() + timeout
+	while not condition():
+		if time.monotonic() > deadline:
+			raise AssertionError("Timed out waiting for the peer")
+		time.sleep(0.01)
+
+
+if __name__ == '__main__':
+	unittest.main()
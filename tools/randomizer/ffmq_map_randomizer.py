@@ -21,7 +21,7 @@ Randomization Modes:
 
 Features:
 - Seed generation
-- Logic validation
+- Logic validation (entrance shuffles keep every map reachable, no one-way traps)
 - Completion checks
 - Spoiler logs
 - Progressive difficulty
@@ -38,11 +38,14 @@ Usage:
 import argparse
 import json
 import random
+import secrets
 from pathlib import Path
 from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 
+from progression_logic import LogicWorld, ProgressionSolver, SeedReport
+
 
 class RandomizationMode(Enum):
 	"""Randomization modes"""
@@ -139,6 +142,10 @@ class MapRandomizer:
 	ITEMS = list(range(1, 101))  # 100 items
 	KEY_ITEMS = list(range(101, 121))  # 20 key items
 	
+	# Entrance logic
+	START_MAP = 0
+	ENTRANCE_ATTEMPTS = 100
+	
 	def __init__(self, config: RandomizationConfig, verbose: bool = False):
 		self.config = config
 		self.verbose = verbose
@@ -160,8 +167,8 @@ class MapRandomizer:
 			if self.verbose:
 				print(f"✓ Initialized RNG with seed: {self.config.seed}")
 		else:
-			# Generate random seed
-			self.config.seed = random.randint(0, 99999999)
+			# Generate random seed (OS entropy, leaves global random untouched)
+			self.config.seed = secrets.randbelow(100000000)
 			self.rng = random.Random(self.config.seed)
 			
 			if self.verbose:
@@ -359,6 +366,31 @@ class MapRandomizer:
 		if self.verbose:
 			print(f"✓ Randomized {len(self.chests)} treasure chests")
 	
+	def door_world(self) -> LogicWorld:
+		"""
+		Map graph of the current door table
+		
+		Each map is a region holding a location of the same name; every
+		door is one-way (source -> destination). The goal is the start map,
+		so a one-way trap is a map the player cannot get back home from.
+		"""
+		home = f"Map {self.START_MAP}"
+		world = LogicWorld(home, home)
+		map_ids = {self.START_MAP}
+		map_ids.update(map_data.map_id for map_data in self.maps)
+		for door in self.doors:
+			map_ids.update((door.source_map, door.dest_map))
+		for map_id in sorted(map_ids):
+			world.add_location(f"Map {map_id}", f"Map {map_id}")
+		for door in self.doors:
+			world.add_door(f"Map {door.source_map}", f"Map {door.dest_map}", one_way=True,
+						   name=f"Door {door.door_id}")
+		return world
+	
+	def check_entrances(self) -> SeedReport:
+		"""Reachability and one-way traps of the current door table"""
+		return ProgressionSolver(self.door_world()).check()
+	
 	def randomize_entrances(self) -> None:
 		"""Randomize door connections"""
 		if not self.config.randomize_entrances or self.rng is None:
@@ -367,20 +399,41 @@ class MapRandomizer:
 		self.spoiler_log.append("\n=== Entrance Randomization ===")
 		
 		# Collect all destinations
-		destinations = [
+		original = [
 			(door.dest_map, door.dest_x, door.dest_y)
 			for door in self.doors
 		]
 		
-		# Shuffle destinations
-		if self.rng is not None:
+		# Maps reachable before shuffling must stay reachable, and no door
+		# may lead somewhere the player cannot walk back from
+		baseline = set(self.check_entrances().unreachable) if self.config.validate_logic else set()
+		attempts = self.ENTRANCE_ATTEMPTS if self.config.validate_logic else 1
+		
+		for attempt in range(1, attempts + 1):
+			destinations = original.copy()
 			self.rng.shuffle(destinations)
+			for door, dest in zip(self.doors, destinations):
+				door.dest_map, door.dest_x, door.dest_y = dest
+			
+			if not self.config.validate_logic:
+				break
+			
+			report = self.check_entrances()
+			if not report.traps and set(report.unreachable) <= baseline:
+				if self.verbose:
+					print(f"✓ Valid entrance layout after {attempt} shuffle(s)")
+				break
+		else:
+			# No valid layout found: keep vanilla connections
+			for door, dest in zip(self.doors, original):
+				door.dest_map, door.dest_x, door.dest_y = dest
+			self.spoiler_log.append(f"No valid layout in {attempts} shuffles; entrances unchanged")
+			if self.verbose:
+				print(f"⚠ No valid entrance layout in {attempts} shuffles, keeping vanilla doors")
+			return
 		
 		# Assign shuffled destinations
-		for i, door in enumerate(self.doors):
-			old_dest = (door.dest_map, door.dest_x, door.dest_y)
-			door.dest_map, door.dest_x, door.dest_y = destinations[i]
-			
+		for door, old_dest in zip(self.doors, original):
 			self.spoiler_log.append(
 				f"Door {door.door_id}: Map {old_dest[0]} → Map {door.dest_map}"
 			)
@@ -50,9 +50,12 @@ import random
 import hashlib
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 
+from item_fill import AssumedFill, FillError
+from progression_logic import ProgressionSolver, SeedReport, default_world
+
 
 class RandomizerMode(Enum):
 	"""Randomization difficulty modes"""
@@ -131,6 +134,7 @@ class SpoilerLog:
 	enemy_randomizations: List[EnemyRandomization]
 	boss_order: List[str]
 	key_item_locations: Dict[str, str]
+	playthrough: List[str] = field(default_factory=list)
 	
 	def to_dict(self) -> dict:
 		return {
@@ -139,7 +143,8 @@ class SpoilerLog:
 			'item_placements': [p.to_dict() for p in self.item_placements],
 			'enemy_randomizations': [e.to_dict() for e in self.enemy_randomizations],
 			'boss_order': self.boss_order,
-			'key_item_locations': self.key_item_locations
+			'key_item_locations': self.key_item_locations,
+			'playthrough': self.playthrough
 		}
 
 
@@ -161,35 +166,43 @@ class FFMQRandomizerLogic:
 		"Focus Tower": ["Venus Key", "Multi Key", "Thunder Rock", "Wakewater"]
 	}
 	
-	@staticmethod
-	def validate_progression(item_placements: Dict[str, str]) -> bool:
-		"""Check if randomization is completable"""
-		# Simplified logic - real implementation would be more complex
-		
-		# Check all progression items are placed
-		for item in FFMQRandomizerLogic.PROGRESSION_ITEMS:
-			if item not in item_placements.values():
-				return False
-		
-		# Check key items are accessible
-		# (Real logic would do BFS/DFS through areas)
-		
-		return True
+	_solver: Optional[ProgressionSolver] = None
+	
+	@classmethod
+	def solver(cls) -> ProgressionSolver:
+		"""Shared solver over the default world graph (compiled once)"""
+		if cls._solver is None:
+			cls._solver = ProgressionSolver(default_world())
+		return cls._solver
+	
+	@classmethod
+	def check(cls, item_placements: Dict[str, str]) -> SeedReport:
+		"""Full check: beatability, sphere playthrough, one-way traps"""
+		return cls.solver().check(item_placements)
+	
+	@classmethod
+	def validate_progression(cls, item_placements: Dict[str, str]) -> bool:
+		"""Check if randomization is completable (locations not placed keep vanilla items)"""
+		return cls.check(item_placements).valid
 
 
 class FFMQRandomizer:
 	"""FFMQ Randomizer main class"""
 	
-	def __init__(self, rom_path: Path, settings: RandomizerSettings, verbose: bool = False):
+	def __init__(self, rom_path: Path, settings: RandomizerSettings, verbose: bool = False,
+				 rom_data: Optional[bytes] = None):
 		self.rom_path = rom_path
 		self.settings = settings
 		self.verbose = verbose
 		
-		with open(rom_path, 'rb') as f:
-			self.rom_data = bytearray(f.read())
+		# rom_data: base ROM already in memory (shared by batch workers)
+		if rom_data is None:
+			with open(rom_path, 'rb') as f:
+				rom_data = f.read()
+		self.rom_data = bytearray(rom_data)
 		
-		# Initialize RNG with seed
-		random.seed(settings.seed)
+		# Private RNG: results depend only on the seed, not on global state
+		self.rng = random.Random(settings.seed)
 		
 		if self.verbose:
 			print(f"Loaded ROM: {rom_path} ({len(self.rom_data):,} bytes)")
@@ -210,12 +223,12 @@ class FFMQRandomizer:
 			mod = self.settings.difficulty_modifier
 			
 			# Randomize with variance
-			random_hp = int(base_hp * mod * random.uniform(0.8, 1.2))
-			random_attack = int(base_attack * mod * random.uniform(0.8, 1.2))
-			random_defense = int(base_defense * mod * random.uniform(0.8, 1.2))
+			random_hp = int(base_hp * mod * self.rng.uniform(0.8, 1.2))
+			random_attack = int(base_attack * mod * self.rng.uniform(0.8, 1.2))
+			random_defense = int(base_defense * mod * self.rng.uniform(0.8, 1.2))
 			
 			# Random AI script
-			ai_script = random.randint(0, 63)
+			ai_script = self.rng.randint(0, 63)
 			
 			# Calculate difficulty rating
 			difficulty = (random_hp + random_attack * 5 + random_defense * 3) / 100.0
@@ -256,9 +269,15 @@ class FFMQRandomizer:
 			("Multi Key", ItemType.PROGRESSION),
 		]
 		
-		# Shuffle items
+		# Shuffle items (assumed fill keeps the seed beatable by construction)
 		shuffled_items = items.copy()
-		random.shuffle(shuffled_items)
+		self.rng.shuffle(shuffled_items)
+		if self.settings.preserve_logic:
+			filler = AssumedFill(FFMQRandomizerLogic.solver().world)
+			result = filler.fill([name for name, _ in items], [name for _, name in locations], rng=self.rng)
+			item_types = dict(items)
+			shuffled_items = [(result.placements[name], item_types[result.placements[name]])
+							  for _, name in locations]
 		
 		# Place items
 		for i, (loc_id, loc_name) in enumerate(locations):
@@ -297,12 +316,15 @@ class FFMQRandomizer:
 			enemy_randomizations = self.randomize_enemies()
 		
 		if self.settings.randomize_bosses:
-			random.shuffle(boss_order)
+			self.rng.shuffle(boss_order)
 		
 		# Validate if logic preservation is enabled
+		playthrough = []
 		if self.settings.preserve_logic:
 			item_map = {p.location_name: p.randomized_item for p in item_placements}
-			if not FFMQRandomizerLogic.validate_progression(item_map):
+			report = FFMQRandomizerLogic.check(item_map)
+			playthrough = report.spoiler_lines()
+			if not report.valid:
 				if self.verbose:
 					print("⚠️  Warning: Randomization may not be completable!")
 		
@@ -312,7 +334,8 @@ class FFMQRandomizer:
 			item_placements=item_placements,
 			enemy_randomizations=enemy_randomizations,
 			boss_order=boss_order,
-			key_item_locations=key_item_locations
+			key_item_locations=key_item_locations,
+			playthrough=playthrough
 		)
 		
 		return spoiler
@@ -354,6 +377,11 @@ class FFMQRandomizer:
 			f.write(f"\n=== All Item Placements ===\n\n")
 			for p in spoiler.item_placements:
 				f.write(f"{p.location_name:<30} {p.original_item:<20} -> {p.randomized_item}\n")
+			
+			if spoiler.playthrough:
+				f.write(f"\n=== Playthrough ===\n\n")
+				for line in spoiler.playthrough:
+					f.write(f"{line}\n")
 		
 		if self.verbose:
 			print(f"✓ Saved spoiler log to {output_path}")
@@ -410,7 +438,11 @@ def main():
 	randomizer = FFMQRandomizer(Path(args.rom), settings, verbose=args.verbose)
 	
 	# Perform randomization
-	spoiler = randomizer.randomize_all()
+	try:
+		spoiler = randomizer.randomize_all()
+	except FillError as e:
+		print(f"Error: settings cannot produce a beatable seed: {e}")
+		return 1
 	
 	print(f"\n=== FFMQ Randomizer ===\n")
 	print(f"Seed: {seed}")
@@ -23,7 +23,7 @@ Randomizer Modes:
 
 Features:
 - Seed-based reproducible randomization
-- Logic validation (ensure completeness)
+- Logic validation (ensure completeness; graph-based with --logic-world)
 - Difficulty rating
 - Spoiler log generation
 - Progressive item placement
@@ -38,6 +38,7 @@ Usage:
 	python ffmq_randomizer.py rom.sfc --balanced-mode --difficulty hard
 	python ffmq_randomizer.py rom.sfc --spoiler-log spoiler.txt
 	python ffmq_randomizer.py rom.sfc --custom-config config.json
+	python ffmq_randomizer.py rom.sfc --logic-world world.json --spoiler-log spoiler.json
 """
 
 import argparse
@@ -49,6 +50,9 @@ from typing import List, Tuple, Optional, Dict, Any, Set
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
+from item_fill import AssumedFill, FillError
+from progression_logic import LogicWorld, ProgressionSolver, SeedReport
+
 
 class RandomizerMode(Enum):
 	"""Randomizer modes"""
@@ -84,6 +88,7 @@ class RandomizerConfig:
 	ensure_completable: bool = True
 	enemy_scaling: bool = True
 	qol_improvements: bool = True
+	logic_world: Optional[str] = None	# World JSON with "Chest N" locations
 	
 	def to_dict(self) -> dict:
 		d = asdict(self)
@@ -181,21 +186,27 @@ class FFMQRandomizer:
 		# ... more bosses
 	}
 	
-	def __init__(self, rom_path: Path, config: RandomizerConfig, verbose: bool = False):
+	def __init__(self, rom_path: Path, config: RandomizerConfig, verbose: bool = False,
+				 rom_data: Optional[bytes] = None):
 		self.rom_path = rom_path
 		self.config = config
 		self.verbose = verbose
 		
-		with open(rom_path, 'rb') as f:
-			self.rom_data = bytearray(f.read())
+		# rom_data: base ROM already in memory (shared by batch workers)
+		if rom_data is None:
+			with open(rom_path, 'rb') as f:
+				rom_data = f.read()
+		self.rom_data = bytearray(rom_data)
 		
-		# Initialize RNG with seed
-		random.seed(config.seed)
+		# Private RNG: results depend only on the seed, not on global state
+		self.rng = random.Random(config.seed)
 		
 		# Tracking
 		self.item_placements: List[ItemPlacement] = []
 		self.enemy_placements: List[EnemyPlacement] = []
 		self.key_item_locations: Dict[str, str] = {}
+		self.logic_report: Optional[SeedReport] = None
+		self.valid: Optional[bool] = None
 		
 		if self.verbose:
 			print(f"Loaded FFMQ ROM: {rom_path} ({len(self.rom_data):,} bytes)")
@@ -223,7 +234,9 @@ class FFMQRandomizer:
 				item_pool.append(item_id)
 		
 		# Shuffle item pool
-		random.shuffle(item_pool)
+		self.rng.shuffle(item_pool)
+		if self.config.logic_world and self.config.ensure_completable:
+			item_pool = self.fill_with_logic(item_pool)
 		
 		# Reassign items
 		for chest_id in range(len(item_pool)):
@@ -257,6 +270,28 @@ class FFMQRandomizer:
 		if self.verbose:
 			print(f"✓ Randomized {len(item_pool)} treasure chests")
 	
+	def fill_with_logic(self, item_pool: List[int]) -> List[int]:
+		"""
+		Order item_pool by chest with assumed fill, so key items only land
+		where the logic world says they can be reached
+		"""
+		world = LogicWorld.load(Path(self.config.logic_world))
+		names = [self.KEY_ITEMS.get(item_id, f"Item {item_id}") for item_id in item_pool]
+		chests = [f"Chest {chest_id}" for chest_id in range(len(item_pool))]
+		
+		result = AssumedFill(world).fill(names, chests, rng=self.rng)
+		
+		# Map names back to IDs (several chests may hold the same item)
+		ids_by_name: Dict[str, List[int]] = {}
+		for name, item_id in zip(names, item_pool):
+			ids_by_name.setdefault(name, []).append(item_id)
+		
+		if self.verbose:
+			print(f"✓ Assumed fill: {result.backtracks} backtracks, {result.attempts} attempt(s) "
+				  f"({result.elapsed_ms:.2f} ms)")
+		
+		return [ids_by_name[result.placements[chest]].pop() for chest in chests]
+	
 	def randomize_enemies(self) -> None:
 		"""Randomize enemy encounters"""
 		if not self.config.randomize_enemies:
@@ -283,7 +318,7 @@ class FFMQRandomizer:
 				continue
 			
 			# Select random enemy
-			new_enemy = random.choice(enemy_pool)
+			new_enemy = self.rng.choice(enemy_pool)
 			
 			# Scale stats if enabled
 			if self.config.enemy_scaling:
@@ -371,7 +406,7 @@ class FFMQRandomizer:
 				item_pool = consumables.copy()
 			
 			# Randomize shop items (8 slots)
-			random.shuffle(item_pool)
+			self.rng.shuffle(item_pool)
 			
 			for i in range(8):
 				if i < len(item_pool):
@@ -396,14 +431,14 @@ class FFMQRandomizer:
 			
 			# Randomize within ±30% of original
 			hp = struct.unpack_from('<H', self.rom_data, char_offset)[0]
-			new_hp = int(hp * random.uniform(0.7, 1.3))
+			new_hp = int(hp * self.rng.uniform(0.7, 1.3))
 			struct.pack_into('<H', self.rom_data, char_offset, new_hp)
 			
 			attack = self.rom_data[char_offset + 2]
-			self.rom_data[char_offset + 2] = int(attack * random.uniform(0.7, 1.3))
+			self.rom_data[char_offset + 2] = int(attack * self.rng.uniform(0.7, 1.3))
 			
 			defense = self.rom_data[char_offset + 3]
-			self.rom_data[char_offset + 3] = int(defense * random.uniform(0.7, 1.3))
+			self.rom_data[char_offset + 3] = int(defense * self.rng.uniform(0.7, 1.3))
 		
 		if self.verbose:
 			print(f"✓ Randomized character stats")
@@ -433,7 +468,10 @@ class FFMQRandomizer:
 		if not self.config.ensure_completable:
 			return True
 		
-		# Check that all key items are accessible
+		if self.config.logic_world:
+			return self.validate_with_world(Path(self.config.logic_world))
+		
+		# No world graph: only check that all key items are placed
 		required_items = set(self.KEY_ITEMS.keys())
 		placed_items = set(p.new_item for p in self.item_placements)
 		
@@ -446,6 +484,24 @@ class FFMQRandomizer:
 		
 		return True
 	
+	def validate_with_world(self, world_path: Path) -> bool:
+		"""Check beatability and one-way traps against a world graph"""
+		solver = ProgressionSolver(LogicWorld.load(world_path))
+		placements = {
+			p.location_name: self.KEY_ITEMS.get(p.new_item, f"Item {p.new_item}")
+			for p in self.item_placements
+		}
+		self.logic_report = solver.check(placements)
+		
+		if self.verbose:
+			report = self.logic_report
+			print(f"Logic: beatable={report.beatable}, {len(report.spheres)} spheres, "
+				  f"{len(report.traps)} traps ({report.elapsed_ms:.2f} ms)")
+			for trap in report.traps:
+				print(f"⚠ Warning: {trap.door} strands the player in {trap.region}")
+		
+		return self.logic_report.valid
+	
 	def calculate_overall_difficulty(self) -> int:
 		"""Calculate overall difficulty rating"""
 		if not self.enemy_placements:
@@ -465,12 +521,24 @@ class FFMQRandomizer:
 		"""Generate spoiler log"""
 		difficulty = self.calculate_overall_difficulty()
 		
+		if self.logic_report is not None:
+			# Key items in the order a player can collect them
+			key_names = set(self.KEY_ITEMS.values())
+			progression_path = [
+				f"{item} @ {location}"
+				for sphere in self.logic_report.spheres
+				for location, item in sphere
+				if item in key_names
+			]
+		else:
+			progression_path = list(self.key_item_locations.keys())
+		
 		spoiler = SpoilerLog(
 			config=self.config,
 			item_placements=self.item_placements,
 			enemy_placements=self.enemy_placements,
 			key_item_locations=self.key_item_locations,
-			progression_path=list(self.key_item_locations.keys()),
+			progression_path=progression_path,
 			difficulty_rating=difficulty
 		)
 		
@@ -492,6 +560,7 @@ class FFMQRandomizer:
 		
 		# Validate
 		valid = self.validate_logic()
+		self.valid = valid
 		
 		if valid:
 			if self.verbose:
@@ -530,6 +599,7 @@ def main():
 	parser.add_argument('--randomize-stats', action='store_true', help='Randomize stats')
 	parser.add_argument('--no-qol', action='store_true', help='Disable QOL improvements')
 	parser.add_argument('--no-validation', action='store_true', help='Disable logic validation')
+	parser.add_argument('--logic-world', type=str, help='World graph JSON for logic validation')
 	parser.add_argument('--spoiler-log', type=str, help='Output spoiler log')
 	parser.add_argument('--output', type=str, help='Output ROM file')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
@@ -550,7 +620,8 @@ def main():
 		randomize_shops=args.randomize_shops or args.mode != 'custom',
 		randomize_stats=args.randomize_stats,
 		qol_improvements=not args.no_qol,
-		ensure_completable=not args.no_validation
+		ensure_completable=not args.no_validation,
+		logic_world=args.logic_world
 	)
 	
 	# Chaos mode = randomize everything
@@ -563,7 +634,11 @@ def main():
 	
 	# Run randomizer
 	randomizer = FFMQRandomizer(Path(args.rom), config, verbose=args.verbose)
-	spoiler = randomizer.randomize_all()
+	try:
+		spoiler = randomizer.randomize_all()
+	except FillError as e:
+		print(f"Error: settings cannot produce a beatable seed: {e}")
+		return 1
 	
 	# Save ROM
 	output_path = Path(args.output) if args.output else Path(args.rom).with_suffix('.randomized.sfc')
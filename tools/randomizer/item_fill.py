@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+FFMQ Item Fill - Assumed-fill item placement
+
+Places items so every seed is beatable by construction, instead of
+shuffling and retrying until the logic check passes.
+
+Assumed fill:
+- Progression items are placed one at a time, in random order
+- Each item goes into an empty location reachable while *assuming* the
+  player already holds every progression item not yet placed
+- Once all progression items are placed, the assumption has been
+  discharged: the seed is beatable
+- Remaining (non-progression) items fill the leftover locations at random
+
+Constraints:
+- Location weights bias where progression lands (weighted pools);
+  weight 0 keeps progression out of a location
+- Item restrictions limit an item to a set of locations
+- Restricted backtracking: when an item has no legal location, earlier
+  placements are revisited (bounded budget per attempt); a spent budget
+  restarts with a new item order, up to a fixed number of attempts
+- Unsatisfiable settings raise FillError instead of retrying forever
+
+Reachability uses ProgressionSolver's bitset sweep (progression_logic.py).
+
+Usage:
+	python item_fill.py --seed 12345 --spoiler
+	python item_fill.py --world world.json --seed 1 --output placements.json
+	python item_fill.py --benchmark --seeds 1000
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+from progression_logic import LogicWorld, ProgressionSolver, SeedReport, default_world
+
+
+class FillError(Exception):
+	"""Settings cannot produce a beatable seed"""
+
+
+@dataclass
+class FillSettings:
+	"""Fill constraints"""
+	location_weights: Dict[str, float] = field(default_factory=dict)	# Default weight 1
+	item_locations: Dict[str, Set[str]] = field(default_factory=dict)	# Item -> allowed locations
+	starting_items: List[str] = field(default_factory=list)
+	max_backtracks: int = 20		# Per attempt
+	max_attempts: int = 20
+
+
+@dataclass
+class FillResult:
+	"""Placements and how they were found"""
+	placements: Dict[str, str]
+	report: SeedReport
+	backtracks: int = 0
+	attempts: int = 1
+	elapsed_ms: float = 0.0
+
+
+class AssumedFill:
+	"""Assumed-fill placer over a LogicWorld"""
+
+	def __init__(self, world: LogicWorld, settings: Optional[FillSettings] = None):
+		self.world = world
+		self.settings = settings or FillSettings()
+		self.solver = ProgressionSolver(world)
+
+	def is_progression(self, item: str) -> bool:
+		return item in self.world.item_bits
+
+	def fill(self, items: Sequence[str], locations: Optional[Sequence[str]] = None,
+			 rng: Optional[random.Random] = None) -> FillResult:
+		"""
+		Place items into locations
+
+		Args:
+			items: Item pool (one entry per copy); must fit the locations
+			locations: Locations to fill (default: every location with a
+				vanilla item); all other locations keep their vanilla item
+			rng: Random source (random.Random or the random module)
+
+		Returns:
+			FillResult with a beatable placement
+
+		Raises:
+			FillError: No beatable placement satisfies the settings
+		"""
+		start = time.perf_counter()
+		world = self.world
+		solver = self.solver
+		settings = self.settings
+		rng = rng or random.Random()
+
+		if locations is None:
+			locations = [loc.name for loc in world.locations if loc.item is not None]
+		locations = list(locations)
+		unknown = [name for name in locations if name not in world.location_index]
+		if unknown:
+			raise FillError(f"Unknown locations: {', '.join(unknown[:5])}")
+		if len(items) > len(locations):
+			raise FillError(f"{len(items)} items do not fit in {len(locations)} locations")
+
+		progression = [item for item in items if self.is_progression(item)]
+		filler = [item for item in items if not self.is_progression(item)]
+
+		# Locations being filled start empty; the rest keep vanilla items
+		location_items = solver.location_items()
+		for name in locations:
+			location_items[world.location_index[name]] = 0
+		starting = world.item_mask(settings.starting_items)
+
+		# Settings that no amount of searching can satisfy
+		_, _, taken = solver.sweep(location_items, starting | world.item_mask(progression))
+		if not taken[solver.goal_index]:
+			raise FillError("Goal unreachable even with every progression item")
+		for item, allowed in settings.item_locations.items():
+			if item in progression and not set(allowed) & set(locations):
+				raise FillError(f"No allowed location for {item} is being filled")
+
+		backtracks = 0
+		for attempt in range(1, settings.max_attempts + 1):
+			rng.shuffle(progression)
+			placed, used = self._place(progression, locations, location_items.copy(), starting, rng)
+			backtracks += used
+			if placed is None:
+				continue
+
+			# Filler goes anywhere that is left
+			placements = dict(placed)
+			remaining = [name for name in locations if name not in placements]
+			rng.shuffle(remaining)
+			for name, item in zip(remaining, filler):
+				placements[name] = item
+
+			# Beatable by construction; one-way traps still need a new attempt
+			report = solver.check(placements, settings.starting_items)
+			if report.valid:
+				break
+		else:
+			raise FillError(f"No beatable placement in {settings.max_attempts} attempts "
+							f"({backtracks} backtracks)")
+
+		return FillResult(placements, report, backtracks, attempt,
+						  (time.perf_counter() - start) * 1000)
+
+	def _place(self, progression: List[str], locations: List[str], location_items: List[int],
+			   starting: int, rng) -> tuple:
+		"""
+		One assumed-fill attempt
+
+		Returns:
+			([(location, item)] or None if the backtrack budget ran out,
+			backtracks used)
+		"""
+		world = self.world
+		solver = self.solver
+		settings = self.settings
+
+		weights = [settings.location_weights.get(name, 1.0) for name in locations]
+		empty = [True] * len(locations)
+
+		# Stack of (item, location, locations already tried for this item)
+		placed: List[tuple] = []
+		pending = list(progression)
+		tried: Set[int] = set()
+		backtracks = 0
+
+		while pending:
+			item = pending[-1]
+			assumed = starting | world.item_mask(pending[:-1])
+			_, _, taken = solver.sweep(location_items, assumed)
+
+			allowed = settings.item_locations.get(item)
+			candidates = [
+				i for i, name in enumerate(locations)
+				if empty[i] and weights[i] > 0 and i not in tried and taken[world.location_index[name]]
+				and (allowed is None or name in allowed)
+			]
+
+			if candidates:
+				choice = rng.choices(candidates, [weights[i] for i in candidates])[0]
+				empty[choice] = False
+				location_items[world.location_index[locations[choice]]] = world.item_mask([item])
+				placed.append((item, choice, tried | {choice}))
+				pending.pop()
+				tried = set()
+				continue
+
+			# Dead end: move the previous item somewhere it has not been yet
+			if not placed or backtracks >= settings.max_backtracks:
+				return None, backtracks
+			backtracks += 1
+			previous, choice, previous_tried = placed.pop()
+			empty[choice] = True
+			location_items[world.location_index[locations[choice]]] = 0
+			pending.append(previous)
+			tried = previous_tried
+
+		return [(locations[i], item) for item, i, _ in placed], backtracks
+
+
+def vanilla_pool(world: LogicWorld) -> List[str]:
+	"""Every vanilla item, one entry per location"""
+	return [loc.item for loc in world.locations if loc.item is not None]
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ assumed-fill item placement')
+	parser.add_argument('--world', type=Path, help='World JSON (default: built-in FFMQ world)')
+	parser.add_argument('--seed', type=int, help='Random seed')
+	parser.add_argument('--weights', type=Path, help='JSON {location: weight}')
+	parser.add_argument('--start-items', nargs='*', default=[], help='Starting inventory')
+	parser.add_argument('--max-backtracks', type=int, default=20, help='Backtracking budget per attempt')
+	parser.add_argument('--max-attempts', type=int, default=20, help='Restarts before giving up')
+	parser.add_argument('--output', type=Path, help='Write placements JSON')
+	parser.add_argument('--spoiler', action='store_true', help='Print the sphere playthrough')
+	parser.add_argument('--benchmark', action='store_true', help='Time fills of many seeds')
+	parser.add_argument('--seeds', type=int, default=1000, help='Seeds for --benchmark')
+
+	args = parser.parse_args()
+	world = LogicWorld.load(args.world) if args.world else default_world()
+	settings = FillSettings(starting_items=args.start_items, max_backtracks=args.max_backtracks,
+							max_attempts=args.max_attempts)
+	if args.weights:
+		settings.location_weights = json.loads(args.weights.read_text(encoding='utf-8'))
+	filler = AssumedFill(world, settings)
+	pool = vanilla_pool(world)
+
+	if args.benchmark:
+		start = time.perf_counter()
+		results = [filler.fill(pool, rng=random.Random(seed)) for seed in range(args.seeds)]
+		elapsed = (time.perf_counter() - start) * 1000 / args.seeds
+		print(f"{elapsed:.3f} ms/seed over {args.seeds} seeds (all beatable)")
+		print(f"  backtracks: {sum(r.backtracks for r in results)}, "
+			  f"max attempts: {max(r.attempts for r in results)}")
+		return 0
+
+	seed = args.seed if args.seed is not None else random.randint(0, 99999999)
+	try:
+		result = filler.fill(pool, rng=random.Random(seed))
+	except FillError as e:
+		print(f"Error: {e}")
+		return 1
+
+	print(f"Seed {seed}: {len(result.placements)} placements, {result.backtracks} backtracks, "
+		  f"{result.attempts} attempt(s) ({result.elapsed_ms:.2f} ms)")
+	if args.spoiler:
+		print('\n'.join(result.report.spoiler_lines()))
+	if args.output:
+		args.output.write_text(json.dumps(result.placements, indent='\t'), encoding='utf-8')
+		print(f"✓ Wrote placements to {args.output}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,698 @@
+#!/usr/bin/env python3
+"""
+FFMQ Progression Logic - Graph-based seed validation
+
+Models the game world as regions joined by doors, with item locations in
+each region. Door and location requirements are boolean expressions over
+key items ("Venus Key & (Claw | Dragon Claw)"), compiled to a list of
+bitmasks (disjunctive normal form) over the key-item set, so a check is
+a few integer ANDs against an int bitset inventory.
+
+Analyses:
+- Reachability: fixed-point sweep (BFS that collects items as it goes and
+  re-opens blocked doors/locations when the inventory grows)
+- Beatability: goal location reachable from the start
+- Playthrough: sphere-by-sphere collection order for spoiler logs
+- Traps: one-way doors that strand the player where the goal is unreachable
+- Unreachable locations
+
+Worlds are built in code, from dicts/JSON (LogicWorld.from_dict / load),
+or from simple area requirement tables. FFMQ_WORLD is an approximation of
+the vanilla overworld progression for testing and benchmarking.
+
+Usage:
+	python progression_logic.py --check placements.json
+	python progression_logic.py --world world.json --check placements.json --spoiler
+	python progression_logic.py --benchmark --seeds 1000
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Requirement in disjunctive normal form: satisfied if any mask is a
+# subset of the inventory. () = impossible, (0,) = always.
+Requirement = Tuple[int, ...]
+ALWAYS: Requirement = (0,)
+NEVER: Requirement = ()
+
+
+# ----------------------------------------------------------------------
+# Requirement expressions
+# ----------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\s*(?:(\()|(\))|(&|\band\b)|(\||\bor\b)|([^()&|]+?)(?=\s*(?:[()&|]|\band\b|\bor\b|$)))",
+					re.IGNORECASE)
+
+
+def _minimize(masks: Iterable[int]) -> Requirement:
+	"""Drop duplicate masks and masks that contain another mask"""
+	unique = sorted(set(masks), key=lambda m: (bin(m).count('1'), m))
+	kept: List[int] = []
+	for mask in unique:
+		if not any(other & mask == other for other in kept):
+			kept.append(mask)
+	return tuple(kept)
+
+
+def _and(left: Requirement, right: Requirement) -> Requirement:
+	return _minimize(a | b for a in left for b in right)
+
+
+def _or(left: Requirement, right: Requirement) -> Requirement:
+	return _minimize(left + right)
+
+
+def compile_requirement(expression, item_bits: Dict[str, int]) -> Requirement:
+	"""
+	Compile a requirement to DNF bitmasks
+
+	Args:
+		expression: '' / None (always), an expression string using & | and
+			parentheses ('and'/'or' also accepted), or a list of item names
+			(all required)
+		item_bits: Item name -> bit index; unknown items are added
+
+	Returns:
+		Tuple of masks, any one of which satisfies the requirement
+	"""
+	if expression is None:
+		return ALWAYS
+	if isinstance(expression, (list, tuple)):
+		expression = ' & '.join(f'({e})' for e in expression) if expression else ''
+	expression = expression.strip()
+	if not expression:
+		return ALWAYS
+
+	tokens = []
+	position = 0
+	while position < len(expression):
+		match = _TOKEN.match(expression, position)
+		if not match or match.end() == position:
+			raise ValueError(f"Bad requirement syntax at {position}: {expression!r}")
+		position = match.end()
+		if match.group(1):
+			tokens.append('(')
+		elif match.group(2):
+			tokens.append(')')
+		elif match.group(3):
+			tokens.append('&')
+		elif match.group(4):
+			tokens.append('|')
+		else:
+			tokens.append(('item', match.group(5).strip()))
+
+	def bit(name: str) -> Requirement:
+		if name.lower() in ('true', 'none', 'nothing'):
+			return ALWAYS
+		if name.lower() == 'false':
+			return NEVER
+		if name not in item_bits:
+			item_bits[name] = len(item_bits)
+		return (1 << item_bits[name],)
+
+	# Recursive descent: or_expr := and_expr ('|' and_expr)*
+	def parse_or(i: int) -> Tuple[Requirement, int]:
+		result, i = parse_and(i)
+		while i < len(tokens) and tokens[i] == '|':
+			right, i = parse_and(i + 1)
+			result = _or(result, right)
+		return result, i
+
+	def parse_and(i: int) -> Tuple[Requirement, int]:
+		result, i = parse_atom(i)
+		while i < len(tokens) and tokens[i] == '&':
+			right, i = parse_atom(i + 1)
+			result = _and(result, right)
+		return result, i
+
+	def parse_atom(i: int) -> Tuple[Requirement, int]:
+		if i >= len(tokens):
+			raise ValueError(f"Unexpected end of requirement: {expression!r}")
+		token = tokens[i]
+		if token == '(':
+			result, i = parse_or(i + 1)
+			if i >= len(tokens) or tokens[i] != ')':
+				raise ValueError(f"Unbalanced parentheses: {expression!r}")
+			return result, i + 1
+		if isinstance(token, tuple):
+			return bit(token[1]), i + 1
+		raise ValueError(f"Unexpected {token!r} in requirement: {expression!r}")
+
+	result, end = parse_or(0)
+	if end != len(tokens):
+		raise ValueError(f"Trailing tokens in requirement: {expression!r}")
+	return result
+
+
+def satisfied(requirement: Requirement, inventory: int) -> bool:
+	"""Check a compiled requirement against an inventory bitset"""
+	for mask in requirement:
+		if mask & inventory == mask:
+			return True
+	return False
+
+
+# ----------------------------------------------------------------------
+# World model
+# ----------------------------------------------------------------------
+
+@dataclass
+class Location:
+	"""Item location inside a region"""
+	name: str
+	region: str
+	requires: str = ''
+	item: Optional[str] = None		# Vanilla item (used when not placed)
+
+
+@dataclass
+class Door:
+	"""Connection between regions"""
+	source: str
+	dest: str
+	requires: str = ''
+	one_way: bool = False
+	name: str = ''
+
+	@property
+	def label(self) -> str:
+		return self.name or f"{self.source} -> {self.dest}"
+
+
+@dataclass
+class Trap:
+	"""One-way door that strands the player"""
+	door: str
+	region: str
+	sphere: int
+	inventory: List[str]
+
+
+@dataclass
+class SeedReport:
+	"""Result of checking one set of placements"""
+	beatable: bool
+	spheres: List[List[Tuple[str, str]]] = field(default_factory=list)
+	traps: List[Trap] = field(default_factory=list)
+	unreachable: List[str] = field(default_factory=list)
+	elapsed_ms: float = 0.0
+
+	@property
+	def valid(self) -> bool:
+		return self.beatable and not self.traps
+
+	def spoiler_lines(self) -> List[str]:
+		"""Playthrough and problems as spoiler log lines"""
+		lines = []
+		for number, sphere in enumerate(self.spheres, 1):
+			lines.append(f"Sphere {number}:")
+			for location, item in sphere:
+				lines.append(f"  {location:<30} {item}")
+		if not self.beatable:
+			lines.append("NOT BEATABLE")
+		for trap in self.traps:
+			lines.append(f"Trap: {trap.door} strands the player in {trap.region} "
+						 f"(sphere {trap.sphere + 1})")
+		return lines
+
+	def to_dict(self) -> dict:
+		return {
+			'beatable': self.beatable,
+			'spheres': [[list(entry) for entry in sphere] for sphere in self.spheres],
+			'traps': [vars(trap) for trap in self.traps],
+			'unreachable': self.unreachable,
+			'elapsed_ms': self.elapsed_ms,
+		}
+
+
+class LogicWorld:
+	"""Regions, doors and locations with compiled requirements"""
+
+	def __init__(self, start: str, goal: str):
+		"""
+		Args:
+			start: Starting region
+			goal: Location whose access means the game can be completed
+		"""
+		self.start = start
+		self.goal = goal
+		self.regions: List[str] = []
+		self.doors: List[Door] = []
+		self.locations: List[Location] = []
+		self.item_bits: Dict[str, int] = {}
+		self._compiled = False
+
+	# -- Building ------------------------------------------------------
+
+	def add_region(self, name: str) -> None:
+		if name not in self.regions:
+			self.regions.append(name)
+			self._compiled = False
+
+	def add_door(self, source: str, dest: str, requires: str = '', one_way: bool = False,
+				 name: str = '') -> None:
+		self.add_region(source)
+		self.add_region(dest)
+		self.doors.append(Door(source, dest, requires, one_way, name))
+		self._compiled = False
+
+	def add_location(self, name: str, region: str, requires: str = '',
+					 item: Optional[str] = None) -> None:
+		self.add_region(region)
+		self.locations.append(Location(name, region, requires, item))
+		self._compiled = False
+
+	def add_key_items(self, names: Iterable[str]) -> None:
+		"""Declare progression items (items never named in requirements are not tracked)"""
+		for name in names:
+			if name not in self.item_bits:
+				self.item_bits[name] = len(self.item_bits)
+
+	@classmethod
+	def from_dict(cls, data: dict) -> 'LogicWorld':
+		"""Build from {'start', 'goal', 'key_items', 'doors': [...], 'locations': [...]}"""
+		world = cls(data['start'], data['goal'])
+		world.add_key_items(data.get('key_items', []))
+		for region in data.get('regions', []):
+			world.add_region(region)
+		for door in data.get('doors', []):
+			world.add_door(door['source'], door['dest'], door.get('requires', ''),
+						   door.get('one_way', False), door.get('name', ''))
+		for location in data.get('locations', []):
+			world.add_location(location['name'], location['region'], location.get('requires', ''),
+							   location.get('item'))
+		return world
+
+	@classmethod
+	def load(cls, path: Path) -> 'LogicWorld':
+		with open(path, 'r', encoding='utf-8') as f:
+			return cls.from_dict(json.load(f))
+
+	def to_dict(self) -> dict:
+		return {
+			'start': self.start,
+			'goal': self.goal,
+			'key_items': self.key_items,
+			'regions': self.regions,
+			'doors': [vars(door) for door in self.doors],
+			'locations': [vars(location) for location in self.locations],
+		}
+
+	@classmethod
+	def from_area_requirements(cls, areas: Dict[str, Sequence[str]], location_areas: Dict[str, str],
+							   start: str, goal_area: str) -> 'LogicWorld':
+		"""
+		Hub world: every area is entered from the start area with its item list
+
+		The goal is a location named after goal_area, inside it.
+		"""
+		world = cls(start, goal_area)
+		world.add_region(start)
+		for area, requires in areas.items():
+			if area != start:
+				world.add_door(start, area, ' & '.join(requires))
+		for location, area in location_areas.items():
+			world.add_location(location, area)
+		world.add_location(goal_area, goal_area)
+		return world
+
+	# -- Compilation ---------------------------------------------------
+
+	@property
+	def key_items(self) -> List[str]:
+		self.compile()
+		return sorted(self.item_bits, key=self.item_bits.get)
+
+	def compile(self) -> None:
+		"""Compile requirements and adjacency (done once, lazily)"""
+		if self._compiled:
+			return
+
+		self.region_index = {name: i for i, name in enumerate(self.regions)}
+		self.location_index = {loc.name: i for i, loc in enumerate(self.locations)}
+		if self.start not in self.region_index:
+			raise ValueError(f"Start region {self.start!r} not in world")
+		if self.goal not in self.location_index:
+			raise ValueError(f"Goal location {self.goal!r} not in world")
+
+		self.out_edges: List[List[Tuple[int, Requirement, int]]] = [[] for _ in self.regions]
+		for door_id, door in enumerate(self.doors):
+			requirement = compile_requirement(door.requires, self.item_bits)
+			source, dest = self.region_index[door.source], self.region_index[door.dest]
+			self.out_edges[source].append((dest, requirement, door_id))
+			if not door.one_way:
+				self.out_edges[dest].append((source, requirement, door_id))
+
+		self.region_locations: List[List[int]] = [[] for _ in self.regions]
+		self.location_reqs: List[Requirement] = []
+		for i, location in enumerate(self.locations):
+			self.region_locations[self.region_index[location.region]].append(i)
+			self.location_reqs.append(compile_requirement(location.requires, self.item_bits))
+
+		self._compiled = True
+
+	def item_mask(self, names: Iterable[str]) -> int:
+		mask = 0
+		for name in names:
+			bit = self.item_bits.get(name)
+			if bit is not None:
+				mask |= 1 << bit
+		return mask
+
+	def item_names(self, mask: int) -> List[str]:
+		return [name for name, bit in sorted(self.item_bits.items(), key=lambda kv: kv[1])
+				if mask >> bit & 1]
+
+
+# ----------------------------------------------------------------------
+# Solver
+# ----------------------------------------------------------------------
+
+class ProgressionSolver:
+	"""Reachability analyses over a LogicWorld"""
+
+	def __init__(self, world: LogicWorld):
+		world.compile()
+		self.world = world
+		self.goal_index = world.location_index[world.goal]
+		self.one_way = [(world.region_index[d.source], world.region_index[d.dest], d)
+						for d in world.doors if d.one_way]
+
+	def location_items(self, placements: Optional[Dict[str, str]] = None) -> List[int]:
+		"""Per-location key-item bit for placements over the vanilla items"""
+		world = self.world
+		items = [location.item for location in world.locations]
+		for name, item in (placements or {}).items():
+			index = world.location_index.get(name)
+			if index is not None:
+				items[index] = item
+		bits = world.item_bits
+		return [(1 << bits[item]) if item in bits else 0 for item in items]
+
+	def sweep(self, location_items: List[int], inventory: int = 0, start: Optional[int] = None,
+			  collect: bool = True) -> Tuple[int, List[bool], List[bool]]:
+		"""
+		Fixed-point reachability
+
+		Args:
+			location_items: From location_items()
+			inventory: Starting inventory bitset
+			start: Start region index (default: world start)
+			collect: Pick up items as they are reached (False = inventory fixed)
+
+		Returns:
+			(final inventory, region reached flags, location reached flags)
+		"""
+		world = self.world
+		out_edges = world.out_edges
+		region_locations = world.region_locations
+		location_reqs = world.location_reqs
+
+		start = world.region_index[world.start] if start is None else start
+		reached = [False] * len(world.regions)
+		taken = [False] * len(world.locations)
+		reached[start] = True
+		stack = [start]
+		blocked_edges: List[Tuple[int, Requirement]] = []
+		blocked_locations: List[int] = []
+
+		while True:
+			while stack:
+				region = stack.pop()
+				for dest, requirement, _ in out_edges[region]:
+					if reached[dest]:
+						continue
+					if satisfied(requirement, inventory):
+						reached[dest] = True
+						stack.append(dest)
+					else:
+						blocked_edges.append((dest, requirement))
+				for index in region_locations[region]:
+					if satisfied(location_reqs[index], inventory):
+						taken[index] = True
+						if collect:
+							inventory |= location_items[index]
+					else:
+						blocked_locations.append(index)
+
+			if not collect:
+				break
+
+			# Inventory may have grown: retry everything that was blocked
+			still_blocked = []
+			for dest, requirement in blocked_edges:
+				if reached[dest]:
+					continue
+				if satisfied(requirement, inventory):
+					reached[dest] = True
+					stack.append(dest)
+				else:
+					still_blocked.append((dest, requirement))
+			blocked_edges = still_blocked
+
+			still_locked = []
+			grew = False
+			for index in blocked_locations:
+				if satisfied(location_reqs[index], inventory):
+					taken[index] = True
+					if location_items[index] & ~inventory:
+						inventory |= location_items[index]
+						grew = True
+				else:
+					still_locked.append(index)
+			blocked_locations = still_locked
+
+			if not stack and not grew:
+				break
+
+		return inventory, reached, taken
+
+	def is_beatable(self, placements: Optional[Dict[str, str]] = None,
+					starting_items: Iterable[str] = ()) -> bool:
+		"""Fast beatability check (single sweep)"""
+		_, _, taken = self.sweep(self.location_items(placements), self.world.item_mask(starting_items))
+		return taken[self.goal_index]
+
+	def spheres(self, placements: Optional[Dict[str, str]] = None,
+				starting_items: Iterable[str] = ()) -> Tuple[List[List[int]], List[int], List[bool]]:
+		"""
+		Sphere-by-sphere collection
+
+		Returns:
+			(location indices per sphere, inventory at the start of each
+			sphere, locations reached by the end)
+		"""
+		location_items = self.location_items(placements)
+		inventory = self.world.item_mask(starting_items)
+		collected = [False] * len(self.world.locations)
+		spheres: List[List[int]] = []
+		inventories: List[int] = []
+
+		while True:
+			_, _, taken = self.sweep(location_items, inventory, collect=False)
+			sphere = [i for i, hit in enumerate(taken) if hit and not collected[i]]
+			if not sphere:
+				break
+			spheres.append(sphere)
+			inventories.append(inventory)
+			for index in sphere:
+				collected[index] = True
+				inventory |= location_items[index]
+
+		return spheres, inventories, collected
+
+	def find_traps(self, location_items: List[int], inventories: List[int]) -> List[Trap]:
+		"""
+		One-way doors that, when first usable, lead somewhere the goal
+		cannot be reached from (with the inventory held at that point)
+		"""
+		world = self.world
+		traps = []
+		for source, dest, door in self.one_way:
+			requirement = compile_requirement(door.requires, world.item_bits)
+			for sphere, inventory in enumerate(inventories):
+				_, reached, _ = self.sweep(location_items, inventory, collect=False)
+				if not (reached[source] and satisfied(requirement, inventory)):
+					continue
+				# Earliest sphere the door is usable has the smallest inventory
+				_, _, taken = self.sweep(location_items, inventory, start=dest)
+				if not taken[self.goal_index]:
+					traps.append(Trap(door.label, door.dest, sphere, world.item_names(inventory)))
+				break
+		return traps
+
+	def check(self, placements: Optional[Dict[str, str]] = None,
+			  starting_items: Iterable[str] = (), playthrough: bool = True) -> SeedReport:
+		"""
+		Full seed check
+
+		Args:
+			playthrough: Compute spheres and traps (False = beatability only)
+		"""
+		start = time.perf_counter()
+		world = self.world
+		location_items = self.location_items(placements)
+		starting = world.item_mask(starting_items)
+
+		if not playthrough:
+			_, _, taken = self.sweep(location_items, starting)
+			return SeedReport(taken[self.goal_index],
+							  elapsed_ms=(time.perf_counter() - start) * 1000)
+
+		spheres, inventories, collected = self.spheres(placements, starting_items)
+		items = [location.item for location in world.locations]
+		for name, item in (placements or {}).items():
+			if name in world.location_index:
+				items[world.location_index[name]] = item
+
+		beatable = collected[self.goal_index]
+		report = SeedReport(
+			beatable=beatable,
+			spheres=[[(world.locations[i].name, items[i] or '') for i in sphere] for sphere in spheres],
+			# Traps are only meaningful when the goal is reachable at all
+			traps=self.find_traps(location_items, inventories) if beatable and self.one_way else [],
+			unreachable=[loc.name for loc, hit in zip(world.locations, collected) if not hit],
+		)
+		report.elapsed_ms = (time.perf_counter() - start) * 1000
+		return report
+
+
+# ----------------------------------------------------------------------
+# Default world
+# ----------------------------------------------------------------------
+
+FFMQ_WORLD = {
+	'start': 'Hill of Destiny',
+	'goal': 'Dark King',
+	'key_items': [
+		'Elixir', 'Tree Wither', 'Wakewater', 'Venus Key', 'Multi Key', 'Mask', 'Magic Mirror',
+		'Thunder Rock', "Captain's Cap", 'Libra Crest', 'Gemini Crest', 'Mobius Crest',
+		'Sand Coin', 'River Coin', 'Sun Coin', 'Sky Coin', 'Bomb', 'Jumbo Bomb', 'Claw',
+		'Dragon Claw', 'Axe', 'Giant\'s Axe',
+	],
+	'doors': [
+		{'source': 'Hill of Destiny', 'dest': 'Level Forest'},
+		{'source': 'Level Forest', 'dest': 'Foresta'},
+		{'source': 'Foresta', 'dest': 'Sand Temple'},
+		{'source': 'Foresta', 'dest': 'Bone Dungeon', 'requires': 'Sand Coin'},
+		{'source': 'Foresta', 'dest': 'Libra Temple', 'requires': 'Bomb | Jumbo Bomb'},
+		{'source': 'Foresta', 'dest': 'Focus Tower', 'requires': 'Sand Coin'},
+		{'source': 'Libra Temple', 'dest': 'Aquaria', 'requires': 'Libra Crest'},
+		{'source': 'Focus Tower', 'dest': 'Aquaria', 'requires': 'River Coin'},
+		{'source': 'Aquaria', 'dest': 'Wintry Cave'},
+		{'source': 'Wintry Cave', 'dest': 'Falls Basin', 'requires': 'Bomb | Jumbo Bomb'},
+		{'source': 'Falls Basin', 'dest': 'Ice Pyramid', 'requires': 'Claw | Dragon Claw'},
+		{'source': 'Ice Pyramid', 'dest': 'Aquaria', 'one_way': True, 'name': 'Ice Pyramid exit'},
+		{'source': 'Aquaria', 'dest': "Spencer's Place", 'requires': 'Wakewater'},
+		{'source': 'Focus Tower', 'dest': 'Fireburg', 'requires': 'Sun Coin'},
+		{'source': "Spencer's Place", 'dest': 'Fireburg'},
+		{'source': 'Fireburg', 'dest': 'Mine', 'requires': 'Jumbo Bomb'},
+		{'source': 'Mine', 'dest': 'Volcano', 'requires': 'Claw | Dragon Claw'},
+		{'source': 'Volcano', 'dest': 'Lava Dome', 'requires': 'Mask'},
+		{'source': 'Fireburg', 'dest': 'Rope Bridge', 'requires': 'Venus Key'},
+		{'source': 'Rope Bridge', 'dest': 'Alive Forest'},
+		{'source': 'Alive Forest', 'dest': 'Giant Tree', 'requires': 'Axe & (Dragon Claw | Claw)'},
+		{'source': 'Focus Tower', 'dest': 'Windia', 'requires': 'Sky Coin | Giant\'s Axe'},
+		{'source': 'Giant Tree', 'dest': 'Windia', 'requires': "Giant's Axe"},
+		{'source': 'Windia', 'dest': 'Kaidge Temple'},
+		{'source': 'Kaidge Temple', 'dest': 'Mount Gale', 'requires': 'Dragon Claw'},
+		{'source': 'Mount Gale', 'dest': 'Windia', 'one_way': True, 'name': 'Mount Gale slide'},
+		{'source': 'Windia', 'dest': "Pazuzu's Tower", 'requires': 'Thunder Rock & Mobius Crest'},
+		{'source': 'Windia', 'dest': 'Ship Dock', 'requires': "Captain's Cap"},
+		{'source': 'Ship Dock', 'dest': "Mac's Ship", 'requires': 'Gemini Crest & Multi Key'},
+		{'source': 'Focus Tower', 'dest': 'Doom Castle', 'requires': 'Sand Coin & River Coin & Sun Coin & Sky Coin'},
+	],
+	'locations': [
+		{'name': 'Hill of Destiny Chest', 'region': 'Hill of Destiny', 'item': 'Heal Potion'},
+		{'name': 'Old Man', 'region': 'Level Forest', 'item': 'Elixir'},
+		{'name': 'Level Forest Chest', 'region': 'Level Forest', 'item': 'Axe'},
+		{'name': 'Foresta Cave Chest', 'region': 'Foresta', 'item': 'Cure Potion'},
+		{'name': 'Kaeli', 'region': 'Foresta', 'requires': 'Elixir', 'item': 'Tree Wither'},
+		{'name': 'Sand Temple Chest', 'region': 'Sand Temple', 'item': 'Sand Coin'},
+		{'name': 'Bone Dungeon Chest', 'region': 'Bone Dungeon', 'item': 'Bomb'},
+		{'name': 'Flamerus Rex', 'region': 'Bone Dungeon', 'item': 'Libra Crest'},
+		{'name': 'Libra Temple Chest', 'region': 'Libra Temple', 'item': 'Wakewater'},
+		{'name': 'Aquaria Shrine Chest', 'region': 'Aquaria', 'item': 'Steel Sword'},
+		{'name': 'Phoebe', 'region': 'Wintry Cave', 'item': 'Claw'},
+		{'name': 'Falls Basin Chest', 'region': 'Falls Basin', 'item': 'Mask'},
+		{'name': 'Ice Golem', 'region': 'Ice Pyramid', 'item': 'River Coin'},
+		{'name': "Spencer's Place Chest", 'region': "Spencer's Place", 'item': 'Jumbo Bomb'},
+		{'name': 'Fireburg Mine Chest', 'region': 'Mine', 'item': 'Venus Key'},
+		{'name': 'Reuben', 'region': 'Fireburg', 'requires': 'Mask', 'item': 'Thunder Rock'},
+		{'name': 'Dualhead Hydra', 'region': 'Lava Dome', 'item': 'Sun Coin'},
+		{'name': 'Alive Forest Chest', 'region': 'Alive Forest', 'item': 'Dragon Claw'},
+		{'name': 'Gidrah', 'region': 'Giant Tree', 'item': "Giant's Axe"},
+		{'name': 'Windia Tower Chest', 'region': 'Windia', 'item': 'Multi Key'},
+		{'name': 'Kaidge Temple Chest', 'region': 'Kaidge Temple', 'item': 'Mobius Crest'},
+		{'name': 'Mount Gale Chest', 'region': 'Mount Gale', 'item': 'Magic Mirror'},
+		{'name': 'Pazuzu', 'region': "Pazuzu's Tower", 'item': 'Sky Coin'},
+		{'name': 'Otto', 'region': 'Windia', 'requires': 'Thunder Rock', 'item': "Captain's Cap"},
+		{'name': 'Ship Dock Chest', 'region': 'Ship Dock', 'item': 'Gemini Crest'},
+		{'name': "Mac's Ship Chest", 'region': "Mac's Ship", 'item': 'Elixir'},
+		{'name': 'Dark King', 'region': 'Doom Castle', 'requires': 'Magic Mirror'},
+	],
+}
+
+
+def default_world() -> LogicWorld:
+	return LogicWorld.from_dict(FFMQ_WORLD)
+
+
+def random_placements(world: LogicWorld, rng: random.Random) -> Dict[str, str]:
+	"""Shuffle every vanilla item among the item locations (no logic)"""
+	names = [loc.name for loc in world.locations if loc.item is not None]
+	items = [loc.item for loc in world.locations if loc.item is not None]
+	rng.shuffle(items)
+	return dict(zip(names, items))
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ progression logic solver')
+	parser.add_argument('--world', type=Path, help='World JSON (default: built-in FFMQ world)')
+	parser.add_argument('--check', type=Path, help='Placements JSON {location: item} to validate')
+	parser.add_argument('--start-items', nargs='*', default=[], help='Starting inventory')
+	parser.add_argument('--spoiler', action='store_true', help='Print the sphere playthrough')
+	parser.add_argument('--export-world', type=Path, help='Write the world as JSON')
+	parser.add_argument('--benchmark', action='store_true', help='Time checks of random shuffles')
+	parser.add_argument('--seeds', type=int, default=1000, help='Seeds for --benchmark')
+
+	args = parser.parse_args()
+	world = LogicWorld.load(args.world) if args.world else default_world()
+	solver = ProgressionSolver(world)
+
+	if args.export_world:
+		args.export_world.write_text(json.dumps(world.to_dict(), indent='\t'), encoding='utf-8')
+		print(f"✓ Wrote world to {args.export_world}")
+
+	if args.check:
+		placements = json.loads(args.check.read_text(encoding='utf-8'))
+		report = solver.check(placements, args.start_items)
+		print(f"Beatable: {report.beatable}  Traps: {len(report.traps)}  "
+			  f"Unreachable: {len(report.unreachable)}  ({report.elapsed_ms:.2f} ms)")
+		if args.spoiler:
+			print('\n'.join(report.spoiler_lines()))
+		return 0 if report.valid else 1
+
+	if args.benchmark:
+		rng = random.Random(0)
+		seeds = [random_placements(world, rng) for _ in range(args.seeds)]
+		for label, playthrough in (('beatable only', False), ('full check', True)):
+			start = time.perf_counter()
+			beatable = sum(solver.check(p, playthrough=playthrough).beatable for p in seeds)
+			elapsed = (time.perf_counter() - start) * 1000 / len(seeds)
+			print(f"{label:<14} {elapsed:7.3f} ms/seed   {beatable}/{len(seeds)} beatable")
+		return 0
+
+	parser.print_help()
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Item Fill - Test Suite
+
+Checks that assumed fill only produces beatable seeds, honours weights and
+item restrictions, and reports unsatisfiable settings.
+
+Usage:
+	python test_item_fill.py
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from item_fill import AssumedFill, FillError, FillSettings, vanilla_pool
+from progression_logic import LogicWorld, ProgressionSolver, default_world
+
+
+def chain_world() -> LogicWorld:
+	"""A -Key1-> B -Key2-> C, goal in C; three chests per region"""
+	world = LogicWorld('A', 'Goal')
+	world.add_door('A', 'B', 'Key1')
+	world.add_door('B', 'C', 'Key2')
+	for region in 'ABC':
+		for n in range(3):
+			world.add_location(f"{region}{n}", region, item='Potion')
+	world.add_location('Goal', 'C', 'Key3')
+	return world
+
+
+class TestAssumedFill(unittest.TestCase):
+	def test_default_world_always_beatable(self):
+		world = default_world()
+		filler = AssumedFill(world)
+		solver = ProgressionSolver(world)
+		pool = vanilla_pool(world)
+		for seed in range(100):
+			result = filler.fill(pool, rng=random.Random(seed))
+			self.assertTrue(solver.is_beatable(result.placements))
+			self.assertEqual(sorted(result.placements.values()), sorted(pool))
+
+	def test_deterministic(self):
+		world = default_world()
+		pool = vanilla_pool(world)
+		first = AssumedFill(world).fill(pool, rng=random.Random(42)).placements
+		second = AssumedFill(world).fill(pool, rng=random.Random(42)).placements
+		self.assertEqual(first, second)
+
+	def test_weights_and_restrictions(self):
+		world = chain_world()
+		settings = FillSettings(
+			location_weights={'A0': 0, 'A1': 0},
+			item_locations={'Key3': {'C2'}},
+		)
+		pool = ['Key1', 'Key2', 'Key3'] + ['Potion'] * 6
+		for seed in range(30):
+			placements = AssumedFill(world, settings).fill(pool, rng=random.Random(seed)).placements
+			self.assertEqual(placements['C2'], 'Key3')
+			self.assertEqual(placements['A2'], 'Key1')	# Only weighted location in A
+			self.assertNotIn(placements['A0'], ('Key1', 'Key2', 'Key3'))
+
+	def test_unsatisfiable(self):
+		world = chain_world()
+		pool = ['Key1', 'Key2', 'Potion']
+		with self.assertRaises(FillError):
+			AssumedFill(world).fill(pool, rng=random.Random(0))		# Key3 missing
+
+		# Key1 forced behind its own door
+		settings = FillSettings(item_locations={'Key1': {'B0', 'B1', 'C0'}})
+		with self.assertRaises(FillError):
+			AssumedFill(world, settings).fill(pool + ['Key3'], rng=random.Random(0))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Progression Logic - Test Suite
+
+Checks requirement compilation, fixed-point reachability, sphere order,
+one-way trap detection and the per-seed time budget.
+
+Usage:
+	python test_progression_logic.py
+"""
+
+import random
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from progression_logic import (
+	ALWAYS, NEVER, LogicWorld, ProgressionSolver, compile_requirement,
+	default_world, random_placements, satisfied
+)
+
+
+def small_world() -> LogicWorld:
+	world = LogicWorld('Town', 'Boss')
+	world.add_door('Town', 'Cave', 'Lamp')
+	world.add_door('Town', 'Tower', 'Key & (Rope | Wings)')
+	world.add_door('Cave', 'Pit', one_way=True, name='Pit drop')
+	world.add_location('Town Chest', 'Town', item='Lamp')
+	world.add_location('Cave Chest', 'Cave', item='Key')
+	world.add_location('Pit Chest', 'Pit', item='Rope')
+	world.add_location('Boss', 'Tower')
+	return world
+
+
+class TestRequirements(unittest.TestCase):
+	def test_dnf(self):
+		bits = {}
+		req = compile_requirement('A & (B | C)', bits)
+		a, b, c = (1 << bits[n] for n in 'ABC')
+		self.assertEqual(set(req), {a | b, a | c})
+		self.assertTrue(satisfied(req, a | c))
+		self.assertFalse(satisfied(req, b | c))
+
+	def test_absorption_and_constants(self):
+		bits = {}
+		# A | (A & B) reduces to A
+		self.assertEqual(compile_requirement('A | (A and B)', bits), (1 << bits['A'],))
+		self.assertEqual(compile_requirement('', bits), ALWAYS)
+		self.assertEqual(compile_requirement('false', bits), NEVER)
+		self.assertEqual(compile_requirement(['A', 'B'], bits), (3,))
+
+	def test_syntax_errors(self):
+		for bad in ('A & (B', 'A &', '| A', 'A ) B'):
+			with self.assertRaises(ValueError):
+				compile_requirement(bad, {})
+
+
+class TestSolver(unittest.TestCase):
+	def test_vanilla_beatable(self):
+		solver = ProgressionSolver(small_world())
+		report = solver.check()
+		self.assertTrue(report.beatable)
+		self.assertEqual(report.unreachable, [])
+		# Lamp opens the cave and pit, whose items open the tower
+		order = [[item for _, item in sphere] for sphere in report.spheres]
+		self.assertEqual(order, [['Lamp'], ['Key', 'Rope'], ['']])
+
+	def test_unbeatable_placement(self):
+		solver = ProgressionSolver(small_world())
+		report = solver.check({'Town Chest': 'Key', 'Cave Chest': 'Lamp'})
+		self.assertFalse(report.beatable)
+		self.assertIn('Cave Chest', report.unreachable)
+		self.assertFalse(solver.is_beatable({'Town Chest': 'Key', 'Cave Chest': 'Lamp'}))
+
+	def test_starting_items(self):
+		solver = ProgressionSolver(small_world())
+		self.assertTrue(solver.is_beatable({'Town Chest': 'Potion'}, starting_items=['Lamp']))
+
+	def test_one_way_trap(self):
+		world = small_world()
+		world.add_door('Tower', 'Town')		# Irrelevant extra door
+		solver = ProgressionSolver(world)
+		# Rope in the pit: dropping in strands the player with no way out
+		self.assertEqual(solver.check().traps[0].door, 'Pit drop')
+		# Climbing out with the rope the pit holds makes the drop safe
+		world.add_door('Pit', 'Cave', 'Rope', one_way=True)
+		self.assertEqual(ProgressionSolver(world).check().traps, [])
+
+	def test_sweep_matches_spheres(self):
+		world = default_world()
+		solver = ProgressionSolver(world)
+		rng = random.Random(1)
+		for _ in range(50):
+			placements = random_placements(world, rng)
+			report = solver.check(placements)
+			self.assertEqual(report.beatable, solver.is_beatable(placements))
+
+	def test_round_trip(self):
+		world = small_world()
+		copy = LogicWorld.from_dict(world.to_dict())
+		self.assertEqual(ProgressionSolver(copy).check().to_dict()['spheres'],
+						 ProgressionSolver(world).check().to_dict()['spheres'])
+
+	def test_time_budget(self):
+		world = default_world()
+		solver = ProgressionSolver(world)
+		rng = random.Random(2)
+		seeds = [random_placements(world, rng) for _ in range(100)]
+		start = time.perf_counter()
+		for placements in seeds:
+			solver.check(placements)
+		per_seed = (time.perf_counter() - start) * 1000 / len(seeds)
+		self.assertLess(per_seed, 10.0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -53,23 +53,35 @@ Features:
 - Convert formats
 - Validate integrity
 
+Native files:
+- Version 2 (default, replay_container.py): run-length inputs, delta
+  keyframe states and a seek index; open_native() memory-maps it so long
+  replays open in milliseconds and segments decode without the rest
+- Version 1 (fixed per-frame records) is still read, and convert_native()
+  rewrites either version as the other without loss
+
 Usage:
 	python ffmq_replay_system.py record --output run.replay
 	python ffmq_replay_system.py playback --input run.replay
 	python ffmq_replay_system.py verify --input run.replay --rom original.sfc
 	python ffmq_replay_system.py export --input run.replay --format json
 	python ffmq_replay_system.py info --input run.replay
+	python ffmq_replay_system.py convert --input old.replay --output new.replay --version 2
+	python ffmq_replay_system.py segment --input run.replay --output part.replay --start 3600 --end 7199
 """
 
 import argparse
 import json
-import struct
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 from datetime import datetime
 
+import numpy as np
+
+from replay_container import ReplayData, ReplayFile, convert, read_version, read_v1, write_replay, write_v1
+
 
 class InputButton(Enum):
 	"""SNES controller buttons"""
@@ -157,7 +169,7 @@ class FFMQReplaySystem:
 	
 	# Native binary format magic number
 	MAGIC = b'FFMQ'
-	VERSION = 1
+	VERSION = 2
 	
 	def __init__(self, verbose: bool = False):
 		self.verbose = verbose
@@ -213,81 +225,73 @@ class FFMQReplaySystem:
 		if self.verbose:
 			print(f"✓ Added chapter at frame {frame}: {name}")
 	
-	def save_native(self, replay: Replay, output_path: Path) -> None:
-		"""Save replay in native binary format"""
-		with open(output_path, 'wb') as f:
-			# Header
-			f.write(self.MAGIC)
-			f.write(struct.pack('<I', self.VERSION))
-			
-			# Metadata (simplified - would be more complex in real implementation)
-			metadata_json = json.dumps(replay.metadata.to_dict()).encode('utf-8')
-			f.write(struct.pack('<I', len(metadata_json)))
-			f.write(metadata_json)
-			
-			# Input data
-			f.write(struct.pack('<I', len(replay.inputs)))
-			for input_frame in replay.inputs:
-				f.write(struct.pack('<IH', input_frame.frame_number, input_frame.buttons))
-			
-			# Save states (if any)
-			f.write(struct.pack('<I', len(replay.save_states)))
-			for frame, state_data in replay.save_states.items():
-				f.write(struct.pack('<I', frame))
-				f.write(struct.pack('<I', len(state_data)))
-				f.write(state_data)
+	@staticmethod
+	def _metadata_from_dict(metadata_dict: dict) -> ReplayMetadata:
+		"""Rebuild metadata (and its chapters) from a dict"""
+		metadata_dict = dict(metadata_dict)
+		metadata_dict['chapters'] = [ChapterMarker(**c) for c in metadata_dict.get('chapters', [])]
+		return ReplayMetadata(**metadata_dict)
+	
+	@staticmethod
+	def _to_data(replay: Replay) -> ReplayData:
+		frames = np.fromiter((f.frame_number for f in replay.inputs), dtype=np.uint32, count=len(replay.inputs))
+		buttons = np.fromiter((f.buttons for f in replay.inputs), dtype=np.uint16, count=len(replay.inputs))
+		return ReplayData(replay.metadata.to_dict(), frames, buttons, replay.save_states)
+	
+	def _from_data(self, data: ReplayData) -> Replay:
+		inputs = [InputFrame(frame, buttons) for frame, buttons in zip(data.frames.tolist(), data.buttons.tolist())]
+		return Replay(metadata=self._metadata_from_dict(data.metadata), inputs=inputs,
+					  save_states=dict(data.states))
+	
+	def save_native(self, replay: Replay, output_path: Path, version: int = VERSION) -> None:
+		"""Save replay in native binary format (version 2, or 1 for old tools)"""
+		data = self._to_data(replay)
+		if version == self.VERSION:
+			write_replay(output_path, data)
+		elif version == 1:
+			write_v1(output_path, data)
+		else:
+			raise ValueError(f"Unsupported replay version: {version}")
 		
 		if self.verbose:
-			print(f"✓ Saved replay to {output_path} ({len(replay.inputs)} frames)")
+			print(f"✓ Saved replay to {output_path} ({len(replay.inputs)} frames, version {version})")
 	
 	def load_native(self, input_path: Path) -> Replay:
-		"""Load replay from native binary format"""
-		with open(input_path, 'rb') as f:
-			# Verify header
-			magic = f.read(4)
-			if magic != self.MAGIC:
-				raise ValueError("Invalid replay file: bad magic number")
-			
-			version = struct.unpack('<I', f.read(4))[0]
-			if version != self.VERSION:
-				raise ValueError(f"Unsupported replay version: {version}")
-			
-			# Load metadata
-			metadata_len = struct.unpack('<I', f.read(4))[0]
-			metadata_json = f.read(metadata_len).decode('utf-8')
-			metadata_dict = json.loads(metadata_json)
-			
-			# Rebuild chapters
-			chapters = []
-			for ch_dict in metadata_dict.get('chapters', []):
-				chapters.append(ChapterMarker(**ch_dict))
-			metadata_dict['chapters'] = chapters
-			
-			metadata = ReplayMetadata(**metadata_dict)
-			
-			# Load inputs
-			input_count = struct.unpack('<I', f.read(4))[0]
-			inputs = []
-			for _ in range(input_count):
-				frame_number, buttons = struct.unpack('<IH', f.read(6))
-				inputs.append(InputFrame(frame_number, buttons))
-			
-			# Load save states
-			save_states = {}
-			state_count = struct.unpack('<I', f.read(4))[0]
-			for _ in range(state_count):
-				frame = struct.unpack('<I', f.read(4))[0]
-				state_len = struct.unpack('<I', f.read(4))[0]
-				state_data = f.read(state_len)
-				save_states[frame] = state_data
-		
-		replay = Replay(metadata=metadata, inputs=inputs, save_states=save_states)
+		"""Load replay from native binary format (either version)"""
+		version = read_version(input_path)
+		if version == 1:
+			data = read_v1(Path(input_path).read_bytes())
+		elif version == self.VERSION:
+			with ReplayFile(input_path) as replay_file:
+				data = replay_file.read()
+		else:
+			raise ValueError(f"Unsupported replay version: {version}")
+		
+		replay = self._from_data(data)
 		
 		if self.verbose:
-			print(f"✓ Loaded replay from {input_path} ({len(inputs)} frames)")
+			print(f"✓ Loaded replay from {input_path} ({len(replay.inputs)} frames)")
 		
 		return replay
 	
+	def open_native(self, input_path: Path) -> ReplayFile:
+		"""Memory-map a version 2 replay for seeking without loading it"""
+		version = read_version(input_path)
+		if version != self.VERSION:
+			raise ValueError(f"Replay is version {version}; convert it to version {self.VERSION} first")
+		return ReplayFile(input_path)
+	
+	def convert_native(self, input_path: Path, output_path: Path, version: int = VERSION) -> None:
+		"""Rewrite a native replay as another version (lossless)"""
+		source = read_version(input_path)
+		if version not in (1, self.VERSION):
+			raise ValueError(f"Unsupported replay version: {version}")
+		size = convert(input_path, output_path, version)
+		
+		if self.verbose:
+			print(f"✓ Converted {input_path} (version {source}) to {output_path} "
+				  f"(version {version}, {size:,} bytes)")
+	
 	def export_json(self, replay: Replay, output_path: Path) -> None:
 		"""Export replay to JSON"""
 		data = {
@@ -307,12 +311,7 @@ class FFMQReplaySystem:
 			data = json.load(f)
 		
 		# Rebuild metadata
-		metadata_dict = data['metadata']
-		chapters = []
-		for ch_dict in metadata_dict.get('chapters', []):
-			chapters.append(ChapterMarker(**ch_dict))
-		metadata_dict['chapters'] = chapters
-		metadata = ReplayMetadata(**metadata_dict)
+		metadata = self._metadata_from_dict(data['metadata'])
 		
 		# Rebuild inputs
 		inputs = []
@@ -399,11 +398,41 @@ class FFMQReplaySystem:
 			print(f"✓ Extracted segment: frames {start_frame}-{end_frame} ({len(segment_inputs)} frames)")
 		
 		return segment
+	
+	def extract_segment_native(self, replay_file: ReplayFile, start_frame: int, end_frame: int) -> Replay:
+		"""
+		Extract segment of a mapped replay, decoding only its frames
+		
+		Inputs, keyframes and chapters are all renumbered to frame -
+		start_frame, so gaps in the input frames are kept; the segment
+		starts from a known state only when start_frame is a keyframe
+		(ReplayFile.seek finds the nearest one).
+		"""
+		frames, buttons = replay_file.inputs(start_frame, end_frame + 1)
+		inputs = [InputFrame(f, b) for f, b in zip((frames - start_frame).tolist(), buttons.tolist())]
+		save_states = {frame - start_frame: state
+					   for frame, state in replay_file.states(start_frame, end_frame + 1).items()}
+		
+		metadata = self._metadata_from_dict(replay_file.metadata)
+		metadata.recording_date = datetime.now().isoformat()
+		metadata.frame_count = len(inputs)
+		metadata.duration_seconds = len(inputs) / self.FRAMES_PER_SECOND
+		metadata.rng_seed = None
+		metadata.chapters = [ChapterMarker(c.frame - start_frame, c.name, c.description)
+							 for c in metadata.chapters if start_frame <= c.frame <= end_frame]
+		
+		segment = Replay(metadata=metadata, inputs=inputs, save_states=save_states)
+		
+		if self.verbose:
+			print(f"✓ Extracted segment: frames {start_frame}-{end_frame} ({len(inputs)} frames)")
+		
+		return segment
 
 
 def main():
 	parser = argparse.ArgumentParser(description='FFMQ Replay System')
-	parser.add_argument('command', choices=['record', 'playback', 'verify', 'export', 'import', 'info'],
+	parser.add_argument('command', choices=['record', 'playback', 'verify', 'export', 'import', 'info',
+											 'convert', 'segment'],
 					   help='Command to execute')
 	parser.add_argument('--input', type=str, help='Input replay file')
 	parser.add_argument('--output', type=str, help='Output file')
@@ -411,6 +440,10 @@ def main():
 	parser.add_argument('--format', type=str, choices=[f.value for f in ReplayFormat],
 					   default='native', help='Replay format')
 	parser.add_argument('--player', type=str, help='Player name')
+	parser.add_argument('--version', type=int, choices=[1, FFMQReplaySystem.VERSION],
+					   default=FFMQReplaySystem.VERSION, help='Native format version to write')
+	parser.add_argument('--start', type=int, default=0, help='Segment start frame')
+	parser.add_argument('--end', type=int, help='Segment end frame (inclusive)')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
 	
 	args = parser.parse_args()
@@ -470,7 +503,31 @@ def main():
 			print(f"Error: Unsupported import format: {args.format}")
 			return 1
 		
-		system.save_native(replay, Path(args.output))
+		system.save_native(replay, Path(args.output), args.version)
+		return 0
+	
+	# Convert between native versions
+	elif args.command == 'convert':
+		if not all([args.input, args.output]):
+			print("Error: --input and --output required")
+			return 1
+		
+		system.convert_native(Path(args.input), Path(args.output), args.version)
+		return 0
+	
+	# Extract segment
+	elif args.command == 'segment':
+		if not all([args.input, args.output]) or args.end is None:
+			print("Error: --input, --output and --end required")
+			return 1
+		
+		if read_version(Path(args.input)) == system.VERSION:
+			with system.open_native(Path(args.input)) as replay_file:
+				segment = system.extract_segment_native(replay_file, args.start, args.end)
+		else:
+			segment = system.extract_segment(system.load_native(Path(args.input)), args.start, args.end)
+		
+		system.save_native(segment, Path(args.output), args.version)
 		return 0
 	
 	# Show info
@@ -479,24 +536,32 @@ def main():
 			print("Error: --input required")
 			return 1
 		
-		replay = system.load_native(Path(args.input))
+		if read_version(Path(args.input)) == system.VERSION:
+			# Metadata and run table only - no per-frame decoding
+			with system.open_native(Path(args.input)) as replay_file:
+				metadata = system._metadata_from_dict(replay_file.metadata)
+				held = replay_file.button_counts()
+			button_counts = {button.name: held[button.value] for button in InputButton}
+		else:
+			replay = system.load_native(Path(args.input))
+			metadata = replay.metadata
+			button_counts = system.get_input_summary(replay)
 		
 		print(f"\n=== Replay Information ===\n")
-		print(f"Player: {replay.metadata.player_name}")
-		print(f"Date: {replay.metadata.recording_date}")
-		print(f"Duration: {replay.metadata.duration_seconds:.2f} seconds")
-		print(f"Frames: {replay.metadata.frame_count:,}")
-		print(f"ROM Checksum: {replay.metadata.rom_checksum}")
-		print(f"Emulator: {replay.metadata.emulator} {replay.metadata.emulator_version}")
-		
-		if replay.metadata.chapters:
-			print(f"\nChapters: {len(replay.metadata.chapters)}")
-			for chapter in replay.metadata.chapters:
+		print(f"Player: {metadata.player_name}")
+		print(f"Date: {metadata.recording_date}")
+		print(f"Duration: {metadata.duration_seconds:.2f} seconds")
+		print(f"Frames: {metadata.frame_count:,}")
+		print(f"ROM Checksum: {metadata.rom_checksum}")
+		print(f"Emulator: {metadata.emulator} {metadata.emulator_version}")
+		
+		if metadata.chapters:
+			print(f"\nChapters: {len(metadata.chapters)}")
+			for chapter in metadata.chapters:
 				time = chapter.frame / system.FRAMES_PER_SECOND
 				print(f"  {time:.2f}s - {chapter.name}")
 		
 		# Input summary
-		button_counts = system.get_input_summary(replay)
 		print(f"\nButton Presses:")
 		for button, count in sorted(button_counts.items(), key=lambda x: x[1], reverse=True):
 			if count > 0:
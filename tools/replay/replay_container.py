@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+FFMQ Replay Container - Seekable v2 replay format
+
+Version 1 stores one (frame u32, buttons u16) record per frame and every
+save state in full, so a 10-hour run is 2M struct calls to read and can
+only be read front to back. Version 2 keeps the same information in a
+layout that can be memory-mapped and sought.
+
+Layout (little endian, sections in this order):
+- Header: magic 'FFMQ', version 2, counts and section offsets
+- Metadata: UTF-8 JSON (same fields as v1)
+- Runs: (first frame u32, length u32, buttons u16) per input run; a run
+  breaks when the buttons change or frame numbers stop being consecutive,
+  so any v1 frame sequence round-trips exactly
+- Keyframe index: (frame u32, flags u32, offset u64, size u32, raw size
+  u32) per save state, sorted by frame
+- Keyframe blobs: zlib(state XOR previous keyframe) - or zlib(state) for
+  every FULL_KEYFRAME_INTERVAL-th keyframe and on size changes - so a
+  seek decodes a bounded chain
+
+Reading:
+- ReplayFile maps the file and views the run and index tables in place
+  (np.frombuffer), so opening costs the metadata parse plus one prefix
+  sum, whatever the length
+- Frame -> run and frame -> keyframe are binary searches
+- buttons(start, stop) expands only the runs overlapping the range
+
+Usage:
+	python replay_container.py convert run_v1.replay run_v2.replay
+	python replay_container.py info run_v2.replay
+	python replay_container.py seek run_v2.replay --frame 1000000
+	python replay_container.py benchmark --hours 10
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b'FFMQ'
+VERSION = 2
+FULL_KEYFRAME_INTERVAL = 16		# Keyframes between full (non-delta) states
+KEY_DELTA = 0x0001				# Blob is XOR'd against the previous keyframe
+
+HEADER = struct.Struct('<4sIIIIIQQQ')	# magic, version, inputs, runs, keyframes,
+										# metadata size, runs/index/blobs offsets
+V1_INPUT = np.dtype([('frame', '<u4'), ('buttons', '<u2')])
+RUN = np.dtype([('frame', '<u4'), ('length', '<u4'), ('buttons', '<u2')])
+KEYFRAME = np.dtype([('frame', '<u4'), ('flags', '<u4'), ('offset', '<u8'),
+					 ('size', '<u4'), ('raw_size', '<u4')])
+
+
+class ReplayData(NamedTuple):
+	"""Replay contents as arrays (shared by the v1 and v2 readers)"""
+	metadata: dict
+	frames: np.ndarray				# Frame number per input (uint32)
+	buttons: np.ndarray				# Buttons per input (uint16)
+	states: Dict[int, bytes]		# Frame -> save state
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+	return -(-offset // alignment) * alignment
+
+
+# ----------------------------------------------------------------------
+# Run-length inputs
+# ----------------------------------------------------------------------
+
+def encode_runs(frames: np.ndarray, buttons: np.ndarray) -> np.ndarray:
+	"""Run table for per-input frame numbers and buttons"""
+	frames = np.asarray(frames, dtype=np.uint32)
+	buttons = np.asarray(buttons, dtype=np.uint16)
+	if frames.size != buttons.size:
+		raise ValueError(f"{frames.size} frame numbers for {buttons.size} inputs")
+	if frames.size > 1 and not np.all(frames[1:] > frames[:-1]):
+		raise ValueError("Frame numbers must be strictly increasing")
+
+	breaks = np.flatnonzero((buttons[1:] != buttons[:-1]) | (frames[1:] != frames[:-1] + 1)) + 1
+	starts = np.r_[0, breaks] if frames.size else np.zeros(0, dtype=np.int64)
+	runs = np.empty(starts.size, dtype=RUN)
+	runs['frame'] = frames[starts]
+	runs['length'] = np.diff(np.r_[starts, frames.size])
+	runs['buttons'] = buttons[starts]
+	return runs
+
+
+def decode_runs(runs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+	"""Per-input (frames, buttons) for a run table"""
+	lengths = runs['length'].astype(np.int64)
+	buttons = np.repeat(runs['buttons'], lengths)
+	# Frame = run start + position inside the run
+	offsets = np.arange(buttons.size, dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+	frames = (np.repeat(runs['frame'].astype(np.int64), lengths) + offsets).astype(np.uint32)
+	return frames, buttons
+
+
+# ----------------------------------------------------------------------
+# Version 1
+# ----------------------------------------------------------------------
+
+def read_v1(data: bytes) -> ReplayData:
+	"""Parse a version 1 file with array reads (no per-frame unpacking)"""
+	view = memoryview(data)
+	magic, version = struct.unpack_from('<4sI', view)
+	if magic != MAGIC or version != 1:
+		raise ValueError("Not a version 1 replay")
+	offset = 8
+	(metadata_len,) = struct.unpack_from('<I', view, offset)
+	metadata = json.loads(bytes(view[offset + 4:offset + 4 + metadata_len]).decode('utf-8'))
+	offset += 4 + metadata_len
+
+	(count,) = struct.unpack_from('<I', view, offset)
+	records = np.frombuffer(view, dtype=V1_INPUT, count=count, offset=offset + 4)
+	offset += 4 + count * V1_INPUT.itemsize
+
+	states = {}
+	(state_count,) = struct.unpack_from('<I', view, offset)
+	offset += 4
+	for _ in range(state_count):
+		frame, size = struct.unpack_from('<II', view, offset)
+		states[frame] = bytes(view[offset + 8:offset + 8 + size])
+		offset += 8 + size
+	return ReplayData(metadata, records['frame'].copy(), records['buttons'].copy(), states)
+
+
+def write_v1(path: Path, replay: ReplayData) -> int:
+	"""Write a version 1 file (one array write for the inputs)"""
+	records = np.empty(len(replay.frames), dtype=V1_INPUT)
+	records['frame'] = replay.frames
+	records['buttons'] = replay.buttons
+	metadata = json.dumps(replay.metadata).encode('utf-8')
+	with open(path, 'wb') as f:
+		f.write(MAGIC + struct.pack('<II', 1, len(metadata)) + metadata)
+		f.write(struct.pack('<I', len(records)))
+		f.write(records.tobytes())
+		f.write(struct.pack('<I', len(replay.states)))
+		for frame, state in replay.states.items():
+			f.write(struct.pack('<II', frame, len(state)))
+			f.write(state)
+		return f.tell()
+
+
+# ----------------------------------------------------------------------
+# Version 2
+# ----------------------------------------------------------------------
+
+def write_replay(path: Path, replay: ReplayData, level: int = 6,
+				 full_interval: int = FULL_KEYFRAME_INTERVAL) -> int:
+	"""Write a version 2 file; returns its size"""
+	runs = encode_runs(replay.frames, replay.buttons)
+	metadata = json.dumps(replay.metadata).encode('utf-8')
+
+	runs_offset = _align(HEADER.size + len(metadata))
+	index_offset = _align(runs_offset + runs.nbytes)
+	blobs_offset = index_offset + len(replay.states) * KEYFRAME.itemsize
+
+	index = np.zeros(len(replay.states), dtype=KEYFRAME)
+	blobs = []
+	offset = blobs_offset
+	previous = None
+	for i, frame in enumerate(sorted(replay.states)):
+		state = np.frombuffer(replay.states[frame], dtype=np.uint8)
+		delta = previous is not None and previous.size == state.size and i % full_interval
+		blob = zlib.compress((state ^ previous).tobytes() if delta else state.tobytes(), level)
+		index[i] = (frame, KEY_DELTA if delta else 0, offset, len(blob), state.size)
+		blobs.append(blob)
+		offset += len(blob)
+		previous = state
+
+	with open(path, 'wb') as f:
+		f.write(HEADER.pack(MAGIC, VERSION, len(replay.frames), len(runs), len(index),
+							len(metadata), runs_offset, index_offset, blobs_offset))
+		f.write(metadata)
+		f.write(bytes(runs_offset - f.tell()))
+		f.write(runs.tobytes())
+		f.write(bytes(index_offset - f.tell()))
+		f.write(index.tobytes())
+		for blob in blobs:
+			f.write(blob)
+		return f.tell()
+
+
+def read_version(path: Path) -> int:
+	with open(path, 'rb') as f:
+		magic, version = struct.unpack('<4sI', f.read(8))
+	if magic != MAGIC:
+		raise ValueError("Invalid replay file: bad magic number")
+	return version
+
+
+class ReplayFile:
+	"""Memory-mapped version 2 replay (tables are views into the file)"""
+
+	def __init__(self, path: Path):
+		self.path = Path(path)
+		with open(self.path, 'rb') as f:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			(magic, version, self.input_count, run_count, key_count, metadata_size,
+			 runs_offset, index_offset, _) = HEADER.unpack_from(self.map)
+		except struct.error:
+			self.close()
+			raise ValueError("Invalid replay file: truncated header")
+		if magic != MAGIC or version != VERSION:
+			self.close()
+			raise ValueError(f"Not a version {VERSION} replay (magic {magic!r}, version {version})")
+
+		self.metadata = json.loads(self.map[HEADER.size:HEADER.size + metadata_size].decode('utf-8'))
+		self.runs = np.frombuffer(self.map, dtype=RUN, count=run_count, offset=runs_offset)
+		self.keyframes = np.frombuffer(self.map, dtype=KEYFRAME, count=key_count, offset=index_offset)
+		self.run_frames = self.runs['frame']
+		# Input index of each run's first frame
+		self.run_starts = np.r_[0, np.cumsum(self.runs['length'], dtype=np.int64)]
+		self._cache: Optional[Tuple[int, np.ndarray]] = None
+
+	def close(self) -> None:
+		self.runs = self.keyframes = self.run_frames = None
+		self.map.close()
+
+	def __enter__(self) -> 'ReplayFile':
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	@property
+	def first_frame(self) -> int:
+		return int(self.run_frames[0]) if len(self.runs) else 0
+
+	@property
+	def last_frame(self) -> int:
+		if not len(self.runs):
+			return -1
+		return int(self.run_frames[-1]) + int(self.runs['length'][-1]) - 1
+
+	# Inputs
+
+	def run_at(self, frame: int) -> int:
+		"""Index of the run holding frame (or the last run before it)"""
+		return int(np.searchsorted(self.run_frames, frame, side='right')) - 1
+
+	def input_index(self, frame: int) -> int:
+		"""Position of the first input with frame number >= frame"""
+		run = self.run_at(frame)
+		if run < 0:
+			return 0
+		inside = min(frame - int(self.run_frames[run]), int(self.runs['length'][run]))
+		return int(self.run_starts[run]) + inside
+
+	def inputs(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""(frames, buttons) of inputs with start <= frame < stop"""
+		first, last = self.run_at(start), self.run_at(stop - 1)
+		frames, buttons = decode_runs(self.runs[max(first, 0):last + 1])
+		keep = slice(*np.searchsorted(frames, [start, stop]))
+		return frames[keep], buttons[keep]
+
+	def buttons(self, start: int, stop: int) -> np.ndarray:
+		return self.inputs(start, stop)[1]
+
+	def button_counts(self) -> Dict[int, int]:
+		"""Frames each button bit is held (computed on runs, not frames)"""
+		lengths = self.runs['length'].astype(np.int64)
+		buttons = self.runs['buttons']
+		return {1 << bit: int(lengths[(buttons >> bit) & 1 == 1].sum()) for bit in range(16)}
+
+	# Keyframes
+
+	def keyframe_at(self, frame: int) -> int:
+		"""Index of the last keyframe at or before frame (-1 = none)"""
+		return int(np.searchsorted(self.keyframes['frame'], frame, side='right')) - 1
+
+	def _blob(self, index: int) -> np.ndarray:
+		entry = self.keyframes[index]
+		start = int(entry['offset'])
+		data = zlib.decompress(self.map[start:start + int(entry['size'])])
+		if len(data) != entry['raw_size']:
+			raise ValueError(f"Keyframe {index} decodes to {len(data)} bytes, expected {entry['raw_size']}")
+		return np.frombuffer(data, dtype=np.uint8)
+
+	def state(self, index: int) -> bytes:
+		"""Save state of keyframe index (decodes back to the last full keyframe)"""
+		if not 0 <= index < len(self.keyframes):
+			raise IndexError(f"No keyframe {index}")
+		if self._cache is not None and self._cache[0] == index:
+			return self._cache[1].tobytes()
+		chain = [index]
+		while self.keyframes['flags'][chain[-1]] & KEY_DELTA:
+			if self._cache is not None and self._cache[0] == chain[-1] - 1:
+				break
+			chain.append(chain[-1] - 1)
+
+		if self.keyframes['flags'][chain[-1]] & KEY_DELTA:
+			state = self._cache[1]
+		else:
+			state = self._blob(chain.pop())
+		for i in reversed(chain):
+			state = state ^ self._blob(i)
+		self._cache = (index, state)
+		return state.tobytes()
+
+	def seek(self, frame: int) -> Tuple[Optional[int], Optional[bytes], np.ndarray]:
+		"""
+		Nearest keyframe at or before frame, plus the inputs to replay
+
+		Returns:
+			(keyframe frame, state, buttons from the keyframe up to frame);
+			without an earlier keyframe: (None, None, buttons from the start)
+		"""
+		index = self.keyframe_at(frame)
+		if index < 0:
+			return None, None, self.buttons(self.first_frame, frame)
+		key_frame = int(self.keyframes['frame'][index])
+		return key_frame, self.state(index), self.buttons(key_frame, frame)
+
+	def states(self, start: int = 0, stop: Optional[int] = None) -> Dict[int, bytes]:
+		"""Keyframes with start <= frame < stop"""
+		frames = self.keyframes['frame']
+		first, last = np.searchsorted(frames, [start, stop if stop is not None else 1 << 32])
+		return {int(frames[i]): self.state(i) for i in range(first, last)}
+
+	def read(self) -> ReplayData:
+		"""Everything, decoded"""
+		frames, buttons = decode_runs(self.runs)
+		return ReplayData(self.metadata, frames, buttons, self.states())
+
+
+def load(path: Path) -> ReplayData:
+	"""Either version, as arrays"""
+	if read_version(path) == 1:
+		return read_v1(Path(path).read_bytes())
+	with ReplayFile(path) as replay:
+		return replay.read()
+
+
+def convert(source: Path, target: Path, version: int = VERSION) -> int:
+	"""Rewrite a replay in the given version (lossless both ways)"""
+	data = load(source)
+	return write_replay(target, data) if version == VERSION else write_v1(target, data)
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def synthetic_replay(hours: float, state_size: int = 0x20000, key_interval: int = 3600,
+					 seed: int = 0) -> ReplayData:
+	"""Plausible long run: held inputs of random length, slowly changing states"""
+	rng = np.random.default_rng(seed)
+	count = int(hours * 3600 * 60)
+	holds = rng.integers(1, 40, count // 8 + 1)
+	buttons = np.repeat(rng.integers(0, 0x1000, holds.size).astype(np.uint16), holds)[:count]
+	states = {}
+	state = rng.integers(0, 256, state_size, dtype=np.uint8)
+	for frame in range(0, count, key_interval):
+		touched = rng.integers(0, state_size, 2000)
+		state[touched] = rng.integers(0, 256, touched.size, dtype=np.uint8)
+		states[frame] = state.tobytes()
+	return ReplayData({'frame_count': count}, np.arange(count, dtype=np.uint32), buttons, states)
+
+
+def benchmark(hours: float) -> None:
+	data = synthetic_replay(hours)
+	with tempfile.TemporaryDirectory() as tmp:
+		v1, v2 = Path(tmp) / 'run_v1.replay', Path(tmp) / 'run_v2.replay'
+		size_v1 = write_v1(v1, data)
+		start = time.perf_counter()
+		size_v2 = write_replay(v2, data)
+		write_ms = (time.perf_counter() - start) * 1000
+
+		start = time.perf_counter()
+		read_v1(v1.read_bytes())
+		read_v1_ms = (time.perf_counter() - start) * 1000
+
+		start = time.perf_counter()
+		replay = ReplayFile(v2)
+		open_ms = (time.perf_counter() - start) * 1000
+
+		rng = np.random.default_rng(1)
+		targets = rng.integers(0, len(data.frames), 100)
+		start = time.perf_counter()
+		for frame in targets.tolist():
+			replay.seek(frame)
+		seek_ms = (time.perf_counter() - start) * 1000 / len(targets)
+		replay.close()
+
+	print(f"{hours:g} h: {len(data.frames):,} frames, {len(data.states)} keyframes")
+	print(f"  v1: {size_v1:,} bytes, array read {read_v1_ms:.1f} ms")
+	print(f"  v2: {size_v2:,} bytes ({size_v2 / size_v1:.1%}), write {write_ms:.0f} ms, "
+		  f"open {open_ms:.2f} ms, seek {seek_ms:.2f} ms")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ seekable replay container')
+	parser.add_argument('command', choices=['convert', 'info', 'seek', 'benchmark'])
+	parser.add_argument('paths', type=Path, nargs='*', help='Replay file(s)')
+	parser.add_argument('--version', type=int, default=VERSION, choices=[1, VERSION],
+						help='Target version for convert')
+	parser.add_argument('--frame', type=int, default=0, help='Frame for seek')
+	parser.add_argument('--hours', type=float, default=10.0, help='Benchmark replay length')
+
+	args = parser.parse_args()
+
+	if args.command == 'benchmark':
+		benchmark(args.hours)
+		return 0
+
+	if args.command == 'convert':
+		if len(args.paths) != 2:
+			print("Error: convert needs SOURCE and TARGET")
+			return 1
+		size = convert(args.paths[0], args.paths[1], args.version)
+		print(f"✓ Wrote {args.paths[1]} (version {args.version}, {size:,} bytes)")
+		return 0
+
+	if len(args.paths) != 1:
+		print(f"Error: {args.command} needs one replay file")
+		return 1
+
+	with ReplayFile(args.paths[0]) as replay:
+		if args.command == 'info':
+			print(f"Frames: {replay.input_count:,} ({replay.first_frame}-{replay.last_frame})")
+			print(f"Runs: {len(replay.runs):,}  Keyframes: {len(replay.keyframes)}")
+			print(f"Player: {replay.metadata.get('player_name', '?')}")
+			return 0
+
+		key_frame, state, buttons = replay.seek(args.frame)
+		if key_frame is None:
+			print(f"No keyframe before {args.frame}; {len(buttons):,} inputs from the start")
+		else:
+			print(f"Keyframe {key_frame} ({len(state):,} byte state), "
+				  f"{len(buttons):,} inputs to frame {args.frame}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Replay Container - Test Suite
+
+Checks run-length round trips, v1 <-> v2 conversion, keyframe delta
+chains, seeking and segment extraction from mapped files.
+
+Usage:
+	python test_replay_container.py
+"""
+
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_replay_system import FFMQReplaySystem, InputFrame
+from replay_container import (
+	ReplayData, ReplayFile, convert, decode_runs, encode_runs, read_v1, synthetic_replay, write_replay
+)
+
+
+def sample_replay(frames: int = 5000, state_size: int = 4096, key_interval: int = 300) -> ReplayData:
+	data = synthetic_replay(frames / 216000, state_size=state_size, key_interval=key_interval, seed=3)
+	metadata = FFMQReplaySystem().create_metadata('Tester', 'abc').to_dict()
+	return data._replace(metadata=metadata)
+
+
+class TestRuns(unittest.TestCase):
+	def test_round_trip_with_gaps(self):
+		frames = np.array([0, 1, 2, 5, 6, 7, 8, 20], dtype=np.uint32)
+		buttons = np.array([1, 1, 1, 1, 1, 2, 2, 2], dtype=np.uint16)
+		runs = encode_runs(frames, buttons)
+		self.assertEqual(runs['length'].tolist(), [3, 2, 2, 1])
+		decoded = decode_runs(runs)
+		self.assertEqual(decoded[0].tolist(), frames.tolist())
+		self.assertEqual(decoded[1].tolist(), buttons.tolist())
+		with self.assertRaises(ValueError):
+			encode_runs(frames[::-1], buttons)
+
+
+class TestContainer(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.dir = Path(self.tmp.name)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_v1_conversion_is_lossless(self):
+		system = FFMQReplaySystem()
+		metadata = system.create_metadata('Tester', 'abc')
+		rng = random.Random(0)
+		inputs = [InputFrame(f, rng.choice([0, 0x80, 0x81])) for f in range(700)]
+		replay = system.create_replay(metadata, inputs)
+		replay.save_states = {0: bytes(range(256)) * 4, 600: bytes(1024)}
+		system.save_native(replay, self.dir / 'v1.replay', version=1)
+
+		system.convert_native(self.dir / 'v1.replay', self.dir / 'v2.replay')
+		system.convert_native(self.dir / 'v2.replay', self.dir / 'back.replay', version=1)
+		self.assertEqual((self.dir / 'back.replay').read_bytes(), (self.dir / 'v1.replay').read_bytes())
+
+		loaded = system.load_native(self.dir / 'v2.replay')
+		self.assertEqual([(f.frame_number, f.buttons) for f in loaded.inputs],
+						 [(f.frame_number, f.buttons) for f in inputs])
+		self.assertEqual(loaded.save_states, replay.save_states)
+		self.assertTrue(system.verify_replay(loaded)[0])
+
+	def test_seek_and_keyframe_chains(self):
+		data = sample_replay()
+		write_replay(self.dir / 'run.replay', data, full_interval=4)
+		with ReplayFile(self.dir / 'run.replay') as replay:
+			self.assertEqual(replay.input_count, len(data.frames))
+			self.assertLess(len(replay.runs), len(data.frames) // 4)
+			for frame in (4999, 1234, 0, 299, 300, 2700, 2699):		# Out of order: chains and cache
+				key_frame, state, buttons = replay.seek(frame)
+				expected_key = frame // 300 * 300
+				self.assertEqual(key_frame, expected_key)
+				self.assertEqual(state, data.states[expected_key])
+				self.assertEqual(buttons.tolist(), data.buttons[expected_key:frame].tolist())
+			self.assertEqual(replay.buttons(1000, 1100).tolist(), data.buttons[1000:1100].tolist())
+			self.assertEqual(replay.input_index(1500), 1500)
+
+	def test_segment_without_full_decode(self):
+		data = sample_replay()
+		write_replay(self.dir / 'run.replay', data)
+		convert(self.dir / 'run.replay', self.dir / 'run_v1.replay', version=1)
+		self.assertEqual(read_v1((self.dir / 'run_v1.replay').read_bytes()).buttons.tolist(),
+						 data.buttons.tolist())
+
+		system = FFMQReplaySystem()
+		with system.open_native(self.dir / 'run.replay') as replay:
+			segment = system.extract_segment_native(replay, 900, 1499)
+		self.assertEqual(len(segment.inputs), 600)
+		self.assertEqual([f.buttons for f in segment.inputs], data.buttons[900:1500].tolist())
+		self.assertEqual(sorted(segment.save_states), [0, 300])
+		self.assertEqual(segment.save_states[300], data.states[1200])
+		with self.assertRaises(ValueError):
+			system.open_native(self.dir / 'run_v1.replay')
+
+	def test_segment_with_gaps(self):
+		system = FFMQReplaySystem()
+		inputs = [InputFrame(f, f & 0xFF) for f in list(range(0, 100)) + list(range(150, 400))]
+		replay = system.create_replay(system.create_metadata('Tester', 'abc'), inputs)
+		replay.save_states = {0: bytes(64), 200: bytes(range(64))}
+		system.save_native(replay, self.dir / 'gaps.replay')
+
+		with system.open_native(self.dir / 'gaps.replay') as mapped:
+			segment = system.extract_segment_native(mapped, 50, 249)
+		self.assertEqual([f.frame_number for f in segment.inputs], list(range(0, 50)) + list(range(100, 200)))
+		self.assertEqual(segment.save_states, {150: bytes(range(64))})
+		by_frame = {f.frame_number: f.buttons for f in segment.inputs}
+		self.assertEqual(by_frame[150], 200 & 0xFF)			# The state still lines up with its input
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -26,6 +26,17 @@ from enum import Enum
 from typing import Dict, List, Optional, Tuple
 import struct
 import os
+import numpy as np
+
+from rom_statistics import find_byte_runs
+
+# Printable byte lookup tables for text scanning
+ASCII_MASK = np.zeros(256, dtype=bool)
+ASCII_MASK[0x20:0x7F] = True
+
+SHIFT_JIS_MASK = ASCII_MASK.copy()
+SHIFT_JIS_MASK[0x81:0xA0] = True
+SHIFT_JIS_MASK[0xE0:0xFD] = True
 
 
 class ColorDepth(Enum):
@@ -399,32 +410,19 @@ class AssetExtractor:
 
 	def find_text_strings(self, min_length: int = 4, encoding: str = 'ascii') -> List[Tuple[int, str]]:
 		"""Find text strings in ROM"""
+		if encoding == 'shift_jis':
+			# Simplified Shift-JIS detection
+			mask = SHIFT_JIS_MASK
+		else:
+			mask = ASCII_MASK
+
 		strings = []
-		current_string = []
-		start_offset = 0
-
-		for i, byte in enumerate(self.rom_data):
-			# Check if printable
-			is_printable = False
-			if encoding == 'ascii':
-				is_printable = 0x20 <= byte < 0x7F
-			elif encoding == 'shift_jis':
-				# Simplified Shift-JIS detection
-				is_printable = (0x20 <= byte < 0x7F) or (0x81 <= byte <= 0x9F) or (0xE0 <= byte <= 0xFC)
-
-			if is_printable:
-				if not current_string:
-					start_offset = i
-				current_string.append(byte)
-			else:
-				if len(current_string) >= min_length:
-					try:
-						text = bytes(current_string).decode(encoding, errors='ignore')
-						if text.strip():
-							strings.append((start_offset, text))
-					except:
-						pass
-				current_string = []
+		starts, ends = find_byte_runs(self.rom_data, mask, min_length)
+
+		for start, end in zip(starts, ends):
+			text = self.rom_data[start:end].decode(encoding, errors='ignore')
+			if text.strip():
+				strings.append((int(start), text))
 
 		return strings
 
@@ -9,6 +9,8 @@ from enum import Enum
 from dataclasses import dataclass
 import json
 
+from rom_index import ROMIndex
+
 
 class CompressionType(Enum):
 	"""Compression algorithm types"""
@@ -118,8 +120,15 @@ class LZSSCompressor:
 		self.window_size = window_size
 		self.lookahead_size = lookahead_size
 
-	def compress(self, data: bytes) -> bytes:
-		"""Compress data using LZSS"""
+	def compress(self, data: bytes, index: Optional[ROMIndex] = None) -> bytes:
+		"""
+		Compress data using LZSS
+
+		Args:
+			data: Data to compress
+			index: Optional suffix index built over data; match search then
+				uses the index instead of scanning the window byte by byte
+		"""
 		if not data:
 			return b''
 
@@ -128,7 +137,11 @@ class LZSSCompressor:
 
 		while position < len(data):
 			# Find longest match in sliding window
-			match_pos, match_len = self._find_longest_match(data, position)
+			if index is not None:
+				match_pos, match_len = index.longest_previous_match(
+					position, self.window_size, self.lookahead_size)
+			else:
+				match_pos, match_len = self._find_longest_match(data, position)
 
 			if match_len >= 3:  # Encode as reference
 				# Format: 1 bit flag (1) + 12 bits offset + 4 bits length
@@ -6,7 +6,7 @@ Professional hex editor for ROM manipulation with intelligent template system.
 Features include:
 - Dual hex/ASCII view with synchronized scrolling
 - Multi-level undo/redo system
-- Search and replace (hex and text)
+- Search and replace (hex, text, wildcards, 8-32 bit values)
 - Data inspection panel (int8/16/32, float, pointers)
 - Template system for structured data editing
 - Bookmark management
@@ -27,6 +27,8 @@ from typing import Dict, List, Optional, Tuple, Any
 import struct
 import pygame
 
+from rom_search import ROMSearch
+
 
 class FieldType(Enum):
 	"""Template field types"""
@@ -185,6 +187,7 @@ class HexEditor:
 
 	def __init__(self, data: bytes):
 		self.data = bytearray(data)
+		self.searcher = ROMSearch(self.data)
 		self.bookmarks: List[Bookmark] = []
 		self.templates: Dict[str, DataTemplate] = {}
 
@@ -216,6 +219,7 @@ class HexEditor:
 
 		# Apply edit
 		self.data[offset] = value
+		self.searcher.invalidate()
 		return True
 
 	def edit_bytes(self, offset: int, new_data: bytes, description: str = "Edit bytes"):
@@ -238,6 +242,7 @@ class HexEditor:
 
 		# Apply edit
 		self.data[offset:offset + len(new_data)] = new_data
+		self.searcher.invalidate()
 		return True
 
 	def undo(self) -> bool:
@@ -250,6 +255,7 @@ class HexEditor:
 
 		# Revert edit
 		self.data[action.offset:action.offset + len(action.old_data)] = action.old_data
+		self.searcher.invalidate()
 		return True
 
 	def redo(self) -> bool:
@@ -262,18 +268,20 @@ class HexEditor:
 
 		# Reapply edit
 		self.data[action.offset:action.offset + len(action.new_data)] = action.new_data
+		self.searcher.invalidate()
 		return True
 
 	def search(self, pattern: bytes, start_offset: int = 0) -> List[int]:
 		"""Search for byte pattern"""
-		results = []
-		pattern_len = len(pattern)
+		return self.searcher.find_bytes(pattern, start_offset).tolist()
 
-		for i in range(start_offset, len(self.data) - pattern_len + 1):
-			if self.data[i:i + pattern_len] == pattern:
-				results.append(i)
+	def search_masked(self, pattern: str, start_offset: int = 0) -> List[int]:
+		"""Search for hex pattern with wildcards (e.g. "A9 ?? 8D")"""
+		return self.searcher.find_masked(pattern, start_offset).tolist()
 
-		return results
+	def search_value(self, value: int, width: int = 2, start_offset: int = 0) -> List[int]:
+		"""Search for little-endian 8/16/24/32-bit value at every alignment"""
+		return self.searcher.find_value(value, width, start_offset).tolist()
 
 	def replace(self, old_pattern: bytes, new_pattern: bytes,
 				start_offset: int = 0, max_replacements: int = -1) -> int:
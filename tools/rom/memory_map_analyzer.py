@@ -8,8 +8,8 @@ Features include:
 - Bank analysis and visualization
 - Header parsing (internal/external)
 - Region detection (code vs data)
-- Pattern analysis (repeated data, compression candidates)
-- Entropy calculation
+- Pattern analysis (repeated data via suffix index, compression candidates)
+- Entropy calculation (vectorized, see rom_statistics.py)
 - String extraction (ASCII, Japanese)
 - Graphical memory map visualization
 
@@ -22,10 +22,16 @@ Memory Mappings:
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Set, Tuple
+from typing import List, Optional, Set, Tuple
 import struct
+import numpy as np
 import pygame
 
+from rom_index import ROMIndex
+from rom_statistics import (
+	BlockStatistics, compute_block_statistics, find_printable_runs
+)
+
 
 class ROMType(Enum):
 	"""ROM mapping types"""
@@ -135,6 +141,8 @@ class MemoryMapAnalyzer:
 		self.header: Optional[ROMHeader] = None
 		self.banks: List[BankInfo] = []
 		self.regions: List[MemoryRegion] = []
+		self.block_stats: Optional[BlockStatistics] = None
+		self.index: Optional[ROMIndex] = None
 
 		# Analyze ROM
 		self._detect_mapping()
@@ -241,26 +249,6 @@ class MemoryMapAnalyzer:
 
 		self.header = self._try_parse_header(offset)
 
-	def _calculate_entropy(self, data: bytes) -> float:
-		"""Calculate Shannon entropy of data (0-8 bits)"""
-		if len(data) == 0:
-			return 0.0
-
-		# Count byte frequencies
-		freq = [0] * 256
-		for byte in data:
-			freq[byte] += 1
-
-		# Calculate entropy
-		entropy = 0.0
-		total = len(data)
-		for count in freq:
-			if count > 0:
-				p = count / total
-				entropy -= p * (p.bit_length() - 1)  # Approximate log2
-
-		return entropy
-
 	def _analyze_banks(self):
 		"""Analyze ROM banks"""
 		if self.rom_type == ROMType.LOROM:
@@ -270,25 +258,15 @@ class MemoryMapAnalyzer:
 		else:
 			bank_size = 0x8000
 
-		num_banks = (len(self.rom_data) + bank_size - 1) // bank_size
-
-		for i in range(num_banks):
-			offset = i * bank_size
-			end = min(offset + bank_size, len(self.rom_data))
-			bank_data = self.rom_data[offset:end]
-
-			# Calculate entropy
-			entropy = self._calculate_entropy(bank_data)
-
-			# Count unique bytes
-			unique = len(set(bank_data))
+		stats = compute_block_statistics(self.rom_data, bank_size)
 
+		for i in range(len(stats)):
 			self.banks.append(BankInfo(
 				bank_number=i,
-				pc_offset=offset,
-				size=len(bank_data),
-				entropy=entropy,
-				unique_bytes=unique,
+				pc_offset=int(stats.offsets[i]),
+				size=int(stats.lengths[i]),
+				entropy=float(stats.entropy[i]),
+				unique_bytes=int(stats.unique[i]),
 				regions=[]
 			))
 
@@ -297,122 +275,64 @@ class MemoryMapAnalyzer:
 		# Split into chunks for analysis
 		chunk_size = 0x1000  # 4KB chunks
 
-		for i in range(0, len(self.rom_data), chunk_size):
-			end = min(i + chunk_size, len(self.rom_data))
-			chunk = self.rom_data[i:end]
-
-			# Calculate metrics
-			entropy = self._calculate_entropy(chunk)
-			unique = len(set(chunk))
-
-			# Classify region based on entropy and patterns
-			region_type = self._classify_chunk(chunk, entropy, unique)
+		self.block_stats = compute_block_statistics(self.rom_data, chunk_size)
+		region_types = self._classify_blocks(self.block_stats)
 
+		starts = self.block_stats.offsets
+		ends = self.block_stats.ends()
+		for i, region_type in enumerate(region_types):
 			self.regions.append(MemoryRegion(
-				start=i,
-				end=end,
+				start=int(starts[i]),
+				end=int(ends[i]),
 				region_type=region_type,
-				entropy=entropy,
-				unique_bytes=unique
+				entropy=float(self.block_stats.entropy[i]),
+				unique_bytes=int(self.block_stats.unique[i])
 			))
 
-	def _classify_chunk(self, data: bytes, entropy: float, unique: int) -> RegionType:
-		"""Classify a chunk of data"""
-		size = len(data)
-
-		# Check for empty/unused
-		if unique < 4:
-			return RegionType.EMPTY
-
-		# Check for text (high ratio of printable ASCII)
-		printable = sum(1 for b in data if 0x20 <= b < 0x7F)
-		if printable > size * 0.7:
-			return RegionType.TEXT
-
-		# Check for graphics (moderate entropy, many unique bytes)
-		if 3.0 < entropy < 6.0 and unique > 100:
-			# Look for tile patterns (repeating 8-byte or 16-byte chunks)
-			if self._has_tile_pattern(data):
-				return RegionType.GRAPHICS
-
-		# Check for code (high entropy, varied bytes)
-		if entropy > 5.0 and unique > 200:
-			return RegionType.CODE
-
-		# Check for music data (look for APU patterns)
-		if self._has_music_pattern(data):
-			return RegionType.MUSIC
-
-		# Default to data
-		return RegionType.DATA
-
-	def _has_tile_pattern(self, data: bytes) -> bool:
-		"""Check for graphics tile patterns"""
-		# Look for repeating 8-byte patterns (2bpp tiles)
-		if len(data) < 16:
-			return False
-
-		patterns_8 = {}
-		for i in range(0, len(data) - 7, 8):
-			pattern = data[i:i + 8]
-			patterns_8[pattern] = patterns_8.get(pattern, 0) + 1
-
-		# If many patterns repeat, likely tiles
-		repeating = sum(1 for count in patterns_8.values() if count > 1)
-		return repeating > len(patterns_8) * 0.3
-
-	def _has_music_pattern(self, data: bytes) -> bool:
-		"""Check for music/sound data patterns"""
-		if len(data) < 32:
-			return False
-
-		# Look for BRR header patterns (common in SNES music)
-		# BRR blocks start with header byte
-		brr_headers = 0
-		for i in range(0, len(data) - 9, 9):
-			header = data[i]
-			# Check for valid BRR header bits
-			if (header & 0x0C) == 0 or (header & 0xF0) in [0x00, 0x10, 0x20, 0x30]:
-				brr_headers += 1
+	def _classify_blocks(self, stats: BlockStatistics) -> List[RegionType]:
+		"""Classify every block at once from its statistics arrays"""
+		entropy = stats.entropy
+		unique = stats.unique
+
+		# Rules are evaluated in priority order; first match wins
+		conditions = [
+			# Empty/unused
+			unique < 4,
+			# High ratio of printable ASCII
+			stats.printable_ratio > 0.7,
+			# Moderate entropy with repeating tile rows
+			(entropy > 3.0) & (entropy < 6.0) & (unique > 100) & (stats.tile_score > 0.3),
+			# High entropy, varied bytes
+			(entropy > 5.0) & (unique > 200),
+			# BRR sample headers (APU data)
+			stats.brr_score > 0.5,
+		]
+		choices = list(range(len(conditions)))
+		kinds = [RegionType.EMPTY, RegionType.TEXT, RegionType.GRAPHICS,
+				 RegionType.CODE, RegionType.MUSIC, RegionType.DATA]
 
-		return brr_headers > (len(data) // 9) * 0.5
+		codes = np.select(conditions, choices, default=len(conditions))
+		return [kinds[code] for code in codes]
 
 	def find_strings(self, min_length: int = 4) -> List[Tuple[int, str]]:
 		"""Find ASCII strings in ROM"""
-		strings = []
-		current_string = []
-		start_offset = 0
-
-		for i, byte in enumerate(self.rom_data):
-			if 0x20 <= byte < 0x7F:  # Printable ASCII
-				if not current_string:
-					start_offset = i
-				current_string.append(chr(byte))
-			else:
-				if len(current_string) >= min_length:
-					strings.append((start_offset, ''.join(current_string)))
-				current_string = []
-
-		return strings
+		starts, ends = find_printable_runs(self.rom_data, min_length)
+		return [(int(start), self.rom_data[start:end].decode('ascii'))
+				for start, end in zip(starts, ends)]
 
-	def find_repeated_data(self, min_size: int = 16, min_repeats: int = 3) -> List[Tuple[bytes, List[int]]]:
-		"""Find repeated data patterns"""
-		patterns: Dict[bytes, List[int]] = {}
+	def get_index(self) -> ROMIndex:
+		"""Suffix index over the ROM, built on first use"""
+		if self.index is None:
+			self.index = ROMIndex(self.rom_data)
+		return self.index
 
-		for i in range(0, len(self.rom_data) - min_size):
-			pattern = self.rom_data[i:i + min_size]
-			if pattern not in patterns:
-				patterns[pattern] = []
-			patterns[pattern].append(i)
-
-		# Filter to patterns that repeat enough
-		repeated = [(pattern, offsets) for pattern, offsets in patterns.items()
-					if len(offsets) >= min_repeats]
-
-		# Sort by total size (pattern size * repeats)
-		repeated.sort(key=lambda x: len(x[0]) * len(x[1]), reverse=True)
+	def find_repeated_data(self, min_size: int = 16, min_repeats: int = 3) -> List[Tuple[bytes, List[int]]]:
+		"""Find repeated data patterns of at least min_size bytes"""
+		repeats = self.get_index().find_repeats(min_size, min_repeats)
 
-		return repeated
+		# Sorted by total size (pattern size * repeats)
+		return [(self.rom_data[r.offsets[0]:r.offsets[0] + r.length], r.offsets.tolist())
+				for r in repeats]
 
 	def get_compression_candidates(self) -> List[MemoryRegion]:
 		"""Find regions that would benefit from compression"""
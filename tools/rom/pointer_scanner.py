@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Pointer Table Scanner
+
+Whole-ROM analysis pass that discovers pointer tables instead of relying
+on hard-coded offsets. Every 16-bit and 24-bit little-endian word is read
+at every alignment (see ROMSearch.values), runs of words that map into
+LoROM space and stay close together are collected as candidate tables,
+and each candidate is scored by:
+
+- Monotonicity (fraction of non-decreasing entries)
+- Uniqueness (fraction of distinct targets)
+- Target alignment: how many targets look like record starts, using
+  target profiles (byte after a terminator, code after RTS/RTL, tile
+  boundaries, ...)
+
+16-bit tables often point into another bank (the FFMQ dialog table in
+bank $01 points into bank $03), so the target bank is inferred by scoring
+every bank and keeping the best fit.
+
+Usage:
+	python pointer_scanner.py rom.sfc
+	python pointer_scanner.py rom.sfc --min-entries 16 --top 50 --output catalog.json
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rom_search import ROMSearch
+from rom_statistics import find_byte_runs
+
+
+LOROM_BANK_SIZE = 0x8000
+
+
+def _prev_byte_profile(values) -> np.ndarray:
+	mask = np.zeros(256, dtype=bool)
+	mask[list(values)] = True
+	return mask
+
+
+# Target profiles: name -> (kind, table). "prev" profiles test the byte just
+# before each target (the end of the previous record), "align" profiles test
+# the target offset modulo a record size.
+TARGET_PROFILES: Dict[str, tuple] = {
+	'terminated': ('prev', _prev_byte_profile([0x00])),
+	'code': ('prev', _prev_byte_profile([0x60, 0x6B, 0x40])),	 # RTS, RTL, RTI
+	'script': ('prev', _prev_byte_profile([0x00, 0xFF])),
+	'tiles': ('align', 0x10),
+}
+
+
+@dataclass
+class PointerTableCandidate:
+	"""A discovered pointer table"""
+	offset: int				# PC offset of the first entry
+	entry_size: int			# 2 or 3 bytes
+	count: int
+	target_bank: int		   # LoROM bank of 16-bit targets (24-bit: bank of first)
+	targets: np.ndarray = field(repr=False)	# PC offsets of targets
+	monotonic: float = 0.0
+	unique_ratio: float = 0.0
+	alignment: float = 0.0
+	profile: str = ""
+	score: float = 0.0
+
+	@property
+	def end(self) -> int:
+		return self.offset + self.count * self.entry_size
+
+	def snes_address(self) -> int:
+		"""LoROM address of the table itself"""
+		return pc_to_lorom(self.offset)
+
+	def pointer_values(self) -> List[int]:
+		"""Entries as full 24-bit LoROM addresses"""
+		return [pc_to_lorom(int(t)) for t in self.targets]
+
+	def to_dict(self) -> dict:
+		return {
+			'offset': f"0x{self.offset:06X}",
+			'snes_address': f"${self.snes_address():06X}",
+			'entry_size': self.entry_size,
+			'count': self.count,
+			'target_bank': f"${self.target_bank:02X}",
+			'target_range': [f"0x{int(self.targets.min()):06X}", f"0x{int(self.targets.max()):06X}"],
+			'monotonic': round(self.monotonic, 3),
+			'unique_ratio': round(self.unique_ratio, 3),
+			'alignment': round(self.alignment, 3),
+			'profile': self.profile,
+			'score': round(self.score, 3),
+		}
+
+
+def pc_to_lorom(offset: int) -> int:
+	"""PC offset -> LoROM address ($BB:8000-$FFFF)"""
+	return ((offset // LOROM_BANK_SIZE) << 16) | (0x8000 + offset % LOROM_BANK_SIZE)
+
+
+def lorom_to_pc(address: np.ndarray) -> np.ndarray:
+	"""LoROM address array -> PC offsets (-1 where the address is not ROM)"""
+	address = np.asarray(address, dtype=np.int64)
+	bank = (address >> 16) & 0x7F
+	low = address & 0xFFFF
+	pc = bank * LOROM_BANK_SIZE + (low - 0x8000)
+	return np.where(low >= 0x8000, pc, -1)
+
+
+class PointerScanner:
+	"""Discover and rank pointer tables across the whole ROM"""
+
+	def __init__(self, rom_data: bytes, min_entries: int = 8, max_gap: int = 0x4000,
+				 min_score: float = 2.0):
+		"""
+		Args:
+			rom_data: Headerless ROM image
+			min_entries: Shortest run reported as a table
+			max_gap: Largest target distance between neighbouring entries
+			min_score: Candidates scoring below this are treated as noise
+		"""
+		self.rom_data = rom_data
+		self.search = ROMSearch(rom_data)
+		self.array = self.search.array
+		self.rom_size = len(rom_data)
+		self.min_entries = min_entries
+		self.max_gap = max_gap
+		self.min_score = min_score
+		self.bank_count = max(1, (self.rom_size + LOROM_BANK_SIZE - 1) // LOROM_BANK_SIZE)
+
+	# ------------------------------------------------------------------
+	# Candidate discovery
+	# ------------------------------------------------------------------
+
+	def scan(self, widths=(2, 3)) -> List[PointerTableCandidate]:
+		"""Scan every alignment of every width and return ranked, non-overlapping tables"""
+		candidates = []
+		for width in widths:
+			values = self.search.values(width).astype(np.int64)
+			for align in range(width):
+				candidates.extend(self._scan_lane(values[align::width], width, align))
+
+		return self._select(candidates)
+
+	def _scan_lane(self, words: np.ndarray, width: int, align: int) -> List[PointerTableCandidate]:
+		"""Find runs of plausible pointers in one (width, alignment) lane"""
+		if words.size < self.min_entries:
+			return []
+
+		if width == 2:
+			# Bank is unknown yet; compare raw words, they share a bank
+			valid = (words >= 0x8000) & (words != 0xFFFF)
+			positions = words
+		else:
+			positions = lorom_to_pc(words)
+			bank = (words >> 16) & 0xFF
+			valid = (positions >= 0) & (positions < self.rom_size) & (bank != 0x7E) & (bank != 0x7F)
+
+		link = valid[:-1] & valid[1:] & (np.abs(np.diff(positions)) <= self.max_gap)
+		# Constant words (filler) are not tables
+		link &= np.diff(words) != 0
+
+		starts, ends = find_byte_runs(link.view(np.uint8), np.array([False, True]),
+									  self.min_entries - 1)
+
+		tables = []
+		for start, end in zip(starts, ends):
+			entries = words[start:end + 1]
+			offset = align + int(start) * width
+			if width == 2:
+				tables.append(self._score_short(offset, entries))
+			else:
+				tables.append(self._score(offset, 3, positions[start:end + 1],
+										  int((entries[0] >> 16) & 0x7F)))
+		return [t for t in tables if t is not None]
+
+	# ------------------------------------------------------------------
+	# Scoring
+	# ------------------------------------------------------------------
+
+	def _profile_hits(self, targets: np.ndarray) -> Dict[str, np.ndarray]:
+		"""
+		Per-target profile matches.
+
+		Args:
+			targets: (banks, count) or (count,) PC offsets, -1 for invalid
+		"""
+		targets = np.atleast_2d(targets)
+		inside = (targets > 0) & (targets < self.rom_size)
+		safe = np.where(inside, targets, 1)
+		prev = self.array[safe - 1]
+
+		hits = {}
+		for name, (kind, table) in TARGET_PROFILES.items():
+			if kind == 'prev':
+				hits[name] = table[prev] & inside
+			else:
+				hits[name] = (targets % table == 0) & inside
+		return hits
+
+	def _profile_scores(self, targets: np.ndarray) -> Dict[str, np.ndarray]:
+		"""Fraction of targets matching each profile"""
+		return {name: hits.mean(axis=1) for name, hits in self._profile_hits(targets).items()}
+
+	def _score_short(self, offset: int, words: np.ndarray) -> Optional[PointerTableCandidate]:
+		"""Score a 16-bit table, inferring the bank its targets live in"""
+		banks = np.arange(self.bank_count, dtype=np.int64)
+		targets = banks[:, None] * LOROM_BANK_SIZE + (words[None, :] - 0x8000)
+		targets = np.where(targets < self.rom_size, targets, -1)
+
+		profiles = self._profile_scores(targets)
+		best = np.max(np.stack(list(profiles.values())), axis=0)
+
+		# Prefer the table's own bank on ties
+		own_bank = offset // LOROM_BANK_SIZE
+		best_bank = int(np.argmax(best))
+		if best[own_bank] >= best[best_bank]:
+			best_bank = own_bank
+
+		return self._score(offset, 2, targets[best_bank], best_bank)
+
+	def _score(self, offset: int, width: int, targets: np.ndarray,
+			   bank: int) -> Optional[PointerTableCandidate]:
+		"""Score one candidate table"""
+		if (targets < 0).any():
+			return None
+
+		profiles = self._profile_hits(targets)
+		profile, hits = max(profiles.items(), key=lambda item: item[1].sum())
+		hits = hits[0]
+
+		# Neighbouring words often extend a run by an entry; drop edge
+		# entries that both miss the profile and break the table's order
+		while targets.size > self.min_entries and not hits[0] and targets[1] <= targets[0]:
+			offset += width
+			targets, hits = targets[1:], hits[1:]
+		while targets.size > self.min_entries and not hits[-1] and targets[-1] <= targets[-2]:
+			targets, hits = targets[:-1], hits[:-1]
+
+		count = targets.size
+		deltas = np.diff(targets)
+		monotonic = float((deltas >= 0).mean())
+		unique_ratio = np.unique(targets).size / count
+		alignment = float(hits.mean())
+
+		# Targets landing inside the table itself are a strong negative sign
+		self_hits = float(((targets >= offset) & (targets < offset + count * width)).mean())
+
+		quality = 0.35 * monotonic + 0.15 * unique_ratio + 0.5 * alignment - self_hits
+		score = max(quality, 0.0) * np.log2(count)
+
+		return PointerTableCandidate(
+			offset=offset,
+			entry_size=width,
+			count=count,
+			target_bank=bank,
+			targets=targets,
+			monotonic=monotonic,
+			unique_ratio=unique_ratio,
+			alignment=alignment,
+			profile=profile,
+			score=float(score)
+		)
+
+	def _select(self, candidates: List[PointerTableCandidate]) -> List[PointerTableCandidate]:
+		"""Keep the best-scoring candidate wherever candidates overlap"""
+		ranked = sorted(candidates, key=lambda c: c.score, reverse=True)
+		taken = np.zeros(self.rom_size + 1, dtype=bool)
+		selected = []
+
+		for candidate in ranked:
+			if candidate.score < self.min_score or taken[candidate.offset:candidate.end].any():
+				continue
+			taken[candidate.offset:candidate.end] = True
+			selected.append(candidate)
+
+		return selected
+
+
+def export_catalog(tables: List[PointerTableCandidate], output_path: Path, rom_path: str = ""):
+	"""Write the ranked catalog as JSON"""
+	catalog = {
+		'rom_file': rom_path,
+		'table_count': len(tables),
+		'tables': [table.to_dict() for table in tables]
+	}
+	with open(output_path, 'w') as f:
+		json.dump(catalog, f, indent='\t')
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Discover pointer tables in a SNES LoROM image')
+	parser.add_argument('rom', type=Path, help='ROM file')
+	parser.add_argument('--min-entries', type=int, default=8, help='Minimum table length')
+	parser.add_argument('--max-gap', type=lambda x: int(x, 0), default=0x4000,
+						help='Maximum target distance between neighbouring entries')
+	parser.add_argument('--min-score', type=float, default=2.0, help='Minimum candidate score')
+	parser.add_argument('--top', type=int, default=30, help='Tables to print')
+	parser.add_argument('--output', type=Path, help='Write full catalog to JSON')
+
+	args = parser.parse_args()
+
+	rom_data = args.rom.read_bytes()
+	if len(rom_data) % 1024 == 512:
+		rom_data = rom_data[512:]
+
+	scanner = PointerScanner(rom_data, args.min_entries, args.max_gap, args.min_score)
+	tables = scanner.scan()
+
+	print(f"\n=== Pointer Table Catalog ({len(tables)} tables) ===\n")
+	print(f"{'Offset':<10} {'SNES':<9} {'Size':<5} {'Count':<6} {'Bank':<5} {'Profile':<11} {'Score':<6}")
+	print("-" * 60)
+	for table in tables[:args.top]:
+		print(f"0x{table.offset:06X}  ${table.snes_address():06X}  {table.entry_size:<5} "
+			  f"{table.count:<6} ${table.target_bank:02X}   {table.profile:<11} {table.score:.2f}")
+
+	if args.output:
+		export_catalog(tables, args.output, str(args.rom))
+		print(f"\n✓ Catalog saved to {args.output}")
+
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
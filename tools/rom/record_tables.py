@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+ROM Record Tables
+
+Fixed-size ROM records (enemy stats, formations, item and spell data)
+declared once as NumPy structured dtypes, and viewed in place.
+
+A table is (offset, count, stride, fields). view(rom) returns an
+np.ndarray over the ROM buffer itself - no copy - so with a bytearray
+ROM every assignment writes straight through:
+
+	enemies = ENEMY_STATS.view(rom_data)
+	scale(enemies, {'hp': 1.5})						# Clamped to 0..65535
+	enemies['attack'][enemies['hp'] > 5000] = 255
+
+Records that would run past the end of the ROM are left out of the view.
+
+Columns:
+- Nested fields and sub-arrays flatten to column names such as
+  'slots[3].enemy'; column(view, name) resolves one back to a view
+- Export/import as CSV, JSON or a pandas DataFrame (pandas imported on
+  demand); imports may cover a subset of rows and columns, are keyed by
+  the 'id' column and reject out-of-range values
+
+Usage:
+	python record_tables.py --list
+	python record_tables.py rom.sfc --table enemy_stats --export enemies.csv
+	python record_tables.py rom.sfc --table enemy_stats --import enemies.csv --output patched.sfc
+	python record_tables.py rom.sfc --table enemy_stats --scale hp=1.5 attack=1.25 --output hard.sfc
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+FieldSpec = Tuple[str, Any, int]		# name, NumPy format, byte offset in the record
+
+
+@dataclass
+class RecordTable:
+	"""Fixed-record ROM table"""
+	name: str
+	offset: int
+	count: int
+	stride: int
+	fields: Sequence[FieldSpec]
+	description: str = ""
+	dtype: np.dtype = field(init=False, repr=False)
+
+	def __post_init__(self):
+		self.dtype = np.dtype({
+			'names': [f[0] for f in self.fields],
+			'formats': [f[1] for f in self.fields],
+			'offsets': [f[2] for f in self.fields],
+			'itemsize': self.stride,
+		})
+
+	@property
+	def size(self) -> int:
+		return self.count * self.stride
+
+	def address(self, index: int) -> int:
+		return self.offset + index * self.stride
+
+	def view(self, rom) -> np.ndarray:
+		"""Records over the ROM buffer (writable when the buffer is)"""
+		available = (memoryview(rom).nbytes - self.offset) // self.stride
+		count = max(0, min(self.count, available))
+		if count == 0:
+			return np.zeros(0, dtype=self.dtype)
+		return np.frombuffer(rom, dtype=self.dtype, count=count, offset=self.offset)
+
+	def columns(self) -> List[str]:
+		return [name for name, _ in _flatten(self.dtype)]
+
+
+# ----------------------------------------------------------------------
+# Table declarations
+# ----------------------------------------------------------------------
+# Addresses follow the tools that use them; several are still the
+# placeholder layouts those tools shipped with.
+
+def _bytes(names: str, start: int, fmt: str = 'u1') -> List[FieldSpec]:
+	size = np.dtype(fmt).itemsize
+	return [(name, fmt, start + i * size) for i, name in enumerate(names.split())]
+
+
+FORMATION_SLOT = np.dtype([('enemy', 'u1'), ('x', 'u1'), ('y', 'u1')])
+ZONE_SLOT = np.dtype([('formation', 'u1'), ('weight', 'u1')])
+AI_RULE = np.dtype({
+	'names': ['flags', 'conditions', 'actions'],
+	'formats': ['u1', ('u1', (4, 3)), ('u1', (4, 4))],		# (type, param1, param2), (type, ID, target, priority)
+	'offsets': [0, 1, 13],
+	'itemsize': 32,
+})
+ITEM_HEADER = [
+	('item_type', 'u1', 0), ('max_stack', 'u1', 1), ('buy_price', '<u2', 2),
+	('sell_price', '<u2', 4), ('flags', '<u2', 6), ('icon_id', 'u1', 8), ('palette_id', 'u1', 9),
+	('equip_restriction', 'u1', 10), ('element', 'u1', 11), ('special_effect', 'u1', 12),
+]
+
+ENEMY_STATS = RecordTable(
+	'enemy_stats', 0x0F0000, 50, 32,
+	[('hp', '<u2', 0)] + _bytes('attack defense speed magic', 2),
+	"Enemy stats scaled by the difficulty adjuster")
+
+ENEMY_COMBAT = RecordTable(
+	'enemy_combat', 0x1A0000, 256, 32,
+	[('hp', '<u2', 0), ('attack', 'u1', 4), ('defense', 'u1', 5)],
+	"Enemy HP/attack/defense read by the difficulty analyzer")
+
+FORMATIONS = RecordTable(
+	'formations', 0x330000, 256, 32,
+	[('flags', 'u1', 0), ('slots', (FORMATION_SLOT, (8,)), 1)],
+	"Battle formations: flags + 8 (enemy, x, y) slots, enemy 0xFF = empty")
+
+ENCOUNTER_ZONES = RecordTable(
+	'encounter_zones', 0x340000, 512, 32,
+	_bytes('map_id x1 y1 x2 y2 encounter_rate', 0) + [('slots', (ZONE_SLOT, (8,)), 8)],
+	"Encounter zones: map (0xFF = unused), rectangle, steps, 8 (formation, weight) slots")
+
+AI_SCRIPTS = RecordTable(
+	'ai_scripts', 0x320000, 256, 256,
+	[('rules', (AI_RULE, (7,)), 0), ('state', 'u1', 225), ('transitions', ('u1', (3, 4)), 226),
+	 ('counter_attack', ('u1', (3,)), 240), ('counter_magic', ('u1', (3,)), 248)],
+	"Enemy AI scripts as read by the AI editor: 7 rules, state machine at +224, counters at +240")
+
+MAP_HEADERS = RecordTable(
+	'map_headers', 0x100000, 50, 32,
+	_bytes('width height tileset_id music_id entrance_x entrance_y', 0),
+	"Map headers read by the map randomizer: size in tiles, tileset, music, entrance tile")
+
+DOOR_TABLE = RecordTable(
+	'door_table', 0x130000, 80, 16,
+	_bytes('source_map source_x source_y dest_map dest_x dest_y', 0),
+	"Door connections: source map and tile, destination map and tile")
+
+DAMAGE_FORMULA = RecordTable(
+	'damage_formula', 0x180000, 1, 16,
+	_bytes('base_multiplier attack_factor defense_factor variance crit_multiplier crit_rate', 0),
+	"Damage formula factors in percent")
+
+ELEMENT_TABLE = RecordTable(
+	'element_table', 0x180100, 25, 1,
+	[('multiplier', 'u1', 0)],
+	"5x5 attacker x defender element multipliers in percent")
+
+EDITOR_ENEMIES = RecordTable(
+	'editor_enemies', 0x0D0000, 256, 256,
+	_bytes('hp attack defense magic magic_defense speed evade critical exp gold', 0, '<u2')
+	+ _bytes('fire water earth wind holy dark poison physical magical', 20)
+	+ [('enemy_flags', '<u2', 29), ('level', 'u1', 31)]
+	+ _bytes('common_item common_rate common_flags rare_item rare_rate rare_flags', 32),
+	"Map editor enemy blocks (fixed part; sprite and AI script follow)")
+
+EDITOR_ITEMS = RecordTable(
+	'editor_items', 0x0F0000, 256, 32,
+	ITEM_HEADER + _bytes('attack defense magic magic_defense speed accuracy evade hp_bonus mp_bonus',
+						 14, '<i2'),
+	"Map editor items, equipment layout")
+
+EDITOR_ITEM_EFFECTS = RecordTable(
+	'editor_item_effects', 0x0F0000, 256, 32,
+	ITEM_HEADER + _bytes('effect_type power target', 14) + [('status', '<u2', 17)],
+	"Map editor items, consumable layout (same bytes as editor_items)")
+
+EDITOR_SPELLS = RecordTable(
+	'editor_spells', 0x0E0000, 128, 64,
+	_bytes('mp_cost level_required element target formula accuracy', 0)
+	+ _bytes('base_power variance multiplier_pct status', 6, '<u2')
+	+ _bytes('status_chance status_duration', 14) + [('spell_flags', '<u2', 16), ('critical', 'u1', 18)],
+	"Map editor spells (fixed part; animation data follows)")
+
+TABLES: Dict[str, RecordTable] = {table.name: table for table in (
+	ENEMY_STATS, ENEMY_COMBAT, FORMATIONS, ENCOUNTER_ZONES, AI_SCRIPTS, MAP_HEADERS, DOOR_TABLE,
+	DAMAGE_FORMULA, ELEMENT_TABLE, EDITOR_ENEMIES, EDITOR_ITEMS, EDITOR_ITEM_EFFECTS, EDITOR_SPELLS,
+)}
+
+
+# ----------------------------------------------------------------------
+# Columns and bulk edits
+# ----------------------------------------------------------------------
+
+def _flatten(dtype: np.dtype, label: str = '', path: tuple = ()) -> Iterator[Tuple[str, tuple]]:
+	"""(column name, access path) for every scalar inside a record"""
+	if dtype.subdtype is not None:
+		base, shape = dtype.subdtype
+		for index in np.ndindex(shape):
+			suffix = ''.join(f'[{i}]' for i in index)
+			yield from _flatten(base, label + suffix, path + (index,))
+	elif dtype.names:
+		for name in dtype.names:
+			yield from _flatten(dtype.fields[name][0], f"{label}.{name}" if label else name, path + (name,))
+	else:
+		yield label, path
+
+
+def _resolve(view: np.ndarray, path: tuple) -> np.ndarray:
+	for key in path:
+		view = view[key] if isinstance(key, str) else view[(slice(None),) + key]
+	return view
+
+
+def column(view: np.ndarray, name: str) -> np.ndarray:
+	"""Writable view of one flattened column ('hp', 'slots[2].enemy')"""
+	for label, path in _flatten(view.dtype):
+		if label == name:
+			return _resolve(view, path)
+	raise KeyError(f"No column '{name}'")
+
+
+def scale(view: np.ndarray, factors: Dict[str, float],
+		  limits: Optional[Dict[str, Tuple[int, int]]] = None) -> None:
+	"""
+	Multiply columns in place, truncating and clamping to the field range
+
+	Args:
+		factors: Column -> multiplier
+		limits: Optional column -> (min, max), tighter than the field type
+	"""
+	limits = limits or {}
+	for name, factor in factors.items():
+		target = column(view, name)
+		info = np.iinfo(target.dtype)
+		low, high = limits.get(name, (info.min, info.max))
+		target[...] = np.clip(np.trunc(target * float(factor)), low, high)
+
+
+def _assign(view: np.ndarray, ids: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+	"""Write columns for record ids after validating every value"""
+	ids = np.asarray(ids, dtype=np.int64)
+	if ids.size and (ids.min() < 0 or ids.max() >= len(view)):
+		raise ValueError(f"Record id out of range 0..{len(view) - 1}")
+	paths = dict(_flatten(view.dtype))
+	unknown = sorted(set(values) - set(paths))
+	if unknown:
+		raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+	checked = {}
+	for name, data in values.items():
+		target_type = _resolve(view[:0], paths[name]).dtype
+		data = np.asarray(data)
+		if data.dtype.kind == 'f' and not np.all(np.mod(data, 1) == 0):
+			raise ValueError(f"Column '{name}' has non-integer values")
+		data = data.astype(np.int64)
+		info = np.iinfo(target_type)
+		if data.size and (data.min() < info.min or data.max() > info.max):
+			raise ValueError(f"Column '{name}' out of range {info.min}..{info.max}")
+		checked[name] = data
+	for name, data in checked.items():
+		_resolve(view, paths[name])[ids] = data
+
+
+# ----------------------------------------------------------------------
+# Export / import
+# ----------------------------------------------------------------------
+
+def to_rows(view: np.ndarray) -> List[Dict[str, int]]:
+	columns = [(name, _resolve(view, path).tolist()) for name, path in _flatten(view.dtype)]
+	return [dict([('id', i)] + [(name, values[i]) for name, values in columns]) for i in range(len(view))]
+
+
+def from_rows(view: np.ndarray, rows: Sequence[Dict[str, Any]]) -> None:
+	if not rows:
+		return
+	names = [name for name in rows[0] if name != 'id']
+	ids = [int(row['id']) if 'id' in row else i for i, row in enumerate(rows)]
+	_assign(view, np.array(ids), {name: np.array([int(row[name]) for row in rows]) for name in names})
+
+
+def to_dataframe(view: np.ndarray):
+	"""pandas DataFrame indexed by record id"""
+	import pandas as pd
+	data = {name: _resolve(view, path).copy() for name, path in _flatten(view.dtype)}
+	return pd.DataFrame(data, index=pd.RangeIndex(len(view), name='id'))
+
+
+def from_dataframe(view: np.ndarray, frame) -> None:
+	"""Write a DataFrame back (index or an 'id' column selects the records)"""
+	if 'id' in frame.columns:
+		frame = frame.set_index('id')
+	_assign(view, frame.index.to_numpy(), {name: frame[name].to_numpy() for name in frame.columns})
+
+
+def to_csv(view: np.ndarray, path: Path) -> None:
+	rows = to_rows(view)
+	with open(path, 'w', newline='', encoding='utf-8') as f:
+		writer = csv.DictWriter(f, fieldnames=['id'] + [name for name, _ in _flatten(view.dtype)])
+		writer.writeheader()
+		writer.writerows(rows)
+
+
+def from_csv(view: np.ndarray, path: Path) -> None:
+	with open(path, newline='', encoding='utf-8') as f:
+		rows = [{key: int(value, 0) for key, value in row.items()} for row in csv.DictReader(f)]
+	from_rows(view, rows)
+
+
+def to_json(view: np.ndarray, path: Path, table: Optional[RecordTable] = None) -> None:
+	data = {'records': to_rows(view)}
+	if table is not None:
+		data = {'table': table.name, 'offset': table.offset, 'stride': table.stride, **data}
+	with open(path, 'w', encoding='utf-8') as f:
+		json.dump(data, f, indent='\t')
+
+
+def from_json(view: np.ndarray, path: Path) -> None:
+	with open(path, encoding='utf-8') as f:
+		data = json.load(f)
+	from_rows(view, data['records'] if isinstance(data, dict) else data)
+
+
+def export_table(view: np.ndarray, path: Path, table: Optional[RecordTable] = None) -> None:
+	"""Export by file extension (.csv or .json)"""
+	if path.suffix.lower() == '.csv':
+		to_csv(view, path)
+	elif path.suffix.lower() == '.json':
+		to_json(view, path, table)
+	else:
+		raise ValueError(f"Unsupported table format: {path.suffix}")
+
+
+def import_table(view: np.ndarray, path: Path) -> None:
+	"""Import by file extension (.csv or .json)"""
+	if path.suffix.lower() == '.csv':
+		from_csv(view, path)
+	elif path.suffix.lower() == '.json':
+		from_json(view, path)
+	else:
+		raise ValueError(f"Unsupported table format: {path.suffix}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ ROM record tables')
+	parser.add_argument('rom', type=Path, nargs='?', help='ROM file')
+	parser.add_argument('--list', action='store_true', help='List declared tables')
+	parser.add_argument('--table', type=str, choices=sorted(TABLES), help='Table to work on')
+	parser.add_argument('--export', type=Path, metavar='FILE', help='Export table (.csv/.json)')
+	parser.add_argument('--import', dest='import_path', type=Path, metavar='FILE',
+						help='Import table (.csv/.json)')
+	parser.add_argument('--scale', type=str, nargs='+', metavar='COLUMN=FACTOR',
+						help='Scale columns (clamped to field range)')
+	parser.add_argument('--output', type=Path, help='Output ROM for --import/--scale')
+
+	args = parser.parse_args()
+
+	if args.list:
+		for table in TABLES.values():
+			print(f"{table.name:<20} ${table.offset:06X}  {table.count:4d} x {table.stride:3d}  "
+				  f"{table.description}")
+		return 0
+
+	if not args.rom or not args.table:
+		parser.print_help()
+		return 1
+
+	rom = bytearray(args.rom.read_bytes())
+	table = TABLES[args.table]
+	view = table.view(rom)
+	print(f"{table.name}: {len(view)} of {table.count} records in ROM")
+
+	if args.export:
+		export_table(view, args.export, table)
+		print(f"✓ Exported to {args.export}")
+
+	changed = False
+	if args.import_path:
+		import_table(view, args.import_path)
+		changed = True
+	if args.scale:
+		scale(view, {name: float(factor) for name, factor in (s.split('=') for s in args.scale)})
+		changed = True
+
+	if changed:
+		output = args.output or args.rom
+		output.write_bytes(rom)
+		print(f"✓ Wrote {output}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
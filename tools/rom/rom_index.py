@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+ROM Suffix Index
+
+Suffix array + LCP array over a ROM image, built once and shared by the
+analyzers, compressors and search tools.
+
+Construction uses vectorized prefix doubling (NumPy argsort over packed
+rank pairs), so a 2MB ROM indexes in a few seconds. The rank array of
+every doubling level is kept, which lets the LCP array be finished with
+binary lifting instead of a per-byte Python loop.
+
+Queries:
+- find(pattern)                    All occurrences, O(m log n)
+- find_repeats(min_length)         Maximal repeat groups >= k bytes,
+                                   O(n * MAX_PERIOD + output)
+- longest_previous_match(i)        LZ-style match source for position i
+
+Usage:
+	index = ROMIndex(rom_data)
+	offsets = index.find(b'\\x20\\x00\\x80')
+	for repeat in index.find_repeats(32):
+		print(repeat.length, repeat.offsets)
+
+	# Cache the index next to other build artifacts
+	index = ROMIndex.load_or_build(rom_data, Path('build/cache'))
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional, Tuple
+import hashlib
+import numpy as np
+
+from rom_statistics import BytesLike, as_byte_array, find_byte_runs
+
+
+@dataclass
+class Repeat:
+	"""A byte sequence that occurs at several offsets"""
+	length: int
+	suffixes: np.ndarray  # Occurrences in suffix array order (a view into the index)
+
+	@cached_property
+	def offsets(self) -> np.ndarray:
+		"""Sorted PC offsets"""
+		return np.sort(self.suffixes)
+
+	@property
+	def count(self) -> int:
+		return len(self.suffixes)
+
+	@property
+	def total_size(self) -> int:
+		"""Bytes covered by all occurrences"""
+		return self.length * len(self.suffixes)
+
+
+def build_suffix_array(data: BytesLike) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Build the suffix array and LCP array by prefix doubling.
+
+	Only suffixes that still share a group with another suffix are re-sorted
+	on each pass (Larsson-Sadakane style), so long runs of filler bytes
+	cost time proportional to the run, not to the ROM.
+
+	Returns:
+		(sa, lcp) where sa lists suffix start offsets in sorted order and
+		lcp[r] is the common prefix length of suffixes sa[r-1] and sa[r]
+		(lcp[0] is 0).
+	"""
+	arr = as_byte_array(data)
+	n = arr.size
+	if n == 0:
+		return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+	positions = np.arange(n, dtype=np.int64)
+	sa = np.argsort(arr, kind='stable').astype(np.int64)
+
+	# is_head marks the first sa slot of each group of equal prefixes;
+	# a suffix's rank is the sa slot of its group head
+	is_head = np.ones(n, dtype=bool)
+	sorted_bytes = arr[sa]
+	is_head[1:] = sorted_bytes[1:] != sorted_bytes[:-1]
+	head = np.maximum.accumulate(np.where(is_head, positions, 0))
+	rank = np.empty(n, dtype=np.int64)
+	rank[sa] = head
+
+	# levels[k][i]: rank of the 2**k-byte prefix of suffix i
+	# split[r]: level at which slots r-1 and r stopped sharing a group
+	levels = [rank.astype(np.int32)]
+	split = np.zeros(n, dtype=np.int8)
+	k = 1
+
+	while True:
+		singleton = is_head & np.append(is_head[1:], True)
+		active = np.flatnonzero(~singleton)
+		if active.size == 0:
+			break
+
+		# Sort each unresolved group by the rank of the suffix k bytes on
+		nxt = sa[active] + k
+		second = np.where(nxt < n, rank[np.minimum(nxt, n - 1)], -1)
+		group = head[active]
+		order = np.argsort(group * (n + 1) + second + 1)
+
+		sa[active] = sa[active][order]
+		second = second[order]
+		group = group[order]
+
+		new_head = np.ones(active.size, dtype=bool)
+		new_head[1:] = (group[1:] != group[:-1]) | (second[1:] != second[:-1])
+		split[active[new_head & ~is_head[active]]] = len(levels)
+		is_head[active] = new_head
+		head = np.maximum.accumulate(np.where(is_head, positions, 0))
+		rank[sa[active]] = head[active]
+
+		levels.append(rank.astype(np.int32))
+		k *= 2
+
+	return sa.astype(np.int32), _lift_lcp(sa, levels, split)
+
+
+def _lift_lcp(sa: np.ndarray, levels: List[np.ndarray], split: np.ndarray) -> np.ndarray:
+	"""
+	Finish the LCP array by binary lifting.
+
+	A pair split at level L shares 2**(L-1) bytes but not 2**L, so only the
+	steps below 2**(L-1) remain to be tested.
+	"""
+	n = sa.size
+	split = split.astype(np.int64)
+	lcp = np.where(split > 0, np.left_shift(1, np.maximum(split - 1, 0)), 0)
+	lcp[0] = 0
+
+	for k in range(len(levels) - 3, -1, -1):
+		slots = np.flatnonzero(split >= k + 2)
+		if slots.size == 0:
+			continue
+
+		pa = sa[slots - 1] + lcp[slots]
+		pb = sa[slots] + lcp[slots]
+		valid = (pa < n) & (pb < n)
+		match = np.zeros(slots.size, dtype=bool)
+		match[valid] = levels[k][pa[valid]] == levels[k][pb[valid]]
+		lcp[slots[match]] += 1 << k
+
+	return lcp.astype(np.int32)
+
+
+class ROMIndex:
+	"""Suffix/LCP index over a ROM image"""
+
+	CACHE_VERSION = 1
+	MAX_PERIOD = 64  # Longest period find_repeats collapses; longer ones nest only ~run/period deep
+
+	def __init__(self, data: BytesLike, sa: Optional[np.ndarray] = None,
+				 lcp: Optional[np.ndarray] = None):
+		self.data = bytes(data)
+		self.array = as_byte_array(self.data)
+
+		if sa is None or lcp is None:
+			sa, lcp = build_suffix_array(self.array)
+
+		self.sa = sa
+		self.lcp = lcp
+		self._rank: Optional[np.ndarray] = None
+
+	def __len__(self) -> int:
+		return len(self.data)
+
+	@property
+	def rank(self) -> np.ndarray:
+		"""Inverse suffix array: rank[i] is the position of suffix i in sa"""
+		if self._rank is None:
+			self._rank = np.empty_like(self.sa)
+			self._rank[self.sa] = np.arange(self.sa.size, dtype=self.sa.dtype)
+		return self._rank
+
+	@staticmethod
+	def data_hash(data: BytesLike) -> str:
+		"""Cache key for a ROM image"""
+		return hashlib.sha1(bytes(data)).hexdigest()
+
+	def save(self, path: Path):
+		"""Save index arrays to an .npz file"""
+		np.savez(path, version=self.CACHE_VERSION, sa=self.sa, lcp=self.lcp)
+
+	@classmethod
+	def load(cls, data: BytesLike, path: Path) -> 'ROMIndex':
+		"""Load index arrays built for this exact ROM"""
+		with np.load(path) as cache:
+			if int(cache['version']) != cls.CACHE_VERSION or cache['sa'].size != len(data):
+				raise ValueError(f"Index cache does not match ROM: {path}")
+			return cls(data, sa=cache['sa'], lcp=cache['lcp'])
+
+	@classmethod
+	def load_or_build(cls, data: BytesLike, cache_dir: Path) -> 'ROMIndex':
+		"""Load the cached index for this ROM hash, building it if needed"""
+		cache_dir = Path(cache_dir)
+		path = cache_dir / f"rom_index_{cls.data_hash(data)}.npz"
+
+		if path.exists():
+			try:
+				return cls.load(data, path)
+			except (ValueError, KeyError, OSError):
+				pass
+
+		index = cls(data)
+		cache_dir.mkdir(parents=True, exist_ok=True)
+		index.save(path)
+		return index
+
+	# ------------------------------------------------------------------
+	# Pattern search
+	# ------------------------------------------------------------------
+
+	def _bound(self, pattern: bytes, upper: bool) -> int:
+		"""Binary search for the first suffix rank >= (or >) pattern prefix"""
+		lo, hi = 0, self.sa.size
+		m = len(pattern)
+		data = self.data
+
+		while lo < hi:
+			mid = (lo + hi) // 2
+			start = int(self.sa[mid])
+			prefix = data[start:start + m]
+			if prefix < pattern or (upper and prefix == pattern):
+				lo = mid + 1
+			else:
+				hi = mid
+		return lo
+
+	def suffix_range(self, pattern: bytes) -> Tuple[int, int]:
+		"""Range [lo, hi) of suffix ranks that start with pattern"""
+		if not pattern:
+			return 0, self.sa.size
+		return self._bound(pattern, False), self._bound(pattern, True)
+
+	def count(self, pattern: bytes) -> int:
+		"""Number of occurrences of pattern"""
+		lo, hi = self.suffix_range(pattern)
+		return hi - lo
+
+	def find(self, pattern: bytes) -> np.ndarray:
+		"""All offsets where pattern occurs, sorted ascending"""
+		lo, hi = self.suffix_range(pattern)
+		return np.sort(self.sa[lo:hi])
+
+	# ------------------------------------------------------------------
+	# Repeats
+	# ------------------------------------------------------------------
+
+	def periodic_runs(self, min_length: int) -> List[Tuple[int, int, int]]:
+		"""
+		Periodic runs in which a min_length repeat overlaps itself.
+
+		A run of period p is data[start:end] with data[i] == data[i + p]
+		throughout, where the repeat data[start:end - p] is at least
+		min_length bytes and longer than p, so its two occurrences overlap.
+		Fill runs are period 1. Each run is reported once, at its smallest
+		period up to MAX_PERIOD.
+
+		Returns:
+			(start, end, period) tuples sorted by start
+		"""
+		arr = self.array
+		n = arr.size
+		covered = np.zeros(n + 1, dtype=np.int64)  # End of the run covering each offset
+		runs = []
+		for period in range(1, min(self.MAX_PERIOD, n // 2) + 1):
+			same = (arr[period:] == arr[:-period]).view(np.uint8)
+			starts, ends = find_byte_runs(same, np.array([False, True]), max(min_length, period + 1))
+			for start, end in zip(starts.tolist(), (ends + period).tolist()):
+				if covered[start] >= end:
+					continue
+				runs.append((start, end, period))
+				covered[start:end] = np.maximum(covered[start:end], end)
+		runs.sort()
+		return runs
+
+	def find_repeats(self, min_length: int, min_count: int = 2) -> List[Repeat]:
+		"""
+		Find maximal repeat groups of at least min_length bytes.
+
+		Every LCP interval with value >= min_length is one group: the ranks
+		[lb, rb] whose suffixes share exactly that prefix length. Intervals
+		nest (ABCDEFGH at two offsets inside ABCD at three), so they are
+		enumerated bottom-up with a stack over the LCP array, visiting only
+		the runs where LCP >= min_length. Groups whose occurrences are all
+		preceded by the same byte are dropped, since the same data is
+		reported by the group one byte to the left; that "preceding byte"
+		is merged from child to parent interval as the stack unwinds.
+
+		A periodic run (see periodic_runs) of L bytes would add one nested
+		group per length with O(L) offsets each, so it is reported as a
+		single repeat instead: its period rounded up to min_length, tiled
+		back to back across the run. Groups whose every occurrence lies
+		inside such a run are dropped, using the room left to the run end
+		merged up the stack like the preceding byte.
+
+		Returns:
+			Repeats sorted by total covered size, largest first
+		"""
+		n = self.sa.size
+		if n < 2 or min_length <= 0:
+			return []
+
+		repeats = []
+		room = np.zeros(n, dtype=np.int64)  # Bytes from each offset to the end of its run
+		for start, end, period in self.periodic_runs(min_length):
+			offsets = np.arange(start, end)
+			room[start:end] = np.maximum(room[start:end], end - offsets)
+			unit = -(-min_length // period) * period
+			copies = (end - start) // unit
+			if copies >= min_count:
+				repeats.append(Repeat(unit, start + unit * np.arange(copies)))
+
+		inside = self.lcp >= min_length
+		inside[0] = False
+		starts, ends = find_byte_runs(inside.view(np.uint8), np.array([False, True]))
+
+		lcp = self.lcp.tolist()
+		# Byte before each suffix (-1 at offset 0); diverse once an interval has two
+		previous = np.where(self.sa > 0, self.array[np.maximum(self.sa - 1, 0)].astype(np.int16), -1).tolist()
+		diverse = -2
+		room = room[self.sa].tolist()
+
+		for start, end in zip(starts.tolist(), ends.tolist()):
+			stack = []  # [lcp value, left rank, merged preceding byte, least room to a run end]
+			for i in range(start, end + 1):
+				height = lcp[i] if i < end else -1
+				left = i - 1
+				char = previous[i - 1]
+				least = room[i - 1]
+				while stack and stack[-1][0] > height:
+					top = stack.pop()
+					if top[2] != char:
+						top[2] = diverse
+					top[3] = min(top[3], least)
+					if top[2] == diverse and top[3] < top[0] and i - top[1] >= min_count:
+						repeats.append(Repeat(top[0], self.sa[top[1]:i]))
+					left, char, least = top[1], top[2], top[3]
+				if stack and stack[-1][0] == height:
+					if stack[-1][2] != char:
+						stack[-1][2] = diverse
+					stack[-1][3] = min(stack[-1][3], least)
+				elif height >= 0:
+					stack.append([height, left, char, least])
+
+		repeats.sort(key=lambda r: r.total_size, reverse=True)
+		return repeats
+
+	# ------------------------------------------------------------------
+	# LZ match source
+	# ------------------------------------------------------------------
+
+	def longest_previous_match(self, position: int, window: Optional[int] = None,
+							   max_length: Optional[int] = None) -> Tuple[int, int]:
+		"""
+		Longest match for data[position:] starting at an earlier offset.
+
+		Args:
+			position: Offset being encoded
+			window: Only consider sources in [position - window, position)
+			max_length: Cap on the reported length
+
+		Returns:
+			(source_offset, length); length is 0 when there is no match
+		"""
+		lowest = 0 if window is None else max(0, position - window)
+		r = int(self.rank[position])
+		best_pos, best_len = position, 0
+
+		# Walk away from rank r in both directions; LCP with suffix r is the
+		# running minimum of the LCP array, so the first in-window suffix in
+		# each direction is the best candidate on that side.
+		for direction in (-1, 1):
+			chunk = 256
+			offset = 0
+			running = np.iinfo(np.int64).max
+
+			while True:
+				if direction < 0:
+					hi = r - offset
+					lo = max(0, hi - chunk)
+					if hi <= 0:
+						break
+					ranks = np.arange(hi - 1, lo - 1, -1)
+					lcps = self.lcp[ranks + 1]
+				else:
+					lo = r + 1 + offset
+					hi = min(self.sa.size, lo + chunk)
+					if lo >= self.sa.size:
+						break
+					ranks = np.arange(lo, hi)
+					lcps = self.lcp[ranks]
+
+				lcp_run = np.minimum(np.minimum.accumulate(lcps.astype(np.int64)), running)
+				if lcp_run[0] <= best_len:
+					break
+
+				sources = self.sa[ranks]
+				hits = np.flatnonzero((sources < position) & (sources >= lowest))
+				if hits.size:
+					hit = hits[0]
+					length = int(lcp_run[hit])
+					source = int(sources[hit])
+					if length > best_len or (length == best_len and source < best_pos):
+						best_pos, best_len = source, length
+					break
+
+				running = int(lcp_run[-1])
+				if running <= best_len:
+					break
+				offset += len(ranks)
+				chunk *= 4
+
+		if max_length is not None:
+			best_len = min(best_len, max_length)
+		if best_len == 0:
+			best_pos = position
+		return best_pos, best_len
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+ROM Search
+
+Vectorized search subsystem shared by the hex editor, debug/cheat tools
+and pointer hunting scripts. The ROM is held as a NumPy view (memory
+mapped when opened from a file, or sharing the buffer of an editor's
+bytearray), and every query is a handful of array operations instead of
+a Python loop over offsets.
+
+Queries:
+- Byte patterns, with optional wildcards ("A9 ?? 8D ?? ??")
+- 8/16/24/32-bit little-endian values at every alignment
+- Relative search (byte deltas, for unknown text encodings)
+- Snapshot deltas (values that changed by +n between two dumps)
+- 16-bit pointers into a bank, 24-bit pointers into an address range
+- Many exact patterns at once, answered from the suffix index
+
+Results are cached, so repeated queries against an unchanged ROM are
+free. Whoever writes through a shared buffer calls invalidate() after
+the edit; hashing the ROM on every query to detect edits would cost
+more than most searches.
+
+Usage:
+	search = ROMSearch.open(Path('roms/ffmq.sfc'))
+	search.find_bytes(b'\\x22\\x00\\x80\\x00')
+	search.find_masked('A9 ?? 8D 00 21')
+	search.find_value(0x1234, width=2)
+	search.find_long_pointers(0x0C8000, 0x0CFFFF)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+import hashlib
+import numpy as np
+
+from rom_index import ROMIndex
+from rom_statistics import BytesLike, as_byte_array
+
+
+Pattern = Tuple[bytes, bytes]  # (values, mask) - mask byte 0xFF = must match
+
+
+def parse_masked_pattern(text: str) -> Pattern:
+	"""
+	Parse a hex pattern with wildcards.
+
+	"A9 ?? 8D" -> (b'\\xA9\\x00\\x8D', b'\\xFF\\x00\\xFF')
+	Nibble wildcards are allowed too: "2? F0" matches $20-$2F then $F0.
+	"""
+	tokens = text.replace(',', ' ').split()
+	if len(tokens) == 1 and len(tokens[0]) > 2:
+		token = tokens[0]
+		tokens = [token[i:i + 2] for i in range(0, len(token), 2)]
+
+	values = bytearray()
+	mask = bytearray()
+	for token in tokens:
+		if len(token) != 2:
+			raise ValueError(f"Invalid pattern byte: {token!r}")
+
+		value = 0
+		bits = 0
+		for nibble in token:
+			value <<= 4
+			bits <<= 4
+			if nibble != '?':
+				value |= int(nibble, 16)
+				bits |= 0xF
+		values.append(value)
+		mask.append(bits)
+
+	return bytes(values), bytes(mask)
+
+
+class ROMSearch:
+	"""Vectorized ROM search with a result cache"""
+
+	def __init__(self, data: Union[BytesLike, np.ndarray], cache_dir: Optional[Path] = None):
+		"""
+		Args:
+			data: ROM bytes. A bytearray is shared, not copied; call
+				invalidate() after editing it so later searches see the edit.
+			cache_dir: Optional directory for persisted suffix indexes
+		"""
+		self.array = as_byte_array(data)
+		self.cache_dir = cache_dir
+		self._results: Dict[tuple, np.ndarray] = {}
+		self._values: Dict[int, np.ndarray] = {}
+		self._index: Optional[ROMIndex] = None
+
+	@classmethod
+	def open(cls, path: Path, cache_dir: Optional[Path] = None) -> 'ROMSearch':
+		"""Memory-map a ROM file read-only"""
+		return cls(np.memmap(path, dtype=np.uint8, mode='r'), cache_dir)
+
+	def __len__(self) -> int:
+		return self.array.size
+
+	# ------------------------------------------------------------------
+	# Cache management
+	# ------------------------------------------------------------------
+
+	def content_hash(self) -> str:
+		"""Hash of the current ROM contents"""
+		return hashlib.sha1(self.array.tobytes()).hexdigest()
+
+	def invalidate(self):
+		"""Drop cached results after the shared buffer was edited"""
+		self._results.clear()
+		self._values.clear()
+		self._index = None
+
+	def _cached(self, key: tuple, compute) -> np.ndarray:
+		if key not in self._results:
+			self._results[key] = compute()
+		return self._results[key]
+
+	@property
+	def index(self) -> ROMIndex:
+		"""Suffix index for the current contents, built on first use"""
+		if self._index is None:
+			data = self.array.tobytes()
+			if self.cache_dir is not None:
+				self._index = ROMIndex.load_or_build(data, self.cache_dir)
+			else:
+				self._index = ROMIndex(data)
+		return self._index
+
+	# ------------------------------------------------------------------
+	# Value views
+	# ------------------------------------------------------------------
+
+	def values(self, width: int) -> np.ndarray:
+		"""
+		Little-endian value starting at every offset.
+
+		values(2)[i] == struct.unpack_from('<H', rom, i)[0]
+		"""
+		if width not in (1, 2, 3, 4):
+			raise ValueError(f"Unsupported value width: {width}")
+
+		if width not in self._values:
+			self._values[width] = self._build_values(width)
+		return self._values[width]
+
+	def _build_values(self, width: int) -> np.ndarray:
+		arr = self.array
+		count = max(arr.size - width + 1, 0)
+
+		if width == 1:
+			return arr
+
+		if width == 3:
+			out = arr[:count].astype(np.uint32)
+			out |= arr[1:count + 1].astype(np.uint32) << 8
+			out |= arr[2:count + 2].astype(np.uint32) << 16
+			return out
+
+		# 16/32-bit: one frombuffer view per alignment, interleaved
+		dtype = np.dtype('<u2' if width == 2 else '<u4')
+		out = np.empty(count, dtype=dtype)
+		for align in range(min(width, count)):
+			slots = out[align::width]
+			view = np.frombuffer(arr, dtype=dtype, count=slots.size, offset=align)
+			slots[:] = view
+		return out
+
+	# ------------------------------------------------------------------
+	# Pattern queries
+	# ------------------------------------------------------------------
+
+	@staticmethod
+	def _in_range(offsets: np.ndarray, start: int, end: Optional[int]) -> np.ndarray:
+		if start:
+			offsets = offsets[offsets >= start]
+		if end is not None:
+			offsets = offsets[offsets < end]
+		return offsets
+
+	def find_bytes(self, pattern: bytes, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+		"""Offsets of an exact byte pattern, sorted ascending"""
+		pattern = bytes(pattern)
+		return self._in_range(self._cached(('bytes', pattern), lambda: self._scan(pattern, None)),
+							  start, end)
+
+	def find_masked(self, pattern: Union[str, Pattern], start: int = 0,
+					end: Optional[int] = None) -> np.ndarray:
+		"""
+		Offsets of a wildcard pattern.
+
+		Args:
+			pattern: Hex text ("A9 ?? 8D") or (values, mask) bytes
+		"""
+		values, mask = parse_masked_pattern(pattern) if isinstance(pattern, str) else pattern
+		if len(values) != len(mask):
+			raise ValueError("Pattern and mask must be the same length")
+		key = ('masked', bytes(values), bytes(mask))
+		return self._in_range(self._cached(key, lambda: self._scan(values, mask)), start, end)
+
+	def _scan(self, values: bytes, mask: Optional[bytes]) -> np.ndarray:
+		"""Candidate filtering: anchor on the most selective byte, then narrow"""
+		arr = self.array
+		m = len(values)
+		count = arr.size - m + 1
+		if m == 0 or count <= 0:
+			return np.zeros(0, dtype=np.int64)
+
+		mask = mask or b'\xFF' * m
+		checks = [(k, values[k] & mask[k], mask[k]) for k in range(m) if mask[k]]
+		if not checks:
+			return np.arange(count, dtype=np.int64)
+
+		# Full-byte checks before nibble checks; they narrow fastest
+		checks.sort(key=lambda c: c[2] != 0xFF)
+		k, value, bits = checks[0]
+		window = arr[k:k + count]
+		hits = window == value if bits == 0xFF else (window & bits) == value
+		candidates = np.flatnonzero(hits)
+
+		for k, value, bits in checks[1:]:
+			if candidates.size == 0:
+				break
+			column = arr[candidates + k]
+			keep = column == value if bits == 0xFF else (column & bits) == value
+			candidates = candidates[keep]
+
+		return candidates.astype(np.int64)
+
+	def find_many(self, patterns: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+		"""
+		Offsets of many exact patterns at once.
+
+		Uses the suffix index (one binary search per pattern), which is far
+		cheaper than scanning the ROM once per pattern when hunting for
+		hundreds of pointer or cheat values.
+		"""
+		index = self.index
+		results = {}
+		for pattern in patterns:
+			pattern = bytes(pattern)
+			key = ('bytes', pattern)
+			if key not in self._results:
+				self._results[key] = index.find(pattern).astype(np.int64)
+			results[pattern] = self._results[key]
+		return results
+
+	# ------------------------------------------------------------------
+	# Value queries
+	# ------------------------------------------------------------------
+
+	def find_value(self, value: int, width: int = 1, start: int = 0,
+				   end: Optional[int] = None, aligned: bool = False) -> np.ndarray:
+		"""
+		Offsets where a little-endian value of the given width occurs.
+
+		Args:
+			aligned: Only report offsets that are a multiple of width
+		"""
+		key = ('value', width, value)
+		offsets = self._cached(key, lambda: np.flatnonzero(self.values(width) == value))
+		if aligned:
+			offsets = offsets[offsets % width == 0]
+		return self._in_range(offsets, start, end)
+
+	def find_value_range(self, low: int, high: int, width: int = 2, start: int = 0,
+						 end: Optional[int] = None) -> np.ndarray:
+		"""Offsets whose value lies in [low, high]"""
+		key = ('range', width, low, high)
+
+		def compute():
+			values = self.values(width)
+			return np.flatnonzero((values >= low) & (values <= high))
+
+		return self._in_range(self._cached(key, compute), start, end)
+
+	def find_relative(self, sequence: Sequence[int], start: int = 0,
+					  end: Optional[int] = None) -> np.ndarray:
+		"""
+		Relative search: offsets where consecutive bytes differ like sequence.
+
+		find_relative(b'HERO') finds "HERO" in any encoding where letters are
+		stored in alphabetical order, whatever the base value.
+		"""
+		sequence = bytes(sequence)
+		if len(sequence) < 2:
+			raise ValueError("Relative search needs at least two values")
+
+		deltas = bytes((b - a) & 0xFF for a, b in zip(sequence, sequence[1:]))
+		key = ('relative', deltas)
+
+		def compute():
+			return ROMSearch(np.diff(self.array))._scan(deltas, None)
+
+		return self._in_range(self._cached(key, compute), start, end)
+
+	def find_changed(self, other: BytesLike, delta: Optional[int] = None, width: int = 1,
+					 start: int = 0, end: Optional[int] = None) -> np.ndarray:
+		"""
+		Compare against another snapshot (RAM dump or ROM version).
+
+		Args:
+			other: Later snapshot of the same size
+			delta: Required change (other - self); None for any change
+			width: Value width; deltas are compared modulo 2**(8*width)
+		"""
+		other_search = ROMSearch(other)
+		if len(other_search) != len(self):
+			raise ValueError("Snapshots must be the same size")
+
+		before = self.values(width).astype(np.int64)
+		after = other_search.values(width).astype(np.int64)
+		if delta is None:
+			offsets = np.flatnonzero(before != after)
+		else:
+			modulus = 1 << (8 * width)
+			offsets = np.flatnonzero((after - before) % modulus == delta % modulus)
+		return self._in_range(offsets, start, end)
+
+	# ------------------------------------------------------------------
+	# Pointer queries
+	# ------------------------------------------------------------------
+
+	def find_pointers_in_bank(self, address: int, start: int = 0,
+							  end: Optional[int] = None) -> np.ndarray:
+		"""
+		16-bit pointers to a LoROM address, searched within its own bank.
+
+		Args:
+			address: SNES address ($BBAAAA); the low word is searched for
+				inside the PC range of bank $BB unless start/end are given
+		"""
+		if start == 0 and end is None:
+			bank = (address >> 16) & 0x7F
+			start = bank * 0x8000
+			end = start + 0x8000
+		return self.find_value(address & 0xFFFF, 2, start, end)
+
+	def find_long_pointers(self, target_start: int, target_end: int, start: int = 0,
+						   end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		All 24-bit pointers whose target lies in [target_start, target_end].
+
+		Returns:
+			(offsets, targets) arrays
+		"""
+		offsets = self.find_value_range(target_start, target_end, 3, start, end)
+		return offsets, self.values(3)[offsets]
+
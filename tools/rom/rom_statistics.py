@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+ROM Block Statistics
+
+Vectorized analysis kernel shared by the ROM analyzers. The whole ROM is
+viewed as a 2D array of blocks (or sliding windows) and every per-block
+metric is derived from one byte histogram per row:
+
+- Shannon entropy (true log2, 0-8 bits)
+- Unique byte counts
+- Printable ASCII / zero / $FF ratios
+- Tile-pattern score (repeating 8-byte rows, 2bpp/4bpp graphics)
+- BRR header score (SPC700 sample data)
+
+Histograms are computed with a single np.bincount over (row * 256 + byte)
+indices, so a 2MB ROM is analyzed in milliseconds instead of seconds.
+
+Usage:
+	stats = compute_block_statistics(rom_data, block_size=0x1000)
+	stats.entropy        # float64 array, one value per block
+	stats.offsets        # PC offset of each block
+
+	# Sliding window, 4KB window every 256 bytes
+	stats = compute_block_statistics(rom_data, 0x1000, stride=0x100)
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+import numpy as np
+
+
+BytesLike = Union[bytes, bytearray, memoryview, np.ndarray]
+
+# Byte classification lookup tables
+PRINTABLE_MASK = np.zeros(256, dtype=np.int64)
+PRINTABLE_MASK[0x20:0x7F] = 1
+
+# Valid BRR header bytes (range/filter nibble heuristics)
+BRR_HEADER_MASK = np.array(
+	[(h & 0x0C) == 0 or (h & 0xF0) in (0x00, 0x10, 0x20, 0x30) for h in range(256)],
+	dtype=bool
+)
+
+BRR_BLOCK_SIZE = 9
+TILE_ROW_SIZE = 8
+
+# Upper bound on histogram cells materialized at once (rows * 256)
+MAX_BATCH_CELLS = 1 << 22
+
+
+def as_byte_array(data: BytesLike) -> np.ndarray:
+	"""Return a zero-copy uint8 view of ROM data"""
+	if isinstance(data, np.ndarray):
+		return data.view(np.uint8).ravel()
+	return np.frombuffer(data, dtype=np.uint8)
+
+
+def block_histograms(blocks: np.ndarray) -> np.ndarray:
+	"""
+	Count byte values for every row of a 2D uint8 array.
+
+	Args:
+		blocks: (rows, length) uint8 array
+
+	Returns:
+		(rows, 256) int64 histogram array
+	"""
+	rows = blocks.shape[0]
+	if rows == 0:
+		return np.zeros((0, 256), dtype=np.int64)
+
+	index = blocks.astype(np.int64) + (np.arange(rows, dtype=np.int64) * 256)[:, None]
+	return np.bincount(index.ravel(), minlength=rows * 256).reshape(rows, 256)
+
+
+def entropy_from_histograms(histograms: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+	"""Shannon entropy (bits per byte) for each histogram row"""
+	lengths = np.asarray(lengths, dtype=np.float64)
+	safe_lengths = np.where(lengths > 0, lengths, 1.0)
+	p = histograms / safe_lengths[:, None]
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		terms = np.where(p > 0, p * np.log2(np.where(p > 0, p, 1.0)), 0.0)
+
+	return -terms.sum(axis=1)
+
+
+def shannon_entropy(data: BytesLike) -> float:
+	"""Shannon entropy of a single buffer (0-8 bits)"""
+	arr = as_byte_array(data)
+	if arr.size == 0:
+		return 0.0
+
+	hist = np.bincount(arr, minlength=256)[None, :]
+	return float(entropy_from_histograms(hist, np.array([arr.size]))[0])
+
+
+def tile_pattern_scores(blocks: np.ndarray) -> np.ndarray:
+	"""
+	Fraction of distinct 8-byte rows that repeat within each block.
+
+	Graphics data reuses identical tile rows far more often than code or
+	compressed data, so a high score suggests CHR data.
+	"""
+	rows, length = blocks.shape
+	groups = length // TILE_ROW_SIZE
+	if rows == 0 or groups < 2:
+		return np.zeros(rows, dtype=np.float64)
+
+	words = np.ascontiguousarray(blocks[:, :groups * TILE_ROW_SIZE]).view('<u8')
+	words = np.sort(words, axis=1)
+
+	# is_start marks the first element of each run of equal values
+	is_start = np.ones(words.shape, dtype=bool)
+	is_start[:, 1:] = words[:, 1:] != words[:, :-1]
+
+	distinct = is_start.sum(axis=1)
+	repeating = (is_start[:, :-1] & ~is_start[:, 1:]).sum(axis=1)
+
+	return repeating / distinct
+
+
+def brr_header_scores(blocks: np.ndarray) -> np.ndarray:
+	"""Fraction of 9-byte strides whose first byte is a plausible BRR header"""
+	rows, length = blocks.shape
+	count = len(range(0, length - BRR_BLOCK_SIZE, BRR_BLOCK_SIZE))
+	if rows == 0 or count == 0:
+		return np.zeros(rows, dtype=np.float64)
+
+	headers = blocks[:, 0:count * BRR_BLOCK_SIZE:BRR_BLOCK_SIZE]
+	return BRR_HEADER_MASK[headers].sum(axis=1) / max(length // BRR_BLOCK_SIZE, 1)
+
+
+@dataclass
+class BlockStatistics:
+	"""Per-block metrics for a ROM, one array element per block"""
+	block_size: int
+	stride: int
+	offsets: np.ndarray		 # PC offset of each block
+	lengths: np.ndarray		 # Bytes in each block (last block may be short)
+	entropy: np.ndarray		 # Shannon entropy, 0-8 bits
+	unique: np.ndarray		  # Distinct byte values
+	printable_ratio: np.ndarray
+	zero_ratio: np.ndarray
+	ff_ratio: np.ndarray
+	tile_score: np.ndarray	  # See tile_pattern_scores()
+	brr_score: np.ndarray	   # See brr_header_scores()
+	histograms: Optional[np.ndarray] = None
+
+	def __len__(self) -> int:
+		return len(self.offsets)
+
+	def ends(self) -> np.ndarray:
+		"""End offset (exclusive) of each block"""
+		return self.offsets + self.lengths
+
+
+def _row_statistics(blocks: np.ndarray) -> Tuple[np.ndarray, ...]:
+	"""Compute all metrics for a batch of equal-length rows"""
+	hist = block_histograms(blocks)
+	lengths = np.full(blocks.shape[0], blocks.shape[1], dtype=np.int64)
+	return _histogram_statistics(hist, lengths) + (
+		tile_pattern_scores(blocks),
+		brr_header_scores(blocks),
+		hist,
+	)
+
+
+def _histogram_statistics(hist: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, ...]:
+	"""Metrics that depend only on the byte histogram"""
+	safe = np.where(lengths > 0, lengths, 1).astype(np.float64)
+	return (
+		lengths,
+		entropy_from_histograms(hist, lengths),
+		(hist > 0).sum(axis=1),
+		(hist @ PRINTABLE_MASK) / safe,
+		hist[:, 0x00] / safe,
+		hist[:, 0xFF] / safe,
+	)
+
+
+def _iter_batches(arr: np.ndarray, block_size: int, stride: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+	"""Yield (offsets, rows) batches of full-length windows"""
+	if arr.size < block_size:
+		return
+
+	if stride == block_size:
+		windows = arr[:(arr.size // block_size) * block_size].reshape(-1, block_size)
+	else:
+		windows = np.lib.stride_tricks.sliding_window_view(arr, block_size)[::stride]
+
+	batch_rows = max(1, MAX_BATCH_CELLS // max(block_size, 256))
+	for start in range(0, windows.shape[0], batch_rows):
+		rows = windows[start:start + batch_rows]
+		offsets = (np.arange(start, start + rows.shape[0], dtype=np.int64) * stride)
+		yield offsets, rows
+
+
+def compute_block_statistics(data: BytesLike, block_size: int = 0x1000,
+							 stride: Optional[int] = None,
+							 keep_histograms: bool = False) -> BlockStatistics:
+	"""
+	Compute per-block statistics for a whole ROM.
+
+	Args:
+		data: ROM bytes
+		block_size: Block (window) size in bytes
+		stride: Distance between block starts. Defaults to block_size
+			(non-overlapping blocks, trailing partial block included).
+			Any other value produces sliding windows of full length.
+		keep_histograms: Retain the (blocks, 256) histogram matrix
+
+	Returns:
+		BlockStatistics with one entry per block
+	"""
+	if block_size <= 0:
+		raise ValueError(f"Block size must be positive: {block_size}")
+	stride = stride or block_size
+	if stride <= 0:
+		raise ValueError(f"Stride must be positive: {stride}")
+
+	arr = as_byte_array(data)
+	parts = []
+
+	def collect(offsets: np.ndarray, rows: np.ndarray) -> None:
+		row_stats = _row_statistics(rows)
+		if not keep_histograms:
+			row_stats = row_stats[:-1] + (None,)
+		parts.append((offsets,) + row_stats)
+
+	for offsets, rows in _iter_batches(arr, block_size, stride):
+		collect(offsets, rows)
+
+	# Trailing partial block for non-overlapping mode
+	if stride == block_size:
+		tail_start = (arr.size // block_size) * block_size
+		if tail_start < arr.size:
+			collect(np.array([tail_start], dtype=np.int64), arr[tail_start:][None, :])
+
+	if not parts:
+		empty_f = np.zeros(0, dtype=np.float64)
+		empty_i = np.zeros(0, dtype=np.int64)
+		return BlockStatistics(
+			block_size, stride, empty_i, empty_i, empty_f, empty_i,
+			empty_f, empty_f, empty_f, empty_f, empty_f,
+			np.zeros((0, 256), dtype=np.int64) if keep_histograms else None
+		)
+
+	columns = list(zip(*parts))
+	offsets, lengths, entropy, unique, printable, zero, ff, tile, brr = (
+		np.concatenate(column) for column in columns[:-1]
+	)
+	hist = np.concatenate(columns[-1]) if keep_histograms else None
+
+	return BlockStatistics(
+		block_size=block_size,
+		stride=stride,
+		offsets=offsets,
+		lengths=lengths,
+		entropy=entropy,
+		unique=unique,
+		printable_ratio=printable,
+		zero_ratio=zero,
+		ff_ratio=ff,
+		tile_score=tile,
+		brr_score=brr,
+		histograms=hist
+	)
+
+
+def find_byte_runs(data: BytesLike, byte_mask: np.ndarray,
+				   min_length: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Find maximal runs of bytes accepted by a 256-entry lookup table.
+
+	Args:
+		data: ROM bytes
+		byte_mask: Boolean array indexed by byte value
+		min_length: Shortest run to report
+
+	Returns:
+		(starts, ends) arrays; each run is data[start:end]
+	"""
+	arr = as_byte_array(data)
+	inside = np.asarray(byte_mask, dtype=bool)[arr]
+
+	edges = np.diff(np.concatenate(([False], inside, [False])).astype(np.int8))
+	starts = np.flatnonzero(edges == 1)
+	ends = np.flatnonzero(edges == -1)
+
+	keep = (ends - starts) >= min_length
+	return starts[keep], ends[keep]
+
+
+def find_printable_runs(data: BytesLike, min_length: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+	"""Find runs of printable ASCII ($20-$7E)"""
+	return find_byte_runs(data, PRINTABLE_MASK.astype(bool), min_length)
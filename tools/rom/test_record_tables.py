@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+ROM Record Tables - Test Suite
+
+Checks zero-copy write-through, clamped scaling against a per-record
+reference, CSV/JSON/DataFrame round trips and the tools built on the
+tables.
+
+Usage:
+	python test_record_tables.py
+"""
+
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'difficulty'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'battle'))
+
+from record_tables import (
+	ENEMY_STATS, FORMATIONS, TABLES, column, from_csv, from_dataframe, from_json, scale,
+	to_csv, to_dataframe, to_json, to_rows
+)
+from ffmq_difficulty_adjuster import DifficultyAdjuster, DifficultyConfig
+from ffmq_battle_editor import BattleEditor
+
+
+def random_rom(size: int = 0x344000, seed: int = 0) -> bytearray:
+	return bytearray(np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8).tobytes())
+
+
+class TestViews(unittest.TestCase):
+	def test_write_through_and_short_rom(self):
+		rom = random_rom()
+		enemies = ENEMY_STATS.view(rom)
+		enemies['hp'][3] = 0x1234
+		self.assertEqual(struct.unpack_from('<H', rom, ENEMY_STATS.address(3))[0], 0x1234)
+
+		column(FORMATIONS.view(rom), 'slots[7].y')[2] = 99
+		self.assertEqual(rom[FORMATIONS.address(2) + 1 + 7 * 3 + 2], 99)
+
+		short = rom[:ENEMY_STATS.offset + 10 * 32 + 5]
+		self.assertEqual(len(ENEMY_STATS.view(short)), 10)
+		self.assertEqual(len(FORMATIONS.view(short)), 0)
+		self.assertFalse(ENEMY_STATS.view(bytes(rom)).flags.writeable)
+
+	def test_adjuster_matches_per_record_reference(self):
+		rom = random_rom()
+		expected = bytearray(rom)
+		config = DifficultyConfig(enemy_hp_mult=1.5, enemy_attack_mult=1.3, enemy_defense_mult=0.7,
+								  enemy_speed_mult=2.0, enemy_magic_mult=1.0, boss_hp_mult=1.7)
+		for i in range(50):
+			offset = ENEMY_STATS.offset + i * 32
+			hp = struct.unpack_from('<H', expected, offset)[0]
+			struct.pack_into('<H', expected, offset, min(65535, int(hp * config.enemy_hp_mult)))
+			for field, mult in ((2, 1.3), (3, 0.7), (4, 2.0), (5, 1.0)):
+				expected[offset + field] = min(255, int(expected[offset + field] * mult))
+			if i >= 30:
+				hp = struct.unpack_from('<H', expected, offset)[0]
+				struct.pack_into('<H', expected, offset, min(65535, int(hp * 1.7)))
+
+		adjuster = DifficultyAdjuster()
+		adjuster.rom_data, adjuster.config = rom, config
+		adjuster._modify_enemy_stats()
+		adjuster._modify_boss_stats()
+		self.assertEqual(rom, expected)
+
+	def test_battle_editor_round_trip(self):
+		editor = BattleEditor()
+		editor.rom_data = random_rom()
+		original = bytes(editor.rom_data)
+		editor.extract_battle_system()
+		self.assertEqual(len(editor.battle_system.elemental_modifiers), 25)
+		editor.insert_battle_system()
+		self.assertEqual(bytes(editor.rom_data), original)
+
+
+class TestExchange(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.dir = Path(self.tmp.name)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_round_trips(self):
+		source = random_rom(seed=1)
+		for table in TABLES.values():
+			view = table.view(source)
+			rows = to_rows(view)
+			self.assertNotEqual(to_rows(table.view(random_rom(seed=2))), rows)
+			for name, export, load in (('csv', to_csv, from_csv), ('json', to_json, from_json)):
+				path = self.dir / f"{table.name}.{name}"
+				export(view, path)
+				target = random_rom(seed=2)
+				load(table.view(target), path)
+				self.assertEqual(to_rows(table.view(target)), rows, f"{table.name} {name}")
+
+			target = random_rom(seed=3)
+			from_dataframe(table.view(target), to_dataframe(view))
+			self.assertEqual(to_rows(table.view(target)), rows, table.name)
+
+	def test_partial_import_and_validation(self):
+		rom = random_rom()
+		enemies = ENEMY_STATS.view(rom)
+		before = enemies.copy()
+		frame = to_dataframe(enemies)[['hp']].iloc[[4, 9]]
+		frame['hp'] = [7, 8]
+		from_dataframe(enemies, frame)
+		self.assertEqual(enemies['hp'][[4, 9]].tolist(), [7, 8])
+		self.assertEqual(enemies['attack'].tolist(), before['attack'].tolist())
+
+		frame['hp'] = [7, 70000]
+		with self.assertRaises(ValueError):
+			from_dataframe(enemies, frame)
+		self.assertEqual(enemies['hp'][9], 8)				# Nothing written on error
+
+		scale(enemies, {'attack': 10.0}, limits={'attack': (0, 99)})
+		self.assertLessEqual(int(enemies['attack'].max()), 99)
+
+
+if __name__ == '__main__':
+	unittest.main()
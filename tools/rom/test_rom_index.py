@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+ROM Suffix Index - Test Suite
+
+Compares the suffix/LCP index against brute-force references on small
+random inputs, and checks the printable-run string finders.
+
+Usage:
+	python test_rom_index.py
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rom_index import ROMIndex, build_suffix_array
+from rom_statistics import find_printable_runs
+from compression import LZSSCompressor
+
+
+def common_prefix(a: bytes, b: bytes) -> int:
+	"""Length of the common prefix of two byte strings"""
+	length = 0
+	while length < min(len(a), len(b)) and a[length] == b[length]:
+		length += 1
+	return length
+
+
+class TestSuffixArray(unittest.TestCase):
+	"""Test suffix array and LCP construction"""
+
+	def test_matches_naive_sort(self):
+		"""Test against sorted() over all suffixes"""
+		rng = np.random.default_rng(7)
+		for _ in range(50):
+			data = bytes(rng.integers(0, 3, int(rng.integers(1, 120)), dtype=np.uint8))
+			sa, lcp = build_suffix_array(data)
+
+			self.assertEqual(sa.tolist(), sorted(range(len(data)), key=lambda i: data[i:]))
+			self.assertEqual(lcp[0], 0)
+			for r in range(1, len(data)):
+				self.assertEqual(lcp[r], common_prefix(data[sa[r - 1]:], data[sa[r]:]))
+
+	def test_long_run(self):
+		"""Test filler runs that need many doubling passes"""
+		data = b"\xFF" * 1000 + b"\x00" + b"\xFF" * 10
+		sa, lcp = build_suffix_array(data)
+		self.assertEqual(sa.tolist(), sorted(range(len(data)), key=lambda i: data[i:]))
+		self.assertEqual(int(lcp.max()), 999)
+
+	def test_empty(self):
+		"""Test empty input"""
+		sa, lcp = build_suffix_array(b"")
+		self.assertEqual(sa.size, 0)
+		self.assertEqual(lcp.size, 0)
+
+
+class TestROMIndex(unittest.TestCase):
+	"""Test index queries"""
+
+	def setUp(self):
+		rng = np.random.default_rng(42)
+		data = bytearray(rng.integers(0, 4, 400, dtype=np.uint8).tobytes())
+		data[300:340] = data[50:90]
+		self.data = bytes(data)
+		self.index = ROMIndex(self.data)
+
+	def test_find(self):
+		"""Test all occurrences of a pattern are found"""
+		for pattern in (self.data[10:13], self.data[60:80], b"\x09\x09"):
+			expected = [i for i in range(len(self.data)) if self.data.startswith(pattern, i)]
+			self.assertEqual(self.index.find(pattern).tolist(), expected)
+			self.assertEqual(self.index.count(pattern), len(expected))
+
+	def test_repeats(self):
+		"""Test repeat groups contain identical data"""
+		repeats = self.index.find_repeats(20)
+		self.assertTrue(any(r.length >= 40 and {50, 300} <= set(r.offsets.tolist()) for r in repeats))
+
+		for repeat in repeats:
+			first = repeat.offsets[0]
+			for offset in repeat.offsets:
+				self.assertEqual(self.data[offset:offset + repeat.length],
+								 self.data[first:first + repeat.length])
+
+	def test_nested_repeats(self):
+		"""Test repeats on nested LCP intervals are all reported"""
+		index = ROMIndex(b"xABCDEFGHy" + b"zABCDEFGHw" + b"qABCDr")
+		found = {(r.length, tuple(r.offsets.tolist())) for r in index.find_repeats(4)}
+		self.assertEqual(found, {(8, (1, 11)), (4, (1, 11, 21))})
+
+		# A fill run is one repeat, tiled back to back
+		index = ROMIndex(b"\x01" + b"\xFF" * 12 + b"\x02")
+		self.assertEqual([(r.length, r.offsets.tolist()) for r in index.find_repeats(4)], [(4, [1, 5, 9])])
+
+	def test_periodic_runs_collapse(self):
+		"""Test long periodic runs give a bounded number of groups"""
+		rng = np.random.default_rng(5)
+		data = bytearray(rng.integers(0, 256, 1 << 16, dtype=np.uint8).tobytes())
+		data[1000:21000] = b"\xFF" * 20000
+		data[30000:36000] = b"\x12\x34\x56" * 2000
+		data[40000:40016] = b"\xFF" * 16					# Also inside the fill run
+		data[50000:50100] = data[60000:60100]
+		index = ROMIndex(bytes(data))
+
+		self.assertEqual(index.periodic_runs(16), [(1000, 21000, 1), (30000, 36000, 3)])
+		repeats = index.find_repeats(16)
+		self.assertLess(len(repeats), 10)
+		self.assertLess(sum(r.count for r in repeats), len(data))		# Linear in the run, not quadratic
+		found = {(r.length, r.offsets[0], r.count) for r in repeats}
+		self.assertIn((16, 1000, 1250), found)
+		self.assertIn((18, 30000, 333), found)
+		self.assertIn((100, 50000, 2), found)
+		for repeat in repeats:
+			first = repeat.offsets[0]
+			for offset in repeat.offsets:
+				self.assertEqual(data[offset:offset + repeat.length], data[first:first + repeat.length])
+
+	def test_longest_previous_match(self):
+		"""Test LZ match source against brute force"""
+		for position in range(0, len(self.data), 7):
+			best = max([common_prefix(self.data[j:], self.data[position:])
+						for j in range(max(0, position - 32), position)] or [0])
+			source, length = self.index.longest_previous_match(position, window=32)
+
+			self.assertEqual(length, best)
+			if length:
+				self.assertLess(source, position)
+				self.assertEqual(self.data[source:source + length],
+								 self.data[position:position + length])
+
+	def test_cache_round_trip(self):
+		"""Test index cache keyed by ROM hash"""
+		with tempfile.TemporaryDirectory() as tmp:
+			first = ROMIndex.load_or_build(self.data, Path(tmp))
+			second = ROMIndex.load_or_build(self.data, Path(tmp))
+			self.assertEqual(first.sa.tolist(), second.sa.tolist())
+			self.assertEqual(first.lcp.tolist(), second.lcp.tolist())
+
+	def test_lzss_with_index(self):
+		"""Test LZSS output is unchanged in size and decodes with an index"""
+		data = bytes(b % 0x7F for b in self.data * 3)
+		compressor = LZSSCompressor()
+		packed = compressor.compress(data, ROMIndex(data))
+
+		self.assertEqual(len(packed), len(compressor.compress(data)))
+		self.assertEqual(compressor.decompress(packed), data)
+
+
+class TestPrintableRuns(unittest.TestCase):
+	"""Test vectorized string detection"""
+
+	def test_runs(self):
+		"""Test runs of printable ASCII"""
+		data = b"\x00HELLO\x01AB\x02WORLD!"
+		starts, ends = find_printable_runs(data, 4)
+		self.assertEqual([data[s:e] for s, e in zip(starts, ends)], [b"HELLO", b"WORLD!"])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ROM Search - Test Suite
+
+Checks vectorized searches against struct-based reference scans.
+
+Usage:
+	python test_rom_search.py
+"""
+
+import sys
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rom_search import ROMSearch, parse_masked_pattern
+
+
+class TestROMSearch(unittest.TestCase):
+	"""Test search queries"""
+
+	def setUp(self):
+		rng = np.random.default_rng(99)
+		self.data = bytearray(rng.integers(0, 16, 0x4000, dtype=np.uint8).tobytes())
+		self.data[0x100:0x105] = b"\xA9\x42\x8D\x00\x21"
+		self.data[0x200:0x203] = b"\x34\x92\x0C"	# 24-bit pointer to $0C9234
+		self.search = ROMSearch(self.data)
+
+	def test_values_every_alignment(self):
+		"""Test value views match struct.unpack_from"""
+		for width, fmt in ((2, '<H'), (4, '<I')):
+			values = self.search.values(width)
+			self.assertEqual(len(values), len(self.data) - width + 1)
+			for offset in (0, 1, 2, 3, 777, len(values) - 1):
+				self.assertEqual(values[offset], struct.unpack_from(fmt, self.data, offset)[0])
+
+	def test_find_value(self):
+		"""Test 16-bit search matches a reference scan"""
+		expected = [i for i in range(len(self.data) - 1)
+					if struct.unpack_from('<H', self.data, i)[0] == 0x0102]
+		self.assertEqual(self.search.find_value(0x0102, 2).tolist(), expected)
+
+	def test_masked(self):
+		"""Test wildcard patterns"""
+		self.assertEqual(parse_masked_pattern("A9 ?? 8D"), (b"\xA9\x00\x8D", b"\xFF\x00\xFF"))
+		self.assertIn(0x100, self.search.find_masked("A9 ?? 8D ?? 2?").tolist())
+
+	def test_cache_invalidated_by_edit(self):
+		"""Test edits through the shared buffer are seen after invalidate()"""
+		self.assertEqual(self.search.find_bytes(b"\xEE\xEE\xEE").tolist(), [])
+		self.data[0x300:0x303] = b"\xEE\xEE\xEE"
+		self.search.invalidate()
+		self.assertEqual(self.search.find_bytes(b"\xEE\xEE\xEE").tolist(), [0x300])
+
+	def test_hex_editor_edits(self):
+		"""Test hex editor edits, undo and overlapping replaces reach the search"""
+		from hex_editor import HexEditor
+
+		editor = HexEditor(bytes(self.data))
+		self.assertEqual(editor.search(b"\xEE\xEE\xEE"), [])
+		editor.edit_bytes(0x300, b"\xEE\xEE\xEE\xEE")
+		self.assertEqual(editor.search(b"\xEE\xEE\xEE"), [0x300, 0x301])
+
+		# Every match is replaced, including ones overlapping an earlier replacement
+		self.assertEqual(editor.replace(b"\xEE\xEE\xEE", b"\xDD\xDD\xEE"), 2)
+		self.assertEqual(bytes(editor.data[0x300:0x304]), b"\xDD\xDD\xDD\xEE")
+		self.assertEqual(editor.search(b"\xEE\xEE\xEE"), [])
+
+		editor.undo()
+		editor.undo()
+		self.assertEqual(editor.search(b"\xEE\xEE\xEE"), [0x300, 0x301])
+
+	def test_relative(self):
+		"""Test relative search finds shifted encodings"""
+		self.data[0x800:0x804] = bytes([0x40, 0x41, 0x42, 0x43])
+		self.assertIn(0x800, self.search.find_relative(b"ABCD").tolist())
+
+	def test_find_changed(self):
+		"""Test snapshot delta search"""
+		after = bytearray(self.data)
+		after[0x10] = (after[0x10] + 3) & 0xFF
+		self.assertEqual(self.search.find_changed(after, 3).tolist(), [0x10])
+
+	def test_long_pointers(self):
+		"""Test 24-bit pointers into a range"""
+		offsets, targets = self.search.find_long_pointers(0x0C9000, 0x0C9FFF)
+		self.assertIn(0x200, offsets.tolist())
+		self.assertEqual(targets[offsets.tolist().index(0x200)], 0x0C9234)
+
+	def test_find_many(self):
+		"""Test multi-pattern search through the suffix index"""
+		patterns = [bytes(self.data[i:i + 3]) for i in (5, 50, 500)]
+		results = self.search.find_many(patterns)
+		for pattern in patterns:
+			self.assertEqual(results[pattern].tolist(), self.search.find_bytes(pattern).tolist())
+
+	def test_memory_mapped(self):
+		"""Test searching a memory-mapped ROM file"""
+		with tempfile.TemporaryDirectory() as tmp:
+			path = Path(tmp) / "test.sfc"
+			path.write_bytes(self.data)
+			search = ROMSearch.open(path)
+			self.assertEqual(search.find_bytes(b"\xA9\x42").tolist(),
+							 self.search.find_bytes(b"\xA9\x42").tolist())
+			del search
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+ROM Block Statistics - Test Suite
+
+Checks the vectorized kernel against straightforward per-block reference
+implementations.
+
+Usage:
+	python test_rom_statistics.py
+"""
+
+import sys
+import math
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rom_statistics import (
+	compute_block_statistics, shannon_entropy, tile_pattern_scores, BRR_HEADER_MASK
+)
+
+
+def reference_entropy(data: bytes) -> float:
+	"""Textbook Shannon entropy"""
+	if not data:
+		return 0.0
+	return -sum((c / len(data)) * math.log2(c / len(data)) for c in Counter(data).values())
+
+
+class TestBlockStatistics(unittest.TestCase):
+	"""Test per-block metrics"""
+
+	def setUp(self):
+		rng = np.random.default_rng(1234)
+		rom = bytearray(rng.integers(0, 256, 0x9000 + 100, dtype=np.uint8).tobytes())
+		rom[0x1000:0x2000] = bytes(0x1000)
+		rom[0x2000:0x3000] = (b"MYSTIC QUEST " * 400)[:0x1000]
+		self.rom = bytes(rom)
+
+	def test_entropy_matches_reference(self):
+		"""Test entropy and unique counts for every block"""
+		stats = compute_block_statistics(self.rom, 0x1000)
+		self.assertEqual(len(stats), 10)
+
+		for i, offset in enumerate(stats.offsets):
+			block = self.rom[offset:offset + 0x1000]
+			self.assertAlmostEqual(stats.entropy[i], reference_entropy(block), places=9)
+			self.assertEqual(stats.unique[i], len(set(block)))
+
+	def test_partial_tail_block(self):
+		"""Test trailing short block is included in non-overlapping mode"""
+		stats = compute_block_statistics(self.rom, 0x1000)
+		self.assertEqual(stats.offsets[-1], 0x9000)
+		self.assertEqual(stats.lengths[-1], 100)
+		self.assertEqual(stats.ends()[-1], len(self.rom))
+
+	def test_ratios(self):
+		"""Test printable and zero ratios"""
+		stats = compute_block_statistics(self.rom, 0x1000)
+		self.assertEqual(stats.zero_ratio[1], 1.0)
+		self.assertEqual(stats.unique[1], 1)
+		self.assertEqual(stats.printable_ratio[2], 1.0)
+
+	def test_sliding_window(self):
+		"""Test sliding windows at arbitrary stride"""
+		stats = compute_block_statistics(self.rom, 0x800, stride=0x300, keep_histograms=True)
+		expected = list(range(0, len(self.rom) - 0x800 + 1, 0x300))
+		self.assertEqual(stats.offsets.tolist(), expected)
+
+		for i in (0, 7, len(expected) - 1):
+			window = self.rom[expected[i]:expected[i] + 0x800]
+			self.assertAlmostEqual(stats.entropy[i], reference_entropy(window), places=9)
+			self.assertEqual(stats.histograms[i].tolist(),
+							 np.bincount(np.frombuffer(window, np.uint8), minlength=256).tolist())
+
+	def test_shannon_entropy(self):
+		"""Test single-buffer entropy"""
+		self.assertEqual(shannon_entropy(b""), 0.0)
+		self.assertAlmostEqual(shannon_entropy(bytes(range(256))), 8.0)
+		self.assertAlmostEqual(shannon_entropy(b"\x00\x01" * 8), 1.0)
+
+	def test_tile_pattern_score(self):
+		"""Test repeating 8-byte rows are detected"""
+		tiles = np.frombuffer(b"\x00\xFF\x81\x42\x24\x18\x00\x00" * 4 + bytes(range(32)), np.uint8)
+		# 4 identical rows + 4 distinct rows: 1 of 5 distinct rows repeats
+		self.assertAlmostEqual(tile_pattern_scores(tiles[None, :])[0], 0.2)
+
+	def test_brr_mask(self):
+		"""Test BRR header lookup table"""
+		self.assertTrue(BRR_HEADER_MASK[0x00])
+		self.assertTrue(BRR_HEADER_MASK[0xB3])
+		self.assertFalse(BRR_HEADER_MASK[0xFF])
+
+	def test_invalid_arguments(self):
+		"""Test invalid block sizes are rejected"""
+		with self.assertRaises(ValueError):
+			compute_block_statistics(self.rom, 0)
+		with self.assertRaises(ValueError):
+			compute_block_statistics(self.rom, 16, stride=-1)
+
+
+if __name__ == '__main__':
+	unittest.main()
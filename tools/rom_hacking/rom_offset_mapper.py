@@ -17,6 +17,7 @@ Usage:
 	python rom_offset_mapper.py --rom game.sfc
 	python rom_offset_mapper.py --rom game.sfc --export-csv mappings.csv
 	python rom_offset_mapper.py --rom game.sfc --pointer-table 0x0E/8000
+	python rom_offset_mapper.py --rom game.sfc --detect-tables --report tables.md
 	python rom_offset_mapper.py --rom game.sfc --validate docs/known_mappings.json
 """
 
@@ -26,11 +27,15 @@ import json
 import csv
 import re
 import struct
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+from pointer_scanner import PointerScanner
+
 
 class PointerType(Enum):
 	"""Types of pointer structures found in ROM"""
@@ -255,58 +260,39 @@ class ROMOffsetMapper:
 		"""
 		Scan ROM for pointer table patterns
 
+		Uses the whole-ROM pointer scanner (16/24-bit entries at every
+		alignment, ranked by target alignment). Entries are returned as
+		full 24-bit LoROM addresses so 16-bit tables resolve into the
+		bank their targets were inferred to live in.
+
 		Args:
 			min_entries: Minimum entries to consider valid table
-			max_entries: Maximum entries to scan
+			max_entries: Maximum entries to keep per table
 
 		Returns:
-			List of detected pointer tables
+			List of detected pointer tables, best first
 		"""
 		tables = []
 
 		if self.verbose:
 			print(f"\nScanning for pointer tables (min={min_entries}, max={max_entries})...")
 
-		# Scan ROM in chunks
-		for offset in range(0, self.rom_size - 0x100, 0x10):
-			# Look for sequences of 16-bit pointers
-			if offset + (max_entries * 2) > self.rom_size:
-				continue
-
-			# Check if this looks like a pointer table
-			# Heuristic: pointers should be in ascending order and within ROM bounds
-			pointers = []
-			for i in range(max_entries):
-				ptr_offset = offset + (i * 2)
-				if ptr_offset + 2 > self.rom_size:
-					break
-				ptr = struct.unpack_from('<H', self.rom_data, ptr_offset)[0]
-
-				# Sanity checks
-				if ptr < 0x8000 or ptr >= 0xFFFF:
-					break
-				if pointers and ptr < pointers[-1]:
-					break
-
-				pointers.append(ptr)
-
-				# Stop if we have enough
-				if len(pointers) >= max_entries:
-					break
-
-			# Valid table?
-			if len(pointers) >= min_entries:
-				table = PointerTable(
-					rom_offset=offset,
-					entry_count=len(pointers),
-					entry_size=2,
-					pointer_type=PointerType.INDEXED,
-					base_address=0x8000,
-					entries=pointers
-				)
-				tables.append(table)
-				if self.verbose:
-					print(f"  Found table at 0x{offset:06X} with {len(pointers)} entries")
+		scanner = PointerScanner(self.rom_data, min_entries=min_entries)
+
+		for candidate in scanner.scan():
+			entries = candidate.pointer_values()[:max_entries]
+			table = PointerTable(
+				rom_offset=candidate.offset,
+				entry_count=len(entries),
+				entry_size=candidate.entry_size,
+				pointer_type=PointerType.INDEXED,
+				base_address=0,
+				entries=entries
+			)
+			tables.append(table)
+			if self.verbose:
+				print(f"  Found table at 0x{candidate.offset:06X} with {len(entries)} entries "
+					  f"(bank ${candidate.target_bank:02X}, {candidate.profile}, score {candidate.score:.2f})")
 
 		return tables
 
@@ -678,6 +664,7 @@ def main():
 	parser.add_argument('--export-csv', type=Path, help='Export mappings to CSV file')
 	parser.add_argument('--report', type=Path, help='Generate Markdown report')
 	parser.add_argument('--pointer-table', type=str, help='Pointer table address (0xBB/OOOO format)')
+	parser.add_argument('--detect-tables', action='store_true', help='Discover pointer tables across the whole ROM')
 	parser.add_argument('--validate', type=Path, help='Validate against known mappings (JSON file)')
 	parser.add_argument('--scan-start', type=lambda x: int(x, 0), default=0, help='Start offset for ROM scan')
 	parser.add_argument('--scan-end', type=lambda x: int(x, 0), help='End offset for ROM scan')
@@ -704,6 +691,12 @@ def main():
 			print(f"Invalid pointer table format: {args.pointer_table}")
 			return 1
 
+	# Discover pointer tables
+	if args.detect_tables:
+		for table in mapper.detect_pointer_tables():
+			mapper.pointer_tables.append(table)
+			mapper.mappings.extend(mapper.map_from_pointer_table(table, f"TBL{table.rom_offset:06X}"))
+
 	# Scan ROM for patterns
 	mapper.mappings.extend(mapper.scan_for_dialogs(args.scan_start, args.scan_end))
 
@@ -524,6 +524,11 @@ class SRAMEditor:
 		offset = slot_id * self.SLOT_SIZE
 		self.data[offset:offset + self.SLOT_SIZE] = slot_data
 	
+	def slot_records(self):
+		"""All slots as NumPy records over self.data (sram_corpus.SRAM_SLOTS, writes go through)"""
+		from sram_corpus import SRAM_SLOTS
+		return SRAM_SLOTS.view(self.data)
+	
 	def calculate_checksum(self, slot_data: bytes) -> int:
 		"""Calculate checksum for slot data (sum of bytes 0x06 onwards)"""
 		return sum(slot_data[6:]) & 0xFFFF
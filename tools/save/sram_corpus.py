@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+FFMQ SRAM Corpus - Bulk save file analysis
+
+SRAMEditor.parse_slot builds nested dataclasses one field at a time,
+which is right for editing one save and slow for thousands. This module
+declares the slot layout once as a NumPy structured dtype (a RecordTable
+over the 9 slots of an .srm, offsets taken from SRAMEditor) and reads a
+whole corpus with array operations:
+
+	corpus = SRAMCorpus.from_paths(Path('saves').glob('*.srm'))
+	frame = corpus.to_dataframe()			# One row per slot, every file
+	chests = corpus.flag_bits('chests')		# slots x 256 bool
+
+SRAMCorpus.view(i) memory-maps one file and returns a zero-copy record
+view of its slots. Corpus-wide work runs on one stacked slots x 908 byte
+matrix, filled one mapped file at a time (so only one file is open at
+once): checksums are a row sum, 24-bit fields are assembled from byte
+columns and flag bitfields go through np.unpackbits.
+
+Features:
+- Checksums for every slot at once (calculate_checksums)
+- Per-slot columns matching parse_slot: characters, party, inventory
+  counts, flag and monster book counts, battle and item statistics
+- Flag bit matrices for story, chest, NPC, battlefield, Focus Tower and
+  monster book flags
+- Files of the wrong size are skipped and listed, not fatal
+- CSV export, pandas DataFrame on demand
+
+Usage:
+	python sram_corpus.py saves/ --summary
+	python sram_corpus.py saves/*.srm --output slots.csv
+	python sram_corpus.py saves/ --in-use --output slots.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+
+from ffmq_sram_editor_enhanced import ACCESSORIES, ARMOR, ITEMS, WEAPONS, SRAMEditor
+from record_tables import RecordTable
+
+
+E = SRAMEditor
+
+ITEM_PAIR = np.dtype([('id', 'u1'), ('count', 'u1')])
+U24 = ('u1', (3,))
+
+CHARACTER = np.dtype({
+	'names': ['name', 'level', 'experience', 'hp', 'max_hp', 'status',
+			  'attack', 'defense', 'speed', 'magic', 'base_attack', 'base_defense', 'base_speed', 'base_magic',
+			  'weapon_count', 'weapon_id', 'armor_id', 'helmet_id', 'shield_id', 'accessory1_id', 'accessory2_id',
+			  'spells', 'flags', 'battle_count',
+			  'poison_resist', 'paralysis_resist', 'petrify_resist', 'fatal_resist'],
+	'formats': ['S8', 'u1', U24, '<u2', '<u2', 'u1'] + ['u1'] * 8 + ['u1'] * 7 + ['<u2', 'u1', 'u1'] + ['u1'] * 4,
+	'offsets': [E.CHAR_NAME, E.CHAR_LEVEL, E.CHAR_EXP, E.CHAR_HP_CURRENT, E.CHAR_HP_MAX, E.CHAR_STATUS,
+				E.CHAR_CURRENT_ATTACK, E.CHAR_CURRENT_DEFENSE, E.CHAR_CURRENT_SPEED, E.CHAR_CURRENT_MAGIC,
+				E.CHAR_BASE_ATTACK, E.CHAR_BASE_DEFENSE, E.CHAR_BASE_SPEED, E.CHAR_BASE_MAGIC,
+				E.CHAR_WEAPON_COUNT, E.CHAR_WEAPON_ID, E.CHAR_ARMOR_ID, E.CHAR_HELMET_ID, E.CHAR_SHIELD_ID,
+				E.CHAR_ACCESSORY1_ID, E.CHAR_ACCESSORY2_ID, E.CHAR_SPELLS, E.CHAR_FLAGS, E.CHAR_BATTLE_COUNT,
+				E.CHAR_POISON_RESIST, E.CHAR_PARALYSIS_RESIST, E.CHAR_PETRIFY_RESIST, E.CHAR_FATAL_RESIST],
+	'itemsize': E.OFFSET_CHAR2 - E.OFFSET_CHAR1,
+})
+
+# Flag bitfields: (slot field, bits used)
+FLAGS = {
+	'story': ('story_flags', 256),
+	'chests': ('treasure_chests', 256),
+	'npcs': ('npc_flags', 128),
+	'battlefields': ('battlefield_flags', 128),
+	'focus_tower': ('focus_tower', 64),
+	'monster_book': ('monster_book', 83),
+}
+
+SRAM_SLOTS = RecordTable(
+	'sram_slots', 0, E.NUM_SLOTS, E.SLOT_SIZE,
+	[('signature', 'S4', 0), ('checksum', '<u2', E.OFFSET_CHECKSUM), ('characters', (CHARACTER, (2,)), E.OFFSET_CHAR1),
+	 ('gold', U24, E.OFFSET_GOLD), ('x', 'u1', E.OFFSET_POS_X), ('y', 'u1', E.OFFSET_POS_Y),
+	 ('facing', 'u1', E.OFFSET_FACING), ('map_id', 'u1', E.OFFSET_MAP_ID),
+	 ('play_time', ('u1', (3,)), E.OFFSET_PLAY_TIME), ('cure_count', 'u1', E.OFFSET_CURE_COUNT),
+	 ('consumables', (ITEM_PAIR, (16,)), E.OFFSET_INVENTORY), ('key_items', '<u2', E.OFFSET_KEY_ITEMS),
+	 ('weapons', (ITEM_PAIR, (15,)), E.OFFSET_WEAPONS_INV), ('armor', (ITEM_PAIR, (7,)), E.OFFSET_ARMOR_INV),
+	 ('accessories', (ITEM_PAIR, (3,)), E.OFFSET_ACCESSORIES_INV),
+	 ('story_flags', ('u1', (32,)), E.OFFSET_STORY_FLAGS), ('treasure_chests', ('u1', (32,)), E.OFFSET_TREASURE_CHESTS),
+	 ('npc_flags', ('u1', (16,)), E.OFFSET_NPC_FLAGS), ('battlefield_flags', ('u1', (16,)), E.OFFSET_BATTLEFIELD_FLAGS),
+	 ('focus_tower', ('u1', (8,)), E.OFFSET_FOCUS_TOWER),
+	 ('battles', '<u2', E.OFFSET_BATTLE_STATS), ('battles_won', '<u2', E.OFFSET_BATTLE_STATS + 2),
+	 ('battles_fled', '<u2', E.OFFSET_BATTLE_STATS + 4), ('damage_dealt', U24, E.OFFSET_BATTLE_STATS + 6),
+	 ('damage_taken', U24, E.OFFSET_BATTLE_STATS + 9), ('healing', U24, E.OFFSET_BATTLE_STATS + 12),
+	 ('monster_book', ('u1', (32,)), E.OFFSET_MONSTER_BOOK),
+	 ('items_collected', '<u2', E.OFFSET_ITEM_STATS), ('items_used', '<u2', E.OFFSET_ITEM_STATS + 2),
+	 ('equipment_changes', '<u2', E.OFFSET_ITEM_STATS + 4)],
+	"SRAM save slots (3 slots x 3 copies), as parsed by SRAMEditor.parse_slot")
+
+
+def calculate_checksums(slots: np.ndarray) -> np.ndarray:
+	"""SRAMEditor.calculate_checksum for every row of a slots x SLOT_SIZE byte matrix"""
+	return (slots[:, 6:].sum(axis=1, dtype=np.uint32) & 0xFFFF).astype(np.uint16)
+
+
+def u24(values: np.ndarray) -> np.ndarray:
+	"""Little-endian 24-bit integers from (..., 3) bytes"""
+	values = values.astype(np.int64)
+	return values[..., 0] | (values[..., 1] << 8) | (values[..., 2] << 16)
+
+
+def bits(values: np.ndarray, count: int) -> np.ndarray:
+	"""First `count` flags of (..., bytes) bitfields, bit 0 of byte 0 first"""
+	return np.unpackbits(values, axis=-1, bitorder='little')[..., :count].astype(bool)
+
+
+def _known(pairs: np.ndarray, ids: Iterable[int]) -> np.ndarray:
+	"""Entries parse_inventory keeps: known ID, nonzero count"""
+	return np.isin(pairs['id'], list(ids)) & (pairs['count'] > 0)
+
+
+@dataclass
+class SRAMCorpus:
+	"""A set of .srm files and their stacked slots"""
+	paths: List[Path]
+	rejected: List[Tuple[Path, str]] = field(default_factory=list)
+	_raw: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+	@classmethod
+	def from_paths(cls, paths: Iterable[Path]) -> 'SRAMCorpus':
+		"""Files of the right size (directories are searched for *.srm)"""
+		files, rejected = [], []
+		for path in paths:
+			path = Path(path)
+			for file in sorted(path.glob('*.srm')) if path.is_dir() else [path]:
+				size = file.stat().st_size
+				if size != E.SRAM_SIZE:
+					rejected.append((file, f"{size} bytes (expected {E.SRAM_SIZE})"))
+					continue
+				files.append(file)
+		return cls(files, rejected)
+
+	def __len__(self) -> int:
+		return len(self.paths)
+
+	def view(self, index: int) -> np.ndarray:
+		"""Zero-copy slot records of one file"""
+		return SRAM_SLOTS.view(np.memmap(self.paths[index], dtype=np.uint8, mode='r'))
+
+	@property
+	def raw(self) -> np.ndarray:
+		"""All slots as one (files x 9) x SLOT_SIZE byte matrix"""
+		if self._raw is None:
+			raw = np.empty((len(self.paths) * E.NUM_SLOTS, E.SLOT_SIZE), dtype=np.uint8)
+			for index, path in enumerate(self.paths):
+				mapped = np.memmap(path, dtype=np.uint8, mode='r')
+				raw[index * E.NUM_SLOTS:(index + 1) * E.NUM_SLOTS] = mapped.reshape(E.NUM_SLOTS, E.SLOT_SIZE)
+				del mapped
+			self._raw = raw
+		return self._raw
+
+	@property
+	def records(self) -> np.ndarray:
+		"""All slots as SRAM_SLOTS records (over raw)"""
+		return self.raw.reshape(-1).view(SRAM_SLOTS.dtype)
+
+	def in_use(self) -> np.ndarray:
+		return self.records['signature'] == E.SIGNATURE
+
+	def checksum_valid(self) -> np.ndarray:
+		return calculate_checksums(self.raw) == self.records['checksum']
+
+	def flag_bits(self, name: str) -> np.ndarray:
+		"""slots x bits bool matrix for one of FLAGS"""
+		column, count = FLAGS[name]
+		return bits(self.records[column], count)
+
+	def columns(self) -> Dict[str, np.ndarray]:
+		"""One column per slot field; values as parse_slot reports them"""
+		records = self.records
+		files = np.repeat(np.arange(len(self.paths)), E.NUM_SLOTS)
+		in_use = self.in_use()
+		play_time = records['play_time'].astype(np.int64)
+		columns = {
+			'file': np.array([str(path) for path in self.paths], dtype=object)[files] if len(files) else files,
+			'slot': np.tile(np.arange(E.NUM_SLOTS), len(self.paths)),
+			'in_use': in_use,
+			'valid': in_use & self.checksum_valid(),
+			'checksum': records['checksum'].astype(np.int64),
+			'gold': u24(records['gold']),
+			'map_id': records['map_id'].astype(np.int64),
+			'x': records['x'].astype(np.int64),
+			'y': records['y'].astype(np.int64),
+			'facing': records['facing'].astype(np.int64),
+			'play_seconds': play_time[:, 0] * 3600 + play_time[:, 1] * 60 + play_time[:, 2],
+			'cure_count': records['cure_count'].astype(np.int64),
+		}
+
+		for index, prefix in enumerate(('character1', 'character2')):
+			character = records['characters'][:, index]
+			columns[f'{prefix}_name'] = np.char.decode(character['name'], 'ascii', errors='replace').astype(object)
+			columns[f'{prefix}_experience'] = u24(character['experience'])
+			for name in ('level', 'hp', 'max_hp', 'status', 'attack', 'defense', 'speed', 'magic',
+						 'base_attack', 'base_defense', 'base_speed', 'base_magic', 'weapon_id', 'armor_id',
+						 'accessory1_id', 'accessory2_id', 'battle_count'):
+				columns[f'{prefix}_{name}'] = character[name].astype(np.int64)
+			spells = bits(character['spells'].astype('<u2').view(np.uint8).reshape(-1, 2), 12)
+			columns[f'{prefix}_spells'] = spells.sum(axis=1)
+			columns[f'{prefix}_in_party'] = (character['flags'] & 0x01).astype(bool)
+			columns[f'{prefix}_available'] = (character['flags'] & 0x02).astype(bool)
+
+		columns['consumables'] = _known(records['consumables'], ITEMS).sum(axis=1)
+		columns['key_items'] = bits(records['key_items'].astype('<u2').view(np.uint8).reshape(-1, 2), 16).sum(axis=1)
+		# parse_inventory keys equipment by ID, so repeated IDs count once
+		for name, known in (('weapons', WEAPONS), ('armor', ARMOR), ('accessories', ACCESSORIES)):
+			pairs = records[name]
+			keep = _known(pairs, known)
+			present = np.zeros((len(records), 256), dtype=bool)
+			rows, slots = np.nonzero(keep)
+			present[rows, pairs['id'][rows, slots]] = True
+			columns[name] = present.sum(axis=1)
+
+		for name in FLAGS:
+			columns[name] = self.flag_bits(name).sum(axis=1)
+
+		for name in ('battles', 'battles_won', 'battles_fled', 'items_collected', 'items_used', 'equipment_changes'):
+			columns[name] = records[name].astype(np.int64)
+		for name in ('damage_dealt', 'damage_taken', 'healing'):
+			columns[name] = u24(records[name])
+		return columns
+
+	def to_dataframe(self, in_use_only: bool = False):
+		import pandas as pd
+		frame = pd.DataFrame(self.columns())
+		return frame[frame['in_use']].reset_index(drop=True) if in_use_only else frame
+
+	def to_csv(self, path: Path, in_use_only: bool = False) -> int:
+		columns = self.columns()
+		keep = columns['in_use'] if in_use_only else np.ones(len(columns['slot']), dtype=bool)
+		names = list(columns)
+		with open(path, 'w', newline='') as f:
+			writer = csv.writer(f)
+			writer.writerow(names)
+			writer.writerows(zip(*(columns[name][keep].tolist() for name in names)))
+		return int(keep.sum())
+
+
+def print_summary(corpus: SRAMCorpus) -> None:
+	columns = corpus.columns()
+	in_use, valid = columns['in_use'], columns['valid']
+	print(f"\n=== SRAM Corpus ({len(corpus):,} files, {len(in_use):,} slots) ===\n")
+	print(f"Slots in use:     {in_use.sum():,}")
+	print(f"Valid checksums:  {valid.sum():,}")
+	print(f"Bad checksums:    {(in_use & ~valid).sum():,}")
+	if corpus.rejected:
+		print(f"Rejected files:   {len(corpus.rejected):,}")
+		for path, reason in corpus.rejected[:10]:
+			print(f"  {path}: {reason}")
+	if not valid.any():
+		return
+
+	print(f"\n{'Valid slots':<22} {'Mean':>10} {'Median':>10} {'Max':>10}")
+	print("=" * 55)
+	for name in ('character1_level', 'gold', 'play_seconds', 'key_items', 'chests', 'story', 'battlefields',
+				 'focus_tower', 'monster_book', 'battles'):
+		values = columns[name][valid]
+		print(f"{name:<22} {values.mean():>10.1f} {np.median(values):>10.1f} {values.max():>10}")
+
+	opened = corpus.flag_bits('chests')[valid].mean(axis=0)
+	rarest = np.argsort(opened, kind='stable')[:5]
+	print("\nLeast-opened chests: " + ', '.join(f"{chest} ({opened[chest]:.0%})" for chest in rarest))
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ SRAM Corpus')
+	parser.add_argument('paths', nargs='+', type=Path, help='.srm files or directories of them')
+	parser.add_argument('--summary', action='store_true', help='Print corpus statistics')
+	parser.add_argument('--output', type=Path, help='Write one CSV row per slot')
+	parser.add_argument('--in-use', action='store_true', help='Only slots with a save signature')
+
+	args = parser.parse_args()
+
+	started = time.perf_counter()
+	corpus = SRAMCorpus.from_paths(args.paths)
+	if not len(corpus):
+		print("No SRAM files found")
+		return 1
+
+	if args.output:
+		count = corpus.to_csv(args.output, args.in_use)
+		print(f"✓ Wrote {count:,} slots from {len(corpus):,} files to {args.output} "
+			  f"in {time.perf_counter() - started:.2f}s")
+
+	if args.summary or not args.output:
+		print_summary(corpus)
+
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
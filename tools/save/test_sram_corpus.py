@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+SRAM Corpus - Test Suite
+
+Checks the bulk columns against SRAMEditor.parse_slot slot by slot,
+vectorized checksums against calculate_checksum, zero-copy file views,
+and rejection of files with the wrong size.
+
+Usage:
+	python test_sram_corpus.py
+"""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_sram_editor_enhanced import SRAMEditor
+from sram_corpus import SRAM_SLOTS, SRAMCorpus, calculate_checksums
+
+
+def random_sram(rng: np.random.Generator) -> bytes:
+	"""Random slots; most signed, most with a correct checksum"""
+	editor = SRAMEditor()
+	for slot_id in range(SRAMEditor.NUM_SLOTS):
+		data = bytearray(rng.integers(0, 256, SRAMEditor.SLOT_SIZE, dtype=np.uint8).tobytes())
+		if rng.random() < 0.8:
+			data[0:4] = SRAMEditor.SIGNATURE
+		for offset in (SRAMEditor.OFFSET_CHAR1, SRAMEditor.OFFSET_CHAR2):
+			name = rng.integers(0x41, 0x5B, 8, dtype=np.uint8)
+			name[rng.integers(3, 9):] = 0
+			data[offset:offset + 8] = name.tobytes()
+		if rng.random() < 0.5:
+			for pair in range(16):				# Known consumables, some repeated
+				data[SRAMEditor.OFFSET_INVENTORY + pair * 2] = rng.integers(0x0E, 0x15)
+			for pair in range(15):
+				data[SRAMEditor.OFFSET_WEAPONS_INV + pair * 2] = rng.integers(0, 6)
+		if rng.random() < 0.9:
+			editor.fix_checksum(data)
+		editor.set_slot_data(slot_id, bytes(data))
+	return bytes(editor.data)
+
+
+def write_corpus(folder: Path, files: int, seed: int = 0) -> None:
+	rng = np.random.default_rng(seed)
+	for index in range(files):
+		(folder / f"save{index:05d}.srm").write_bytes(random_sram(rng))
+
+
+class TestCorpus(unittest.TestCase):
+	def setUp(self):
+		self.temp = tempfile.TemporaryDirectory()
+		self.folder = Path(self.temp.name)
+
+	def tearDown(self):
+		self.temp.cleanup()
+
+	def test_columns_match_parse_slot(self):
+		write_corpus(self.folder, 12)
+		(self.folder / "short.srm").write_bytes(b'\x00' * 100)
+		corpus = SRAMCorpus.from_paths([self.folder])
+		self.assertEqual(len(corpus), 12)
+		self.assertEqual([path.name for path, _ in corpus.rejected], ["short.srm"])
+
+		columns = corpus.columns()
+		self.assertEqual(len(columns['slot']), 12 * 9)
+		checked = 0
+		for row in range(len(columns['slot'])):
+			editor = SRAMEditor.from_file(Path(columns['file'][row]))
+			slot_id = int(columns['slot'][row])
+			data = editor.get_slot_data(slot_id)
+			self.assertEqual(columns['in_use'][row], data[0:4] == SRAMEditor.SIGNATURE)
+			if not columns['in_use'][row]:
+				self.assertFalse(columns['valid'][row])
+				continue
+			slot = editor.parse_slot(slot_id)
+			expected = {
+				'valid': slot.valid, 'checksum': slot.checksum, 'gold': slot.gold, 'map_id': slot.map_id,
+				'x': slot.player_x, 'y': slot.player_y, 'facing': slot.player_facing, 'cure_count': slot.cure_count,
+				'play_seconds': slot.play_time_hours * 3600 + slot.play_time_minutes * 60 + slot.play_time_seconds,
+				'consumables': len(slot.inventory.consumables), 'key_items': len(slot.inventory.key_items),
+				'weapons': len(slot.inventory.weapons), 'armor': len(slot.inventory.armor),
+				'accessories': len(slot.inventory.accessories),
+				'story': len(slot.flags.story_flags), 'chests': len(slot.flags.treasure_chests),
+				'npcs': len(slot.flags.npc_flags), 'battlefields': len(slot.flags.battlefield_flags),
+				'focus_tower': len(slot.flags.focus_tower_floors),
+				'monster_book': len(slot.stats.enemies_encountered),
+				'battles': slot.stats.total_battles, 'battles_won': slot.stats.battles_won,
+				'battles_fled': slot.stats.battles_fled, 'damage_dealt': slot.stats.total_damage_dealt,
+				'damage_taken': slot.stats.total_damage_taken, 'healing': slot.stats.total_healing,
+				'items_collected': slot.stats.items_collected, 'items_used': slot.stats.items_used,
+				'equipment_changes': slot.stats.equipment_changes,
+			}
+			for prefix, character in (('character1', slot.character1), ('character2', slot.character2)):
+				expected.update({
+					f'{prefix}_name': character.name, f'{prefix}_level': character.level,
+					f'{prefix}_experience': character.experience, f'{prefix}_hp': character.current_hp,
+					f'{prefix}_max_hp': character.max_hp, f'{prefix}_attack': character.current_attack,
+					f'{prefix}_base_magic': character.base_magic, f'{prefix}_weapon_id': character.weapon_id,
+					f'{prefix}_armor_id': character.equipment.armor_id,
+					f'{prefix}_spells': len(character.learned_spells),
+					f'{prefix}_in_party': character.in_party, f'{prefix}_available': character.available,
+				})
+			self.assertEqual({name: columns[name][row] for name in expected}, expected)
+			self.assertEqual(set(np.flatnonzero(corpus.flag_bits('chests')[row])), slot.flags.treasure_chests)
+			checked += 1
+		self.assertGreater(checked, 50)
+		self.assertLess(columns['valid'].sum(), checked)			# Some bad checksums
+
+		frame = corpus.to_dataframe(in_use_only=True)
+		self.assertEqual(len(frame), checked)
+		self.assertEqual(corpus.to_csv(self.folder / 'slots.csv', in_use_only=True), checked)
+
+	def test_checksums_and_views(self):
+		write_corpus(self.folder, 3, seed=1)
+		corpus = SRAMCorpus.from_paths(sorted(self.folder.glob('*.srm')))
+		editor = SRAMEditor()
+		expected = [editor.calculate_checksum(bytes(row)) for row in corpus.raw]
+		self.assertEqual(calculate_checksums(corpus.raw).tolist(), expected)
+
+		view = corpus.view(1)
+		self.assertFalse(view.flags.owndata)
+		self.assertEqual(view.tobytes(), corpus.paths[1].read_bytes())
+
+		# The editor's own records write through to its buffer
+		editor = SRAMEditor.from_file(corpus.paths[0])
+		editor.slot_records()['gold'][4] = (0x40, 0x42, 0x0F)
+		gold = SRAMEditor.OFFSET_GOLD
+		self.assertEqual(int.from_bytes(editor.get_slot_data(4)[gold:gold + 3], 'little'), 1000000)
+		self.assertEqual(SRAM_SLOTS.dtype.itemsize, SRAMEditor.SLOT_SIZE)
+
+	def test_large_corpus(self):
+		template = random_sram(np.random.default_rng(2))
+		for index in range(2000):
+			(self.folder / f"save{index:05d}.srm").write_bytes(template)
+		started = time.perf_counter()
+		corpus = SRAMCorpus.from_paths([self.folder])
+		columns = corpus.columns()
+		self.assertLess(time.perf_counter() - started, 5.0)
+		self.assertEqual(len(columns['slot']), 18000)
+		np.testing.assert_array_equal(columns['gold'].reshape(2000, 9), np.tile(columns['gold'][:9], (2000, 1)))
+
+
+if __name__ == '__main__':
+	unittest.main()
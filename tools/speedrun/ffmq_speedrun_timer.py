@@ -25,12 +25,14 @@ Features:
 - Split customization
 - Comparison tracking
 - Statistics
+- Persistent attempt store (SQLite) with LiveSplit history import
 
 Usage:
 	python ffmq_speedrun_timer.py --splits splits.lss
 	python ffmq_speedrun_timer.py --create-splits my_splits.json
 	python ffmq_speedrun_timer.py --import splits.lss
 	python ffmq_speedrun_timer.py --statistics
+	python ffmq_speedrun_timer.py --store runs.db --import-lss splits.lss --statistics
 """
 
 import argparse
@@ -42,6 +44,8 @@ from dataclasses import dataclass, asdict, field
 from datetime import timedelta
 from enum import Enum
 
+from split_store import SplitStore, print_statistics as print_store_statistics
+
 
 class SplitState(Enum):
 	"""Split state"""
@@ -118,8 +122,9 @@ class SpeedrunTimer:
 		"Dark King"
 	]
 	
-	def __init__(self, verbose: bool = False):
+	def __init__(self, verbose: bool = False, store: Optional[SplitStore] = None):
 		self.verbose = verbose
+		self.store = store
 		self.splits: List[Split] = []
 		self.attempts: List[Attempt] = []
 		self.comparisons: Dict[str, Comparison] = {}
@@ -138,6 +143,11 @@ class SpeedrunTimer:
 		"""Create splits from names"""
 		self.splits = [Split(name=name) for name in split_names]
 		
+		if self.store is not None:
+			self.store.add_splits(split_names[len(self.store.names):])
+			for split, best in zip(self.splits, self.store.best_segments.tolist()):
+				split.best_segment = best if best == best else None
+		
 		if self.verbose:
 			print(f"✓ Created {len(self.splits)} splits")
 	
@@ -157,6 +167,8 @@ class SpeedrunTimer:
 			attempt_id=len(self.attempts) + 1,
 			timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
 		)
+		if self.store is not None:
+			self.current_attempt.attempt_id = self.store.begin_attempt(self.current_attempt.timestamp)
 		
 		# Set all splits to not started
 		for split in self.splits:
@@ -192,7 +204,12 @@ class SpeedrunTimer:
 		split.state = SplitState.COMPLETED
 		
 		# Check for gold split (best segment)
-		if split.best_segment is None or segment_time < split.best_segment:
+		if self.store is not None and self.current_attempt:
+			split.gold = self.store.record_split(self.current_attempt.attempt_id, self.current_split_index,
+												 segment_time)
+			if split.gold:
+				split.best_segment = segment_time
+		elif split.best_segment is None or segment_time < split.best_segment:
 			split.best_segment = segment_time
 			split.gold = True
 		else:
@@ -281,8 +298,13 @@ class SpeedrunTimer:
 		self.attempts.append(self.current_attempt)
 		
 		# Update PB if faster
-		pb = self.get_pb_time()
-		if pb is None or total_time < pb:
+		if self.store is not None:
+			new_pb = self.store.finish_attempt(self.current_attempt.attempt_id, total_time)
+		else:
+			pb = self.get_pb_time()
+			new_pb = pb is None or total_time < pb
+		
+		if new_pb:
 			self._update_pb()
 			
 			if self.verbose:
@@ -317,6 +339,9 @@ class SpeedrunTimer:
 	
 	def get_pb_time(self) -> Optional[float]:
 		"""Get PB total time"""
+		if self.store is not None:
+			return self.store.pb_time()
+		
 		completed_attempts = [a for a in self.attempts if a.completed]
 		
 		if not completed_attempts:
@@ -326,6 +351,9 @@ class SpeedrunTimer:
 	
 	def get_sum_of_best(self) -> float:
 		"""Get sum of best segments"""
+		if self.store is not None:
+			return self.store.sum_of_best()
+		
 		total = 0.0
 		
 		for split in self.splits:
@@ -423,6 +451,10 @@ class SpeedrunTimer:
 	
 	def print_statistics(self) -> None:
 		"""Print run statistics"""
+		if self.store is not None:
+			print_store_statistics(self.store)
+			return
+		
 		print(f"\n=== Statistics ===\n")
 		
 		completed = [a for a in self.attempts if a.completed]
@@ -453,11 +485,23 @@ def main():
 	parser.add_argument('--list', action='store_true', help='List splits')
 	parser.add_argument('--statistics', action='store_true',
 					   help='Show statistics')
+	parser.add_argument('--store', type=str, metavar='FILE',
+					   help='Attempt database (SQLite)')
+	parser.add_argument('--import-lss', type=str, metavar='FILE',
+					   help='Import LiveSplit attempt history into --store')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
 	
 	args = parser.parse_args()
 	
-	timer = SpeedrunTimer(verbose=args.verbose)
+	if args.import_lss and not args.store:
+		parser.error('--import-lss requires --store')
+	
+	store = SplitStore(Path(args.store)) if args.store else None
+	if store is not None and args.import_lss:
+		count = store.import_lss(Path(args.import_lss))
+		print(f"✓ Imported {count:,} attempts")
+	
+	timer = SpeedrunTimer(verbose=args.verbose, store=store)
 	
 	# Create default splits
 	if args.create_splits:
@@ -470,6 +514,8 @@ def main():
 		timer.import_json(Path(args.splits))
 	elif args.import_file:
 		timer.import_json(Path(args.import_file))
+	elif store is not None and store.names:
+		timer.create_splits(store.names)
 	else:
 		# Use default splits
 		timer.create_splits(timer.DEFAULT_SPLITS)
@@ -33,7 +33,7 @@ Usage:
 	python ffmq_speedrun_tools.py rom.sfc --analyze-route route.json
 	python ffmq_speedrun_tools.py rom.sfc --validate-skip "bone_dungeon_wall_clip"
 	python ffmq_speedrun_tools.py rom.sfc --calc-damage --enemy 15 --spell Thunder
-	python ffmq_speedrun_tools.py rom.sfc --export-route optimized.json
+	python ffmq_speedrun_tools.py rom.sfc --generate-route any% --export-route optimized.json
 	python ffmq_speedrun_tools.py rom.sfc --compare-splits wr.txt pb.txt
 """
 
@@ -168,28 +168,6 @@ class FFMQSpeedrunDatabase:
 			'requirements': ['Low HP', 'Enemy positioning']
 		},
 	}
-	
-	# Sample route segments
-	SAMPLE_SEGMENTS = [
-		{
-			'name': 'Hill of Destiny',
-			'objectives': ['Get sword', 'Fight Hydra'],
-			'time': 180,
-			'gold': 165
-		},
-		{
-			'name': 'Foresta',
-			'objectives': ['Kaeli quest', 'Flamerus Rex'],
-			'time': 420,
-			'gold': 390
-		},
-		{
-			'name': 'Aquaria',
-			'objectives': ['Phoebe quest', 'Ice Golem'],
-			'time': 360,
-			'gold': 330
-		},
-	]
 
 
 class FFMQSpeedrunTools:
@@ -261,42 +239,20 @@ class FFMQSpeedrunTools:
 		
 		return calc
 	
-	def generate_route(self, category: Category) -> SpeedrunRoute:
-		"""Generate optimal route for category"""
-		segments = []
+	def generate_route(self, category: Category, world_path: Optional[Path] = None,
+					   maps_path: Optional[Path] = None) -> SpeedrunRoute:
+		"""Generate optimal route for category (see route_optimizer.py)"""
+		from route_optimizer import RouteOptimizer, build_graph
 		
-		# Build segments from database
-		for i, seg_data in enumerate(FFMQSpeedrunDatabase.SAMPLE_SEGMENTS):
-			segment = RouteSegment(
-				segment_id=i,
-				name=seg_data['name'],
-				start_location=seg_data['name'],
-				end_location=f"After {seg_data['name']}",
-				objectives=seg_data['objectives'],
-				estimated_time=seg_data['time'],
-				gold_time=seg_data['gold'],
-				skips_used=[],
-				items_required=[],
-				boss_fights=[],
-				difficulty=5
-			)
-			segments.append(segment)
+		# Map sizes and door positions come from this ROM when regions are mapped
+		graph = build_graph(world_path, self.rom_path if maps_path else None, maps_path)
+		optimizer = RouteOptimizer(graph)
+		plan = optimizer.solve(category.value)
 		
-		total_time = sum(s.estimated_time for s in segments)
-		gold_time = sum(s.gold_time for s in segments)
-		
-		route = SpeedrunRoute(
-			category=category,
-			route_name=f"FFMQ {category.value} Route",
-			segments=segments,
-			total_estimated_time=total_time,
-			total_gold_time=gold_time,
-			difficulty_rating=6.5,
-			rng_dependence=0.3,
-			consistency_score=0.7
-		)
+		if self.verbose:
+			print(f"✓ Solved {category.value} route: {optimizer.expanded:,} states expanded")
 		
-		return route
+		return plan.to_route()
 	
 	def analyze_splits(self, splits: List[Split]) -> Dict[str, Any]:
 		"""Analyze run splits for optimization"""
@@ -338,6 +294,8 @@ def main():
 	parser.add_argument('--defender-defense', type=int, default=30, help='Defender defense')
 	parser.add_argument('--spell-power', type=int, default=0, help='Spell power (0=physical)')
 	parser.add_argument('--generate-route', type=str, help='Generate route (any%/100%/etc)')
+	parser.add_argument('--world', type=str, help='World JSON for --generate-route')
+	parser.add_argument('--region-maps', type=str, help='JSON {region: map_id} for ROM travel times')
 	parser.add_argument('--export-route', type=str, help='Export route to JSON')
 	parser.add_argument('--verbose', action='store_true', help='Verbose output')
 	
@@ -398,7 +356,8 @@ def main():
 		}
 		
 		category = category_map.get(args.generate_route.lower(), Category.ANY_PERCENT)
-		route = tools.generate_route(category)
+		route = tools.generate_route(category, Path(args.world) if args.world else None,
+									 Path(args.region_maps) if args.region_maps else None)
 		
 		print(f"\n=== {route.route_name} ===\n")
 		print(f"Estimated Time: {route.total_estimated_time:.0f}s ({route.total_estimated_time/60:.1f}m)")
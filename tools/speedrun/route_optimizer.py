@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+FFMQ Route Optimizer - Minimum-time speedrun routes over the world graph
+
+Routes are solved on the progression logic world (regions, doors and
+item locations with key-item requirements, see progression_logic.py).
+Every door and location gets a time estimate; the optimizer then runs
+A* over (region, inventory bitset) states, where the inventory holds the
+key items collected plus one bit per category objective. Locations are
+only visited when they add a bit, so the search never branches on items
+that no requirement mentions.
+
+Time model:
+- Doors: half a crossing of each region (width + height in tiles at
+  walking speed) plus a screen transition. With ROM tables and a
+  region -> map assignment, map sizes come from the map headers and a
+  door record between the two maps replaces the crossing of the source
+  region with the walk from its entrance to the door tile.
+- Locations: chest, event or boss time plus a detour into the region
+- Gold times: estimates at gold pace
+
+The heuristic is the requirement-free shortest path to the goal, through
+any missing objective, so it never overestimates.
+
+Features:
+- Any%, All Bosses and 100% objectives (Low% and Glitchless use Any%)
+- SpeedrunRoute output with one segment per pickup
+- Incremental splits: changing one door or location time updates only
+  the splits from the first step that uses it, and reports whether the
+  route itself may need re-solving
+
+Usage:
+	python route_optimizer.py
+	python route_optimizer.py --category all_bosses --export route.json
+	python route_optimizer.py --world world.json --rom rom.sfc --maps region_maps.json
+	python route_optimizer.py --set-time "Foresta -> Bone Dungeon" 90
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'randomizer'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'rom'))
+
+from ffmq_speedrun_tools import Category, RouteSegment, Split, SpeedrunRoute
+from progression_logic import LogicWorld, compile_requirement, default_world, satisfied
+from record_tables import DOOR_TABLE, MAP_HEADERS
+
+
+TILES_PER_SECOND = 6.0			# Walking speed
+TRANSITION = 2.0				# Screen fade per door
+GOLD_PACE = 0.9					# Gold time / estimated time
+CHEST_TIME = 4.0
+DEFAULT_SIZE = (32, 32)			# Region size in tiles when nothing is known
+
+# Approximate size of each default-world region in tiles (all floors)
+REGION_SIZES = {
+	'Hill of Destiny': (32, 32), 'Level Forest': (48, 48), 'Foresta': (32, 32), 'Sand Temple': (24, 32),
+	'Bone Dungeon': (96, 96), 'Libra Temple': (32, 32), 'Focus Tower': (64, 64), 'Aquaria': (32, 32),
+	'Wintry Cave': (64, 64), 'Falls Basin': (48, 48), 'Ice Pyramid': (128, 96), "Spencer's Place": (48, 32),
+	'Fireburg': (32, 32), 'Mine': (96, 64), 'Volcano': (64, 64), 'Lava Dome': (128, 96),
+	'Rope Bridge': (48, 16), 'Alive Forest': (64, 64), 'Giant Tree': (96, 128), 'Windia': (32, 32),
+	'Kaidge Temple': (32, 32), 'Mount Gale': (48, 64), "Pazuzu's Tower": (64, 160), 'Ship Dock': (32, 32),
+	"Mac's Ship": (64, 64), 'Doom Castle': (96, 160),
+}
+
+# Boss fights (seconds); these are the All Bosses objectives
+BOSS_TIMES = {
+	'Flamerus Rex': 75.0, 'Ice Golem': 90.0, 'Dualhead Hydra': 110.0, 'Gidrah': 90.0,
+	'Pazuzu': 140.0, 'Dark King': 240.0,
+}
+
+# Story events (seconds)
+EVENT_TIMES = {'Old Man': 20.0, 'Kaeli': 25.0, 'Phoebe': 20.0, 'Reuben': 20.0, 'Otto': 20.0}
+
+
+@dataclass
+class RouteStep:
+	"""One door walked through or location visited"""
+	kind: str					# 'door' or 'location'
+	index: int					# Door or location index in the world
+	name: str
+	region: str					# Region the step ends in
+	seconds: float
+	inventory: int = 0			# Inventory bitset before the step
+
+
+class RouteGraph:
+	"""LogicWorld with a time for every door and location"""
+
+	def __init__(self, world: LogicWorld, door_times: Sequence[float], location_times: Sequence[float]):
+		world.compile()
+		self.world = world
+		self.door_times = [float(t) for t in door_times]
+		self.location_times = [float(t) for t in location_times]
+		self._distances = None
+
+	@classmethod
+	def estimate(cls, world: LogicWorld, sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+				 door_walks: Optional[Dict[int, float]] = None) -> 'RouteGraph':
+		"""
+		Time estimates from region sizes
+
+		Args:
+			sizes: Region -> (width, height) in tiles (default REGION_SIZES)
+			door_walks: Door index -> tiles walked in the source region,
+				replacing half its crossing
+		"""
+		sizes = REGION_SIZES if sizes is None else sizes
+		door_walks = door_walks or {}
+		crossing = {region: sum(sizes.get(region, DEFAULT_SIZE)) / TILES_PER_SECOND for region in world.regions}
+
+		door_times = []
+		for index, door in enumerate(world.doors):
+			walk = door_walks[index] / TILES_PER_SECOND if index in door_walks else crossing[door.source] / 2
+			door_times.append(walk + crossing[door.dest] / 2 + TRANSITION)
+
+		location_times = []
+		for location in world.locations:
+			action = BOSS_TIMES.get(location.name, EVENT_TIMES.get(location.name, CHEST_TIME))
+			location_times.append(action + crossing[location.region] / 2)
+		return cls(world, door_times, location_times)
+
+	@classmethod
+	def from_rom(cls, world: LogicWorld, rom: bytes, region_maps: Dict[str, int]) -> 'RouteGraph':
+		"""
+		Estimates from the map header and door tables
+
+		Regions listed in region_maps take their size from the map header;
+		a door record from the source map to the destination map sets the
+		walk from the source map's entrance to the door tile (Manhattan).
+		"""
+		headers = MAP_HEADERS.view(rom)
+		doors = DOOR_TABLE.view(rom)
+		sizes = {region: (int(headers['width'][map_id]), int(headers['height'][map_id]))
+				 for region, map_id in region_maps.items() if map_id < len(headers)}
+
+		# Tiles from each door's source map entrance to the door
+		sources = doors['source_map'].astype(np.int64)
+		known = sources < len(headers)
+		walks = np.full(len(doors), -1, dtype=np.int64)
+		walks[known] = (np.abs(doors['source_x'][known].astype(np.int64) - headers['entrance_x'][sources[known]])
+						+ np.abs(doors['source_y'][known].astype(np.int64) - headers['entrance_y'][sources[known]]))
+		links = {}
+		for source, dest, walk in zip(sources.tolist(), doors['dest_map'].tolist(), walks.tolist()):
+			if walk >= 0:
+				links.setdefault((source, dest), walk)
+
+		door_walks = {}
+		for index, door in enumerate(world.doors):
+			key = (region_maps.get(door.source), region_maps.get(door.dest))
+			if key in links:
+				door_walks[index] = links[key]
+		return cls.estimate(world, {**REGION_SIZES, **sizes}, door_walks)
+
+	def door_index(self, label: str) -> int:
+		for index, door in enumerate(self.world.doors):
+			if door.label == label:
+				return index
+		raise KeyError(f"No door '{label}'")
+
+	def distances(self) -> np.ndarray:
+		"""All-pairs region travel times ignoring requirements (Floyd-Warshall)"""
+		if self._distances is None:
+			world = self.world
+			count = len(world.regions)
+			distances = np.full((count, count), np.inf)
+			np.fill_diagonal(distances, 0.0)
+			for source, edges in enumerate(world.out_edges):
+				for dest, _, door in edges:
+					distances[source, dest] = min(distances[source, dest], self.door_times[door])
+			for k in range(count):
+				np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+			self._distances = distances
+		return self._distances
+
+	def set_time(self, kind: str, index: int, seconds: float) -> None:
+		times = self.door_times if kind == 'door' else self.location_times
+		times[index] = float(seconds)
+		if kind == 'door':
+			self._distances = None
+
+
+def objectives(world: LogicWorld, category) -> List[int]:
+	"""Location indices a category must visit besides the goal"""
+	category = Category(getattr(category, 'value', category))
+	if category == Category.ALL_BOSSES:
+		names = set(BOSS_TIMES)
+	elif category == Category.HUNDRED_PERCENT:
+		names = {location.name for location in world.locations if location.item is not None}
+	else:
+		names = set()
+	return [i for i, location in enumerate(world.locations) if location.name in names and location.name != world.goal]
+
+
+class RouteOptimizer:
+	"""A* over (region, inventory) states"""
+
+	def __init__(self, graph: RouteGraph):
+		self.graph = graph
+		self.expanded = 0
+
+	def solve(self, category=Category.ANY_PERCENT, starting_items: Sequence[str] = ()) -> 'RoutePlan':
+		graph, world = self.graph, self.graph.world
+		goal = world.location_index[world.goal]
+		targets = objectives(world, category)
+
+		# Inventory bits: key items, then one per objective, then the goal
+		item_count = len(world.item_bits)
+		useful = 0
+		for requirement in [req for edges in world.out_edges for _, req, _ in edges] + world.location_reqs:
+			for mask in requirement:
+				useful |= mask
+		gains = []
+		for index, location in enumerate(world.locations):
+			bit = world.item_bits.get(location.item)
+			gains.append((1 << bit) & useful if bit is not None else 0)
+		for number, index in enumerate(targets):
+			gains[index] |= 1 << (item_count + number)
+		goal_bit = 1 << (item_count + len(targets))
+		gains[goal] = goal_bit
+		required = sum(1 << (item_count + n) for n in range(len(targets)))
+
+		# Heuristic: through the farthest missing objective to the goal
+		distances = graph.distances()
+		goal_region = world.region_index[world.locations[goal].region]
+		to_goal = distances[:, goal_region] + graph.location_times[goal]
+		detours = [(1 << (item_count + n), distances[:, world.region_index[world.locations[i].region]]
+					+ graph.location_times[i] + to_goal[world.region_index[world.locations[i].region]])
+				   for n, i in enumerate(targets)]
+
+		def heuristic(region: int, inventory: int) -> float:
+			estimate = to_goal[region]
+			for bit, through in detours:
+				if not inventory & bit and through[region] > estimate:
+					estimate = through[region]
+			return estimate
+
+		start = (world.region_index[world.start], world.item_mask(starting_items))
+		best = {start: 0.0}
+		parents: Dict[Tuple[int, int], Tuple[Tuple[int, int], str, int]] = {}
+		queue = [(heuristic(*start), 0.0, start)]
+		self.expanded = 0
+
+		while queue:
+			_, elapsed, state = heapq.heappop(queue)
+			if elapsed > best[state]:
+				continue
+			region, inventory = state
+			if inventory & goal_bit:
+				return RoutePlan.from_states(graph, state, parents, category)
+			self.expanded += 1
+
+			moves = [(dest, inventory, 'door', door, graph.door_times[door])
+					 for dest, requirement, door in world.out_edges[region] if satisfied(requirement, inventory)]
+			for index in world.region_locations[region]:
+				gain = gains[index] & ~inventory
+				if index == goal and inventory & required != required:
+					continue
+				if gain and satisfied(world.location_reqs[index], inventory):
+					moves.append((region, inventory | gain, 'location', index, graph.location_times[index]))
+
+			for dest, held, kind, index, seconds in moves:
+				successor = (dest, held)
+				cost = elapsed + seconds
+				if cost < best.get(successor, float('inf')):
+					best[successor] = cost
+					parents[successor] = (state, kind, index)
+					heapq.heappush(queue, (cost + heuristic(dest, held), cost, successor))
+
+		raise ValueError(f"No route reaches {world.goal} for {Category(getattr(category, 'value', category)).value}")
+
+
+class RoutePlan:
+	"""Solved route: steps, running time and splits"""
+
+	def __init__(self, graph: RouteGraph, steps: List[RouteStep], category):
+		self.graph = graph
+		self.steps = steps
+		self.category = Category(getattr(category, 'value', category))
+		self.seconds = np.array([step.seconds for step in steps])
+		self.elapsed = np.cumsum(self.seconds)
+		# Splits end at each location visit
+		self.split_ends = np.array([i for i, step in enumerate(steps) if step.kind == 'location'], dtype=np.int64)
+
+	@classmethod
+	def from_states(cls, graph: RouteGraph, state, parents, category) -> 'RoutePlan':
+		world = graph.world
+		steps = []
+		while state in parents:
+			previous, kind, index = parents[state]
+			if kind == 'door':
+				name, seconds = world.doors[index].label, graph.door_times[index]
+			else:
+				name, seconds = world.locations[index].name, graph.location_times[index]
+			steps.append(RouteStep(kind, index, name, world.regions[state[0]], seconds, previous[1]))
+			state = previous
+		return cls(graph, steps[::-1], category)
+
+	@property
+	def total_time(self) -> float:
+		return float(self.elapsed[-1]) if len(self.elapsed) else 0.0
+
+	def update_time(self, kind: str, index: int, seconds: float) -> bool:
+		"""
+		Change one door or location time and update the splits from the
+		first step that uses it
+
+		Returns:
+			True if the route may no longer be optimal (a step it uses got
+			slower, or something it does not use got faster)
+		"""
+		old = (self.graph.door_times if kind == 'door' else self.graph.location_times)[index]
+		self.graph.set_time(kind, index, seconds)
+		used = [i for i, step in enumerate(self.steps) if step.kind == kind and step.index == index]
+		if used:
+			self.seconds[used] = seconds
+			for i in used:
+				self.steps[i].seconds = float(seconds)
+			first = used[0]
+			base = self.elapsed[first - 1] if first else 0.0
+			self.elapsed[first:] = base + np.cumsum(self.seconds[first:])
+			return seconds > old
+		return seconds < old
+
+	def splits(self) -> List[Split]:
+		"""One split per location visit"""
+		ends = self.elapsed[self.split_ends]
+		times = np.diff(ends, prepend=0.0)
+		return [Split(self.steps[end].name, float(segment), float(total), float(segment * GOLD_PACE),
+					  float(segment * (1 - GOLD_PACE)))
+				for end, segment, total in zip(self.split_ends.tolist(), times, ends)]
+
+	def to_route(self) -> SpeedrunRoute:
+		world = self.graph.world
+		segments = []
+		start = 0
+		region = world.start
+		for number, end in enumerate(self.split_ends.tolist()):
+			steps = self.steps[start:end + 1]
+			walked = [step for step in steps if step.kind == 'door']
+			needed = 0
+			for step in walked:
+				requirement = compile_requirement(world.doors[step.index].requires, world.item_bits)
+				needed |= next((mask for mask in requirement if mask & step.inventory == mask), 0)
+			location = world.locations[steps[-1].index]
+			seconds = float(self.seconds[start:end + 1].sum())
+			boss = location.name in BOSS_TIMES
+			segments.append(RouteSegment(
+				segment_id=number,
+				name=location.name,
+				start_location=region,
+				end_location=location.region,
+				objectives=[f"Defeat {location.name}" if boss else
+							f"Get {location.item}" if location.item else f"Reach {location.name}"],
+				estimated_time=seconds,
+				gold_time=seconds * GOLD_PACE,
+				skips_used=[],
+				items_required=world.item_names(needed),
+				boss_fights=[location.name] if boss else [],
+				difficulty=7 if boss else 3,
+				notes=' → '.join([region] + [step.region for step in walked]) if walked else '',
+			))
+			region = location.region
+			start = end + 1
+
+		total = self.total_time
+		fights = sum(float(self.seconds[i]) for i, step in enumerate(self.steps)
+					 if step.kind == 'location' and step.name in BOSS_TIMES)
+		rng = fights / total if total else 0.0
+		return SpeedrunRoute(
+			category=self.category,
+			route_name=f"FFMQ {self.category.value} Route",
+			segments=segments,
+			total_estimated_time=total,
+			total_gold_time=total * GOLD_PACE,
+			difficulty_rating=round(float(np.mean([s.difficulty for s in segments])), 1) if segments else 0.0,
+			rng_dependence=round(rng, 2),
+			consistency_score=round(1 - rng / 2, 2),
+		)
+
+
+def build_graph(world_path: Optional[Path] = None, rom_path: Optional[Path] = None,
+				maps_path: Optional[Path] = None) -> RouteGraph:
+	"""Graph for the CLI and the speedrun toolkit"""
+	world = LogicWorld.load(world_path) if world_path else default_world()
+	if rom_path and maps_path:
+		region_maps = json.loads(Path(maps_path).read_text(encoding='utf-8'))
+		return RouteGraph.from_rom(world, Path(rom_path).read_bytes(), region_maps)
+	return RouteGraph.estimate(world)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ Route Optimizer')
+	parser.add_argument('--category', type=str, default='any%', choices=[c.value for c in Category],
+						help='Speedrun category')
+	parser.add_argument('--world', type=Path, help='World JSON (default: built-in FFMQ world)')
+	parser.add_argument('--rom', type=Path, help='ROM for map header/door table estimates')
+	parser.add_argument('--maps', type=Path, help='JSON {region: map_id} for --rom')
+	parser.add_argument('--start-items', nargs='*', default=[], help='Starting inventory')
+	parser.add_argument('--set-time', nargs=2, metavar=('DOOR', 'SECONDS'),
+						help='Change one door time and show the updated splits')
+	parser.add_argument('--export', type=Path, help='Export route JSON')
+
+	args = parser.parse_args()
+	graph = build_graph(args.world, args.rom, args.maps)
+	optimizer = RouteOptimizer(graph)
+
+	started = time.perf_counter()
+	plan = optimizer.solve(args.category, args.start_items)
+	elapsed = time.perf_counter() - started
+	print(f"\n=== FFMQ {args.category} Route ({optimizer.expanded:,} states, {elapsed:.2f}s) ===\n")
+
+	if args.set_time:
+		stale = plan.update_time('door', graph.door_index(args.set_time[0]), float(args.set_time[1]))
+		print(f"{args.set_time[0]} set to {float(args.set_time[1]):.0f}s"
+			  + (" (route may no longer be optimal)" if stale else "") + "\n")
+
+	print(f"{'Split':<25} {'Segment':>8} {'Total':>9}")
+	print("=" * 44)
+	for split in plan.splits():
+		print(f"{split.split_name:<25} {split.segment_time:>7.0f}s {split.total_time / 60:>8.1f}m")
+	print(f"\nTotal: {plan.total_time / 60:.1f}m (gold {plan.total_time * GOLD_PACE / 60:.1f}m)")
+
+	if args.export:
+		args.export.write_text(json.dumps(plan.to_route().to_dict(), indent='\t'), encoding='utf-8')
+		print(f"✓ Exported route to {args.export}")
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+FFMQ Split Store - Attempt history and split statistics
+
+Attempts live in a SQLite database with one REAL column per split
+(s0, s1, ...), so recording a split is a single-column UPDATE instead of
+a rewrite of the whole history. On open, the history is loaded into an
+attempts x splits NumPy matrix (NaN = no time) and every statistic is a
+column reduction over it. Recording a split updates the matrix and the
+running best/PB in place; medians and percentiles are recomputed only
+for the splits that changed.
+
+Features:
+- Sum of best, best possible time, PB and possible time save per split
+- Median, percentile and average segments
+- Consistency per split (standard deviation and coefficient of variation)
+- Incremental updates while a run is in progress
+- LiveSplit .lss import (attempt history and segment history)
+
+Usage:
+	python split_store.py runs.db --import-lss splits.lss
+	python split_store.py runs.db --statistics
+	python split_store.py runs.db --percentile 90
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from xml.sax.saxutils import unescape
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class SplitStats:
+	"""Statistics for one split"""
+	name: str
+	attempts: int				# Attempts with a time for this split
+	best: float
+	median: float
+	average: float
+	std: float
+	pb: float					# Segment in the PB run
+	possible_save: float		# pb - best
+
+	@property
+	def consistency(self) -> float:
+		"""Coefficient of variation (std / average); lower is more consistent"""
+		return self.std / self.average if self.average else np.nan
+
+
+class SplitStore:
+	"""SQLite-backed attempt history with in-memory segment matrix"""
+
+	def __init__(self, path: Path, split_names: Sequence[str] = ()):
+		"""
+		Args:
+			path: Database file (created if missing; ':memory:' works too)
+			split_names: Splits for a new database, or appended to an
+				existing one
+		"""
+		self.path = path
+		self.db = sqlite3.connect(str(path))
+		self.db.executescript("""
+			CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+			CREATE TABLE IF NOT EXISTS splits (position INTEGER PRIMARY KEY, name TEXT NOT NULL);
+			CREATE TABLE IF NOT EXISTS attempts (
+				id INTEGER PRIMARY KEY, started TEXT, ended TEXT, real_time REAL
+			);
+		""")
+		self.names: List[str] = [name for (name,) in self.db.execute("SELECT name FROM splits ORDER BY position")]
+		self.add_splits(list(split_names)[len(self.names):])
+		self._load()
+
+	# -- Schema and loading --------------------------------------------
+
+	def add_splits(self, names: Sequence[str]) -> None:
+		"""Append splits (existing attempts get no time for them)"""
+		for name in names:
+			position = len(self.names)
+			self.db.execute("INSERT INTO splits VALUES (?, ?)", (position, name))
+			self.db.execute(f"ALTER TABLE attempts ADD COLUMN s{position} REAL")
+			self.names.append(name)
+		self.db.commit()
+		if names and hasattr(self, '_segments'):
+			added = len(names)
+			self._segments = np.hstack([self._segments, np.full((len(self._segments), added), np.nan)])
+			self._best = np.concatenate([self._best, np.full(added, np.inf)])
+			self._dirty = np.concatenate([self._dirty, np.ones(added, dtype=bool)])
+			self._median = np.concatenate([self._median, np.full(added, np.nan)])
+
+	def _columns(self) -> str:
+		return ', '.join(f"s{i}" for i in range(len(self.names)))
+
+	def _load(self) -> None:
+		"""Read the whole history into arrays"""
+		columns = ', ' + self._columns() if self.names else ''
+		rows = self.db.execute(f"SELECT id, real_time{columns} FROM attempts ORDER BY id").fetchall()
+		data = np.array(rows, dtype=np.float64).reshape(len(rows), 2 + len(self.names))
+		self._set_arrays(data[:, 0].astype(np.int64), data[:, 1], data[:, 2:])
+
+	def _set_arrays(self, ids: np.ndarray, real_times: np.ndarray, segments: np.ndarray) -> None:
+		capacity = max(16, len(ids) * 2)
+		self._ids = np.zeros(capacity, dtype=np.int64)
+		self._real = np.full(capacity, np.nan)
+		self._segments = np.full((capacity, len(self.names)), np.nan)
+		self._ids[:len(ids)] = ids
+		self._real[:len(ids)] = real_times
+		self._segments[:len(ids)] = segments
+		self.count = len(ids)
+
+		self._best = np.fmin.reduce(self.segments, axis=0, initial=np.inf)
+		self._pb_row = self._find_pb()
+		self._dirty = np.ones(len(self.names), dtype=bool)
+		self._median = np.full(len(self.names), np.nan)
+
+	def _find_pb(self) -> Optional[int]:
+		real = self._real[:self.count]
+		if not np.isfinite(real).any():
+			return None
+		return int(np.nanargmin(real))
+
+	def _grow(self) -> None:
+		if self.count < len(self._ids):
+			return
+		capacity = len(self._ids) * 2
+		self._ids = np.concatenate([self._ids, np.zeros(capacity - len(self._ids), dtype=np.int64)])
+		self._real = np.concatenate([self._real, np.full(capacity - len(self._real), np.nan)])
+		self._segments = np.vstack([self._segments, np.full((capacity - len(self._segments), len(self.names)), np.nan)])
+
+	@property
+	def segments(self) -> np.ndarray:
+		"""attempts x splits segment times (view, NaN = no time)"""
+		return self._segments[:self.count]
+
+	@property
+	def real_times(self) -> np.ndarray:
+		"""Final time per attempt (NaN = not finished)"""
+		return self._real[:self.count]
+
+	@property
+	def attempt_ids(self) -> np.ndarray:
+		return self._ids[:self.count]
+
+	def close(self) -> None:
+		self.db.close()
+
+	# -- Recording -----------------------------------------------------
+
+	def begin_attempt(self, started: Optional[str] = None) -> int:
+		"""Start a new attempt; returns its id"""
+		started = started or time.strftime("%Y-%m-%d %H:%M:%S")
+		attempt_id = self.db.execute("INSERT INTO attempts (started) VALUES (?)", (started,)).lastrowid
+		self.db.commit()
+		self._grow()
+		self._ids[self.count] = attempt_id
+		self._real[self.count] = np.nan
+		self._segments[self.count] = np.nan
+		self.count += 1
+		return attempt_id
+
+	def _row(self, attempt_id: int) -> int:
+		row = int(np.searchsorted(self.attempt_ids, attempt_id))
+		if row >= self.count or self._ids[row] != attempt_id:
+			raise KeyError(f"No attempt {attempt_id}")
+		return row
+
+	def record_split(self, attempt_id: int, position: int, seconds: float) -> bool:
+		"""
+		Store one segment time
+
+		Returns:
+			True if it is a new best segment (gold)
+		"""
+		row = self._row(attempt_id)
+		self.db.execute(f"UPDATE attempts SET s{position} = ? WHERE id = ?", (seconds, attempt_id))
+		self.db.commit()
+		self._segments[row, position] = seconds
+		self._dirty[position] = True
+		gold = seconds < self._best[position]
+		if gold:
+			self._best[position] = seconds
+		return gold
+
+	def finish_attempt(self, attempt_id: int, real_time: Optional[float] = None) -> bool:
+		"""
+		Mark an attempt finished (real_time defaults to its segment sum)
+
+		Returns:
+			True if it is a new PB
+		"""
+		row = self._row(attempt_id)
+		if real_time is None:
+			real_time = float(np.nansum(self._segments[row]))
+		self.db.execute("UPDATE attempts SET real_time = ?, ended = ? WHERE id = ?",
+						(real_time, time.strftime("%Y-%m-%d %H:%M:%S"), attempt_id))
+		self.db.commit()
+		self._real[row] = real_time
+		if self._pb_row is None or real_time < self._real[self._pb_row]:
+			self._pb_row = row
+			return True
+		return False
+
+	# -- Statistics ----------------------------------------------------
+
+	@property
+	def best_segments(self) -> np.ndarray:
+		"""Best time per split (NaN = never reached)"""
+		return np.where(np.isfinite(self._best), self._best, np.nan)
+
+	def sum_of_best(self) -> float:
+		return float(np.nansum(self.best_segments))
+
+	def pb_time(self) -> Optional[float]:
+		return None if self._pb_row is None else float(self._real[self._pb_row])
+
+	def pb_segments(self) -> np.ndarray:
+		if self._pb_row is None:
+			return np.full(len(self.names), np.nan)
+		return self._segments[self._pb_row].copy()
+
+	def possible_time_save(self) -> np.ndarray:
+		"""PB segment minus best segment, per split"""
+		return self.pb_segments() - self.best_segments
+
+	def medians(self) -> np.ndarray:
+		"""Median segment per split, recomputed only for changed splits"""
+		dirty = np.flatnonzero(self._dirty)
+		if len(dirty) and self.count:
+			self._median[dirty] = _nan_reduce(np.nanmedian, self.segments[:, dirty])
+		elif len(dirty):
+			self._median[dirty] = np.nan
+		self._dirty[:] = False
+		return self._median.copy()
+
+	def percentile(self, q: float) -> np.ndarray:
+		"""q-th percentile segment per split"""
+		return _nan_reduce(lambda a, axis: np.nanpercentile(a, q, axis=axis), self.segments)
+
+	def averages(self) -> np.ndarray:
+		return _nan_reduce(np.nanmean, self.segments)
+
+	def deviations(self) -> np.ndarray:
+		return _nan_reduce(np.nanstd, self.segments)
+
+	def completed_times(self) -> np.ndarray:
+		real = self.real_times
+		return real[np.isfinite(real)]
+
+	def statistics(self) -> List[SplitStats]:
+		"""Per-split statistics"""
+		reached = np.isfinite(self.segments).sum(axis=0)
+		columns = zip(self.names, reached.tolist(), self.best_segments, self.medians(), self.averages(),
+					  self.deviations(), self.pb_segments(), self.possible_time_save())
+		return [SplitStats(name, count, *map(float, values)) for name, count, *values in columns]
+
+	# -- LiveSplit import ----------------------------------------------
+
+	def import_lss(self, path: Path) -> int:
+		"""
+		Replace the history with a LiveSplit .lss file
+
+		Returns:
+			Number of attempts imported
+		"""
+		text = Path(path).read_text(encoding='utf-8-sig')
+		for key in ('GameName', 'CategoryName'):
+			match = re.search(f"<{key}>(.*?)</{key}>", text, re.S)
+			if match:
+				self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, unescape(match.group(1))))
+
+		history = re.search(r"<AttemptHistory>(.*?)</AttemptHistory>|<AttemptHistory\s*/>", text, re.S)
+		attempts = _LSS_ATTEMPT.findall(history.group(1) or '' if history else '')
+		attributes = [dict(_LSS_ATTRIBUTE.findall(attempt[0])) for attempt in attempts]
+		ids = np.array([int(a['id']) for a in attributes], dtype=np.int64)
+		real = _lss_seconds([attempt[1:] for attempt in attempts])
+		order = np.argsort(ids, kind='stable')
+		ids, real = ids[order], real[order]
+		started = [attributes[i].get('started') for i in order]
+		ended = [attributes[i].get('ended') for i in order]
+
+		starts = [match.start() for match in re.finditer(r"<Segment>", text)] + [len(text)]
+		names = []
+		segments = np.full((len(ids), len(starts) - 1), np.nan)
+		for column, (start, end) in enumerate(zip(starts, starts[1:])):
+			name = _LSS_NAME.search(text, start, end)
+			names.append(unescape(name.group(1)) if name else '')
+			entries = _LSS_SEGMENT_TIME.findall(text, start, end)
+			if not entries or not len(ids):
+				continue
+			time_ids = np.array([entry[0] for entry in entries], dtype=np.int64)
+			values = _lss_seconds([entry[1:] for entry in entries])
+			# Negative ids are LiveSplit's cleaned-up history; drop anything without an attempt
+			rows = np.minimum(np.searchsorted(ids, time_ids), len(ids) - 1)
+			known = ids[rows] == time_ids
+			segments[rows[known], column] = values[known]
+
+		# Rebuild the attempts table (SQLite stores NaN as NULL)
+		self.db.execute("DROP TABLE attempts")
+		self.db.execute("DELETE FROM splits")
+		self.db.execute("CREATE TABLE attempts (id INTEGER PRIMARY KEY, started TEXT, ended TEXT, real_time REAL)")
+		self.names = []
+		self.add_splits(names)
+		placeholders = ', '.join('?' * (4 + len(names)))
+		rows = [(attempt_id, start, end, total, *row) for attempt_id, start, end, total, row
+				in zip(ids.tolist(), started, ended, real.tolist(), segments.tolist())]
+		self.db.executemany(f"INSERT INTO attempts VALUES ({placeholders})", rows)
+		self.db.commit()
+
+		self._set_arrays(ids, real, segments)
+		return len(ids)
+
+
+# LiveSplit writes a fixed layout, so the history is scanned with regexes
+# rather than built into an element tree (several times faster on big files)
+_TIME_FIELDS = r"(-?)(?:(\d+)\.)?(\d+):(\d+):(\d+(?:\.\d+)?)"		# [-][d.]hh:mm:ss[.fffffff]
+_LSS_ATTEMPT = re.compile(rf"<Attempt\b([^>]*?)(?:/>|>\s*(?:<RealTime>{_TIME_FIELDS}</RealTime>)?.*?</Attempt>)", re.S)
+_LSS_ATTRIBUTE = re.compile(r'(\w+)="([^"]*)"')
+_LSS_NAME = re.compile(r"<Name>(.*?)</Name>", re.S)
+_LSS_SEGMENT_TIME = re.compile(rf"<Time id=\"(-?\d+)\">\s*<RealTime>{_TIME_FIELDS}</RealTime>")
+
+
+def _lss_seconds(fields: Sequence[Sequence[str]]) -> np.ndarray:
+	"""Seconds from (sign, days, hours, minutes, seconds) strings; NaN where empty"""
+	if not len(fields):
+		return np.zeros(0)
+	sign, days, hours, minutes, seconds = zip(*fields)
+	missing = np.array([not h for h in hours]) if '' in hours else None
+	values = np.zeros(len(fields))
+	for column, scale in ((days, 86400.0), (hours, 3600.0), (minutes, 60.0), (seconds, 1.0)):
+		if any(column):
+			values += np.array([value or 0 for value in column] if '' in column else column, dtype=np.float64) * scale
+	if '-' in sign:
+		values[np.array([s == '-' for s in sign])] *= -1
+	if missing is not None:
+		values[missing] = np.nan
+	return values
+
+
+def _nan_reduce(function, data: np.ndarray) -> np.ndarray:
+	"""Column reduction that returns NaN for all-NaN columns without warnings"""
+	if not len(data):
+		return np.full(data.shape[1], np.nan)
+	result = np.full(data.shape[1], np.nan)
+	filled = np.isfinite(data).any(axis=0)
+	if filled.any():
+		result[filled] = function(data[:, filled], axis=0)
+	return result
+
+
+def format_time(seconds: float) -> str:
+	"""H:MM:SS.mmm / M:SS.mmm"""
+	if not np.isfinite(seconds):
+		return '-'
+	sign = '-' if seconds < 0 else ''
+	seconds = abs(seconds)
+	hours, minutes, secs = int(seconds // 3600), int(seconds % 3600 // 60), seconds % 60
+	return f"{sign}{hours}:{minutes:02d}:{secs:06.3f}" if hours else f"{sign}{minutes}:{secs:06.3f}"
+
+
+def print_statistics(store: SplitStore, percentile: Optional[float] = None) -> None:
+	completed = store.completed_times()
+	print(f"\n=== Statistics ({store.count:,} attempts, {len(completed):,} completed) ===\n")
+	extra = store.percentile(percentile) if percentile is not None else None
+	header = f"{'Split':<24} {'Runs':>6} {'Best':>10} {'Median':>10} {'PB':>10} {'Save':>9} {'CV':>6}"
+	print(header + (f" {'P' + format(percentile, 'g'):>10}" if extra is not None else ''))
+	print('-' * (len(header) + (11 if extra is not None else 0)))
+	for i, stats in enumerate(store.statistics()):
+		line = (f"{stats.name[:24]:<24} {stats.attempts:>6} {format_time(stats.best):>10} "
+				f"{format_time(stats.median):>10} {format_time(stats.pb):>10} "
+				f"{format_time(stats.possible_save):>9} {stats.consistency:>6.2f}")
+		print(line + (f" {format_time(extra[i]):>10}" if extra is not None else ''))
+
+	print(f"\nPB: {format_time(store.pb_time() or np.nan)}")
+	print(f"Sum of Best: {format_time(store.sum_of_best())}")
+	print(f"Possible Time Save: {format_time(float(np.nansum(store.possible_time_save())))}")
+	if len(completed):
+		print(f"Median Finish: {format_time(float(np.median(completed)))}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='FFMQ Split Store')
+	parser.add_argument('database', type=Path, help='Attempt database (SQLite)')
+	parser.add_argument('--import-lss', type=Path, metavar='FILE', help='Import a LiveSplit .lss file')
+	parser.add_argument('--statistics', action='store_true', help='Show split statistics')
+	parser.add_argument('--percentile', type=float, help='Add a percentile column to --statistics')
+
+	args = parser.parse_args()
+	store = SplitStore(args.database)
+
+	if args.import_lss:
+		started = time.perf_counter()
+		count = store.import_lss(args.import_lss)
+		print(f"✓ Imported {count:,} attempts x {len(store.names)} splits "
+			  f"in {time.perf_counter() - started:.2f}s")
+
+	if args.statistics or args.percentile is not None:
+		print_statistics(store, args.percentile)
+
+	store.close()
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Route Optimizer - Test Suite
+
+Checks A* routes against an exhaustive uniform-cost search, route
+validity against the progression requirements, ROM-table travel
+estimates and incremental split updates.
+
+Usage:
+	python test_route_optimizer.py
+"""
+
+import heapq
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_speedrun_tools import Category
+from route_optimizer import (
+	TILES_PER_SECOND, TRANSITION, RouteGraph, RouteOptimizer, default_world
+)
+from progression_logic import LogicWorld, compile_requirement, satisfied
+from record_tables import DOOR_TABLE, MAP_HEADERS
+
+
+def small_world() -> LogicWorld:
+	world = LogicWorld('Town', 'Boss')
+	world.add_door('Town', 'Cave', 'Lamp')
+	world.add_door('Town', 'Tower', 'Key & (Rope | Wings)')
+	world.add_door('Town', 'Field')
+	world.add_door('Cave', 'Pit', one_way=True, name='Pit drop')
+	world.add_door('Pit', 'Field', one_way=True, name='Pit exit')
+	world.add_location('Town Chest', 'Town', item='Lamp')
+	world.add_location('Cave Chest', 'Cave', item='Key')
+	world.add_location('Pit Chest', 'Pit', item='Rope')
+	world.add_location('Field Chest', 'Field', item='Wings')
+	world.add_location('Boss', 'Tower')
+	return world
+
+
+def uniform_cost(graph: RouteGraph) -> float:
+	"""Any% optimum by plain Dijkstra over every (region, inventory)"""
+	world = graph.world
+	goal = world.location_index[world.goal]
+	items = [(1 << world.item_bits[loc.item]) if loc.item in world.item_bits else 0 for loc in world.locations]
+	start = (world.region_index[world.start], 0)
+	best = {start: 0.0}
+	queue = [(0.0, start)]
+	while queue:
+		cost, (region, inventory) = heapq.heappop(queue)
+		if region < 0:
+			return cost
+		if cost > best[(region, inventory)]:
+			continue
+		moves = [(dest, inventory, graph.door_times[door]) for dest, req, door in world.out_edges[region]
+				 if satisfied(req, inventory)]
+		for index in world.region_locations[region]:
+			if satisfied(world.location_reqs[index], inventory):
+				if index == goal:
+					moves.append((-1, inventory, graph.location_times[index]))
+				else:
+					moves.append((region, inventory | items[index], graph.location_times[index]))
+		for dest, held, seconds in moves:
+			if cost + seconds < best.get((dest, held), float('inf')):
+				best[(dest, held)] = cost + seconds
+				heapq.heappush(queue, (cost + seconds, (dest, held)))
+	raise AssertionError("goal unreachable")
+
+
+def replay(plan) -> int:
+	"""Walk the route checking every requirement; returns the final region index"""
+	world = plan.graph.world
+	region, inventory = world.region_index[world.start], 0
+	for step in plan.steps:
+		if step.kind == 'door':
+			door = world.doors[step.index]
+			ends = [door.source, door.dest]
+			assert world.regions[region] in ends and (world.regions[region] == door.source or not door.one_way)
+			assert satisfied(compile_requirement(door.requires, world.item_bits), inventory), step.name
+			region = world.region_index[step.region]
+		else:
+			location = world.locations[step.index]
+			assert world.regions[region] == location.region
+			assert satisfied(world.location_reqs[step.index], inventory), step.name
+			inventory |= world.item_mask([location.item] if location.item else [])
+	return region
+
+
+class TestSolve(unittest.TestCase):
+	def test_small_world_and_exhaustive_optimum(self):
+		graph = RouteGraph(small_world(), [10, 10, 5, 3, 4], [1, 2, 2, 30, 50])
+		plan = RouteOptimizer(graph).solve()
+		# Rope via the one-way pit beats the slow field chest's wings
+		self.assertEqual([step.name for step in plan.steps], [
+			'Town Chest', 'Town -> Cave', 'Cave Chest', 'Pit drop', 'Pit Chest', 'Pit exit', 'Town -> Field',
+			'Town -> Tower', 'Boss'])
+		self.assertEqual(plan.total_time, uniform_cost(graph))
+
+		graph.location_times[3] = 1
+		self.assertEqual(RouteOptimizer(graph).solve().total_time, uniform_cost(graph))
+
+		for seed in range(5):
+			rng = np.random.default_rng(seed)
+			world = default_world()
+			graph = RouteGraph(world, rng.uniform(5, 120, len(world.doors)), rng.uniform(2, 200, len(world.locations)))
+			started = time.perf_counter()
+			plan = RouteOptimizer(graph).solve(Category.ANY_PERCENT)
+			self.assertLess(time.perf_counter() - started, 5.0)
+			self.assertAlmostEqual(plan.total_time, uniform_cost(graph), places=6)
+			self.assertEqual(plan.steps[-1].name, world.goal)
+			replay(plan)
+
+	def test_categories(self):
+		world = default_world()
+		graph = RouteGraph.estimate(world)
+		for location in ('Flamerus Rex', 'Ice Golem', 'Dualhead Hydra', 'Gidrah', 'Pazuzu'):
+			graph.location_times[world.location_index[location]] = 1000.0
+		any_percent = RouteOptimizer(graph).solve('any%')
+		bosses = RouteOptimizer(graph).solve(Category.ALL_BOSSES)
+		fought = {step.name for step in bosses.steps}
+		self.assertTrue({'Flamerus Rex', 'Ice Golem', 'Dualhead Hydra', 'Gidrah', 'Pazuzu'} <= fought)
+		self.assertLessEqual(any_percent.total_time, bosses.total_time)
+		replay(bosses)
+
+		route = bosses.to_route()
+		self.assertEqual(route.category, Category.ALL_BOSSES)
+		self.assertAlmostEqual(sum(s.estimated_time for s in route.segments), route.total_estimated_time)
+		self.assertEqual(route.segments[-1].boss_fights, ['Dark King'])
+		for before, after in zip(route.segments, route.segments[1:]):
+			self.assertEqual(before.end_location, after.start_location)
+
+
+class TestTimes(unittest.TestCase):
+	def test_rom_tables(self):
+		rom = bytearray(0x140000)
+		headers, doors = MAP_HEADERS.view(rom), DOOR_TABLE.view(rom)
+		headers[:3] = [(20, 30, 0, 0, 2, 3), (40, 10, 0, 0, 0, 0), (8, 8, 0, 0, 0, 0)]
+		doors['source_map'] = 0xFF
+		doors[5] = (0, 12, 9, 1, 0, 0)
+		world = small_world()
+		graph = RouteGraph.from_rom(world, rom, {'Town': 0, 'Cave': 1, 'Pit': 2})
+		cave, field = graph.door_index('Town -> Cave'), graph.door_index('Town -> Field')
+		# Entrance (2, 3) to the door at (12, 9), then half of the 40x10 cave
+		self.assertAlmostEqual(graph.door_times[cave], (10 + 6 + 25) / TILES_PER_SECOND + TRANSITION)
+		# No door record: half of the 20x30 town and of the default-size field
+		self.assertAlmostEqual(graph.door_times[field], (25 + 32) / TILES_PER_SECOND + TRANSITION)
+
+	def test_incremental_splits(self):
+		graph = RouteGraph.estimate(default_world())
+		plan = RouteOptimizer(graph).solve()
+		door = next(step.index for step in plan.steps[5:] if step.kind == 'door')
+		unused = next(i for i in range(len(graph.door_times)) if i not in
+					  {step.index for step in plan.steps if step.kind == 'door'})
+
+		self.assertTrue(plan.update_time('door', door, graph.door_times[door] + 400))
+		self.assertFalse(plan.update_time('door', unused, graph.door_times[unused] + 5))
+		self.assertTrue(plan.update_time('door', unused, 0.5))
+		expected = np.cumsum([graph.door_times[s.index] if s.kind == 'door' else graph.location_times[s.index]
+							  for s in plan.steps])
+		np.testing.assert_allclose(plan.elapsed, expected)
+		splits = plan.splits()
+		self.assertAlmostEqual(splits[-1].total_time, expected[-1])
+		self.assertAlmostEqual(sum(s.segment_time for s in splits), expected[-1])
+
+		resolved = RouteOptimizer(graph).solve()
+		self.assertLessEqual(resolved.total_time, plan.total_time)
+		self.assertAlmostEqual(resolved.total_time, uniform_cost(graph))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Split Store - Test Suite
+
+Checks LiveSplit import against generated histories (including a large
+one), the vectorized statistics against plain NumPy references,
+incremental updates while splits are recorded, persistence, and the
+timer's use of the store.
+
+Usage:
+	python test_split_store.py
+"""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ffmq_speedrun_timer import SpeedrunTimer
+from split_store import SplitStore, _lss_seconds
+
+
+def lss_time(seconds: float) -> str:
+	hours, minutes, secs = int(seconds // 3600), int(seconds % 3600 // 60), seconds % 60
+	return f"{hours:02d}:{minutes:02d}:{secs:010.7f}"
+
+
+def write_lss(path: Path, attempts: int, splits: int, seed: int = 0):
+	"""LiveSplit-layout file; returns (segments, reached) with NaN past each reset"""
+	rng = np.random.default_rng(seed)
+	segments = rng.normal(100, 10, (attempts, splits))
+	reached = rng.integers(1, splits + 1, attempts)
+	reached[rng.random(attempts) < 0.5] = splits
+	segments[np.arange(splits) >= reached[:, None]] = np.nan
+
+	lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<Run version="1.7.0">',
+			 '<GameName>FFMQ</GameName>', '<CategoryName>Any% &amp; More</CategoryName>', '<AttemptHistory>']
+	for i in range(attempts):
+		if reached[i] == splits:
+			lines.append(f'<Attempt id="{i + 1}" started="01/01/2020 00:00:00" isStartedSynced="True">'
+						 f'<RealTime>{lss_time(segments[i].sum())}</RealTime><PauseTime>00:00:01</PauseTime></Attempt>')
+		else:
+			lines.append(f'<Attempt id="{i + 1}" started="01/01/2020 00:00:00" />')
+	lines.append('</AttemptHistory>\n<Segments>')
+	for j in range(splits):
+		lines.append(f'<Segment><Name>Split {j}</Name><Icon />'
+					 f'<SplitTimes><SplitTime name="Personal Best"><RealTime>00:01:00</RealTime></SplitTime></SplitTimes>'
+					 f'<BestSegmentTime><RealTime>00:00:01</RealTime></BestSegmentTime><SegmentHistory>')
+		for i in np.flatnonzero(reached > j):
+			lines.append(f'<Time id="{i + 1}"><RealTime>{lss_time(segments[i, j])}</RealTime></Time>')
+		lines.append('<Time id="-3"><RealTime>00:00:01.0000000</RealTime></Time>'
+					 '<Time id="99999999"><RealTime>00:00:02</RealTime></Time></SegmentHistory></Segment>')
+	lines.append('</Segments>\n</Run>')
+	Path(path).write_text('\n'.join(lines), encoding='utf-8')
+	return segments, reached
+
+
+class TestImport(unittest.TestCase):
+	def setUp(self):
+		self.temp = tempfile.TemporaryDirectory()
+		self.dir = Path(self.temp.name)
+
+	def tearDown(self):
+		self.temp.cleanup()
+
+	def test_small_history_and_reopen(self):
+		segments, reached = write_lss(self.dir / 'run.lss', 40, 5)
+		store = SplitStore(self.dir / 'runs.db')
+		self.assertEqual(store.import_lss(self.dir / 'run.lss'), 40)
+		self.assertEqual(store.names, [f"Split {j}" for j in range(5)])
+		np.testing.assert_allclose(store.segments, segments, atol=1e-6)
+		finished = reached == 5
+		np.testing.assert_allclose(store.real_times[finished], np.nansum(segments[finished], axis=1), atol=1e-6)
+		self.assertTrue(np.isnan(store.real_times[~finished]).all())
+		self.assertEqual(store.db.execute("SELECT value FROM meta WHERE key = 'CategoryName'").fetchone(),
+						 ("Any% & More",))
+		store.close()
+
+		reopened = SplitStore(self.dir / 'runs.db')
+		np.testing.assert_array_equal(reopened.attempt_ids, np.arange(1, 41))
+		np.testing.assert_allclose(reopened.segments, segments, atol=1e-6)
+		self.assertAlmostEqual(reopened.sum_of_best(), np.nanmin(segments, axis=0).sum(), places=5)
+		reopened.close()
+
+	def test_time_formats(self):
+		values = _lss_seconds([('', '', '01', '02', '03.5'), ('-', '', '00', '00', '01.25'),
+							   ('', '2', '00', '00', '00'), ('', '', '', '', '')])
+		np.testing.assert_allclose(values[:3], [3723.5, -1.25, 172800])
+		self.assertTrue(np.isnan(values[3]))
+		self.assertEqual(len(_lss_seconds([])), 0)
+
+	def test_large_history(self):
+		segments, _ = write_lss(self.dir / 'big.lss', 10000, 15, seed=1)
+		store = SplitStore(':memory:')
+		started = time.perf_counter()
+		store.import_lss(self.dir / 'big.lss')
+		self.assertLess(time.perf_counter() - started, 1.0)
+		self.assertEqual(store.segments.shape, (10000, 15))
+		np.testing.assert_allclose(store.segments, segments, atol=1e-6)
+
+
+class TestStatistics(unittest.TestCase):
+	def test_against_numpy_and_incremental(self):
+		rng = np.random.default_rng(3)
+		store = SplitStore(':memory:', ['A', 'B', 'C'])
+		history = np.full((60, 3), np.nan)
+		finals = np.full(60, np.nan)
+		for row in range(60):
+			attempt = store.begin_attempt()
+			for position in range(rng.integers(1, 4)):
+				seconds = float(rng.normal(50 + 10 * position, 5))
+				best = np.nanmin(history[:, position]) if row else np.nan
+				self.assertEqual(store.record_split(attempt, position, seconds), not seconds >= best)
+				history[row, position] = seconds
+			if position == 2:
+				finals[row] = history[row].sum()
+				self.assertEqual(store.finish_attempt(attempt), finals[row] == np.nanmin(finals))
+			if row % 7 == 0:
+				np.testing.assert_allclose(store.medians(), np.nanmedian(history[:row + 1], axis=0))
+
+		pb = np.nanargmin(finals)
+		np.testing.assert_allclose(store.best_segments, np.nanmin(history, axis=0))
+		np.testing.assert_allclose(store.medians(), np.nanmedian(history, axis=0))
+		np.testing.assert_allclose(store.percentile(90), np.nanpercentile(history, 90, axis=0))
+		np.testing.assert_allclose(store.possible_time_save(), history[pb] - np.nanmin(history, axis=0))
+		self.assertAlmostEqual(store.pb_time(), finals[pb])
+		for stats, column in zip(store.statistics(), history.T):
+			self.assertEqual(stats.attempts, np.isfinite(column).sum())
+			self.assertAlmostEqual(stats.consistency, np.nanstd(column) / np.nanmean(column))
+
+		empty = SplitStore(':memory:', ['A'])
+		self.assertTrue(np.isnan(empty.medians()).all())
+		self.assertIsNone(empty.pb_time())
+		self.assertEqual(empty.sum_of_best(), 0.0)
+
+
+class TestTimer(unittest.TestCase):
+	def test_timer_records_to_store(self):
+		store = SplitStore(':memory:')
+		timer = SpeedrunTimer(store=store)
+		timer.create_splits(['One', 'Two'])
+		self.assertEqual(store.names, ['One', 'Two'])
+		for _ in range(2):
+			timer.start_timer()
+			timer.split()
+			timer.split()
+			timer.reset()
+		self.assertEqual(store.count, 2)
+		self.assertTrue(np.isfinite(store.real_times).all())
+		np.testing.assert_allclose(store.real_times, store.segments.sum(axis=1))
+		self.assertEqual(timer.get_pb_time(), store.real_times.min())
+		self.assertEqual(timer.get_sum_of_best(), store.sum_of_best())
+		self.assertEqual(timer.splits[0].best_segment, store.best_segments[0])
+
+		# A new timer over the same store starts from its bests
+		again = SpeedrunTimer(store=store)
+		again.create_splits(store.names)
+		self.assertEqual([s.best_segment for s in again.splits], store.best_segments.tolist())
+
+
+if __name__ == '__main__':
+	unittest.main()